@@ -38,9 +38,9 @@ INSERT INTO Servicio (codigo, ruta_id, bus_id, chofer_id, fecha_salida, fecha_ll
 
 -- TARIFAS
 INSERT INTO Tarifa (ruta_id, nombre, monto, fecha_inicio, fecha_fin) VALUES
-(1, 'Temporada baja', 8500, '2025-09-01', '2025-11-30'),
-(2, 'Temporada baja', 12000, '2025-09-01', '2025-11-30'),
-(3, 'Temporada baja', 10500, '2025-09-01', '2025-11-30');
+(1, 'Temporada baja', 8500, '2025-09-01 00:00', '2025-11-30 23:59'),
+(2, 'Temporada baja', 12000, '2025-09-01 00:00', '2025-11-30 23:59'),
+(3, 'Temporada baja', 10500, '2025-09-01 00:00', '2025-11-30 23:59');
 
 -- BOLETOS
 INSERT INTO Boleto (codigo, servicio_id, cliente_id, asiento, precio) VALUES
@@ -51,10 +51,10 @@ INSERT INTO Boleto (codigo, servicio_id, cliente_id, asiento, precio) VALUES
 
 -- PAGOS
 INSERT INTO Pago (boleto_id, monto, fecha_pago, metodo) VALUES
-(1, 8500, '2025-10-20', 'Debito'),
-(2, 8500, '2025-10-20', 'Efectivo'),
-(3, 12000, '2025-10-21', 'Credito'),
-(4, 10500, '2025-10-21', 'Transferencia');
+(1, 8500, '2025-10-20 00:00', 'Debito'),
+(2, 8500, '2025-10-20 00:00', 'Efectivo'),
+(3, 12000, '2025-10-21 00:00', 'Credito'),
+(4, 10500, '2025-10-21 00:00', 'Transferencia');
 
 -- RUTA-PARADAS (asignación de paradas a rutas con orden)
 INSERT INTO RutaParadas (ruta_id, parada_id, orden) VALUES
@@ -130,10 +130,14 @@ CREATE INDEX idx_cliente_rut ON Cliente(rut);
 -- Índice compuesto para determinar tarifas vigentes
 CREATE INDEX idx_tarifa_ruta_vigencia ON Tarifa(ruta_id, fecha_inicio, fecha_fin);
 
--- Índices para reportes de ventas en boletos
-CREATE INDEX idx_boleto_servicio ON Boleto(servicio_id);
+-- Índice para reportes de ventas en boletos por cliente
 CREATE INDEX idx_boleto_cliente ON Boleto(cliente_id);
 
+-- Índice único: un asiento no se puede vender dos veces en el mismo servicio
+-- (también acelera la consulta de asientos libres, ver asientos.py, y las
+-- búsquedas por servicio_id, así que no hace falta otro índice solo sobre esa columna)
+CREATE UNIQUE INDEX idx_boleto_servicio_asiento ON Boleto(servicio_id, asiento);
+
 
 
 -- CREACIÓN DE VISTAS
@@ -0,0 +1,506 @@
+"""
+Asesor de índices a partir de la carga real de consultas.
+
+1. Captura: mientras está activa, guarda en memoria cada sentencia distinta
+   que pasa por instrumentacion.medir (funciones_crud y el SQL de main.py) con
+   su cantidad de llamadas y una muestra de los valores de sus parámetros
+   (los valores no van al log de instrumentacion).
+2. Análisis, sobre una copia de la base (Connection.backup):
+    - índices redundantes: los que repiten, o son el comienzo de, otro índice
+      de la misma tabla (por ejemplo un CREATE INDEX sobre una columna UNIQUE);
+    - claves foráneas sin índice: borrar o cambiar el id de la fila referida
+      recorre completa la tabla que la referencia;
+    - índices candidatos según las columnas de WHERE/ON (igualdades primero,
+      después un rango) y de ORDER BY de cada sentencia.
+   Cada candidato se crea en la copia y se conserva solo si EXPLAIN QUERY PLAN
+   muestra que alguna sentencia lo usa. Después se vuelve a ejecutar la carga
+   (las escrituras dentro de un SAVEPOINT que se deshace) con y sin el índice,
+   y la diferencia, ponderada por la cantidad de llamadas, es la ganancia
+   estimada de crearlo o borrarlo.
+3. aplicar() ejecuta en la base los CREATE/DROP INDEX recomendados.
+
+Uso:
+    python asesor_indices.py analizar carga.json [--aplicar]
+    python asesor_indices.py analizar --log registro_consultas.jsonl
+    python asesor_indices.py redundantes
+(carga.json se guarda con Carga.guardar; el log de instrumentacion no tiene
+los valores de los parámetros, así que con --log solo se comparan planes.)
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import funciones_crud
+import instrumentacion
+from catalogo import obtener_catalogo
+
+MUESTRAS_POR_SENTENCIA = 20  # valores de parámetros guardados por sentencia distinta
+MAX_SENTENCIAS = 2000  # sentencias distintas guardadas por la captura
+REPETICIONES = 3  # veces que se ejecuta la carga en cada medición (se toma la más rápida)
+TIEMPO_MINIMO = 0.02  # segundos: las sentencias rápidas se repiten hasta sumar este tiempo por medición
+GANANCIA_MINIMA = 0.10  # fracción del tiempo de las sentencias afectadas para recomendar crear un índice
+MAX_COLUMNAS = 3  # columnas de un índice candidato
+
+
+# =========================================
+# CAPTURA DE LA CARGA
+# =========================================
+class Carga:
+    """
+    Sentencias observadas: {sql: {"operacion", "tabla", "llamadas", "total_ms", "valores": [tuplas]}}.
+    Parámetros:
+        muestras: valores de parámetros guardados por sentencia
+    """
+
+    def __init__(self, muestras=MUESTRAS_POR_SENTENCIA):
+        self.muestras = muestras
+        self.sentencias: Dict[str, Dict[str, Any]] = {}
+        self._candado = threading.Lock()
+
+    def agregar(self, registro, valores):
+        """Observador de instrumentacion: suma una ejecución de la sentencia."""
+        if registro["error"] is not None:
+            return
+        sql = registro["sql"]
+        with self._candado:
+            datos = self.sentencias.get(sql)
+            if datos is None:
+                if len(self.sentencias) >= MAX_SENTENCIAS:
+                    return
+                datos = self.sentencias[sql] = {"operacion": registro["operacion"], "tabla": registro["tabla"],
+                                                "llamadas": 0, "total_ms": 0.0, "parametros": registro["parametros"], "valores": []}
+            datos["llamadas"] += 1
+            datos["total_ms"] += registro["duracion_ms"]
+            if len(datos["valores"]) < self.muestras:
+                datos["valores"].append(tuple(valores or ()))
+
+    def guardar(self, ruta):
+        """Escribe la carga en un archivo JSON (incluye los valores de los parámetros)."""
+        with self._candado:
+            datos = {sql: dict(d, valores=[list(v) for v in d["valores"]]) for sql, d in self.sentencias.items()}
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(datos, archivo, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Lee una carga guardada con guardar()."""
+        carga = cls()
+        with open(ruta, encoding="utf-8") as archivo:
+            for sql, datos in json.load(archivo).items():
+                carga.sentencias[sql] = dict(datos, valores=[tuple(v) for v in datos["valores"]])
+        return carga
+
+    @classmethod
+    def desde_log(cls, ruta=None):
+        """Carga desde el log JSONL de instrumentacion: llamadas y tiempos, sin valores de parámetros."""
+        carga = cls()
+        instrumentacion.volcar_log()  # las líneas que todavía estaban en memoria
+        with open(ruta or instrumentacion.RUTA_LOG, encoding="utf-8") as archivo:
+            for linea in archivo:
+                try:
+                    registro = json.loads(linea)
+                except ValueError:
+                    continue
+                carga.agregar(registro, None)
+        for datos in carga.sentencias.values():
+            datos["valores"] = []
+        return carga
+
+
+_carga: Optional[Carga] = None
+_candado = threading.Lock()
+
+
+def iniciar_captura() -> Carga:
+    """Empieza a capturar las sentencias del proceso (si no se estaba capturando). Retorna la Carga."""
+    global _carga
+    with _candado:
+        if _carga is None:
+            _carga = Carga()
+            instrumentacion.observar(_carga.agregar)
+        return _carga
+
+
+def detener_captura() -> Optional[Carga]:
+    """Deja de capturar. Retorna la Carga capturada (o None si no había captura)."""
+    global _carga
+    with _candado:
+        carga, _carga = _carga, None
+        if carga is not None:
+            instrumentacion.dejar_de_observar(carga.agregar)
+        return carga
+
+
+def captura_activa() -> Optional[Carga]:
+    return _carga
+
+
+# =========================================
+# COLUMNAS USADAS POR UNA SENTENCIA
+# =========================================
+_RESERVADAS = {"WHERE", "JOIN", "ON", "LEFT", "INNER", "CROSS", "OUTER", "NATURAL", "GROUP", "ORDER",
+               "LIMIT", "USING", "SET", "VALUES", "INDEXED", "NOT", "UNION", "HAVING", "WINDOW"}
+_TABLA = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+"?(\w+)"?(?:\s+(?:AS\s+)?"?(\w+)"?)?', re.I)
+_CLAUSULA = re.compile(r'\b(WHERE|ON)\b(.*?)(?=\b(?:WHERE|JOIN|LEFT|INNER|CROSS|GROUP|ORDER|LIMIT|HAVING|UNION|WINDOW|RETURNING)\b|$)',
+                       re.I | re.S)
+_COMPARACION = re.compile(r'(?:"?(\w+)"?\.)?"?(\w+)"?\s*(==|=|<=|>=|<|>|\bIS\s+(?!NOT\b)|\bIN\s*\(|\bBETWEEN\b|\bGLOB\b)', re.I)
+_ORDEN = re.compile(r'\bORDER\s+BY\s+(.+?)(?=\bLIMIT\b|\bOFFSET\b|\)|$)', re.I | re.S)
+
+
+def _alias(sql, catalogo):
+    """{alias o nombre: tabla} de las tablas de la aplicación que nombra la sentencia."""
+    alias = {}
+    for tabla, nombre in _TABLA.findall(sql):
+        if tabla in catalogo.tablas and not tabla.startswith("_"):
+            alias[tabla] = tabla
+            if nombre and nombre.upper() not in _RESERVADAS:
+                alias[nombre] = tabla
+    return alias
+
+
+def _resolver(calificador, columna, alias, catalogo):
+    """Tabla dueña de la columna (por su alias o, sin alias, la única tabla que la tiene)."""
+    if calificador:
+        tabla = alias.get(calificador)
+        return tabla if tabla and columna in catalogo.tablas[tabla].nombres_columnas else None
+    duenas = {t for t in alias.values() if columna in catalogo.tablas[t].nombres_columnas}
+    return duenas.pop() if len(duenas) == 1 else None
+
+
+def columnas_usadas(sql, catalogo) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Columnas de cada tabla que la sentencia compara en WHERE/ON y ordena en ORDER BY:
+    {tabla: {"igualdad": [...], "rango": [...], "orden": [...]}}.
+    Es un análisis aproximado del texto: lo que no entiende lo ignora.
+    """
+    alias = _alias(sql, catalogo)
+    usadas: Dict[str, Dict[str, List[str]]] = {}
+
+    def anotar(tabla, tipo, columna):
+        listas = usadas.setdefault(tabla, {"igualdad": [], "rango": [], "orden": []})
+        if columna not in listas[tipo]:
+            listas[tipo].append(columna)
+
+    for _, texto in _CLAUSULA.findall(sql):
+        for calificador, columna, operador in _COMPARACION.findall(texto):
+            tabla = _resolver(calificador, columna, alias, catalogo)
+            if tabla:
+                anotar(tabla, "igualdad" if operador.strip().upper()[:2] in ("=", "==", "IS", "IN") else "rango", columna)
+    for lista in _ORDEN.findall(sql):
+        for termino in lista.split(","):
+            partes = re.match(r'\s*(?:"?(\w+)"?\.)?"?(\w+)"?\s*(?:ASC|DESC)?\s*$', termino, re.I)
+            tabla = partes and _resolver(partes.group(1), partes.group(2), alias, catalogo)
+            if tabla:
+                anotar(tabla, "orden", partes.group(2))
+    return usadas
+
+
+# =========================================
+# ÍNDICES DE LA BASE
+# =========================================
+def _cubre(indice_columnas, columnas):
+    """True si un índice con indice_columnas sirve para buscar por columnas (las tiene como comienzo)."""
+    return tuple(indice_columnas[:len(columnas)]) == tuple(columnas)
+
+
+def redundantes(catalogo=None) -> List[Dict[str, Any]]:
+    """
+    Índices creados con CREATE INDEX (no UNIQUE) cuyas columnas son el comienzo de
+    otro índice de la tabla: ese otro ya sirve para las mismas búsquedas.
+    Retorna [{"accion": "eliminar", "tabla", "indice", "columnas", "motivo", "sql"}].
+    """
+    catalogo = catalogo or obtener_catalogo()
+    resultado = []
+    for tabla in catalogo.tablas_aplicacion():
+        indices = [i for i in catalogo.tablas[tabla].indices if i.columnas and None not in i.columnas]
+        for indice in indices:
+            if indice.unico or indice.origen != "c":
+                continue
+            for otro in indices:
+                if otro is indice or not _cubre(otro.columnas, indice.columnas):
+                    continue
+                if otro.columnas == indice.columnas and not otro.unico and otro.nombre > indice.nombre:
+                    continue  # dos iguales sin UNIQUE: se conserva uno solo
+                resultado.append({
+                    "accion": "eliminar", "tabla": tabla, "indice": indice.nombre, "columnas": list(indice.columnas),
+                    "motivo": f"repite {otro.nombre} ({', '.join(otro.columnas)})",
+                    "sql": f'DROP INDEX "{indice.nombre}"',
+                })
+                break
+    return resultado
+
+
+def claves_sin_indice(catalogo=None) -> List[Dict[str, Any]]:
+    """Claves foráneas cuya columna no encabeza ningún índice: [{"tabla", "columnas", "tabla_ref"}]."""
+    catalogo = catalogo or obtener_catalogo()
+    resultado = []
+    for tabla in catalogo.tablas_aplicacion():
+        for fk in catalogo.tablas[tabla].claves_foraneas:
+            if catalogo.indice_para(tabla, fk.columna) is None:
+                resultado.append({"tabla": tabla, "columnas": [fk.columna], "tabla_ref": fk.tabla_ref})
+    return resultado
+
+
+def _nombre_indice(tabla, columnas):
+    return f"idx_{tabla.lower()}_{'_'.join(columnas)}"
+
+
+def _candidatos(carga, catalogo):
+    """{(tabla, columnas): motivo} de índices que podrían servir a la carga."""
+    candidatos = {}
+    for fk in claves_sin_indice(catalogo):
+        candidatos[(fk["tabla"], tuple(fk["columnas"]))] = f"clave foránea a {fk['tabla_ref']} sin índice"
+    for sql in carga.sentencias:
+        for tabla, usadas in columnas_usadas(sql, catalogo).items():
+            info = catalogo.tablas[tabla]
+            columnas = [c for c in usadas["igualdad"] if c not in info.pk]
+            rango = [c for c in usadas["rango"] if c not in columnas and c not in info.pk]
+            if rango:
+                columnas.append(rango[0])
+            elif len(usadas["orden"]) and not set(usadas["orden"]) & set(info.pk):
+                columnas += [c for c in usadas["orden"] if c not in columnas]
+            columnas = tuple(columnas[:MAX_COLUMNAS])
+            if not columnas or any(_cubre(i.columnas, columnas) for i in info.indices if i.columnas):
+                continue
+            candidatos.setdefault((tabla, columnas), "columnas de WHERE/ORDER BY de la carga")
+    return candidatos
+
+
+# =========================================
+# PLANES Y REPRODUCCIÓN SOBRE LA COPIA
+# =========================================
+def _copiar():
+    """Copia de la base en un archivo temporal (Connection.backup). Retorna (ruta, conexión)."""
+    descriptor, ruta = tempfile.mkstemp(prefix="asesor_indices_", suffix=".db")
+    os.close(descriptor)
+    copia = sqlite3.connect(ruta, isolation_level=None)
+    with funciones_crud.obtener_conexion() as conexion:
+        conexion.backup(copia)
+    copia.execute("PRAGMA journal_mode = WAL")
+    copia.execute("PRAGMA foreign_keys = ON")  # las escrituras pagan también los chequeos de claves foráneas
+    return ruta, copia
+
+
+def _borrar_copia(ruta, copia):
+    copia.close()
+    for sufijo in ("", "-wal", "-shm"):
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
+
+
+def _valores(datos):
+    return datos["valores"] or [(None,) * datos["parametros"]]
+
+
+def _indices_del_plan(copia, sql, datos):
+    """(índices que usa el plan, tablas que recorre completas); None si no se puede explicar."""
+    try:
+        pasos, escaneos = instrumentacion.plan_consulta(copia, sql, _valores(datos)[0])
+    except sqlite3.Error:
+        return None
+    usados = set()
+    for paso in pasos:
+        usados.update(re.findall(r"USING (?:COVERING )?INDEX (\w+)", paso))
+    return usados, set(escaneos)
+
+
+_REPRODUCIBLES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+def _ejecutar(copia, sql, valores):
+    if sql.lstrip().upper().startswith(("SELECT", "WITH")):
+        copia.execute(sql, valores).fetchall()
+        return
+    # Escrituras: se deshacen para que la copia no cambie. Los INSERT se reproducen
+    # como INSERT OR REPLACE porque la fila (mismo id) ya está en la copia.
+    if sql.lstrip().upper().startswith("INSERT INTO"):
+        sql = "INSERT OR REPLACE INTO" + sql.lstrip()[len("INSERT INTO"):]
+    copia.execute("SAVEPOINT asesor")
+    try:
+        copia.execute(sql, valores)
+    except sqlite3.IntegrityError:
+        pass  # claves foráneas: el chequeo (lo que se quiere medir) ya se hizo
+    finally:
+        copia.execute("ROLLBACK TO asesor")
+        copia.execute("RELEASE asesor")
+
+
+def _reproducir(copia, carga, sentencias, repeticiones=REPETICIONES):
+    """{sql: milisegundos por llamada} de las sentencias con valores capturados (la mejor de las repeticiones)."""
+    tiempos = {}
+    for sql in sentencias:
+        datos = carga.sentencias[sql]
+        if not datos["valores"] or not sql.lstrip().upper().startswith(_REPRODUCIBLES):
+            continue
+        mejor = None
+        for _ in range(repeticiones):
+            llamadas, inicio = 0, time.perf_counter()
+            try:
+                while llamadas == 0 or time.perf_counter() - inicio < TIEMPO_MINIMO:
+                    for valores in datos["valores"]:
+                        _ejecutar(copia, sql, valores)
+                    llamadas += len(datos["valores"])
+            except sqlite3.Error:
+                mejor = None
+                break
+            duracion = (time.perf_counter() - inicio) * 1000 / llamadas
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        if mejor is not None:
+            tiempos[sql] = mejor
+    return tiempos
+
+
+def _costo(carga, tiempos):
+    """Milisegundos de la carga completa: tiempo por llamada x llamadas."""
+    return sum(ms * carga.sentencias[sql]["llamadas"] for sql, ms in tiempos.items())
+
+
+def _afectadas(carga, catalogo, tabla):
+    """Sentencias que nombran la tabla (o la tabla referida por sus claves foráneas, por los chequeos)."""
+    referidas = {fk.tabla_ref for fk in catalogo.tablas[tabla].claves_foraneas}
+    sentencias = []
+    for sql in carga.sentencias:
+        nombradas = set(_alias(sql, catalogo).values())
+        if tabla in nombradas or (nombradas & referidas and not sql.lstrip().upper().startswith("SELECT")):
+            sentencias.append(sql)
+    return sentencias
+
+
+def _medir_cambio(copia, carga, sentencias, crear, deshacer):
+    """Aplica 'crear' en la copia, mide las sentencias y lo deshace. Retorna (tiempos después, planes después)."""
+    copia.execute(crear)
+    try:
+        planes = {sql: _indices_del_plan(copia, sql, carga.sentencias[sql]) for sql in sentencias}
+        despues = _reproducir(copia, carga, sentencias)
+    finally:
+        copia.execute(deshacer)
+    return despues, planes
+
+
+# =========================================
+# ANÁLISIS
+# =========================================
+def analizar(carga: Optional[Carga] = None) -> Dict[str, Any]:
+    """
+    Recomienda índices para crear y borrar según la carga (por defecto la capturada).
+    Retorna {"recomendaciones": [{"accion", "tabla", "indice", "columnas", "motivo", "sql",
+             "antes_ms", "despues_ms", "ganancia_pct", "sentencias"}],
+             "sin_uso": [índices que ningún plan de la carga usa],
+             "sentencias": distintas, "medidas": con valores, "costo_ms": de la carga completa}.
+    antes_ms/despues_ms son el costo de las sentencias afectadas (tiempo por llamada x
+    llamadas); None si no se pudo medir (carga sin valores de parámetros).
+    """
+    carga = carga or _carga or Carga()
+    ruta, copia = _copiar()
+    try:
+        catalogo = obtener_catalogo(copia)
+        todas = list(carga.sentencias)
+        _reproducir(copia, carga, todas, repeticiones=1)  # calienta la caché de páginas
+        base = _reproducir(copia, carga, todas)
+        planes = {sql: _indices_del_plan(copia, sql, carga.sentencias[sql]) for sql in todas}
+        recomendaciones = []
+
+        for (tabla, columnas), motivo in _candidatos(carga, catalogo).items():
+            nombre = _nombre_indice(tabla, columnas)
+            sentencias = _afectadas(carga, catalogo, tabla)
+            lista = ", ".join(f'"{c}"' for c in columnas)
+            sql_crear = f'CREATE INDEX "{nombre}" ON "{tabla}" ({lista})'
+            despues, planes_despues = _medir_cambio(copia, carga, sentencias, sql_crear, f'DROP INDEX "{nombre}"')
+            usado = [sql for sql, plan in planes_despues.items() if plan and nombre in plan[0]]
+            es_clave = motivo.startswith("clave foránea")
+            if not usado and not es_clave:
+                continue
+            medidas = [sql for sql in sentencias if sql in base and sql in despues]
+            antes_ms, despues_ms = _costo(carga, {s: base[s] for s in medidas}), _costo(carga, {s: despues[s] for s in medidas})
+            ganancia = (antes_ms - despues_ms) / antes_ms if antes_ms else None
+            if ganancia is not None and ganancia < GANANCIA_MINIMA and not (es_clave and not usado):
+                continue
+            recomendaciones.append({
+                "accion": "crear", "tabla": tabla, "indice": nombre, "columnas": list(columnas),
+                "motivo": motivo if not usado else f"{motivo}; sentencias que lo usan: {len(usado)}",
+                "sql": sql_crear, "antes_ms": round(antes_ms, 3) if medidas else None,
+                "despues_ms": round(despues_ms, 3) if medidas else None,
+                "ganancia_pct": round(ganancia * 100, 1) if ganancia is not None else None, "sentencias": len(usado),
+            })
+
+        definiciones = dict(copia.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL").fetchall())
+        for redundante in redundantes(catalogo):
+            sentencias = _afectadas(carga, catalogo, redundante["tabla"])
+            despues, planes_despues = _medir_cambio(copia, carga, sentencias, redundante["sql"], definiciones[redundante["indice"]])
+            nuevos_escaneos = [sql for sql, plan in planes_despues.items()
+                               if plan and planes.get(sql) and plan[1] - planes[sql][1]]
+            if nuevos_escaneos:
+                continue  # sin el índice alguna sentencia pasaría a recorrer la tabla completa
+            medidas = [sql for sql in sentencias if sql in base and sql in despues]
+            antes_ms, despues_ms = _costo(carga, {s: base[s] for s in medidas}), _costo(carga, {s: despues[s] for s in medidas})
+            recomendaciones.append(dict(
+                redundante, antes_ms=round(antes_ms, 3) if medidas else None, despues_ms=round(despues_ms, 3) if medidas else None,
+                ganancia_pct=round((antes_ms - despues_ms) / antes_ms * 100, 1) if antes_ms else None, sentencias=len(medidas)))
+
+        usados = set().union(*(plan[0] for plan in planes.values() if plan)) if planes else set()
+        con_carga = {t for sql in todas for t in _alias(sql, catalogo).values()}
+        quitar = {r["indice"] for r in recomendaciones if r["accion"] == "eliminar"}
+        sin_uso = [i.nombre for t in sorted(con_carga) for i in catalogo.tablas[t].indices
+                   if i.origen == "c" and not i.unico and i.nombre not in usados and i.nombre not in quitar
+                   and not any(fk.columna == (i.columnas or (None,))[0] for fk in catalogo.tablas[t].claves_foraneas)]
+    finally:
+        _borrar_copia(ruta, copia)
+    recomendaciones.sort(key=lambda r: (r["accion"], -(r["ganancia_pct"] or 0)))
+    return {"recomendaciones": recomendaciones, "sin_uso": sin_uso, "sentencias": len(carga.sentencias),
+            "medidas": len(base), "costo_ms": round(_costo(carga, base), 3)}
+
+
+def aplicar(recomendaciones: List[Dict[str, Any]]) -> int:
+    """Ejecuta en la base los CREATE/DROP INDEX de las recomendaciones. Retorna cuántos se aplicaron."""
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            for recomendacion in recomendaciones:
+                conexion.execute(recomendacion["sql"].replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1)
+                                 .replace("DROP INDEX", "DROP INDEX IF EXISTS", 1))
+            conexion.commit()
+        return len(recomendaciones)
+
+    aplicadas = funciones_crud.en_escritor(lambda: funciones_crud.con_reintentos(operacion))
+    funciones_crud.cache.limpiar()
+    return aplicadas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=["analizar", "redundantes"])
+    parser.add_argument("carga", nargs="?", help="analizar: archivo JSON guardado con Carga.guardar")
+    parser.add_argument("--log", help="analizar: usar el log JSONL de instrumentacion (sin valores: solo planes)")
+    parser.add_argument("--aplicar", action="store_true", help="analizar: ejecutar las recomendaciones en la base")
+    parser.add_argument("--bd", help="archivo de base de datos (por defecto " + funciones_crud.RUTA_BD + ")")
+    args = parser.parse_args(argv)
+    if args.bd:
+        funciones_crud.configurar_pool(ruta_bd=args.bd)
+    if args.comando == "redundantes":
+        for r in redundantes():
+            print(f"{r['sql']};  -- {r['motivo']}")
+        return 0
+    if not args.carga and not args.log:
+        parser.error("analizar necesita un archivo de carga o --log")
+    carga = Carga.cargar(args.carga) if args.carga else Carga.desde_log(args.log)
+    resultado = analizar(carga)
+    print(f"{resultado['sentencias']} sentencias distintas ({resultado['medidas']} con valores para medir), "
+          f"costo de la carga {resultado['costo_ms']:.1f} ms")
+    for r in resultado["recomendaciones"]:
+        ganancia = f"{r['ganancia_pct']:+.1f} %" if r["ganancia_pct"] is not None else "sin medir"
+        print(f"{r['sql']};  -- {ganancia}: {r['motivo']}")
+    if resultado["sin_uso"]:
+        print("Índices que ningún plan de la carga usa: " + ", ".join(resultado["sin_uso"]))
+    if args.aplicar and resultado["recomendaciones"]:
+        print(f"{aplicar(resultado['recomendaciones'])} cambios aplicados.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
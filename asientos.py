@@ -0,0 +1,211 @@
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import funciones_crud
+
+# =========================================
+# MAPA DE ASIENTOS POR SERVICIO
+# =========================================
+# Responde "¿qué asientos quedan libres en el servicio X?" y vende un asiento
+# de forma atómica, aunque varios vendedores intenten el mismo asiento a la vez.
+#   - Los asientos válidos van de 1 a Bus.capacidad del bus asignado al Servicio.
+#   - Los asientos vendidos se leen con el índice único (servicio_id, asiento)
+#     de Boleto, que además impide a nivel de base que un asiento se venda dos veces.
+#   - Para mostrar disponibilidad se guarda un mapa de bits por servicio (un int:
+#     bit n encendido = asiento n vendido), que vence a los pocos segundos para
+#     reflejar ventas hechas desde otros procesos.
+
+INDICE_ASIENTOS = "idx_boleto_servicio_asiento"
+VIGENCIA_MAPA = 2.0  # segundos que se reutiliza un mapa de bits sin volver a la base
+
+_mapas: Dict[int, tuple] = {}  # servicio_id -> (capacidad, bits_ocupados, vence)
+_candado = threading.Lock()
+_instalado: Dict[str, bool] = {}  # archivo de base -> si quedó el índice único (False: hay asientos repetidos)
+
+
+def asegurar_indice(conexion: sqlite3.Connection) -> bool:
+    """
+    Crea (si falta) el índice único Boleto(servicio_id, asiento) y borra
+    idx_boleto_servicio, que queda de más: es el comienzo del índice único.
+    Retorna False si no se pudo crear porque ya hay asientos vendidos dos veces.
+    """
+    try:
+        conexion.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {INDICE_ASIENTOS} ON Boleto(servicio_id, asiento)")
+        conexion.execute("DROP INDEX IF EXISTS idx_boleto_servicio")
+        conexion.commit()
+    except sqlite3.IntegrityError:
+        conexion.rollback()
+        return False
+    return True
+
+
+def instalar() -> bool:
+    """
+    Crea el índice único una sola vez por proceso y recuerda el resultado, también
+    si falló: con asientos ya repetidos, volver a intentarlo en cada venta sería
+    recorrer Boleto completo con el bloqueo de escritura tomado. Sin el índice la
+    reserva igual verifica el asiento dentro de su transacción.
+    Retorna True si el índice existe.
+    """
+    if funciones_crud.RUTA_BD not in _instalado:
+        def operacion():
+            with funciones_crud.obtener_conexion() as conexion:
+                return asegurar_indice(conexion)
+        _instalado[funciones_crud.RUTA_BD] = funciones_crud.en_escritor(lambda: funciones_crud.con_reintentos(operacion))
+    return _instalado[funciones_crud.RUTA_BD]
+
+
+def _capacidad(conexion: sqlite3.Connection, servicio_id: int) -> Optional[int]:
+    fila = conexion.execute(
+        "SELECT b.capacidad FROM Servicio s JOIN Bus b ON b.id = s.bus_id WHERE s.id = ?", (servicio_id,)
+    ).fetchone()
+    return fila[0] if fila else None
+
+
+def _bits_ocupados(conexion: sqlite3.Connection, servicio_id: int, capacidad: int) -> int:
+    # Solo lee el índice (servicio_id, asiento): no toca las filas de Boleto. Los
+    # asientos fuera de 1..capacidad (filas antiguas o importadas) no entran al mapa:
+    # un número enorme haría crecer el entero en cada reserva
+    bits = 0
+    for (asiento,) in conexion.execute(
+        "SELECT asiento FROM Boleto WHERE servicio_id = ? AND asiento BETWEEN 1 AND ?", (servicio_id, capacidad)
+    ):
+        if isinstance(asiento, int):
+            bits |= 1 << asiento
+    return bits
+
+
+def _guardar_mapa(servicio_id: int, capacidad: int, bits: int):
+    with _candado:
+        _mapas[servicio_id] = (capacidad, bits, time.monotonic() + VIGENCIA_MAPA)
+
+
+def _mapa(servicio_id: int):
+    """(capacidad, bits_ocupados) del servicio, desde el mapa guardado o desde la base."""
+    with _candado:
+        guardado = _mapas.get(servicio_id)
+    if guardado and time.monotonic() < guardado[2]:
+        return guardado[0], guardado[1]
+    with funciones_crud.obtener_conexion() as conexion:
+        capacidad = _capacidad(conexion, servicio_id)
+        if capacidad is None:
+            return None, 0
+        bits = _bits_ocupados(conexion, servicio_id, capacidad)
+    _guardar_mapa(servicio_id, capacidad, bits)
+    return capacidad, bits
+
+
+def invalidar(servicio_id: Optional[int] = None):
+    """Olvida el mapa de un servicio (o de todos), por ejemplo si cambió su bus."""
+    with _candado:
+        if servicio_id is None:
+            _mapas.clear()
+        else:
+            _mapas.pop(servicio_id, None)
+
+
+# =========================================
+# CONSULTAS
+# =========================================
+def asientos_libres(servicio_id: int) -> List[int]:
+    """Lista de asientos libres (1..capacidad) del servicio; vacía si el servicio no existe."""
+    capacidad, bits = _mapa(servicio_id)
+    if capacidad is None:
+        return []
+    return [n for n in range(1, capacidad + 1) if not (bits >> n) & 1]
+
+
+def resumen_servicio(servicio_id: int) -> Optional[Dict[str, int]]:
+    """{"capacidad", "vendidos", "libres"} del servicio, o None si no existe."""
+    capacidad, bits = _mapa(servicio_id)
+    if capacidad is None:
+        return None
+    vendidos = bin(bits).count("1")  # el mapa solo tiene asientos de 1..capacidad
+    return {"capacidad": capacidad, "vendidos": vendidos, "libres": capacidad - vendidos}
+
+
+def verificar_actualizacion(boleto_id: int, datos: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """
+    Verifica contra Bus.capacidad el asiento que tendría el Boleto después de
+    actualizarlo con 'datos' (si cambian servicio_id o asiento), igual que la venta.
+    Retorna None si está bien, o {"error", "message"} como reservar_asiento.
+    """
+    if "asiento" not in datos and "servicio_id" not in datos:
+        return None
+    with funciones_crud.obtener_conexion() as conexion:
+        actual = conexion.execute("SELECT servicio_id, asiento FROM Boleto WHERE id = ?", (boleto_id,)).fetchone()
+        if actual is None:
+            return None  # el UPDATE no va a cambiar ninguna fila
+        servicio_id = datos.get("servicio_id", actual[0])
+        capacidad = _capacidad(conexion, servicio_id)
+    if capacidad is None:
+        return {"error": "not_found", "message": f"No existe el servicio id={servicio_id}."}
+    try:
+        asiento = int(datos.get("asiento", actual[1]))
+    except (TypeError, ValueError):
+        asiento = None
+    if asiento is None or not 1 <= asiento <= capacidad:
+        return {"error": "validation", "message": f"El asiento debe estar entre 1 y {capacidad} (capacidad del bus)."}
+    return None
+
+
+# =========================================
+# RESERVA ATÓMICA
+# =========================================
+def reservar_asiento(servicio_id: int, cliente_id: int, precio: int, codigo: str, asiento: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Vende un asiento del servicio creando el Boleto, de forma atómica.
+    Parámetros:
+        servicio_id, cliente_id, precio, codigo: datos del Boleto
+        asiento: número de asiento pedido; si es None se asigna el primero libre
+    Todo ocurre dentro de una transacción BEGIN IMMEDIATE (un solo escritor a la vez):
+    se leen los asientos vendidos, se verifica el pedido contra Bus.capacidad y se inserta.
+    El índice único (servicio_id, asiento) es la última garantía contra la doble venta.
+    Retorna {"id", "asiento"} si se vendió, o {"error", "message"} si no.
+    """
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                capacidad = _capacidad(conexion, servicio_id)
+                if capacidad is None:
+                    conexion.rollback()
+                    return {"error": "not_found", "message": f"No existe el servicio id={servicio_id}."}
+                bits = _bits_ocupados(conexion, servicio_id, capacidad)
+                elegido = asiento
+                if elegido is None:
+                    elegido = next((n for n in range(1, capacidad + 1) if not (bits >> n) & 1), None)
+                    if elegido is None:
+                        conexion.rollback()
+                        _guardar_mapa(servicio_id, capacidad, bits)
+                        return {"error": "lleno", "message": f"El servicio id={servicio_id} no tiene asientos libres."}
+                elif not 1 <= elegido <= capacidad:
+                    conexion.rollback()
+                    return {"error": "validation", "message": f"El asiento debe estar entre 1 y {capacidad} (capacidad del bus)."}
+                elif (bits >> elegido) & 1:
+                    conexion.rollback()
+                    _guardar_mapa(servicio_id, capacidad, bits)
+                    return {"error": "ocupado", "message": f"El asiento {elegido} ya está vendido en el servicio id={servicio_id}."}
+                cursor = conexion.execute(
+                    "INSERT INTO Boleto (codigo, servicio_id, cliente_id, asiento, precio) VALUES (?, ?, ?, ?, ?)",
+                    (codigo, servicio_id, cliente_id, elegido, precio),
+                )
+                conexion.commit()
+            except sqlite3.IntegrityError as error:
+                conexion.rollback()
+                if "asiento" in str(error):
+                    return {"error": "ocupado", "message": f"El asiento {elegido} ya está vendido en el servicio id={servicio_id}."}
+                return {"error": "unique" if "UNIQUE" in str(error) else "db_error", "message": str(error)}
+        _guardar_mapa(servicio_id, capacidad, bits | (1 << elegido))
+        return {"id": cursor.lastrowid, "asiento": elegido}
+
+    try:
+        instalar()
+        resultado = funciones_crud.en_escritor(lambda: funciones_crud.con_reintentos(operacion))
+    except sqlite3.Error as error:
+        return {"error": "db_error", "message": str(error)}
+    if "id" in resultado:
+        funciones_crud.invalidar_cache("Boleto")
+    return resultado
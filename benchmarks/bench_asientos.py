@@ -0,0 +1,101 @@
+"""
+Prueba de estrés del mapa de asientos: varios vendedores (hilos) reservando
+asientos al azar en los mismos servicios a la vez.
+
+Informa reservas por segundo, cuántos intentos encontraron el asiento ya
+vendido y verifica al final que ningún asiento quedó vendido dos veces.
+
+Uso:
+    python benchmarks/bench_asientos.py [--vendedores 8] [--servicios 200] [--intentos 20000]
+"""
+import argparse
+import contextlib
+import io
+import random
+import threading
+import time
+
+from comun import borrar_bd, crear_bd_temporal
+
+import asientos
+import funciones_crud
+
+
+def _preparar(servicios, capacidad):
+    funciones_crud.insertar_lote("Bus", ["patente", "modelo", "capacidad"], ((f"Z{i:05d}", "Bench", capacidad) for i in range(servicios)))
+    buses = [r[0] for r in funciones_crud.consultar("Bus", ["id"], "patente LIKE 'Z%'", usar_cache=False)]
+    funciones_crud.insertar_lote(
+        "Servicio",
+        ["codigo", "ruta_id", "bus_id", "chofer_id", "fecha_salida"],
+        ((f"SB{i:05d}", 1, bus, 1, "2025/12/01 08:00") for i, bus in enumerate(buses)),
+    )
+    return [r[0] for r in funciones_crud.consultar("Servicio", ["id"], "codigo LIKE 'SB%'", usar_cache=False)]
+
+
+def ejecutar(vendedores, servicios, capacidad, intentos):
+    ruta = crear_bd_temporal()
+    funciones_crud.configurar_pool(ruta_bd=ruta, tamano_max=vendedores)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ids_servicio = _preparar(servicios, capacidad)
+    contadores = {"vendidos": 0, "ocupados": 0, "otros": 0}
+    candado = threading.Lock()
+    por_vendedor = intentos // vendedores
+
+    def vendedor(numero):
+        azar = random.Random(numero)
+        vendidos = ocupados = otros = 0
+        for i in range(por_vendedor):
+            servicio = azar.choice(ids_servicio)
+            asiento = azar.randint(1, capacidad)
+            res = asientos.reservar_asiento(servicio, 1, 1000, f"V{numero}-{i}", asiento)
+            if "id" in res:
+                vendidos += 1
+            elif res.get("error") == "ocupado":
+                ocupados += 1
+            else:
+                otros += 1
+        with candado:
+            contadores["vendidos"] += vendidos
+            contadores["ocupados"] += ocupados
+            contadores["otros"] += otros
+
+    hilos = [threading.Thread(target=vendedor, args=(n,)) for n in range(vendedores)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+
+    with funciones_crud.obtener_conexion() as conexion:
+        dobles = conexion.execute(
+            "SELECT COUNT(*) FROM (SELECT servicio_id, asiento FROM Boleto GROUP BY servicio_id, asiento HAVING COUNT(*) > 1)"
+        ).fetchone()[0]
+        fuera = conexion.execute(
+            "SELECT COUNT(*) FROM Boleto b JOIN Servicio s ON s.id = b.servicio_id JOIN Bus u ON u.id = s.bus_id "
+            "WHERE b.asiento < 1 OR b.asiento > u.capacidad"
+        ).fetchone()[0]
+    inicio_libres = time.perf_counter()
+    for servicio in ids_servicio:
+        asientos.invalidar(servicio)
+        asientos.asientos_libres(servicio)
+    consulta_libres = (time.perf_counter() - inicio_libres) / len(ids_servicio)
+    funciones_crud.cerrar_pool()
+    borrar_bd(ruta)
+
+    total = contadores["vendidos"] + contadores["ocupados"] + contadores["otros"]
+    print(f"{vendedores} vendedores, {servicios} servicios x {capacidad} asientos, {total} intentos en {duracion:.2f} s")
+    print(f"  intentos/s: {total / duracion:.0f}  reservas/s: {contadores['vendidos'] / duracion:.0f}")
+    print(f"  vendidos: {contadores['vendidos']}  ya ocupados: {contadores['ocupados']}  otros errores: {contadores['otros']}")
+    print(f"  asientos vendidos dos veces: {dobles}  fuera de capacidad: {fuera}")
+    print(f"  asientos_libres (sin mapa en memoria): {consulta_libres * 1e6:.0f} µs por servicio")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vendedores", type=int, default=8)
+    parser.add_argument("--servicios", type=int, default=200)
+    parser.add_argument("--capacidad", type=int, default=45)
+    parser.add_argument("--intentos", type=int, default=20000)
+    args = parser.parse_args()
+    ejecutar(args.vendedores, args.servicios, args.capacidad, args.intentos)
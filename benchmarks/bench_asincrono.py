@@ -0,0 +1,129 @@
+"""
+Hilo escritor + lectores (crud_asincrono) contra llamadas sincrónicas directas.
+
+Sobre una base generada (ver generador.py) mide:
+  1. Una recarga de página con cuatro consultas independientes: la búsqueda del
+     formulario "Leer", la página del panel derecho, los dependientes de un
+     Servicio y un total de pagos; una tras otra (como antes) o a la vez en los
+     hilos lectores.
+  2. Varios hilos escribiendo a la vez, solos y mientras otro hilo hace una
+     carga masiva: cada uno con su propia conexión del pool (compiten por el
+     bloqueo de escritura; SQLite los hace esperar con reintentos y pausas) o
+     encolando en el único hilo escritor.
+
+Uso:
+    python benchmarks/bench_asincrono.py [--escala 1000000] [--hilos 8] [--escrituras 200]
+"""
+import argparse
+import contextlib
+import io
+import random
+import threading
+import time
+
+from comun import borrar_bd, medir, resumen
+from generador import crear_bd_generada
+
+import crud_asincrono
+import funciones_crud
+import operaciones
+from filtros import Filtro
+
+
+def _pagina(filas, azar):
+    """Las consultas de una recarga de la página, como (funcion, args...)."""
+    desde = azar.randint(1, filas["Boleto"])
+    return [
+        # Filtro sobre una columna sin índice, ordenado por ella: recorre Boleto completa
+        (operaciones.buscar_registros, "Boleto", [Filtro("precio", "entre", (5000, 6000))], "precio", True, 50),
+        (funciones_crud.consultar, "Boleto", ["id", "codigo", "servicio_id", "cliente_id", "asiento", "precio"], None, (), 11, None, None, desde),
+        (operaciones._buscar_referencias, None, "Servicio", azar.randint(1, filas["Servicio"])),
+        # Total cobrado desde una fecha (Pago.fecha_pago no tiene índice)
+        (funciones_crud.consultar, "Pago", ["COUNT(*)", "SUM(monto)"], "fecha_pago >= ?", ("2024-06-01",)),
+    ]
+
+
+def _escritores(hilos, escrituras, prefijo, carga_masiva=0):
+    """
+    Lanza hilos que insertan a la vez (y, con carga_masiva, otro que inserta esa
+    cantidad de filas en un solo lote al mismo tiempo); retorna (segundos, latencias).
+    """
+    latencias = []
+    candado = threading.Lock()
+
+    def escribir(n):
+        propias = []
+        for i in range(escrituras):
+            inicio = time.perf_counter()
+            funciones_crud.insertar("Parada", ["nombre", "ciudad"], [f"{prefijo} {n}-{i}", "Bench"])
+            propias.append(time.perf_counter() - inicio)
+        with candado:
+            latencias.extend(propias)
+
+    lista = [threading.Thread(target=escribir, args=(n,)) for n in range(hilos)]
+    if carga_masiva:
+        filas = ((f"{prefijo} lote {i}", "Lote") for i in range(carga_masiva))
+        lista.insert(0, threading.Thread(target=funciones_crud.insertar_lote, args=("Parada", ["nombre", "ciudad"], filas)))
+    inicio = time.perf_counter()
+    for hilo in lista:
+        hilo.start()
+    for hilo in lista:
+        hilo.join()
+    return time.perf_counter() - inicio, latencias
+
+
+def ejecutar(escala, hilos, escrituras, repeticiones, semilla, carga_masiva):
+    ruta, filas = crear_bd_generada(escala, semilla)
+    resultados = {}
+    try:
+        funciones_crud.configurar_pool(ruta_bd=ruta, tamano_max=hilos + 1)
+        azar = random.Random(semilla)
+        paginas = [_pagina(filas, azar) for _ in range(repeticiones)]
+
+        def secuencial(i):
+            funciones_crud.cache.limpiar()
+            return [funcion(*args) for funcion, *args in paginas[i]]
+
+        def en_paralelo(i):
+            funciones_crud.cache.limpiar()
+            return crud_asincrono.en_paralelo(*paginas[i])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultados["página, una consulta tras otra"] = resumen(medir(secuencial, repeticiones))
+            crud_asincrono.iniciar(lectores=3)
+            resultados["página, consultas en paralelo"] = resumen(medir(en_paralelo, repeticiones))
+            crud_asincrono.detener()
+
+            escrituras_medidas = []
+            for carga in (0, carga_masiva):
+                directa = _escritores(hilos, escrituras, f"Directa {carga}", carga)
+                crud_asincrono.iniciar(lectores=3, encolar_escrituras=True)
+                escritor = _escritores(hilos, escrituras, f"Escritor {carga}", carga)
+                crud_asincrono.detener()
+                escrituras_medidas.append((carga, directa, escritor))
+    finally:
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta)
+
+    print(f"Escala {escala} boletos")
+    print(f"  {'caso':<36}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for nombre, r in resultados.items():
+        print(f"  {nombre:<36}{r['p50_us'] / 1000:>10.2f}{r['p95_us'] / 1000:>10.2f}")
+    for carga, directa, escritor in escrituras_medidas:
+        print(f"  {hilos} hilos x {escrituras} inserciones" + (f", con un lote de {carga} filas a la vez:" if carga else ":"))
+        for nombre, (duracion, latencias) in (("directas", directa), ("en el hilo escritor", escritor)):
+            r = resumen(latencias)
+            print(f"    {nombre:<22}{duracion:>8.2f} s total, p50 {r['p50_us'] / 1000:.2f} ms, "
+                  f"p95 {r['p95_us'] / 1000:.2f} ms, máx {max(latencias) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", type=int, default=1000000, help="cantidad de boletos de la base generada")
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--escrituras", type=int, default=200, help="escrituras por hilo")
+    parser.add_argument("--carga-masiva", type=int, default=300000, help="filas del lote que compite con los escritores")
+    parser.add_argument("--repeticiones", type=int, default=100)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    ejecutar(args.escala, args.hilos, args.escrituras, args.repeticiones, args.semilla, args.carga_masiva)
@@ -0,0 +1,117 @@
+"""
+Búsqueda de clientes mientras se escribe: índice FTS5 (funciones_crud.buscar_texto)
+contra LIKE '%texto%' sobre la tabla completa.
+
+Carga N clientes con nombres, emails y direcciones al azar (semilla fija) y mide
+la latencia de búsquedas de 2 a 8 letras, como las que genera la caja de
+búsqueda rápida al ir escribiendo.
+
+Uso:
+    python benchmarks/bench_busqueda.py [--clientes 1000000] [--busquedas 300]
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from comun import borrar_bd, crear_bd_temporal, medir, resumen
+
+import funciones_crud
+
+NOMBRES = ("Juan", "María", "José", "Ana", "Luis", "Carmen", "Pedro", "Sofía", "Diego", "Valentina",
+           "Andrés", "Camila", "Felipe", "Javiera", "Cristián", "Fernanda", "Matías", "Daniela", "Tomás", "Beatriz")
+APELLIDOS = ("González", "Muñoz", "Rojas", "Díaz", "Pérez", "Soto", "Contreras", "Silva", "Martínez", "Sepúlveda",
+             "Morales", "Rodríguez", "López", "Fuentes", "Hernández", "Torres", "Araya", "Flores", "Espinoza", "Valenzuela",
+             "Castillo", "Tapia", "Reyes", "Gutiérrez", "Castro", "Pizarro", "Álvarez", "Vásquez", "Sánchez", "Carvajal")
+CALLES = ("Providencia", "Alameda", "Matta", "Pedro de Valdivia", "Irarrázaval", "Grecia", "Tobalaba", "Vicuña Mackenna")
+CIUDADES = ("Santiago", "Valparaíso", "Concepción", "Chillán", "Temuco", "La Serena", "Rancagua", "Talca")
+DOMINIOS = ("gmail.com", "hotmail.com", "correo.cl", "empresa.cl")
+
+
+def _clientes(cantidad, azar, desde=0):
+    for i in range(desde, desde + cantidad):
+        nombre, apellido, apellido2 = azar.choice(NOMBRES), azar.choice(APELLIDOS), azar.choice(APELLIDOS)
+        n = 10000000 + i
+        rut = f"{n // 1000000}.{n // 1000 % 1000:03d}.{n % 1000:03d}-{n % 10}"
+        email = f"{nombre[0].lower()}{apellido.lower()}{i}@{azar.choice(DOMINIOS)}"
+        direccion = f"{azar.choice(CALLES)} {azar.randint(1, 9999)}, {azar.choice(CIUDADES)}"
+        yield (rut, f"{nombre} {apellido} {apellido2}", email, direccion)
+
+
+def _textos(azar, cantidad):
+    """
+    Textos como los que se escriben letra a letra: prefijos de nombres, apellidos y
+    ciudades (muchas coincidencias) y comienzos de un email puntual (una sola).
+    """
+    textos = []
+    for _ in range(cantidad):
+        palabra = azar.choice(NOMBRES + APELLIDOS + CIUDADES)
+        tipo = azar.random()
+        if tipo < 0.3:  # nombre completo y comienzo del apellido: "juan pe"
+            textos.append(f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)[:azar.randint(2, 4)]}")
+        elif tipo < 0.5:  # un cliente puntual por su email: "jgonzalez1234"
+            textos.append(f"{azar.choice(NOMBRES)[0].lower()}{azar.choice(APELLIDOS).lower()}{azar.randint(0, 99999)}")
+        else:
+            textos.append(palabra[:azar.randint(2, min(8, len(palabra)))])
+    return textos
+
+
+def _like(texto, limite=10):
+    patron = f"%{texto}%"
+    with funciones_crud.obtener_conexion() as conexion:
+        return conexion.execute(
+            "SELECT id, nombre, email, direccion FROM Cliente WHERE nombre LIKE ? OR email LIKE ? OR direccion LIKE ? LIMIT ?",
+            (patron, patron, patron, limite),
+        ).fetchall()
+
+
+def ejecutar(clientes, busquedas, semilla):
+    ruta = crear_bd_temporal(con_datos=False)
+    funciones_crud.configurar_pool(ruta_bd=ruta)
+    azar = random.Random(semilla)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        funciones_crud.insertar_lote("Cliente", ["rut", "nombre", "email", "direccion"], _clientes(clientes, azar), tamano_lote=5000)
+        carga_sin_indice = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        funciones_crud.preparar_busqueda()
+        creacion_indice = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        funciones_crud.insertar_lote("Cliente", ["rut", "nombre", "email", "direccion"], _clientes(10000, random.Random(semilla + 1), desde=clientes), tamano_lote=5000)
+        carga_con_indice = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        funciones_crud.buscar_texto("Cliente", "juan")  # aplica la cola de cambios de la carga anterior
+        sincronizacion = time.perf_counter() - inicio
+    textos = _textos(azar, busquedas)
+
+    def fts(i, por_relevancia):
+        funciones_crud.cache.limpiar()  # los textos se repiten: se mide siempre la consulta real
+        return funciones_crud.buscar_texto("Cliente", textos[i], 10, por_relevancia=por_relevancia)
+
+    casos = {
+        "FTS5 por relevancia": lambda i: fts(i, True),
+        "FTS5 en orden de id": lambda i: fts(i, False),
+        "LIKE '%texto%'": lambda i: _like(textos[i]),
+    }
+    resultados = {nombre: resumen(medir(funcion, busquedas)) for nombre, funcion in casos.items()}
+    funciones_crud.cerrar_pool()
+    borrar_bd(ruta)
+
+    print(f"{clientes} clientes, {busquedas} búsquedas de 2 a 8 letras")
+    print(f"  carga sin índice: {carga_sin_indice:.1f} s — crear índice FTS5: {creacion_indice:.1f} s")
+    print(f"  insertar 10000 clientes con los triggers del índice: {carga_con_indice:.2f} s")
+    print(f"  primera búsqueda después (aplica esos 10000 cambios al índice): {sincronizacion:.2f} s")
+    print(f"  {'método':<24}{'media (ms)':>12}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for nombre, r in resultados.items():
+        print(f"  {nombre:<24}{r['media_us'] / 1000:>12.2f}{r['p50_us'] / 1000:>10.2f}{r['p95_us'] / 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=1000000)
+    parser.add_argument("--busquedas", type=int, default=300)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    ejecutar(args.clientes, args.busquedas, args.semilla)
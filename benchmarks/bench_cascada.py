@@ -0,0 +1,84 @@
+"""
+Borrado en cascada (borrado_cascada.py) contra el borrado fila por fila.
+
+Sobre una base generada (ver generador.py) toma las dos rutas con más servicios
+(cada una con miles de boletos y pagos) y mide:
+    - borrado_cascada.planificar + borrar de la primera ruta (una consulta
+      WITH RECURSIVE y un DELETE por tabla, en una transacción);
+    - la segunda ruta borrada como había que hacerlo antes: cada Pago, Boleto,
+      Servicio, Tarifa y RutaParadas con operaciones.eliminar_registro, de a uno.
+Al final verifica que PRAGMA foreign_key_check no encuentre filas huérfanas.
+
+Uso:
+    python benchmarks/bench_cascada.py [--escala 300000]
+"""
+import argparse
+import time
+
+from comun import borrar_bd
+from generador import crear_bd_generada
+
+import borrado_cascada
+import funciones_crud
+import operaciones
+
+# Dependientes de una Ruta, de las hojas hacia la raíz
+_DEPENDIENTES = [
+    ("Pago", "SELECT p.id FROM Pago p JOIN Boleto b ON b.id = p.boleto_id JOIN Servicio s ON s.id = b.servicio_id WHERE s.ruta_id = ?"),
+    ("Boleto", "SELECT b.id FROM Boleto b JOIN Servicio s ON s.id = b.servicio_id WHERE s.ruta_id = ?"),
+    ("Servicio", "SELECT id FROM Servicio WHERE ruta_id = ?"),
+    ("Tarifa", "SELECT id FROM Tarifa WHERE ruta_id = ?"),
+    ("RutaParadas", "SELECT id FROM RutaParadas WHERE ruta_id = ?"),
+]
+
+
+def _fila_por_fila(ruta_id):
+    """Borra la ruta y sus dependientes de a una fila; retorna cuántas filas borró."""
+    with funciones_crud.obtener_conexion() as conexion:
+        pendientes = [(t, [i for (i,) in conexion.execute(q, (ruta_id,))]) for t, q in _DEPENDIENTES]
+    total = 0
+    for tabla, ids in pendientes + [("Ruta", [ruta_id])]:
+        for id_registro in ids:
+            total += bool(operaciones.eliminar_registro(tabla, id_registro).get("deleted"))
+    return total
+
+
+def ejecutar(escala, semilla):
+    ruta, _ = crear_bd_generada(escala, semilla)
+    try:
+        funciones_crud.configurar_pool(ruta_bd=ruta)
+        with funciones_crud.obtener_conexion() as conexion:
+            rutas = [r for (r,) in conexion.execute("SELECT ruta_id FROM Servicio GROUP BY ruta_id ORDER BY COUNT(*) DESC LIMIT 2")]
+
+        inicio = time.perf_counter()
+        plan = borrado_cascada.planificar("Ruta", rutas[0])
+        duracion_plan = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        resultado = borrado_cascada.borrar("Ruta", rutas[0], plan["conteos"])
+        duracion_borrado = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        filas_antes = _fila_por_fila(rutas[1])
+        duracion_antes = time.perf_counter() - inicio
+
+        with funciones_crud.obtener_conexion() as conexion:
+            huerfanas = len(conexion.execute("PRAGMA foreign_key_check").fetchall())
+    finally:
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta)
+
+    print(f"Escala {escala} boletos")
+    print(f"  cascada, Ruta id={rutas[0]}: " + ", ".join(f"{t} {n}" for t, n in plan["conteos"].items()))
+    print(f"    plan {duracion_plan * 1000:.1f} ms, borrado {duracion_borrado * 1000:.1f} ms "
+          f"({resultado['total']} filas, {resultado['total'] / duracion_borrado:.0f}/s)")
+    print(f"  fila por fila, Ruta id={rutas[1]}: {filas_antes} filas en {duracion_antes:.2f} s "
+          f"({filas_antes / duracion_antes:.0f}/s)")
+    print(f"  filas huérfanas después: {huerfanas}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", type=int, default=300000, help="cantidad de boletos de la base generada")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    ejecutar(args.escala, args.semilla)
@@ -0,0 +1,112 @@
+"""
+Prueba de carga multi-hilo: lectores consultando mientras escritores insertan,
+con cada perfil de PRAGMAs de funciones_crud (diario de rollback vs. WAL).
+
+Muestra lecturas/s, escrituras/s y cuántas operaciones fallaron con
+"database is locked" pese a los reintentos.
+
+Uso:
+    python benchmarks/bench_concurrencia.py [--lectores 8] [--escritores 2] [--segundos 5]
+"""
+import argparse
+import contextlib
+import io
+import random
+import sqlite3
+import threading
+import time
+
+from comun import borrar_bd, crear_bd_temporal, percentil
+
+import funciones_crud
+
+
+def _cargar_clientes(cantidad):
+    filas = ((f"{i // 1000000 % 100}.{i // 1000 % 1000:03d}.{i % 1000:03d}-1", f"Cliente {i}") for i in range(10, 10 + cantidad))
+    funciones_crud.insertar_lote("Cliente", ["rut", "nombre"], filas, tamano_lote=5000)
+
+
+def _ejecutar_perfil(perfil, lectores, escritores, segundos, filas_iniciales):
+    ruta = crear_bd_temporal()
+    funciones_crud.configurar_pool(ruta_bd=ruta, tamano_max=lectores + escritores)
+    funciones_crud.configurar_perfil(perfil)
+    _cargar_clientes(filas_iniciales)
+    fin = time.monotonic() + segundos
+    contadores = {"lecturas": 0, "escrituras": 0, "errores": 0}
+    latencias_lectura = []
+    candado = threading.Lock()
+
+    def lector(semilla):
+        azar = random.Random(semilla)
+        hechas, tiempos = 0, []
+        while time.monotonic() < fin:
+            desde = azar.randint(1, filas_iniciales)
+            inicio = time.perf_counter()
+            # Sin caché: se mide el acceso real a la base
+            funciones_crud.consultar("Cliente", ["id", "rut", "nombre"], "id >= ?", (desde,), limite=20, usar_cache=False)
+            tiempos.append(time.perf_counter() - inicio)
+            hechas += 1
+        with candado:
+            contadores["lecturas"] += hechas
+            latencias_lectura.extend(tiempos)
+
+    def escritor(semilla):
+        hechas, errores = 0, 0
+        numero = 0
+        while time.monotonic() < fin:
+            numero += 1
+            try:
+                funciones_crud.con_reintentos(lambda: _insertar_uno(semilla, numero))
+                hechas += 1
+            except sqlite3.OperationalError:
+                errores += 1
+        with candado:
+            contadores["escrituras"] += hechas
+            contadores["errores"] += errores
+
+    hilos = [threading.Thread(target=lector, args=(i,)) for i in range(lectores)]
+    hilos += [threading.Thread(target=escritor, args=(1000 + i,)) for i in range(escritores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    funciones_crud.cerrar_pool()
+    borrar_bd(ruta)
+    return {
+        "perfil": perfil,
+        "lecturas_s": contadores["lecturas"] / segundos,
+        "escrituras_s": contadores["escrituras"] / segundos,
+        "errores": contadores["errores"],
+        "lectura_p95_ms": percentil(latencias_lectura, 95) * 1000,
+    }
+
+
+def _insertar_uno(semilla, numero):
+    # Escritura directa (sin el try/except que imprime de insertar) para poder contar errores
+    with funciones_crud.obtener_conexion() as conexion:
+        conexion.execute(
+            "INSERT INTO Parada (nombre, ciudad) VALUES (?, ?)",
+            (f"Parada {semilla}-{numero}", "Carga"),
+        )
+        conexion.commit()
+
+
+def ejecutar(lectores, escritores, segundos, filas_iniciales):
+    resultados = []
+    with contextlib.redirect_stdout(io.StringIO()):  # funciones_crud imprime por operación
+        for perfil in ("compatible", "seguro", "equilibrado"):
+            resultados.append(_ejecutar_perfil(perfil, lectores, escritores, segundos, filas_iniciales))
+    print(f"{lectores} lectores, {escritores} escritores, {segundos} s, {filas_iniciales} clientes")
+    print(f"{'perfil':<13}{'lecturas/s':>12}{'escrituras/s':>14}{'errores':>9}{'lectura p95 (ms)':>18}")
+    for r in resultados:
+        print(f"{r['perfil']:<13}{r['lecturas_s']:>12.0f}{r['escrituras_s']:>14.0f}{r['errores']:>9}{r['lectura_p95_ms']:>18.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lectores", type=int, default=8)
+    parser.add_argument("--escritores", type=int, default=2)
+    parser.add_argument("--segundos", type=float, default=5.0)
+    parser.add_argument("--filas", type=int, default=20000)
+    args = parser.parse_args()
+    ejecutar(args.lectores, args.escritores, args.segundos, args.filas)
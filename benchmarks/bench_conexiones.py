@@ -0,0 +1,105 @@
+"""
+Benchmark: latencia por operación de funciones_crud abriendo una conexión
+por llamada (comportamiento anterior) vs. usando el pool de conexiones.
+
+El cambio junta dos cosas: el pool y el perfil de PRAGMAs (WAL, synchronous,
+caché...). Para separar su efecto se miden las cuatro combinaciones, cada una
+sobre una base nueva (journal_mode = WAL queda grabado en el archivo):
+    por llamada + PRAGMAs originales   (antes)
+    por llamada + perfil nuevo          (solo el perfil)
+    pool + PRAGMAs originales           (solo el pool)
+    pool + perfil nuevo                 (después)
+
+Uso:
+    python benchmarks/bench_conexiones.py [--repeticiones N]
+"""
+import argparse
+import contextlib
+import io
+import sqlite3
+from contextlib import contextmanager
+
+from comun import borrar_bd, crear_bd_temporal, medir, resumen
+
+import funciones_crud
+
+# (nombre, con pool, con el perfil de PRAGMAs de funciones_crud.PERFIL)
+CASOS = (
+    ("llamada+orig", False, False),
+    ("llamada+perfil", False, True),
+    ("pool+orig", True, False),
+    ("pool+perfil", True, True),
+)
+
+
+def _conectar_original():
+    # El conectar() original: solo claves foráneas, sin el perfil de PRAGMAs
+    conexion = sqlite3.connect(funciones_crud.RUTA_BD, check_same_thread=False)
+    conexion.execute("PRAGMA foreign_keys = ON")
+    return conexion
+
+
+@contextmanager
+def _conexion_por_llamada(fabrica):
+    # Reproduce el comportamiento antiguo: abrir, usar y cerrar en cada llamada
+    conexion = fabrica()
+    try:
+        yield conexion
+    finally:
+        conexion.close()
+
+
+def _operaciones(repeticiones):
+    """Mide insertar/consultar/actualizar/eliminar sobre la tabla Cliente."""
+    resultados = {}
+    ids_base = 1000
+    resultados["insertar"] = medir(
+        lambda i: funciones_crud.insertar("Cliente", ["id", "rut", "nombre"], [ids_base + i, f"9.{i:03d}.{i % 1000:03d}-1", "Bench"]),
+        repeticiones,
+    )
+    resultados["consultar"] = medir(
+        lambda i: funciones_crud.consultar("Cliente", ["id", "nombre"], "id = ?", (ids_base + i,)),
+        repeticiones,
+    )
+    resultados["actualizar"] = medir(
+        lambda i: funciones_crud.actualizar("Cliente", {"nombre": "Bench2"}, "id = ?", (ids_base + i,)),
+        repeticiones,
+    )
+    resultados["eliminar"] = medir(
+        lambda i: funciones_crud.eliminar("Cliente", "id = ?", (ids_base + i,)),
+        repeticiones,
+    )
+    return resultados
+
+
+def _medir_caso(con_pool, con_perfil, repeticiones):
+    ruta = crear_bd_temporal()
+    originales = funciones_crud.obtener_conexion, funciones_crud.conectar
+    fabrica = funciones_crud.conectar if con_perfil else _conectar_original
+    try:
+        funciones_crud.conectar = fabrica  # el pool crea sus conexiones con esta función
+        funciones_crud.configurar_pool(ruta_bd=ruta)
+        if not con_pool:
+            funciones_crud.obtener_conexion = lambda: _conexion_por_llamada(fabrica)
+        with contextlib.redirect_stdout(io.StringIO()):  # funciones_crud imprime un mensaje por operación
+            return _operaciones(repeticiones)
+    finally:
+        funciones_crud.obtener_conexion, funciones_crud.conectar = originales
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta)
+
+
+def ejecutar(repeticiones):
+    resultados = {nombre: _medir_caso(con_pool, con_perfil, repeticiones) for nombre, con_pool, con_perfil in CASOS}
+    for metrica, titulo in (("p50_us", "p50 (µs)"), ("media_us", "media (µs)")):
+        print(f"{titulo:<12}" + "".join(f"{nombre:>16}" for nombre, _, _ in CASOS))
+        for operacion in resultados[CASOS[0][0]]:
+            print(f"{operacion:<12}" + "".join(f"{resumen(resultados[nombre][operacion])[metrica]:>16.1f}" for nombre, _, _ in CASOS))
+    print("Efecto del pool: llamada+orig contra pool+orig; del perfil: llamada+orig contra llamada+perfil.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=500)
+    args = parser.parse_args()
+    ejecutar(args.repeticiones)
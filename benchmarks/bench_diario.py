@@ -0,0 +1,114 @@
+"""
+Diario de cambios (diario_cambios.py): costo en las escrituras y réplicas incrementales.
+
+Sobre una base generada (ver generador.py) mide:
+    - la venta de boletos con pago (inserción de Boleto + Pago) sin y con el
+      diario instalado;
+    - la primera copia de la réplica (Connection.backup) contra poner al día
+      esa réplica después de una mezcla de ventas, cambios de precio y borrados
+      (solo los cambios nuevos) y contra volver a copiar la base completa;
+    - exportar los cambios a JSONL y compactar el diario;
+y al final compara tabla por tabla la réplica con la base original.
+
+Uso:
+    python benchmarks/bench_diario.py [--escala 1000000] [--ventas 2000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import time
+
+from comun import borrar_bd, resumen
+from generador import METODOS_PAGO, crear_bd_generada
+
+import diario_cambios
+import funciones_crud
+from catalogo import obtener_catalogo
+
+
+def _vender(primer_boleto, cantidad, servicio_id):
+    """Inserta cantidad boletos con su pago; retorna la duración de cada venta."""
+    tiempos = []
+    for i in range(primer_boleto, primer_boleto + cantidad):
+        t0 = time.perf_counter()
+        funciones_crud.insertar("Boleto", ["id", "codigo", "servicio_id", "cliente_id", "asiento", "precio"],
+                                [i, f"V{i:09d}", servicio_id, 1, 1000 + i, 5000])
+        funciones_crud.insertar("Pago", ["boleto_id", "monto", "fecha_pago", "metodo"],
+                                [i, 5000, "2024-01-01 12:00", METODOS_PAGO[i % 4]])
+        tiempos.append(time.perf_counter() - t0)
+    return tiempos
+
+
+def _diferencias(ruta_a, ruta_b):
+    """Tablas de la aplicación cuyo contenido difiere entre las dos bases."""
+    a, b = sqlite3.connect(ruta_a), sqlite3.connect(ruta_b)
+    try:
+        distintas = []
+        for tabla in obtener_catalogo().tablas_aplicacion():
+            consulta = f'SELECT * FROM "{tabla}" ORDER BY id'
+            if a.execute(consulta).fetchall() != b.execute(consulta).fetchall():
+                distintas.append(tabla)
+        return distintas
+    finally:
+        a.close()
+        b.close()
+
+
+def _cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def ejecutar(escala, ventas, semilla):
+    ruta, filas = crear_bd_generada(escala, semilla)
+    carpeta = tempfile.mkdtemp(prefix="bench_diario_")
+    replica, copia, jsonl = (os.path.join(carpeta, n) for n in ("replica.db", "copia.db", "cambios.jsonl"))
+    try:
+        funciones_crud.configurar_pool(ruta_bd=ruta)
+        with contextlib.redirect_stdout(io.StringIO()):
+            sin_diario = resumen(_vender(escala + 1, ventas, 1))
+            diario_cambios.instalar()
+            con_diario = resumen(_vender(escala + ventas + 1, ventas, 2))
+            _, duracion_copia = _cronometrar(lambda: diario_cambios.sincronizar(replica))
+            # Mezcla: más ventas, cambios de precio y borrados de pagos
+            _vender(escala + 2 * ventas + 1, ventas, 3)
+            funciones_crud.actualizar("Boleto", {"precio": 4500}, "servicio_id = ?", (4,))
+            funciones_crud.eliminar("Pago", "boleto_id > ? AND boleto_id <= ?", (escala, escala + ventas // 2))
+        pendientes = diario_cambios.retrasos()["consumidores"][0]["pendientes"]
+        incremental, duracion_incremental = _cronometrar(lambda: diario_cambios.sincronizar(replica))
+        _, duracion_completa = _cronometrar(lambda: diario_cambios.sincronizar(copia))
+        exportados, duracion_jsonl = _cronometrar(lambda: diario_cambios.exportar_jsonl(jsonl))
+        borradas, duracion_compactar = _cronometrar(diario_cambios.compactar)
+        distintas = _diferencias(ruta, replica)
+    finally:
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta)
+        for archivo in (replica, copia, jsonl):
+            if os.path.exists(archivo):
+                os.remove(archivo)
+        os.rmdir(carpeta)
+
+    print(f"Escala {escala} boletos ({filas['Pago']} pagos)")
+    print(f"  venta boleto + pago: p50 {sin_diario['p50_us'] / 1000:.2f} ms sin diario, "
+          f"{con_diario['p50_us'] / 1000:.2f} ms con diario "
+          f"(p95 {sin_diario['p95_us'] / 1000:.2f} / {con_diario['p95_us'] / 1000:.2f} ms)")
+    print(f"  primera copia de la réplica: {duracion_copia:.2f} s")
+    print(f"  poner al día la réplica ({pendientes} cambios pendientes, {incremental['aplicados']} aplicados): "
+          f"{duracion_incremental * 1000:.1f} ms")
+    print(f"  copia completa nueva: {duracion_completa:.2f} s")
+    print(f"  exportar {exportados['exportados']} cambios a JSONL: {duracion_jsonl * 1000:.1f} ms")
+    print(f"  compactar {borradas} cambios: {duracion_compactar * 1000:.1f} ms")
+    print(f"  tablas distintas entre la réplica y la base: {', '.join(distintas) or 'ninguna'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", type=int, default=1000000, help="cantidad de boletos de la base generada")
+    parser.add_argument("--ventas", type=int, default=2000, help="boletos con pago vendidos en cada medición")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    ejecutar(args.escala, args.ventas, args.semilla)
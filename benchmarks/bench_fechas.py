@@ -0,0 +1,131 @@
+"""
+Fechas en formato único (fechas.py): migración en línea y rangos sobre el índice.
+
+Sobre una base generada (ver generador.py) pasa una parte de Servicio.fecha_salida
+a "YYYY/MM/DD HH:MM" y de Pago.fecha_pago a solo la fecha, como dejaba la
+interfaz, y mide:
+    - cuántas filas devuelve mal un rango de un día sobre idx_servicio_salida con
+      los formatos mezclados (comparado con la cuenta fila por fila en Python);
+    - la migración por lotes, mientras otro hilo sigue insertando (latencia
+      máxima de esas inserciones);
+    - la misma consulta de rango después de migrar (resultado y p50/p95).
+
+Uso:
+    python benchmarks/bench_fechas.py [--escala 300000] [--mezcla 0.3] [--lote 500]
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import random
+import sqlite3
+import threading
+import time
+
+from comun import borrar_bd, medir, resumen
+from generador import crear_bd_generada
+
+import fechas
+import funciones_crud
+
+
+def _mezclar(ruta_bd, proporcion, semilla):
+    """Reescribe una proporción de filas en los formatos viejos; retorna cuántas por tabla."""
+    conexion = sqlite3.connect(ruta_bd)
+    modulo = max(1, round(1 / proporcion)) if proporcion else 0
+    cambiadas = {}
+    if modulo:
+        cambiadas["Servicio"] = conexion.execute(
+            "UPDATE Servicio SET fecha_salida = replace(fecha_salida, '-', '/') WHERE id % ? = ?",
+            (modulo, semilla % modulo)).rowcount
+        cambiadas["Pago"] = conexion.execute(
+            "UPDATE Pago SET fecha_pago = substr(fecha_pago, 1, 10) WHERE id % ? = ?",
+            (modulo, semilla % modulo)).rowcount
+    conexion.commit()
+    conexion.close()
+    return cambiadas
+
+
+def _esperados(dias):
+    """Servicios por día, contados fila por fila interpretando cada fecha."""
+    cuenta = dict.fromkeys(dias, 0)
+    with funciones_crud.obtener_conexion() as conexion:
+        for (valor,) in conexion.execute("SELECT fecha_salida FROM Servicio"):
+            dia = fechas.interpretar(valor)[0].strftime("%Y-%m-%d")
+            if dia in cuenta:
+                cuenta[dia] += 1
+    return cuenta
+
+
+def _contar_dia(dia):
+    return len(fechas.consultar_rango("Servicio", "fecha_salida", dia, dia, ["id"]))
+
+
+def ejecutar(escala, proporcion, tamano_lote, consultas, semilla):
+    ruta, _ = crear_bd_generada(escala, semilla)
+    try:
+        cambiadas = _mezclar(ruta, proporcion, semilla)
+        funciones_crud.configurar_pool(ruta_bd=ruta)
+        with funciones_crud.obtener_conexion() as conexion:
+            primero, ultimo = conexion.execute("SELECT MIN(fecha_salida), MAX(fecha_salida) FROM Servicio WHERE fecha_salida LIKE '____-%'").fetchone()
+        primero, ultimo = fechas.interpretar(primero)[0], fechas.interpretar(ultimo)[0]
+        azar = random.Random(semilla)
+        dias = sorted({(primero + datetime.timedelta(days=azar.randint(0, (ultimo - primero).days))).strftime("%Y-%m-%d")
+                       for _ in range(consultas)})
+        esperados = _esperados(dias)
+        errores_antes = sum(abs(_contar_dia(d) - esperados[d]) for d in dias)
+        pendientes_antes = sum(fechas.revisar().values())
+
+        # Migración con un escritor concurrente
+        latencias, detener = [], threading.Event()
+
+        def escritor():
+            i = 0
+            while not detener.is_set():
+                inicio = time.perf_counter()
+                funciones_crud.insertar("Parada", ["nombre", "ciudad"], [f"Durante migración {i}", "Bench"])
+                latencias.append(time.perf_counter() - inicio)
+                i += 1
+                time.sleep(0.005)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            hilo = threading.Thread(target=escritor)
+            hilo.start()
+            inicio = time.perf_counter()
+            resultado = fechas.migrar(tamano_lote)
+            duracion = time.perf_counter() - inicio
+            detener.set()
+            hilo.join()
+        convertidas = sum(d["convertidas"] for d in resultado.values())
+        pendientes_despues = sum(fechas.revisar().values())
+
+        errores_despues = sum(abs(_contar_dia(d) - esperados[d]) for d in dias)
+
+        def consulta(i):
+            funciones_crud.cache.limpiar()
+            _contar_dia(dias[i % len(dias)])
+
+        tiempos = resumen(medir(consulta, consultas))
+    finally:
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta)
+
+    print(f"Escala {escala} boletos; filas en formato viejo: " + ", ".join(f"{t} {n}" for t, n in cambiadas.items()))
+    print(f"  rango de un día ({len(dias)} días al azar), filas de más o de menos: {errores_antes} antes, {errores_despues} después de migrar")
+    print(f"  migración: {convertidas} valores en {duracion:.2f} s ({convertidas / duracion:.0f}/s), lotes de {tamano_lote}; "
+          f"pendientes {pendientes_antes} -> {pendientes_despues}")
+    if latencias:
+        r = resumen(latencias)
+        print(f"  inserciones durante la migración: {len(latencias)}, p50 {r['p50_us'] / 1000:.2f} ms, máx {max(latencias) * 1000:.1f} ms")
+    print(f"  consulta de un día por idx_servicio_salida: p50 {tiempos['p50_us'] / 1000:.2f} ms, p95 {tiempos['p95_us'] / 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", type=int, default=300000, help="cantidad de boletos de la base generada")
+    parser.add_argument("--mezcla", type=float, default=0.3, help="proporción de filas en formato viejo")
+    parser.add_argument("--lote", type=int, default=fechas.TAMANO_LOTE, help="filas por transacción al migrar")
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    ejecutar(args.escala, args.mezcla, args.lote, args.consultas, args.semilla)
@@ -0,0 +1,79 @@
+"""
+Formularios desde el esquema (formularios.py) y selectores de claves foráneas.
+
+Sobre una base generada (ver generador.py) mide:
+    - obtener la especificación de todas las tablas en cada redibujo: guardada
+      (una revisión del esquema por redibujo, como main.py, y luego solo la
+      caché), contra armarla desde el catálogo cada vez;
+    - una página del selector de Boleto.cliente_id y Boleto.servicio_id: sin
+      texto (por id), por id exacto, por texto (FTS5 en Cliente, comienzo del
+      codigo en Servicio) y la página 10 sin texto;
+    - lo que hacía antes quien no conocía el id: listar la tabla completa.
+
+Uso:
+    python benchmarks/bench_formularios.py [--escala 1000000]
+"""
+import argparse
+
+from comun import borrar_bd, medir, resumen
+from generador import crear_bd_generada
+
+import esquema
+import formularios
+import funciones_crud
+from catalogo import obtener_catalogo
+
+
+def ejecutar(escala, repeticiones, semilla):
+    ruta, filas = crear_bd_generada(escala, semilla)
+    resultados = {}
+    try:
+        funciones_crud.configurar_pool(ruta_bd=ruta)
+        esquema.cargar_desde_base()
+        tablas = list(esquema.SCHEMAS)
+        resultados["especificación de todas las tablas, guardada"] = resumen(medir(
+            lambda i: (formularios.revisar_esquema(), [formularios.formulario(t) for t in tablas]), repeticiones))
+        resultados["una especificación guardada"] = resumen(medir(
+            lambda i: formularios.formulario(tablas[i % len(tablas)]), repeticiones))
+        catalogo = obtener_catalogo()
+        resultados["especificación de todas las tablas, armada"] = resumen(medir(
+            lambda i: [formularios._armar(catalogo, t) for t in tablas], repeticiones))
+
+        boleto = formularios.formulario("Boleto")
+        servicio_id, cliente_id = (boleto.referencias[0], boleto.referencias[1])
+        funciones_crud.preparar_busqueda()  # índices FTS5 creados antes de medir
+
+        def pagina(campo, texto="", paginas=1):
+            def una(i):
+                funciones_crud.cache.limpiar()
+                despues = None
+                for _ in range(paginas):
+                    _, despues = formularios.opciones_referencia(campo, texto, despues)
+            return una
+
+        for campo in (cliente_id, servicio_id):
+            nombre = f"{campo.tabla_ref}.{campo.etiqueta_ref}"
+            resultados[f"{nombre}: primera página"] = resumen(medir(pagina(campo), repeticiones))
+            resultados[f"{nombre}: por id"] = resumen(medir(pagina(campo, str(filas[campo.tabla_ref] // 2)), repeticiones))
+            texto = "cliente 12" if campo is cliente_id else "S000012"
+            resultados[f"{nombre}: texto '{texto}'"] = resumen(medir(pagina(campo, texto), repeticiones))
+            resultados[f"{nombre}: 10 páginas sin texto"] = resumen(medir(pagina(campo, paginas=10), repeticiones // 10))
+            resultados[f"{nombre}: tabla completa"] = resumen(medir(
+                lambda i: funciones_crud.consultar(campo.tabla_ref, ["id", campo.etiqueta_ref], usar_cache=False), max(1, repeticiones // 100)))
+    finally:
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta)
+
+    print(f"Escala {escala} boletos ({filas['Cliente']} clientes, {filas['Servicio']} servicios)")
+    print(f"  {'caso':<52}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for nombre, r in resultados.items():
+        print(f"  {nombre:<52}{r['p50_us'] / 1000:>10.2f}{r['p95_us'] / 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", type=int, default=1000000, help="cantidad de boletos de la base generada")
+    parser.add_argument("--repeticiones", type=int, default=500)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    ejecutar(args.escala, args.repeticiones, args.semilla)
@@ -0,0 +1,94 @@
+"""
+Asesor de índices (asesor_indices.py) sobre una carga de boletería.
+
+Sobre una base generada (ver generador.py, con los índices del script SQL):
+    - captura una carga mixta: búsquedas de ruta por código y de cliente por
+      RUT, boletos de un servicio, rutas que pasan por una parada, pagos de un
+      día, venta de boletos con pago y altas de clientes;
+    - la analiza (copia de la base, planes y reproducción con y sin cada índice)
+      y muestra las recomendaciones con la ganancia estimada;
+    - aplica las recomendaciones y vuelve a correr la misma carga sobre la base,
+      para comparar el tiempo real antes y después con lo estimado.
+
+Uso:
+    python benchmarks/bench_indices.py [--escala 1000000] [--rondas 300]
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from comun import borrar_bd
+from generador import METODOS_PAGO, crear_bd_generada
+
+import asesor_indices
+import fechas
+import funciones_crud
+
+
+def _rut_cliente(numero):
+    """RUT del cliente 'numero' de la base generada (mismo formato que generador.py)."""
+    n = 10000000 + numero
+    return f"{n // 1000000}.{n // 1000 % 1000:03d}.{n % 1000:03d}-{n % 10}"
+
+
+def _carga(filas, rondas, primer_id, semilla):
+    """Corre la carga de boletería; retorna los segundos que tardó."""
+    azar = random.Random(semilla)
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for n in range(rondas):
+            funciones_crud.consultar("Ruta", ["id", "nombre"], "codigo = ?", (f"R{azar.randint(1, filas['Ruta']):06d}",), usar_cache=False)
+            funciones_crud.consultar("Cliente", "*", "rut = ?", (_rut_cliente(azar.randint(1, filas["Cliente"])),), usar_cache=False)
+            funciones_crud.consultar("Boleto", ["id", "asiento"], "servicio_id = ?", (azar.randint(1, filas["Servicio"]),), usar_cache=False)
+            funciones_crud.consultar("RutaParadas", ["ruta_id", "orden"], "parada_id = ?", (azar.randint(1, filas["Parada"]),), usar_cache=False)
+            dia = f"2024-{azar.randint(1, 12):02d}-{azar.randint(1, 28):02d}"
+            condicion, valores = fechas.rango("fecha_pago", dia, dia)
+            funciones_crud.consultar("Pago", ["id", "monto", "metodo"], condicion, valores, usar_cache=False)
+            boleto = primer_id + n
+            funciones_crud.insertar("Boleto", ["id", "codigo", "servicio_id", "cliente_id", "asiento", "precio"],
+                                    [boleto, f"A{boleto:09d}", azar.randint(1, filas["Servicio"]), 1, 1000 + boleto, 5000])
+            funciones_crud.insertar("Pago", ["boleto_id", "monto", "fecha_pago", "metodo"],
+                                    [boleto, 5000, f"{dia} 12:00", METODOS_PAGO[n % 4]])
+            funciones_crud.insertar("Cliente", ["nombre", "rut", "email"], [f"Nuevo {boleto}", f"N{boleto}", f"n{boleto}@correo.cl"])
+    return time.perf_counter() - inicio
+
+
+def ejecutar(escala, rondas, semilla):
+    ruta, filas = crear_bd_generada(escala, semilla)
+    try:
+        funciones_crud.configurar_pool(ruta_bd=ruta)
+        carga = asesor_indices.iniciar_captura()
+        antes = _carga(filas, rondas, escala + 1, semilla)
+        asesor_indices.detener_captura()
+
+        inicio = time.perf_counter()
+        resultado = asesor_indices.analizar(carga)
+        duracion_analisis = time.perf_counter() - inicio
+        recomendaciones = resultado["recomendaciones"]
+        asesor_indices.aplicar(recomendaciones)
+        despues = _carga(filas, rondas, escala + rondas + 1, semilla)
+    finally:
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta)
+
+    print(f"Escala {escala} boletos, {rondas} rondas: {resultado['sentencias']} sentencias distintas, "
+          f"análisis en {duracion_analisis:.1f} s")
+    print(f"  {'recomendación':<72}{'antes (ms)':>12}{'después (ms)':>14}{'ganancia':>10}")
+    for r in recomendaciones:
+        medida = r["antes_ms"] is not None
+        print(f"  {r['sql']:<72}{r['antes_ms'] if medida else '-':>12}{r['despues_ms'] if medida else '-':>14}"
+              f"{str(r['ganancia_pct']) + ' %' if r['ganancia_pct'] is not None else '-':>10}")
+    if resultado["sin_uso"]:
+        print("  sin uso en la carga: " + ", ".join(resultado["sin_uso"]))
+    print(f"  carga real: {antes:.2f} s antes, {despues:.2f} s con las recomendaciones aplicadas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", type=int, default=1000000, help="cantidad de boletos de la base generada")
+    parser.add_argument("--rondas", type=int, default=300, help="repeticiones de la carga de boletería")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    ejecutar(args.escala, args.rondas, args.semilla)
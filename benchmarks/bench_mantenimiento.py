@@ -0,0 +1,106 @@
+"""
+Mantenimiento (mantenimiento.py): duración de cada tarea, espacio recuperado y
+efecto del respaldo en línea sobre los escritores.
+
+Sobre una base generada (ver generador.py) mide:
+    - la latencia de un escritor (un UPDATE por commit, desde otra conexión)
+      sin respaldo, durante un respaldo por pasos (PAGINAS_POR_PASO) y durante
+      un respaldo en un solo paso;
+    - la duración de integridad (quick_check), integridad completa, optimizar,
+      analizar y checkpoint;
+    - el espacio que devuelve el vacuum incremental después de borrar una parte
+      de Pago (y lo que tarda el VACUUM completo que lo habilita).
+
+Uso:
+    python benchmarks/bench_mantenimiento.py [--escala 1000000] [--borrar 0.3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from comun import borrar_bd, resumen
+from generador import crear_bd_generada
+
+import funciones_crud
+import mantenimiento
+
+
+def _con_escritor(funcion):
+    """Corre funcion() mientras otro hilo actualiza Boleto; retorna (resultado, latencias del escritor)."""
+    detener = threading.Event()
+    tiempos = []
+
+    def escribir():
+        conexion = funciones_crud.conectar()
+        i = 0
+        while not detener.is_set():
+            t0 = time.perf_counter()
+            conexion.execute("UPDATE Boleto SET precio = precio + 1 WHERE id = ?", (i % 10000 + 1,))
+            conexion.commit()
+            tiempos.append(time.perf_counter() - t0)
+            i += 1
+            time.sleep(0.002)
+        conexion.close()
+
+    hilo = threading.Thread(target=escribir)
+    hilo.start()
+    try:
+        resultado = funcion()
+    finally:
+        detener.set()
+        hilo.join()
+    return resultado, dict(resumen(tiempos), max_us=max(tiempos, default=0.0) * 1e6)
+
+
+def ejecutar(escala, fraccion_borrar, semilla):
+    ruta, filas = crear_bd_generada(escala, semilla)
+    carpeta = tempfile.mkdtemp(prefix="bench_mantenimiento_")
+    resultados = {}
+    try:
+        funciones_crud.configurar_pool(ruta_bd=ruta)
+        _, sin_respaldo = _con_escritor(lambda: time.sleep(1.0))
+        por_pasos, escritor_pasos = _con_escritor(lambda: mantenimiento.ejecutar(
+            "respaldo", destino=os.path.join(carpeta, "pasos.db")))
+        un_paso, escritor_un_paso = _con_escritor(lambda: mantenimiento.ejecutar(
+            "respaldo", destino=os.path.join(carpeta, "un_paso.db"), paginas=-1))
+        for tarea, opciones in (("integridad", {}), ("integridad", {"completa": True}), ("optimizar", {}),
+                                ("analizar", {}), ("checkpoint", {})):
+            nombre = tarea + (" completa" if opciones else "")
+            resultados[nombre] = mantenimiento.ejecutar(tarea, **opciones)
+        resultados["vacuum completo"] = mantenimiento.ejecutar("vacuum", completo=True)
+        borrar_hasta = int(filas["Pago"] * fraccion_borrar)
+        with contextlib.redirect_stdout(io.StringIO()):
+            funciones_crud.eliminar("Pago", "id <= ?", (borrar_hasta,))
+        resultados[f"vacuum incremental ({borrar_hasta} pagos borrados)"] = mantenimiento.ejecutar("vacuum")
+        resultados["checkpoint después del vacuum"] = mantenimiento.ejecutar("checkpoint")
+    finally:
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta)
+        shutil.rmtree(carpeta)
+
+    print(f"Escala {escala} boletos ({filas['Pago']} pagos)")
+    print(f"  {'latencia del escritor':<40}{'p50 (ms)':>10}{'p95 (ms)':>10}{'máx (ms)':>10}")
+    for nombre, r in (("sin respaldo", sin_respaldo), ("durante respaldo por pasos", escritor_pasos),
+                      ("durante respaldo en un paso", escritor_un_paso)):
+        print(f"  {nombre:<40}{r['p50_us'] / 1000:>10.2f}{r['p95_us'] / 1000:>10.2f}{r['max_us'] / 1000:>10.2f}")
+    for nombre, r in (("respaldo por pasos", por_pasos), ("respaldo en un paso", un_paso)):
+        detalle = r["detalle"]
+        print(f"  {nombre}: {r['duracion_s']:.2f} s, {detalle.get('bytes', 0) / 2 ** 20:.0f} MiB, "
+              f"{detalle.get('pasos')} pasos, {detalle.get('reinicios')} reinicios ({detalle.get('modo')})")
+    print(f"  {'tarea':<50}{'duración (s)':>14}{'liberado (MiB)':>16}")
+    for nombre, r in resultados.items():
+        print(f"  {nombre:<50}{r['duracion_s']:>14.3f}{r['liberado_bytes'] / 2 ** 20:>16.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", type=int, default=1000000, help="cantidad de boletos de la base generada")
+    parser.add_argument("--borrar", type=float, default=0.3, help="fracción de Pago que se borra antes del vacuum")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    ejecutar(args.escala, args.borrar, args.semilla)
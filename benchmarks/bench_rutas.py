@@ -0,0 +1,121 @@
+"""
+Planificador de viajes (planificador.py) sobre una red de tamaño realista.
+
+Arma una base temporal con P paradas, R rutas de 5 a 15 paradas cada una y S
+servicios repartidos en 30 días (semilla fija), y mide:
+    - la carga completa del grafo en memoria,
+    - consultas de llegada más temprana entre paradas al azar,
+    - el refresco incremental después de insertar un servicio o cambiar las
+      paradas de una ruta, contra volver a cargar la red completa.
+
+Uso:
+    python benchmarks/bench_rutas.py [--paradas 2000] [--rutas 600] [--servicios 150000] [--consultas 500]
+"""
+import argparse
+import datetime
+import random
+import sqlite3
+import time
+
+from comun import borrar_bd, crear_bd_temporal, medir, resumen
+
+import funciones_crud
+import planificador
+
+INICIO = datetime.datetime(2025, 1, 1)
+DIAS = 30
+
+
+def _fecha(minutos):
+    return (INICIO + datetime.timedelta(minutes=minutos)).strftime("%Y-%m-%d %H:%M")
+
+
+def _llenar(ruta_bd, paradas, rutas, servicios, azar):
+    conexion = sqlite3.connect(ruta_bd)
+    conexion.execute("PRAGMA synchronous = OFF")
+    conexion.execute("INSERT INTO Bus (id, patente, modelo, capacidad) VALUES (1, 'BENCH1', 'Bench', 45)")
+    conexion.execute("INSERT INTO Chofer (id, rut, nombre) VALUES (1, '1.111.111-1', 'Bench')")
+    conexion.executemany("INSERT INTO Parada (id, nombre, ciudad) VALUES (?, ?, ?)",
+                         ((i, f"Parada {i}", f"Ciudad {i % 200}") for i in range(1, paradas + 1)))
+    conexion.executemany("INSERT INTO Ruta (id, codigo, nombre, origen, destino) VALUES (?, ?, ?, ?, ?)",
+                         ((i, f"R{i:05d}", f"Ruta {i}", "-", "-") for i in range(1, rutas + 1)))
+    conexion.executemany(
+        "INSERT INTO RutaParadas (ruta_id, parada_id, orden) VALUES (?, ?, ?)",
+        ((r, p, orden) for r in range(1, rutas + 1) for orden, p in enumerate(azar.sample(range(1, paradas + 1), azar.randint(5, 15)), start=1)),
+    )
+    filas = []
+    for i in range(1, servicios + 1):
+        salida = azar.randint(0, DIAS * 24 * 60)
+        filas.append((f"S{i:07d}", azar.randint(1, rutas), _fecha(salida), _fecha(salida + azar.randint(60, 600))))
+    conexion.executemany("INSERT INTO Servicio (codigo, ruta_id, bus_id, chofer_id, fecha_salida, fecha_llegada) VALUES (?, ?, 1, 1, ?, ?)", filas)
+    conexion.commit()
+    conexion.close()
+
+
+def ejecutar(paradas, rutas, servicios, consultas, semilla):
+    ruta_bd = crear_bd_temporal(con_datos=False)
+    azar = random.Random(semilla)
+    try:
+        _llenar(ruta_bd, paradas, rutas, servicios, azar)
+        funciones_crud.configurar_pool(ruta_bd=ruta_bd)
+        inicio = time.perf_counter()
+        grafo = planificador.obtener_grafo()
+        carga = time.perf_counter() - inicio
+
+        pares = [(azar.randint(1, paradas), azar.randint(1, paradas), _fecha(azar.randint(0, (DIAS - 3) * 24 * 60))) for _ in range(consultas)]
+        viajes = []
+
+        def consulta(i):
+            viajes.append(planificador.planificar(*pares[i]))
+
+        tiempos_consulta = resumen(medir(consulta, consultas))
+        encontrados = [v for v in viajes if v]
+
+        def insertar_servicio(i):
+            with funciones_crud.obtener_conexion() as conexion:
+                conexion.execute(
+                    "INSERT INTO Servicio (codigo, ruta_id, bus_id, chofer_id, fecha_salida, fecha_llegada) VALUES (?, ?, 1, 1, ?, ?)",
+                    (f"N{i:06d}", azar.randint(1, rutas), _fecha(600), _fecha(900)),
+                )
+                conexion.commit()
+
+        def cambiar_ruta(i):
+            with funciones_crud.obtener_conexion() as conexion:
+                conexion.execute("UPDATE RutaParadas SET parada_id = ? WHERE id = (SELECT MIN(id) FROM RutaParadas WHERE ruta_id = ?)",
+                                 (azar.randint(1, paradas), azar.randint(1, rutas)))
+                conexion.commit()
+
+        refrescos = {}
+        for nombre, cambio in (("insertar un servicio", insertar_servicio), ("cambiar una parada de ruta", cambiar_ruta)):
+            tiempos = []
+            for i in range(20):
+                cambio(i)
+                inicio = time.perf_counter()
+                planificador.obtener_grafo()
+                tiempos.append(time.perf_counter() - inicio)
+            refrescos[nombre] = resumen(tiempos)
+        estadisticas = grafo.estadisticas()
+    finally:
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta_bd)
+
+    print(f"{estadisticas['paradas']} paradas, {estadisticas['rutas']} rutas, {estadisticas['servicios']} servicios")
+    print(f"  carga completa del grafo: {carga * 1000:.0f} ms")
+    print(f"  {consultas} consultas: media {tiempos_consulta['media_us'] / 1000:.2f} ms, p50 {tiempos_consulta['p50_us'] / 1000:.2f} ms, "
+          f"p95 {tiempos_consulta['p95_us'] / 1000:.2f} ms")
+    if encontrados:
+        transbordos = sum(v["transbordos"] for v in encontrados) / len(encontrados)
+        print(f"  con conexión: {len(encontrados)} ({transbordos:.1f} transbordos en promedio)")
+    for nombre, r in refrescos.items():
+        print(f"  refresco tras {nombre}: p50 {r['p50_us'] / 1000:.2f} ms, p95 {r['p95_us'] / 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paradas", type=int, default=2000)
+    parser.add_argument("--rutas", type=int, default=600)
+    parser.add_argument("--servicios", type=int, default=150000)
+    parser.add_argument("--consultas", type=int, default=500)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    ejecutar(args.paradas, args.rutas, args.servicios, args.consultas, args.semilla)
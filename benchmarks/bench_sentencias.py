@@ -0,0 +1,104 @@
+"""
+Constructor de sentencias (sentencias.py) y caché de sentencias preparadas.
+
+Mide, sobre una base temporal con N clientes:
+    1. Solo el armado del texto SQL de una consulta y de un UPDATE: concatenando
+       en cada llamada (como antes), pidiéndolo al constructor ya armado y
+       armándolo de nuevo con la validación contra el catálogo.
+    2. Llamadas completas a funciones_crud.consultar (sin caché de resultados) y
+       funciones_crud.actualizar con las conexiones del pool sin caché de
+       sentencias preparadas (cached_statements=0, SQLite compila en cada
+       llamada) y con SENTENCIAS_PREPARADAS.
+
+Uso:
+    python benchmarks/bench_sentencias.py [--clientes 100000] [--repeticiones 20000]
+"""
+import argparse
+import contextlib
+import io
+import random
+import sqlite3
+
+from comun import borrar_bd, crear_bd_temporal, medir, resumen
+
+import funciones_crud
+
+COLUMNAS = ["id", "rut", "nombre", "email", "telefono"]
+
+
+def _armar_anterior(nombre_tabla, columnas, condicion, limite):
+    """El armado que hacía consultar antes del constructor."""
+    consulta_sql = "SELECT " + ", ".join(columnas) + " FROM " + nombre_tabla
+    if condicion:
+        consulta_sql += " WHERE " + condicion
+    if limite is not None:
+        consulta_sql += " LIMIT ?"
+    return consulta_sql
+
+
+def _armar_update_anterior(nombre_tabla, nuevos_datos, condicion):
+    texto_actualizacion = ""
+    for campo in nuevos_datos.keys():
+        texto_actualizacion += campo + " = ?, "
+    texto_actualizacion = texto_actualizacion[:-2]
+    return "UPDATE " + nombre_tabla + " SET " + texto_actualizacion + " WHERE " + condicion
+
+
+def ejecutar(clientes, repeticiones, semilla):
+    ruta_bd = crear_bd_temporal(con_datos=False)
+    azar = random.Random(semilla)
+    resultados = {}
+    try:
+        conexion = sqlite3.connect(ruta_bd)
+        conexion.executemany("INSERT INTO Cliente (rut, nombre, email) VALUES (?, ?, ?)",
+                             ((f"{i}-K", f"Cliente {i}", f"c{i}@correo.cl") for i in range(clientes)))
+        conexion.commit()
+        conexion.close()
+        funciones_crud.configurar_pool(ruta_bd=ruta_bd)
+        datos = {"nombre": "x", "email": "y", "telefono": "z"}
+        constructor = funciones_crud.sentencias
+
+        resultados["armar SELECT concatenando"] = resumen(medir(lambda i: _armar_anterior("Cliente", COLUMNAS, "id = ?", 1), repeticiones))
+        resultados["armar SELECT, ya en el constructor"] = resumen(medir(
+            lambda i: constructor.seleccionar("Cliente", COLUMNAS, "id = ?", None, True), repeticiones))
+
+        def armar_validando(i):
+            constructor.limpiar()
+            constructor.seleccionar("Cliente", COLUMNAS, "id = ?", None, True)
+
+        resultados["armar SELECT validando (primera vez)"] = resumen(medir(armar_validando, repeticiones // 10))
+        resultados["armar UPDATE concatenando"] = resumen(medir(lambda i: _armar_update_anterior("Cliente", datos, "id = ?"), repeticiones))
+        resultados["armar UPDATE, ya en el constructor"] = resumen(medir(
+            lambda i: constructor.actualizar("Cliente", list(datos), "id = ?"), repeticiones))
+
+        ids = [azar.randint(1, clientes) for _ in range(repeticiones)]
+        preparadas = funciones_crud.SENTENCIAS_PREPARADAS
+        for cantidad in (0, preparadas):
+            funciones_crud.SENTENCIAS_PREPARADAS = cantidad
+            funciones_crud.configurar_pool(ruta_bd=ruta_bd)  # conexiones nuevas con ese cached_statements
+            etiqueta = f"cached_statements={cantidad}"
+            resultados[f"consultar por id, {etiqueta}"] = resumen(medir(
+                lambda i: funciones_crud.consultar("Cliente", COLUMNAS, "id = ?", (ids[i],), limite=1, usar_cache=False), repeticiones))
+            with contextlib.redirect_stdout(io.StringIO()):
+                resultados[f"actualizar por id, {etiqueta}"] = resumen(medir(
+                    lambda i: funciones_crud.actualizar("Cliente", {"telefono": str(i)}, "id = ?", (ids[i],)), repeticiones // 10))
+        funciones_crud.SENTENCIAS_PREPARADAS = preparadas
+        estadisticas = funciones_crud.estadisticas_sentencias()
+    finally:
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta_bd)
+
+    print(f"{clientes} clientes, {repeticiones} repeticiones")
+    print(f"  {'caso':<46}{'p50 (µs)':>10}{'p95 (µs)':>10}")
+    for nombre, r in resultados.items():
+        print(f"  {nombre:<46}{r['p50_us']:>10.1f}{r['p95_us']:>10.1f}")
+    print(f"  constructor: {estadisticas['aciertos']} aciertos, {estadisticas['fallos']} armadas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=100000)
+    parser.add_argument("--repeticiones", type=int, default=20000)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    ejecutar(args.clientes, args.repeticiones, args.semilla)
@@ -0,0 +1,190 @@
+"""
+Suite de benchmarks reproducible sobre datos sintéticos (ver generador.py).
+
+Para cada escala crea una base temporal con datos generados con la semilla
+indicada y mide los caminos reales de la aplicación:
+    funciones_crud.consultar / insertar / actualizar / eliminar / insertar_lote,
+    operaciones.leer_registros (lo que usa la vista "Leer" de main.py),
+    validar_datos, operaciones.eliminar_registro (con y sin dependientes)
+    y las vistas vw_boletos_por_servicio / vw_ingresos_ruta.
+
+El resultado se guarda en JSON (una entrada por escala y caso, con media, p50
+y p95 en microsegundos) para poder comparar versiones:
+
+    python benchmarks/bench_suite.py --escalas 1000 100000 --salida base.json
+    ... cambios ...
+    python benchmarks/bench_suite.py --escalas 1000 100000 --salida nuevo.json --comparar base.json
+
+Con --comparar el script termina con código 1 si algún p50 empeoró más que
+--tolerancia (por defecto 25 %).
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+
+from comun import RAIZ, borrar_bd, medir, resumen
+from generador import crear_bd_generada
+
+import funciones_crud
+import instrumentacion
+import operaciones
+import reportes
+from validaciones import validar_datos
+
+VERSION_REPORTE = 1
+ESCALAS_POR_DEFECTO = (1000, 10000, 100000)
+
+
+def _version_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _casos(filas, repeticiones, azar):
+    """Lista de (nombre, funcion(i), repeticiones) a medir sobre la base configurada."""
+    clientes, servicios, boletos, pagos = filas["Cliente"], filas["Servicio"], filas["Boleto"], filas["Pago"]
+    # Las vistas recorren tablas completas: menos repeticiones
+    repeticiones_vistas = max(3, repeticiones // 10)
+    ids_pago = azar.sample(range(1, pagos + 1), min(pagos, repeticiones))
+
+    def insertar(i):
+        funciones_crud.insertar("Parada", ["nombre", "ciudad"], [f"Bench {i}", "Bench"])
+
+    def eliminar(i):
+        funciones_crud.eliminar("Parada", "nombre = ? AND ciudad = ?", (f"Bench {i}", "Bench"))
+
+    def insertar_lote(i):
+        funciones_crud.insertar_lote("Parada", ["nombre", "ciudad"], ((f"Lote {i}-{n}", "Bench") for n in range(1000)))
+
+    return [
+        ("consultar_id", lambda i: funciones_crud.consultar("Cliente", condicion="id = ?", valores_condicion=(azar.randint(1, clientes),), usar_cache=False), repeticiones),
+        ("consultar_fk", lambda i: funciones_crud.consultar("Boleto", condicion="servicio_id = ?", valores_condicion=(azar.randint(1, servicios),), usar_cache=False), repeticiones),
+        ("consultar_pagina_keyset", lambda i: funciones_crud.consultar("Boleto", limite=50, despues_de_id=azar.randint(0, boletos), usar_cache=False), repeticiones),
+        ("consultar_pagina_offset", lambda i: funciones_crud.consultar("Boleto", limite=50, desplazamiento=azar.randint(0, boletos), usar_cache=False), repeticiones),
+        ("consultar_cache", lambda i: funciones_crud.consultar("Ruta", limite=50), repeticiones),
+        ("insertar", insertar, repeticiones),
+        ("actualizar", lambda i: funciones_crud.actualizar("Cliente", {"telefono": f"+5690000{i:04d}"}, "id = ?", (azar.randint(1, clientes),)), repeticiones),
+        ("eliminar", eliminar, repeticiones),
+        ("insertar_lote_1000", insertar_lote, max(3, repeticiones // 10)),
+        ("leer_registros", lambda i: operaciones.leer_registros("Boleto", None, 100), repeticiones),
+        ("leer_registros_filtro", lambda i: operaciones.leer_registros("Boleto", {"cliente_id": azar.randint(1, clientes)}, 100), repeticiones),
+        ("validar_datos", lambda i: validar_datos("Boleto", {"codigo": f"BV{i}", "servicio_id": azar.randint(1, servicios), "cliente_id": azar.randint(1, clientes), "asiento": 1, "precio": 1000}), repeticiones),
+        # Cliente con boletos: falla por clave foránea y busca los dependientes
+        ("eliminar_registro_dependientes", lambda i: operaciones.eliminar_registro("Cliente", azar.randint(1, clientes)), repeticiones),
+        ("eliminar_registro", lambda i: operaciones.eliminar_registro("Pago", ids_pago[i % len(ids_pago)]), len(ids_pago)),
+        ("vw_boletos_por_servicio", lambda i: _leer_vista("vw_boletos_por_servicio"), repeticiones_vistas),
+        ("vw_ingresos_ruta", lambda i: _leer_vista("vw_ingresos_ruta"), repeticiones_vistas),
+        ("resumen_ingresos_ruta", lambda i: reportes.ingresos_por_ruta(), repeticiones),
+    ]
+
+
+def _leer_vista(vista):
+    with funciones_crud.obtener_conexion() as conexion:
+        return conexion.execute(f"SELECT * FROM {vista}").fetchall()
+
+
+def ejecutar_escala(escala, semilla, repeticiones):
+    """Genera la base de una escala, mide todos los casos y retorna su parte del reporte."""
+    inicio = time.perf_counter()
+    ruta, filas = crear_bd_generada(escala, semilla)
+    generacion = time.perf_counter() - inicio
+    try:
+        funciones_crud.configurar_pool(ruta_bd=ruta)
+        with funciones_crud.obtener_conexion() as conexion:
+            inicio = time.perf_counter()
+            reportes.instalar(conexion)  # la aplicación trabaja con los resúmenes instalados
+            instalacion_reportes = time.perf_counter() - inicio
+        azar = random.Random(semilla)
+        casos = {}
+        with contextlib.redirect_stdout(io.StringIO()):  # funciones_crud imprime por operación
+            for nombre, funcion, veces in _casos(filas, repeticiones, azar):
+                casos[nombre] = dict(resumen(medir(funcion, veces)), repeticiones=veces)
+    finally:
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta)
+    return {
+        "filas": filas,
+        "generacion_s": round(generacion, 3),
+        "instalar_reportes_s": round(instalacion_reportes, 3),
+        "casos": {nombre: {k: round(v, 2) if isinstance(v, float) else v for k, v in datos.items()} for nombre, datos in casos.items()},
+    }
+
+
+def comparar(actual, base, tolerancia):
+    """Lista de regresiones (textos) de actual respecto de base: p50 más de tolerancia peor."""
+    regresiones = []
+    for escala, datos in actual["escalas"].items():
+        previos = base.get("escalas", {}).get(escala)
+        if not previos:
+            continue
+        for caso, medicion in datos["casos"].items():
+            previo = previos["casos"].get(caso)
+            if not previo or not previo["p50_us"]:
+                continue
+            razon = medicion["p50_us"] / previo["p50_us"]
+            if razon > 1 + tolerancia:
+                regresiones.append(f"escala {escala}, {caso}: p50 {previo['p50_us']:.0f} -> {medicion['p50_us']:.0f} µs (x{razon:.2f})")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", type=int, nargs="+", default=list(ESCALAS_POR_DEFECTO), help="cantidades de boletos (10^3 a 10^7)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--salida", help="archivo JSON del reporte (por defecto solo se imprime)")
+    parser.add_argument("--comparar", help="reporte JSON anterior para detectar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="empeoramiento de p50 permitido (0.25 = 25 %%)")
+    args = parser.parse_args(argv)
+
+    # Sin archivo de log: se mide el camino de la aplicación sin escribir registro_consultas.jsonl
+    instrumentacion.configurar(ruta_log="")
+    reporte = {
+        "version_reporte": VERSION_REPORTE,
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git": _version_git(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "semilla": args.semilla,
+        "repeticiones": args.repeticiones,
+        "escalas": {},
+    }
+    for escala in args.escalas:
+        print(f"Escala {escala} boletos...", flush=True)
+        datos = ejecutar_escala(escala, args.semilla, args.repeticiones)
+        reporte["escalas"][str(escala)] = datos
+        print(f"  datos generados en {datos['generacion_s']:.1f} s ({sum(datos['filas'].values())} filas)")
+        print(f"  {'caso':<32}{'p50 (µs)':>12}{'p95 (µs)':>12}")
+        for caso, medicion in datos["casos"].items():
+            print(f"  {caso:<32}{medicion['p50_us']:>12.0f}{medicion['p95_us']:>12.0f}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+        print(f"Reporte guardado en {args.salida}")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(reporte, base, args.tolerancia)
+        if regresiones:
+            print(f"{len(regresiones)} regresiones respecto de {args.comparar}:")
+            for linea in regresiones:
+                print("  " + linea)
+            return 1
+        print(f"Sin regresiones respecto de {args.comparar} (tolerancia {args.tolerancia:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
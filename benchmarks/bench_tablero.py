@@ -0,0 +1,110 @@
+"""
+Tablero de operación (tablero.py): indicadores desde acumulados contra en vivo.
+
+Sobre una base generada (ver generador.py) mide:
+    - la instalación: sumar todo Pago y Servicio a los acumulados por primera vez;
+    - el primer dibujo del tablero (tablero.indicadores de los últimos 7 días,
+      sin caché) contra los mismos indicadores agregados en vivo desde
+      Servicio/Boleto/Pago;
+    - la venta de boletos con pago (inserción de Boleto + Pago) sin y con los
+      acumulados instalados, y cuánto tarda después ponerlos al día;
+y al final verifica los acumulados contra la agregación en vivo.
+
+Uso:
+    python benchmarks/bench_tablero.py [--escala 1000000] [--ventas 2000]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from comun import borrar_bd, medir, resumen
+from generador import METODOS_PAGO, crear_bd_generada
+
+import fechas
+import funciones_crud
+import reportes
+import tablero
+
+
+def _en_vivo(desde, hasta):
+    """Los cuatro indicadores agregados desde las tablas de origen (como sin resúmenes)."""
+    condicion, valores = fechas.rango("fecha_salida", desde, hasta)
+    condicion_pago, valores_pago = fechas.rango("fecha_pago", desde, hasta)
+    with funciones_crud.obtener_conexion() as conexion:
+        conexion.execute(f"""
+            SELECT s.id, COUNT(bo.id), b.capacidad FROM Servicio s JOIN Bus b ON b.id = s.bus_id
+            LEFT JOIN Boleto bo ON bo.servicio_id = s.id WHERE {condicion} GROUP BY s.id LIMIT 500""", valores).fetchall()
+        conexion.execute(f"""
+            SELECT substr(p.fecha_pago, 1, 10), s.ruta_id, SUM(p.monto) FROM Pago p
+            JOIN Boleto bo ON bo.id = p.boleto_id JOIN Servicio s ON s.id = bo.servicio_id
+            WHERE {condicion_pago.replace('"fecha_pago"', 'p.fecha_pago')} GROUP BY 1, 2""", valores_pago).fetchall()
+        conexion.execute(f"SELECT substr(fecha_pago, 1, 10), metodo, SUM(monto), COUNT(*) FROM Pago WHERE {condicion_pago} GROUP BY 1, 2",
+                         valores_pago).fetchall()
+        conexion.execute(f"""
+            SELECT chofer_id, COUNT(*), SUM(julianday(fecha_llegada) - julianday(fecha_salida)) FROM Servicio
+            WHERE {condicion} GROUP BY chofer_id ORDER BY 3 DESC LIMIT 50""", valores).fetchall()
+
+
+def _vender(primer_boleto, cantidad, servicio_id):
+    """Inserta cantidad boletos con su pago; retorna la duración de cada venta."""
+    tiempos = []
+    for i in range(primer_boleto, primer_boleto + cantidad):
+        t0 = time.perf_counter()
+        funciones_crud.insertar("Boleto", ["id", "codigo", "servicio_id", "cliente_id", "asiento", "precio"],
+                                [i, f"V{i:09d}", servicio_id, 1, 1000 + i, 5000])
+        funciones_crud.insertar("Pago", ["boleto_id", "monto", "fecha_pago", "metodo"],
+                                [i, 5000, "2024-01-01 12:00", METODOS_PAGO[i % 4]])
+        tiempos.append(time.perf_counter() - t0)
+    return tiempos
+
+
+def ejecutar(escala, ventas, consultas, semilla):
+    ruta, filas = crear_bd_generada(escala, semilla)
+    try:
+        funciones_crud.configurar_pool(ruta_bd=ruta)
+        reportes.instalar()
+        with contextlib.redirect_stdout(io.StringIO()):
+            sin_acumulados = resumen(_vender(escala + 1, ventas, 1))
+
+        inicio = time.perf_counter()
+        tablero.instalar()
+        duracion_instalar = time.perf_counter() - inicio
+        desde, hasta = tablero.periodo_reciente(7)
+
+        def primer_dibujo(i):
+            funciones_crud.cache.limpiar()
+            tablero.indicadores(desde, hasta)
+
+        dibujo = resumen(medir(primer_dibujo, consultas))
+        vivo = resumen(medir(lambda i: _en_vivo(desde, hasta), max(1, consultas // 10)))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            con_acumulados = resumen(_vender(escala + ventas + 1, ventas, 2))
+        inicio = time.perf_counter()
+        sumadas = tablero.actualizar()
+        duracion_actualizar = time.perf_counter() - inicio
+        with funciones_crud.obtener_conexion() as conexion:
+            diferencias = tablero.verificar(conexion)
+    finally:
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta)
+
+    print(f"Escala {escala} boletos ({filas['Pago']} pagos, {filas['Servicio']} servicios); período {desde} a {hasta}")
+    print(f"  instalar (sumar todo por primera vez): {duracion_instalar:.2f} s")
+    print(f"  primer dibujo del tablero: p50 {dibujo['p50_us'] / 1000:.1f} ms, p95 {dibujo['p95_us'] / 1000:.1f} ms")
+    print(f"  mismos indicadores en vivo: p50 {vivo['p50_us'] / 1000:.1f} ms, p95 {vivo['p95_us'] / 1000:.1f} ms")
+    print(f"  venta boleto + pago: p50 {sin_acumulados['p50_us'] / 1000:.2f} ms sin acumulados, "
+          f"{con_acumulados['p50_us'] / 1000:.2f} ms con acumulados")
+    print(f"  poner al día {sumadas['Pago']} pagos nuevos: {duracion_actualizar * 1000:.1f} ms")
+    print(f"  diferencias con la agregación en vivo: {len(diferencias)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", type=int, default=1000000, help="cantidad de boletos de la base generada")
+    parser.add_argument("--ventas", type=int, default=2000, help="boletos con pago vendidos en cada medición")
+    parser.add_argument("--consultas", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    ejecutar(args.escala, args.ventas, args.consultas, args.semilla)
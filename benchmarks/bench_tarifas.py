@@ -0,0 +1,123 @@
+"""
+Tarifa vigente: índice de intervalos en memoria (tarifas.py) contra la consulta SQL.
+
+Arma una base temporal con R rutas y K tarifas consecutivas por ruta (de 1 a 60
+días cada una, algunas solo con fecha y otras con hora) y mide, para momentos
+al azar:
+    - tarifas.tarifa_vigente (bisect sobre el índice cargado),
+    - SELECT ... WHERE ruta_id = ? AND fecha_inicio <= ? AND (fecha_fin IS NULL
+      OR fecha_fin >= ?) ORDER BY fecha_inicio DESC LIMIT 1, con un índice
+      (ruta_id, fecha_inicio),
+además de la carga completa del índice y la recarga después de una escritura.
+Cuenta también las respuestas distintas: la consulta SQL compara textos, y una
+fecha_fin guardada solo con fecha ("2025-11-30") queda antes de
+"2025-11-30 10:00", así que deja sin tarifa el último día.
+
+Uso:
+    python benchmarks/bench_tarifas.py [--rutas 600] [--tarifas 200] [--consultas 20000]
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import random
+import sqlite3
+import time
+
+from comun import borrar_bd, crear_bd_temporal, medir, resumen
+
+import funciones_crud
+import tarifas
+
+INICIO = datetime.datetime(2015, 1, 1)
+
+CONSULTA_SQL = (
+    "SELECT id, monto FROM Tarifa WHERE ruta_id = ? AND fecha_inicio <= ? "
+    "AND (fecha_fin IS NULL OR fecha_fin >= ?) ORDER BY fecha_inicio DESC LIMIT 1"
+)
+
+
+def _llenar(ruta_bd, rutas, por_ruta, azar):
+    """Inserta las rutas y sus tarifas; retorna el último día cubierto."""
+    conexion = sqlite3.connect(ruta_bd)
+    conexion.execute("PRAGMA synchronous = OFF")
+    conexion.executemany("INSERT INTO Ruta (id, codigo, nombre, origen, destino) VALUES (?, ?, ?, ?, ?)",
+                         ((i, f"R{i:05d}", f"Ruta {i}", "-", "-") for i in range(1, rutas + 1)))
+    filas, ultimo = [], INICIO
+    for ruta_id in range(1, rutas + 1):
+        dia = INICIO
+        for k in range(por_ruta):
+            fin = dia + datetime.timedelta(days=azar.randint(1, 60))
+            if azar.random() < 0.5:
+                # Solo fecha: termina el día anterior al inicio de la siguiente
+                textos = (dia.strftime("%Y-%m-%d"), (fin - datetime.timedelta(days=1)).strftime("%Y-%m-%d"))
+            else:
+                textos = (dia.strftime("%Y-%m-%d %H:%M"), (fin - datetime.timedelta(minutes=1)).strftime("%Y-%m-%d %H:%M"))
+            filas.append((ruta_id, f"T{k}", azar.randint(20, 200) * 100) + textos)
+            dia = fin
+        ultimo = max(ultimo, dia)
+    conexion.executemany("INSERT INTO Tarifa (ruta_id, nombre, monto, fecha_inicio, fecha_fin) VALUES (?, ?, ?, ?, ?)", filas)
+    conexion.execute("CREATE INDEX IF NOT EXISTS idx_tarifa_ruta_inicio ON Tarifa (ruta_id, fecha_inicio)")
+    conexion.commit()
+    conexion.close()
+    return ultimo
+
+
+def ejecutar(rutas, por_ruta, consultas, semilla):
+    ruta_bd = crear_bd_temporal(con_datos=False)
+    azar = random.Random(semilla)
+    try:
+        ultimo = _llenar(ruta_bd, rutas, por_ruta, azar)
+        funciones_crud.configurar_pool(ruta_bd=ruta_bd)
+        minutos = int((ultimo - INICIO).total_seconds()) // 60
+        pedidos = [(azar.randint(1, rutas), (INICIO + datetime.timedelta(minutes=azar.randint(0, minutos))).strftime("%Y-%m-%d %H:%M"))
+                   for _ in range(consultas)]
+
+        inicio = time.perf_counter()
+        tarifas.obtener_indice()
+        carga = time.perf_counter() - inicio
+
+        en_memoria, en_sql = [], []
+
+        def memoria(i):
+            tarifa = tarifas.tarifa_vigente(*pedidos[i])
+            en_memoria.append(tarifa["id"] if tarifa else None)
+
+        with funciones_crud.obtener_conexion() as conexion:
+            def sql(i):
+                ruta_id, momento = pedidos[i]
+                fila = conexion.execute(CONSULTA_SQL, (ruta_id, momento, momento)).fetchone()
+                en_sql.append(fila[0] if fila else None)
+
+            tiempos = {"índice en memoria": resumen(medir(memoria, consultas)),
+                       "consulta SQL indexada": resumen(medir(sql, consultas))}
+
+        def escribir_y_recargar(i):
+            funciones_crud.actualizar("Tarifa", {"monto": 1000 + i}, "id = ?", (azar.randint(1, rutas * por_ruta),))
+            tarifas.obtener_indice()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            recarga = resumen(medir(escribir_y_recargar, 10))
+        problemas = len(tarifas.problemas())
+    finally:
+        funciones_crud.cerrar_pool()
+        borrar_bd(ruta_bd)
+
+    distintas = sum(1 for a, b in zip(en_memoria, en_sql) if a != b)
+    print(f"{rutas} rutas x {por_ruta} tarifas, {consultas} consultas")
+    print(f"  carga completa del índice: {carga * 1000:.0f} ms ({problemas} problema(s) encontrados)")
+    print(f"  {'caso':<26}{'p50 (µs)':>10}{'p95 (µs)':>10}")
+    for nombre, r in tiempos.items():
+        print(f"  {nombre:<26}{r['p50_us']:>10.1f}{r['p95_us']:>10.1f}")
+    print(f"  escritura + recarga del índice: p50 {recarga['p50_us'] / 1000:.1f} ms")
+    print(f"  respuestas distintas entre ambos: {distintas} (último día de tarifas guardadas solo con fecha)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rutas", type=int, default=600)
+    parser.add_argument("--tarifas", type=int, default=200, help="tarifas por ruta")
+    parser.add_argument("--consultas", type=int, default=20000)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    ejecutar(args.rutas, args.tarifas, args.consultas, args.semilla)
@@ -0,0 +1,74 @@
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Utilidades compartidas por los scripts de benchmarks.
+# Permite importar los módulos del proyecto (funciones_crud, etc.) desde esta carpeta.
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+SCRIPT_TABLAS = os.path.join(RAIZ, "Script Tablas y Vistas.sql")
+SCRIPT_DATOS = os.path.join(RAIZ, "Datos de prueba.sql")
+
+
+def crear_bd_temporal(con_datos=True, carpeta=None):
+    """
+    Crea un archivo SQLite temporal con el esquema del proyecto (y los datos de prueba).
+    Nunca toca base_de_datos_transportes.db. Retorna la ruta del archivo.
+    """
+    descriptor, ruta = tempfile.mkstemp(prefix="bench_transportes_", suffix=".db", dir=carpeta)
+    os.close(descriptor)
+    conexion = sqlite3.connect(ruta)
+    try:
+        with open(SCRIPT_TABLAS, encoding="utf-8") as archivo:
+            conexion.executescript(archivo.read())
+        if con_datos:
+            with open(SCRIPT_DATOS, encoding="utf-8") as archivo:
+                conexion.executescript(archivo.read())
+        conexion.commit()
+    finally:
+        conexion.close()
+    return ruta
+
+
+def borrar_bd(ruta):
+    """Elimina el archivo temporal y sus archivos auxiliares (-wal, -shm, -journal)."""
+    for sufijo in ("", "-wal", "-shm", "-journal"):
+        try:
+            os.remove(ruta + sufijo)
+        except OSError:
+            pass
+
+
+def medir(funcion, repeticiones):
+    """
+    Ejecuta funcion(i) repeticiones veces y retorna las latencias en segundos.
+    """
+    tiempos = []
+    for i in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(i)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) por el método del rango más cercano."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100.0 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+def resumen(tiempos):
+    """Resumen de latencias en microsegundos: media, p50, p95."""
+    return {
+        "media_us": statistics.fmean(tiempos) * 1e6 if tiempos else 0.0,
+        "p50_us": percentil(tiempos, 50) * 1e6,
+        "p95_us": percentil(tiempos, 95) * 1e6,
+    }
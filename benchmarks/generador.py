@@ -0,0 +1,159 @@
+"""
+Generador de datos sintéticos para los benchmarks.
+
+Llena las diez tablas de SCHEMAS con datos consistentes (todas las claves
+foráneas apuntan a filas existentes, los UNIQUE no se repiten y ningún asiento
+se vende dos veces). La misma semilla y escala producen siempre la misma base.
+
+La escala es la cantidad de boletos; el resto de las tablas crece en proporción:
+    Boleto = escala, Pago ~ 80 % de los boletos, Servicio = escala / 40,
+    Cliente = escala / 10, Bus y Chofer = Servicio / 50, Ruta = escala / 5000,
+    Parada = 2 x Ruta, RutaParadas = 4-8 paradas por ruta, Tarifa = 3 por ruta.
+
+Uso:
+    python benchmarks/generador.py --escala 100000 --salida datos.db [--semilla 42]
+"""
+import argparse
+import datetime
+import random
+import sqlite3
+import time
+
+from comun import SCRIPT_TABLAS, crear_bd_temporal
+
+METODOS_PAGO = ("Efectivo", "Debito", "Credito", "Transferencia")
+CIUDADES = ("Santiago", "Valparaíso", "Chillán", "Concepción", "Temuco", "La Serena", "Rancagua", "Talca", "Puerto Montt", "Antofagasta")
+MODELOS = ("Mercedes Benz O500", "Volvo B9R", "Scania K400", "Marcopolo G7")
+ASIENTOS_POR_SERVICIO = 40  # todos los buses generados tienen al menos esta capacidad
+INICIO = datetime.datetime(2024, 1, 1, 6, 0)
+
+
+def cantidades(escala):
+    """Filas por tabla para una escala (cantidad de boletos)."""
+    servicios = max(3, -(-escala // ASIENTOS_POR_SERVICIO))
+    rutas = max(3, escala // 5000)
+    return {
+        "Ruta": rutas,
+        "Parada": 2 * rutas,
+        "Bus": max(3, servicios // 50),
+        "Chofer": max(3, servicios // 50),
+        "Cliente": max(10, escala // 10),
+        "Servicio": servicios,
+        "Tarifa": 3 * rutas,
+        "Boleto": escala,
+    }
+
+
+def _rut(numero, base):
+    n = base + numero
+    return f"{n // 1000000}.{n // 1000 % 1000:03d}.{n % 1000:03d}-{n % 10}"
+
+
+def _fecha(minutos):
+    return (INICIO + datetime.timedelta(minutes=minutos)).strftime("%Y-%m-%d %H:%M")
+
+
+def generar(ruta_bd, escala, semilla=42):
+    """
+    Llena ruta_bd (con el esquema ya creado y sin datos) con la escala pedida.
+    Retorna {tabla: filas insertadas}.
+    """
+    azar = random.Random(semilla)
+    n = cantidades(escala)
+    conexion = sqlite3.connect(ruta_bd)
+    # Carga inicial: sin diario ni fsync (si falla, la base temporal se descarta)
+    conexion.execute("PRAGMA journal_mode = OFF")
+    conexion.execute("PRAGMA synchronous = OFF")
+    conexion.execute("PRAGMA foreign_keys = ON")
+    try:
+        conexion.executemany(
+            "INSERT INTO Ruta (id, codigo, nombre, origen, destino) VALUES (?, ?, ?, ?, ?)",
+            ((i, f"R{i:06d}", f"Ruta {i}", CIUDADES[i % 10], CIUDADES[(i * 3 + 1) % 10]) for i in range(1, n["Ruta"] + 1)),
+        )
+        conexion.executemany(
+            "INSERT INTO Parada (id, nombre, ciudad) VALUES (?, ?, ?)",
+            ((i, f"Terminal {i}", CIUDADES[i % 10]) for i in range(1, n["Parada"] + 1)),
+        )
+        rutas_paradas = []
+        for ruta in range(1, n["Ruta"] + 1):
+            paradas = azar.sample(range(1, n["Parada"] + 1), min(n["Parada"], azar.randint(4, 8)))
+            rutas_paradas.extend((ruta, parada, orden) for orden, parada in enumerate(paradas, start=1))
+        conexion.executemany("INSERT INTO RutaParadas (ruta_id, parada_id, orden) VALUES (?, ?, ?)", rutas_paradas)
+        n["RutaParadas"] = len(rutas_paradas)
+        conexion.executemany(
+            "INSERT INTO Bus (id, patente, modelo, capacidad) VALUES (?, ?, ?, ?)",
+            ((i, f"{chr(65 + i // 260000 % 26)}{chr(65 + i // 10000 % 26)}{i % 10000:04d}", azar.choice(MODELOS), azar.randint(ASIENTOS_POR_SERVICIO, 50))
+             for i in range(1, n["Bus"] + 1)),
+        )
+        conexion.executemany(
+            "INSERT INTO Chofer (id, rut, nombre, telefono, email) VALUES (?, ?, ?, ?, ?)",
+            ((i, _rut(i, 5000000), f"Chofer {i}", f"+569{i % 100000000:08d}", f"chofer{i}@empresa.cl") for i in range(1, n["Chofer"] + 1)),
+        )
+        conexion.executemany(
+            "INSERT INTO Cliente (id, rut, nombre, email, telefono, direccion) VALUES (?, ?, ?, ?, ?, ?)",
+            ((i, _rut(i, 10000000), f"Cliente {i}", f"cliente{i}@correo.cl", f"+569{(i * 7) % 100000000:08d}", f"Calle {i % 997} {i % 1000}, {CIUDADES[i % 10]}")
+             for i in range(1, n["Cliente"] + 1)),
+        )
+        # Servicios repartidos en el tiempo (uno cada ~10 minutos), duración 1-6 horas
+        conexion.executemany(
+            "INSERT INTO Servicio (id, codigo, ruta_id, bus_id, chofer_id, fecha_salida, fecha_llegada) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((i, f"S{i:08d}", azar.randint(1, n["Ruta"]), azar.randint(1, n["Bus"]), azar.randint(1, n["Chofer"]),
+              _fecha(i * 10), _fecha(i * 10 + azar.randint(60, 360)))
+             for i in range(1, n["Servicio"] + 1)),
+        )
+        # Tres tarifas por ruta con vigencias consecutivas de un año
+        conexion.executemany(
+            "INSERT INTO Tarifa (ruta_id, nombre, monto, fecha_inicio, fecha_fin) VALUES (?, ?, ?, ?, ?)",
+            ((ruta, f"Tarifa {anio}", azar.randint(50, 300) * 100, f"{anio}-01-01 00:00", f"{anio}-12-31 23:59")
+             for ruta in range(1, n["Ruta"] + 1) for anio in (2024, 2025, 2026)),
+        )
+        # Boletos: asientos 1..40 de cada servicio en orden, así no se repite ningún asiento
+        conexion.executemany(
+            "INSERT INTO Boleto (id, codigo, servicio_id, cliente_id, asiento, precio) VALUES (?, ?, ?, ?, ?, ?)",
+            ((i, f"B{i:09d}", (i - 1) // ASIENTOS_POR_SERVICIO + 1, azar.randint(1, n["Cliente"]), (i - 1) % ASIENTOS_POR_SERVICIO + 1, azar.randint(50, 300) * 100)
+             for i in range(1, escala + 1)),
+        )
+        pagos = 0
+
+        def filas_pago():
+            nonlocal pagos
+            for boleto in range(1, escala + 1):
+                if azar.random() < 0.8:
+                    pagos += 1
+                    servicio = (boleto - 1) // ASIENTOS_POR_SERVICIO + 1
+                    yield (boleto, azar.randint(50, 300) * 100, _fecha(servicio * 10 - azar.randint(60, 20000)), azar.choice(METODOS_PAGO))
+
+        conexion.executemany("INSERT INTO Pago (boleto_id, monto, fecha_pago, metodo) VALUES (?, ?, ?, ?)", filas_pago())
+        n["Pago"] = pagos
+        conexion.commit()
+        conexion.execute("ANALYZE")
+        conexion.commit()
+    finally:
+        conexion.close()
+    return {tabla: n[tabla] for tabla in ("Ruta", "Parada", "RutaParadas", "Bus", "Chofer", "Cliente", "Servicio", "Tarifa", "Boleto", "Pago")}
+
+
+def crear_bd_generada(escala, semilla=42, carpeta=None):
+    """Crea una base temporal con el esquema del proyecto y datos generados. Retorna (ruta, filas)."""
+    ruta = crear_bd_temporal(con_datos=False, carpeta=carpeta)
+    return ruta, generar(ruta, escala, semilla)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", type=int, default=10000, help="cantidad de boletos")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="archivo .db de salida (por defecto uno temporal)")
+    args = parser.parse_args()
+    inicio = time.perf_counter()
+    if args.salida:
+        conexion = sqlite3.connect(args.salida)
+        with open(SCRIPT_TABLAS, encoding="utf-8") as archivo:
+            conexion.executescript(archivo.read())
+        conexion.close()
+        ruta, filas = args.salida, generar(args.salida, args.escala, args.semilla)
+    else:
+        ruta, filas = crear_bd_generada(args.escala, args.semilla)
+    print(f"{ruta}: {sum(filas.values())} filas en {time.perf_counter() - inicio:.1f} s")
+    for tabla, cantidad in filas.items():
+        print(f"  {tabla:<12}{cantidad:>12}")
@@ -0,0 +1,194 @@
+"""
+Borrado en cascada planificado: una fila y todo lo que depende de ella.
+
+Cuando un borrado choca con una clave foránea, eliminar_registro lista hasta 10
+dependientes por tabla y había que borrarlos a mano, uno por uno. Este módulo:
+  1. recorre el grafo de claves foráneas del catálogo desde la fila raíz (por
+     ejemplo Servicio -> sus Boleto -> sus Pago) con una sola consulta WITH
+     RECURSIVE que arma el conjunto completo de (tabla, id) afectados, usando
+     los índices de las columnas FK;
+  2. muestra cuántas filas de cada tabla se borrarían;
+  3. al confirmar, vuelve a calcular el conjunto dentro de una transacción
+     BEGIN IMMEDIATE y borra tabla por tabla, de las hojas hacia la raíz,
+     con un DELETE ... WHERE id IN (conjunto) por tabla. Si el conjunto cambió
+     desde que se mostró (alguien vendió un boleto), no borra nada y devuelve
+     el plan nuevo para volver a confirmarlo.
+
+Uso:
+    python borrado_cascada.py plan Servicio 12
+    python borrado_cascada.py borrar Servicio 12
+"""
+import argparse
+import sqlite3
+import sys
+from typing import Any, Dict, Optional
+
+import funciones_crud
+import instrumentacion
+from catalogo import obtener_catalogo
+
+_CONJUNTO = "temp._borrado_cascada"
+
+
+# =========================================
+# GRAFO DE CLAVES FORÁNEAS
+# =========================================
+def _aristas(catalogo, tabla):
+    """Claves foráneas alcanzables desde tabla (cada una una vez), en orden de recorrido."""
+    aristas, vistas, pendientes = [], {tabla}, [tabla]
+    while pendientes:
+        actual = pendientes.pop(0)
+        for fk in catalogo.referencias.get(actual, []):
+            aristas.append(fk)
+            if fk.tabla not in vistas:
+                vistas.add(fk.tabla)
+                pendientes.append(fk.tabla)
+    return aristas
+
+
+def _orden_borrado(tablas, aristas):
+    """
+    Tablas ordenadas de las hojas hacia la raíz: cada tabla va antes que las que
+    referencia. Con ciclos las restantes van al final (el borrado usa
+    defer_foreign_keys, así que igual se valida al confirmar la transacción).
+    """
+    referidas_por = {t: set() for t in tablas}  # tabla -> tablas que la referencian
+    for fk in aristas:
+        if fk.tabla != fk.tabla_ref:
+            referidas_por[fk.tabla_ref].add(fk.tabla)
+    orden, restantes = [], list(tablas)
+    while restantes:
+        libres = [t for t in restantes if not referidas_por[t] - set(orden)]
+        if not libres:
+            orden.extend(restantes)
+            break
+        for t in libres:
+            orden.append(t)
+            restantes.remove(t)
+    return orden
+
+
+def _consulta_conjunto(tabla, aristas):
+    """WITH RECURSIVE con un término por clave foránea; UNION evita repetir filas (y ciclos)."""
+    terminos = [f"SELECT '{tabla}', ?"]
+    for fk in aristas:
+        if fk.columna_ref == "id":
+            union = f'h."{fk.columna}" = a.id'
+        else:
+            union = f'h."{fk.columna}" = (SELECT p."{fk.columna_ref}" FROM "{fk.tabla_ref}" p WHERE p.id = a.id)'
+        terminos.append(f"SELECT '{fk.tabla}', h.id FROM \"{fk.tabla}\" h JOIN afectadas a ON a.tabla = '{fk.tabla_ref}' AND {union}")
+    return (f"WITH RECURSIVE afectadas(tabla, id) AS ({' UNION '.join(terminos)}) "
+            f"INSERT OR IGNORE INTO {_CONJUNTO} (tabla, id) SELECT tabla, id FROM afectadas")
+
+
+def _calcular(conexion, tabla, id_registro):
+    """Llena el conjunto temporal; retorna ({tabla: cantidad} en orden de borrado, orden)."""
+    catalogo = obtener_catalogo(conexion)
+    if tabla not in catalogo.tablas:
+        raise ValueError(f"No existe la tabla {tabla}.")
+    aristas = _aristas(catalogo, tabla)
+    conexion.execute(f"CREATE TABLE IF NOT EXISTS {_CONJUNTO} (tabla TEXT NOT NULL, id INTEGER NOT NULL, PRIMARY KEY (tabla, id)) WITHOUT ROWID")
+    conexion.execute(f"DELETE FROM {_CONJUNTO}")
+    consulta = _consulta_conjunto(tabla, aristas)
+    with instrumentacion.medir("plan_borrado", tabla, consulta, (id_registro,), conexion) as medicion:
+        conexion.execute(consulta, (id_registro,))
+        conteos = dict(conexion.execute(f"SELECT tabla, COUNT(*) FROM {_CONJUNTO} GROUP BY tabla").fetchall())
+        medicion["filas"] = sum(conteos.values())
+    orden = _orden_borrado([tabla] + [t for t in dict.fromkeys(fk.tabla for fk in aristas) if t != tabla], aristas)
+    return {t: conteos.get(t, 0) for t in orden}, orden
+
+
+# =========================================
+# PLAN Y BORRADO
+# =========================================
+def planificar(tabla: str, id_registro: int) -> Dict[str, Any]:
+    """
+    Calcula qué se borraría con la fila tabla.id_registro (sin borrar nada).
+    Retorna {"tabla", "id", "existe", "conteos": {tabla: filas} en orden de
+    borrado (de las hojas a la raíz), "total"}. Lanza ValueError si la tabla no existe.
+    """
+    with funciones_crud.obtener_conexion() as conexion:
+        existe = conexion.execute(f'SELECT 1 FROM "{tabla}" WHERE id = ?', (id_registro,)).fetchone() is not None \
+            if tabla in obtener_catalogo(conexion).tablas else False
+        conteos, _ = _calcular(conexion, tabla, id_registro)
+        conexion.execute(f"DELETE FROM {_CONJUNTO}")
+        if conexion.in_transaction:
+            conexion.commit()
+    if not existe:
+        conteos = {t: 0 for t in conteos}
+    return {"tabla": tabla, "id": id_registro, "existe": existe, "conteos": conteos, "total": sum(conteos.values())}
+
+
+def borrar(tabla: str, id_registro: int, esperado: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Borra la fila y todos sus dependientes en una sola transacción.
+    Parámetros:
+        tabla, id_registro: fila raíz
+        esperado: los conteos que se mostraron al usuario (planificar()["conteos"]);
+            si el conjunto cambió desde entonces, no se borra nada
+    Retorna {"deleted": True, "id", "conteos", "total"} o {"deleted": False,
+    "error": "not_found" | "changed" | "db_error", "message", "plan"}.
+    """
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                if conexion.execute(f'SELECT 1 FROM "{tabla}" WHERE id = ?', (id_registro,)).fetchone() is None:
+                    conexion.rollback()
+                    return {"deleted": False, "error": "not_found", "message": f"Registro id={id_registro} no encontrado en {tabla}."}
+                conteos, orden = _calcular(conexion, tabla, id_registro)
+                if esperado is not None and {t: n for t, n in esperado.items() if n} != {t: n for t, n in conteos.items() if n}:
+                    conexion.rollback()
+                    plan = {"tabla": tabla, "id": id_registro, "existe": True, "conteos": conteos, "total": sum(conteos.values())}
+                    return {"deleted": False, "error": "changed", "plan": plan,
+                            "message": "Los registros dependientes cambiaron desde que se calculó el plan; revise y confirme de nuevo."}
+                # Con ciclos de claves foráneas el orden no alcanza: se valida todo al confirmar
+                conexion.execute("PRAGMA defer_foreign_keys = ON")
+                for t in orden:
+                    if conteos[t]:
+                        consulta = f'DELETE FROM "{t}" WHERE id IN (SELECT id FROM {_CONJUNTO} WHERE tabla = ?)'
+                        with instrumentacion.medir("eliminar_cascada", t, consulta, (t,), conexion) as medicion:
+                            medicion["filas"] = conexion.execute(consulta, (t,)).rowcount
+                conexion.execute(f"DELETE FROM {_CONJUNTO}")
+                conexion.commit()
+            except Exception:
+                conexion.rollback()
+                raise
+        return {"deleted": True, "id": id_registro, "conteos": conteos, "total": sum(conteos.values())}
+
+    try:
+        resultado = funciones_crud.en_escritor(lambda: funciones_crud.con_reintentos(operacion))
+    except (sqlite3.Error, ValueError) as error:
+        return {"deleted": False, "error": "db_error", "message": str(error)}
+    if resultado["deleted"]:
+        for t, n in resultado["conteos"].items():
+            if n:
+                funciones_crud.invalidar_cache(t)
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=["plan", "borrar"])
+    parser.add_argument("tabla")
+    parser.add_argument("id", type=int)
+    parser.add_argument("--bd", help="archivo de base de datos (por defecto " + funciones_crud.RUTA_BD + ")")
+    args = parser.parse_args(argv)
+    if args.bd:
+        funciones_crud.configurar_pool(ruta_bd=args.bd)
+    plan = planificar(args.tabla, args.id)
+    if not plan["existe"]:
+        print(f"No existe {args.tabla} id={args.id}.")
+        return 1
+    for t, n in plan["conteos"].items():
+        print(f"  {t:<16}{n:>10}")
+    print(f"  {'total':<16}{plan['total']:>10}")
+    if args.comando == "plan":
+        return 0
+    resultado = borrar(args.tabla, args.id, plan["conteos"])
+    print("Borradas", resultado["total"], "filas." if resultado["deleted"] else resultado["message"])
+    return 0 if resultado["deleted"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+Índices de búsqueda de texto completo (FTS5) para Cliente, Chofer, Parada y Ruta.
+
+Cada tabla tiene un índice FTS5 "de contenido externo" (_fts_<Tabla>): guarda
+solo el índice invertido de las columnas de texto y lee los valores desde la
+tabla original.
+
+Los triggers no escriben directo en el índice: anotan cada cambio en la cola
+_fts_cola y sincronizar() la aplica con una sentencia por tabla antes de cada
+búsqueda que encuentra la cola con cambios (en el hilo escritor, como toda
+escritura). FTS5 vacía su memoria intermedia en cada sentencia que dispara un
+trigger, así que escribir en el índice fila a fila desde un trigger cuesta
+~2 ms por fila con un millón de clientes (una carga masiva se vuelve 20 veces
+más lenta); anotar en la cola cuesta lo mismo que un INSERT común.
+
+La búsqueda (funciones_crud.buscar_texto) encuentra palabras que empiezan con
+lo escrito, sin importar mayúsculas ni tildes ("muñ" encuentra "Muñoz",
+"valpa" encuentra "Valparaíso"), usando el índice en vez de recorrer la tabla
+como haría LIKE '%texto%'.
+
+Uso:
+    python busqueda.py instalar      (crea índices y triggers y los llena)
+    python busqueda.py reconstruir   (vuelve a llenar los índices desde las tablas)
+    python busqueda.py buscar Cliente "juan pe"
+    python busqueda.py desinstalar
+"""
+import argparse
+import sys
+
+# tabla -> columnas de texto indexadas
+COLUMNAS_BUSQUEDA = {
+    "Cliente": ("nombre", "email", "direccion"),
+    "Chofer": ("nombre", "email"),
+    "Parada": ("nombre", "ciudad"),
+    "Ruta": ("nombre", "origen", "destino"),
+}
+
+# unicode61 sin tildes; prefijos de 2 y 3 letras precalculados para que la
+# búsqueda mientras se escribe no tenga que recorrer todos los términos
+_OPCIONES_FTS = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+
+MIN_LETRAS = 2  # largo mínimo de lo escrito para buscar
+# Filas candidatas que se ordenan por relevancia. Calcular bm25 para todas las
+# coincidencias de un prefijo corto ("ju") en millones de filas tarda decenas de
+# ms; con un tope el costo queda fijo sin importar el tamaño de la tabla.
+MAX_CANDIDATOS = 1000
+
+# Cola de cambios pendientes de aplicar a los índices (una sola para las cuatro tablas)
+COLA = "_fts_cola"
+_CREAR_COLA = f"""CREATE TABLE IF NOT EXISTS {COLA} (
+    seq INTEGER PRIMARY KEY,
+    tabla TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    op TEXT NOT NULL,  -- 'i' fila nueva, 'u' fila modificada, 'd' fila borrada
+    v1, v2, v3  -- valores anteriores de las columnas indexadas ('u' y 'd')
+)"""
+
+
+def tabla_fts(tabla):
+    return f"_fts_{tabla}"
+
+
+def _sentencias(tabla):
+    """(sql de la tabla virtual, [(nombre_trigger, sql)]) para una tabla."""
+    fts = tabla_fts(tabla)
+    columnas = COLUMNAS_BUSQUEDA[tabla]
+    lista = ", ".join(columnas)
+    huecos = ", ".join(f"v{n}" for n in range(1, len(columnas) + 1))
+    viejos = ", ".join(f"OLD.{c}" for c in columnas)
+    crear = f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({lista}, content = '{tabla}', content_rowid = 'id', {_OPCIONES_FTS})"
+    anotar_viejo = f"INSERT INTO {COLA} (tabla, id, op, {huecos}) VALUES ('{tabla}', OLD.id, '{{op}}', {viejos});"
+    triggers = [
+        (f"_trg{fts}_ins", f"AFTER INSERT ON {tabla} BEGIN INSERT INTO {COLA} (tabla, id, op) VALUES ('{tabla}', NEW.id, 'i'); END"),
+        (f"_trg{fts}_del", f"AFTER DELETE ON {tabla} BEGIN {anotar_viejo.format(op='d')} END"),
+        # Solo si cambió alguna columna indexada (o el id)
+        (f"_trg{fts}_upd", f"AFTER UPDATE OF id, {lista} ON {tabla} BEGIN {anotar_viejo.format(op='u')} "
+                           f"INSERT INTO {COLA} (tabla, id, op) SELECT '{tabla}', NEW.id, 'i' WHERE NEW.id IS NOT OLD.id; END"),
+    ]
+    return crear, triggers
+
+
+# =========================================
+# INSTALAR / RECONSTRUIR
+# =========================================
+def instalado(conexion):
+    """True si existen todos los índices FTS, la cola y los triggers."""
+    nombres = {r[0] for r in conexion.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+    if COLA not in nombres:
+        return False
+    for tabla in COLUMNAS_BUSQUEDA:
+        _, triggers = _sentencias(tabla)
+        if tabla_fts(tabla) not in nombres or any(nombre not in nombres for nombre, _ in triggers):
+            return False
+    return True
+
+
+def instalar(conexion):
+    """
+    Crea los índices FTS5, la cola y los triggers si faltan, y llena los índices
+    desde las tablas. Es idempotente. Retorna True si instaló algo.
+    """
+    if instalado(conexion):
+        return False
+    conexion.execute("BEGIN IMMEDIATE")
+    try:
+        conexion.execute(_CREAR_COLA)
+        for tabla in COLUMNAS_BUSQUEDA:
+            crear, triggers = _sentencias(tabla)
+            conexion.execute(crear)
+            for nombre, cuerpo in triggers:
+                conexion.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+        _reconstruir(conexion)
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+    return True
+
+
+def _reconstruir(conexion):
+    for tabla in COLUMNAS_BUSQUEDA:
+        fts = tabla_fts(tabla)
+        conexion.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+    conexion.execute(f"DELETE FROM {COLA}")  # el índice ya refleja todo lo anotado
+
+
+def reconstruir(conexion):
+    """Vuelve a llenar los índices FTS desde las tablas (por si se desalinearon)."""
+    conexion.execute("BEGIN IMMEDIATE")
+    try:
+        _reconstruir(conexion)
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+
+
+def optimizar(conexion):
+    """Une los segmentos de cada índice FTS (conviene tras cargas masivas)."""
+    for tabla in COLUMNAS_BUSQUEDA:
+        fts = tabla_fts(tabla)
+        conexion.execute(f"INSERT INTO {fts} ({fts}) VALUES ('optimize')")
+    conexion.commit()
+
+
+def desinstalar(conexion):
+    """Borra triggers, índices FTS y la cola."""
+    for tabla in COLUMNAS_BUSQUEDA:
+        _, triggers = _sentencias(tabla)
+        for nombre, _ in triggers:
+            conexion.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+        conexion.execute(f"DROP TABLE IF EXISTS {tabla_fts(tabla)}")
+    conexion.execute(f"DROP TABLE IF EXISTS {COLA}")
+    conexion.commit()
+
+
+# =========================================
+# SINCRONIZACIÓN DE LA COLA
+# =========================================
+def hay_pendientes(conexion):
+    """True si hay cambios anotados que todavía no están en los índices."""
+    return conexion.execute(f"SELECT EXISTS (SELECT 1 FROM {COLA})").fetchone()[0] == 1
+
+
+def sincronizar(conexion):
+    """
+    Aplica a los índices FTS los cambios anotados en la cola, en una transacción.
+    Por cada id alcanza con mirar su primera anotación: si era 'u' o 'd', el índice
+    todavía tiene los valores anteriores guardados en ella y se quitan; después se
+    indexan los valores actuales de las filas que siguen existiendo.
+    Retorna la cantidad de anotaciones aplicadas.
+    """
+    conexion.execute("BEGIN IMMEDIATE")
+    try:
+        ultimo, cantidad = conexion.execute(f"SELECT MAX(seq), COUNT(*) FROM {COLA}").fetchone()
+        if not cantidad:
+            conexion.rollback()
+            return 0
+        for tabla, columnas in COLUMNAS_BUSQUEDA.items():
+            fts = tabla_fts(tabla)
+            lista = ", ".join(columnas)
+            huecos = ", ".join(f"v{n}" for n in range(1, len(columnas) + 1))
+            conexion.execute(
+                f"INSERT INTO {fts} ({fts}, rowid, {lista}) SELECT 'delete', id, {huecos} FROM {COLA} "
+                f"WHERE seq IN (SELECT MIN(seq) FROM {COLA} WHERE tabla = ? AND seq <= ? GROUP BY id) AND op != 'i'",
+                (tabla, ultimo),
+            )
+            conexion.execute(
+                f"INSERT INTO {fts} (rowid, {lista}) SELECT id, {lista} FROM {tabla} "
+                f"WHERE id IN (SELECT id FROM {COLA} WHERE tabla = ? AND seq <= ?)",
+                (tabla, ultimo),
+            )
+        conexion.execute(f"DELETE FROM {COLA} WHERE seq <= ?", (ultimo,))
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+    return cantidad
+
+
+# =========================================
+# CONSULTA
+# =========================================
+def expresion(texto):
+    """
+    Traduce lo escrito a una expresión MATCH de FTS5: cada palabra es un prefijo
+    y todas deben aparecer ("juan pe" -> "juan"* "pe"*). Las comillas se escapan,
+    así el texto nunca se interpreta como sintaxis de FTS5 (AND, OR, NEAR, -...).
+    Retorna None si no queda ninguna palabra con al menos MIN_LETRAS caracteres.
+    """
+    palabras = [p.replace('"', '""') for p in (texto or "").split()]
+    if not palabras or len("".join(palabras)) < MIN_LETRAS:
+        return None
+    return " ".join(f'"{p}"*' for p in palabras)
+
+
+def consulta(tabla, columnas, por_relevancia=True):
+    """
+    SQL de búsqueda para la tabla: parámetros (expresión MATCH, límite).
+    Con por_relevancia se ordena por bm25 entre las primeras MAX_CANDIDATOS
+    coincidencias; sin ella, en orden de id (lo más rápido).
+    """
+    fts = tabla_fts(tabla)
+    lista = ", ".join(f"t.{c}" for c in columnas)
+    if por_relevancia:
+        return (f"SELECT {lista} FROM (SELECT rowid AS id_fts, rank FROM {fts} WHERE {fts} MATCH ? LIMIT {MAX_CANDIDATOS}) f "
+                f"JOIN {tabla} t ON t.id = f.id_fts ORDER BY f.rank LIMIT ?")
+    return f"SELECT {lista} FROM {fts} JOIN {tabla} t ON t.id = {fts}.rowid WHERE {fts} MATCH ? LIMIT ?"
+
+
+def main(argv=None):
+    import funciones_crud
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=["instalar", "reconstruir", "buscar", "desinstalar"])
+    parser.add_argument("tabla", nargs="?", choices=list(COLUMNAS_BUSQUEDA))
+    parser.add_argument("texto", nargs="?")
+    parser.add_argument("--bd", help="archivo de base de datos (por defecto " + funciones_crud.RUTA_BD + ")")
+    args = parser.parse_args(argv)
+    if args.bd:
+        funciones_crud.configurar_pool(ruta_bd=args.bd)
+    if args.comando == "buscar":
+        if not args.tabla or not args.texto:
+            parser.error("buscar necesita tabla y texto")
+        for fila in funciones_crud.buscar_texto(args.tabla, args.texto):
+            print(fila)
+        return 0
+    with funciones_crud.obtener_conexion() as conexion:
+        if args.comando == "instalar":
+            print("Índices de búsqueda instalados." if instalar(conexion) else "Los índices de búsqueda ya estaban instalados.")
+        elif args.comando == "reconstruir":
+            if not instalar(conexion):
+                reconstruir(conexion)
+            optimizar(conexion)
+            print("Índices de búsqueda reconstruidos.")
+        else:
+            desinstalar(conexion)
+            print("Índices de búsqueda eliminados.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
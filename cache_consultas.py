@@ -0,0 +1,145 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# =========================================
+# CACHÉ DE RESULTADOS DE CONSULTAS
+# =========================================
+# Guarda en memoria los resultados de funciones_crud.consultar para que las
+# re-ejecuciones del script de Streamlit (una por cada cambio de widget) no
+# vuelvan a leer el disco si nadie escribió en la tabla.
+#   - Expulsión LRU por cantidad de entradas y por memoria aproximada.
+#   - Cada entrada vence después de ttl segundos (cubre escrituras hechas por
+#     otros procesos, que no pasan por la invalidación de este).
+#   - Las escrituras de este proceso invalidan exactamente las entradas de la
+#     tabla escrita.
+
+
+def _tamano_aproximado(filas):
+    """Bytes aproximados que ocupa una lista de filas (tuplas de valores simples)."""
+    total = sys.getsizeof(filas)
+    for fila in filas:
+        total += sys.getsizeof(fila)
+        for valor in fila:
+            total += sys.getsizeof(valor)
+    return total
+
+
+class CacheConsultas:
+    """
+    Caché LRU + TTL acotado por memoria, con invalidación por tabla.
+    Parámetros:
+        max_entradas: cantidad máxima de resultados guardados
+        max_bytes: memoria aproximada máxima (suma de los resultados guardados)
+        ttl: segundos de vida de cada resultado
+    """
+
+    def __init__(self, max_entradas=256, max_bytes=32 * 1024 * 1024, ttl=60.0):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # clave -> (filas, bytes, vence)
+        self._por_tabla = {}  # tabla -> set(claves)
+        self._generacion = {}  # tabla -> contador de escrituras
+        self._bytes = 0
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self.expulsiones = 0
+        self.vencidas = 0
+
+    def generacion(self, tabla):
+        """Contador de escrituras de la tabla; se toma antes de consultar la base."""
+        with self._candado:
+            return self._generacion.get(tabla, 0)
+
+    def obtener(self, tabla, clave):
+        """Devuelve una copia de las filas guardadas o None si no hay (o venció)."""
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            filas, _, vence = entrada
+            if time.monotonic() > vence:
+                self._quitar(tabla, clave)
+                self.vencidas += 1
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return list(filas)
+
+    def guardar(self, tabla, clave, filas, generacion):
+        """
+        Guarda el resultado de una consulta. Si la tabla se escribió mientras se
+        consultaba (la generación cambió), no se guarda para no cachear datos viejos.
+        La clave es una tupla cuyo primer elemento es el nombre de la tabla.
+        """
+        tamano = _tamano_aproximado(filas)
+        if tamano > self.max_bytes:
+            return
+        with self._candado:
+            if self._generacion.get(tabla, 0) != generacion:
+                return
+            if clave in self._entradas:
+                self._quitar(tabla, clave)
+            self._entradas[clave] = (tuple(filas), tamano, time.monotonic() + self.ttl)
+            self._por_tabla.setdefault(tabla, set()).add(clave)
+            self._bytes += tamano
+            while self._entradas and (len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes):
+                clave_vieja = next(iter(self._entradas))
+                self._quitar(clave_vieja[0], clave_vieja)
+                self.expulsiones += 1
+
+    def invalidar_tabla(self, tabla):
+        """Descarta todos los resultados de la tabla (llamar después de cada escritura confirmada)."""
+        with self._candado:
+            self._generacion[tabla] = self._generacion.get(tabla, 0) + 1
+            for clave in list(self._por_tabla.get(tabla, ())):
+                self._quitar(tabla, clave)
+            self.invalidaciones += 1
+
+    def limpiar(self):
+        """Vacía la caché completa."""
+        with self._candado:
+            for tabla in list(self._por_tabla):
+                self._generacion[tabla] = self._generacion.get(tabla, 0) + 1
+            self._entradas.clear()
+            self._por_tabla.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        """Contadores de la caché (aciertos, fallos, tasa de aciertos, tamaño...)."""
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+                "invalidaciones": self.invalidaciones,
+                "expulsiones": self.expulsiones,
+                "vencidas": self.vencidas,
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+            }
+
+    def metricas_texto(self, prefijo="transportes_cache"):
+        """Contadores en formato de texto de Prometheus, para que los lea un recolector externo."""
+        lineas = []
+        for nombre, valor in self.estadisticas().items():
+            lineas.append(f"{prefijo}_{nombre} {valor}")
+        return "\n".join(lineas) + "\n"
+
+    # ---------- Internos (llamar con el candado tomado) ----------
+    def _quitar(self, tabla, clave):
+        entrada = self._entradas.pop(clave, None)
+        if entrada is not None:
+            self._bytes -= entrada[1]
+        claves = self._por_tabla.get(tabla)
+        if claves is not None:
+            claves.discard(clave)
+            if not claves:
+                del self._por_tabla[tabla]
@@ -0,0 +1,177 @@
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# =========================================
+# CATÁLOGO DEL ESQUEMA (INTROSPECCIÓN CACHEADA)
+# =========================================
+# Lee una sola vez por proceso las tablas, columnas, claves primarias,
+# claves foráneas e índices de la base (sqlite_master + PRAGMAs) y arma el
+# grafo inverso de referencias (qué tablas apuntan a cada tabla).
+# El catálogo se reconstruye solo si cambia PRAGMA schema_version, es decir,
+# si alguien crea/borra tablas o índices.
+#
+# Convención: las tablas internas (resúmenes, índices de búsqueda, etc.)
+# llevan prefijo "_" y no se consideran tablas de la aplicación.
+
+
+@dataclass(frozen=True)
+class Columna:
+    nombre: str
+    tipo: str
+    not_null: bool
+    por_defecto: Optional[str]
+    pk: bool
+
+
+@dataclass(frozen=True)
+class ClaveForanea:
+    tabla: str  # tabla que tiene la columna
+    columna: str
+    tabla_ref: str  # tabla referida
+    columna_ref: str
+
+
+@dataclass(frozen=True)
+class Indice:
+    nombre: str
+    tabla: str
+    columnas: Tuple[str, ...]
+    unico: bool
+    origen: str  # "c" (CREATE INDEX), "u" (UNIQUE), "pk"
+
+
+@dataclass
+class Tabla:
+    nombre: str
+    columnas: List[Columna] = field(default_factory=list)
+    claves_foraneas: List[ClaveForanea] = field(default_factory=list)
+    indices: List[Indice] = field(default_factory=list)
+
+    @property
+    def pk(self) -> List[str]:
+        return [c.nombre for c in self.columnas if c.pk]
+
+    @property
+    def nombres_columnas(self) -> List[str]:
+        return [c.nombre for c in self.columnas]
+
+    def columna(self, nombre: str) -> Optional[Columna]:
+        for c in self.columnas:
+            if c.nombre == nombre:
+                return c
+        return None
+
+
+class CatalogoEsquema:
+    """
+    Foto del esquema de una base SQLite.
+    Atributos:
+        version: PRAGMA schema_version con que se construyó
+        tablas: {nombre: Tabla}
+        referencias: {tabla_referida: [ClaveForanea, ...]} (grafo inverso de claves foráneas)
+    """
+
+    def __init__(self, conexion: sqlite3.Connection):
+        self.version = conexion.execute("PRAGMA schema_version").fetchone()[0]
+        self.tablas: Dict[str, Tabla] = {}
+        self.referencias: Dict[str, List[ClaveForanea]] = {}
+        nombres = [r[0] for r in conexion.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        ).fetchall()]
+        for nombre in nombres:
+            tabla = Tabla(nombre)
+            # columnas de PRAGMA table_info: (cid, name, type, notnull, dflt_value, pk)
+            for cid, col, tipo, not_null, defecto, pk in conexion.execute(f'PRAGMA table_info("{nombre}")').fetchall():
+                tabla.columnas.append(Columna(col, (tipo or "").upper(), bool(not_null), defecto, pk > 0))
+            # columnas de PRAGMA foreign_key_list: (id, seq, table, from, to, on_update, on_delete, match)
+            for fk in conexion.execute(f'PRAGMA foreign_key_list("{nombre}")').fetchall():
+                clave = ClaveForanea(nombre, fk[3], fk[2], fk[4] or "id")
+                tabla.claves_foraneas.append(clave)
+                self.referencias.setdefault(clave.tabla_ref, []).append(clave)
+            # columnas de PRAGMA index_list: (seq, name, unique, origin, partial)
+            for _, indice, unico, origen, _ in conexion.execute(f'PRAGMA index_list("{nombre}")').fetchall():
+                cols = tuple(r[2] for r in conexion.execute(f'PRAGMA index_info("{indice}")').fetchall())
+                tabla.indices.append(Indice(indice, nombre, cols, bool(unico), origen))
+            self.tablas[nombre] = tabla
+
+    # ---------- Consultas sobre el catálogo ----------
+    def tablas_aplicacion(self) -> List[str]:
+        """Tablas de la aplicación (sin las internas con prefijo "_"), en orden alfabético."""
+        return [t for t in self.tablas if not t.startswith("_")]
+
+    def dependientes(self, tabla: str) -> Dict[str, List[ClaveForanea]]:
+        """Claves foráneas que apuntan a 'tabla', agrupadas por tabla referente."""
+        grupos: Dict[str, List[ClaveForanea]] = {}
+        for fk in self.referencias.get(tabla, []):
+            grupos.setdefault(fk.tabla, []).append(fk)
+        return grupos
+
+    def indice_para(self, tabla: str, columna: str) -> Optional[str]:
+        """Nombre de un índice cuya primera columna es 'columna' (o "PRIMARY KEY"), si existe."""
+        info = self.tablas.get(tabla)
+        if not info:
+            return None
+        if info.pk == [columna]:
+            return "PRIMARY KEY"
+        for indice in info.indices:
+            if indice.columnas and indice.columnas[0] == columna:
+                return indice.nombre
+        return None
+
+    def columnas_unicas(self, tabla: str) -> List[str]:
+        """Columnas con restricción UNIQUE propia (índice único de una sola columna, sin la PK)."""
+        info = self.tablas.get(tabla)
+        if not info:
+            return []
+        pk = info.pk
+        unicas = []
+        for indice in info.indices:
+            if indice.unico and indice.origen != "pk" and len(indice.columnas) == 1 and indice.columnas[0] not in pk:
+                if indice.columnas[0] not in unicas:
+                    unicas.append(indice.columnas[0])
+        # Mantener el orden de las columnas de la tabla
+        return [c for c in info.nombres_columnas if c in unicas]
+
+
+# =========================================
+# CACHÉ POR PROCESO
+# =========================================
+_catalogos: Dict[str, CatalogoEsquema] = {}
+_candado = threading.Lock()
+
+
+def _archivo(conexion: sqlite3.Connection) -> str:
+    # PRAGMA database_list: (seq, name, file); "main" es la base principal
+    for _, nombre, archivo in conexion.execute("PRAGMA database_list").fetchall():
+        if nombre == "main":
+            return archivo or ":memory:"
+    return ""
+
+
+def obtener_catalogo(conexion: Optional[sqlite3.Connection] = None) -> CatalogoEsquema:
+    """
+    Devuelve el catálogo de la base de la conexión (por defecto, una del pool de funciones_crud).
+    Se construye la primera vez y se reutiliza mientras PRAGMA schema_version no cambie.
+    """
+    if conexion is None:
+        import funciones_crud
+        with funciones_crud.obtener_conexion() as propia:
+            return obtener_catalogo(propia)
+    clave = _archivo(conexion)
+    version = conexion.execute("PRAGMA schema_version").fetchone()[0]
+    with _candado:
+        catalogo = _catalogos.get(clave)
+        if catalogo is not None and catalogo.version == version and clave != ":memory:":
+            return catalogo
+    catalogo = CatalogoEsquema(conexion)
+    with _candado:
+        _catalogos[clave] = catalogo
+    return catalogo
+
+
+def invalidar():
+    """Olvida los catálogos en caché (se reconstruyen en el próximo uso)."""
+    with _candado:
+        _catalogos.clear()
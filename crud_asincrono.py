@@ -0,0 +1,221 @@
+import asyncio
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+import funciones_crud
+
+# =========================================
+# ACCESO A DATOS EN HILOS DEDICADOS
+# =========================================
+# Las consultas de SQLite bloquean a quien las llama. Este módulo las pasa a
+# hilos propios para que la interfaz pueda lanzar varias a la vez (el resultado
+# del formulario y el panel de la derecha) y esperar solo a la más lenta:
+#   - un hilo escritor: las escrituras encoladas (await crud_asincrono.insertar,
+#     o todas las de funciones_crud con ENCOLAR_ESCRITURAS) se ejecutan de a
+#     una, así nunca compiten entre sí por el bloqueo de escritura de SQLite;
+#   - N hilos lectores que atienden una cola de consultas en paralelo (SQLite
+#     suelta el GIL mientras ejecuta, y en modo WAL los lectores no esperan al escritor).
+# Cada hilo tiene su propia conexión (no ocupa conexiones del pool) y dentro de
+# cada tarea funciones_crud la usa en todos sus "with obtener_conexion()".
+#
+# La API async (await crud_asincrono.consultar(...)) imita a funciones_crud. Las
+# funciones sincrónicas de funciones_crud escriben en el hilo que las llama salvo
+# que se inicie con ENCOLAR_ESCRITURAS = True: entonces también encolan sus
+# escrituras en el hilo escritor (cada escritura paga el paso por la cola; conviene
+# cuando hay muchos escritores a la vez y no con una sola sesión).
+
+LECTORES = 3  # hilos lectores por defecto
+ENCOLAR_ESCRITURAS = False  # True: iniciar() hace que funciones_crud escriba siempre en el hilo escritor
+
+
+class TrabajadorBD:
+    """
+    Un hilo escritor y N lectores, cada uno con su cola de tareas y su conexión.
+    Parámetros:
+        lectores: cantidad de hilos lectores
+    """
+
+    def __init__(self, lectores=LECTORES):
+        if lectores < 1:
+            raise ValueError("lectores debe ser al menos 1")
+        self._cola_escrituras = queue.Queue()
+        self._cola_lecturas = queue.Queue()
+        self._escritor = threading.Thread(target=self._atender, args=(self._cola_escrituras,), name="bd-escritor", daemon=True)
+        self._lectores = [
+            threading.Thread(target=self._atender, args=(self._cola_lecturas,), name=f"bd-lector-{n}", daemon=True)
+            for n in range(lectores)
+        ]
+        self.escrituras = 0
+        self.lecturas = 0
+        for hilo in [self._escritor] + self._lectores:
+            hilo.start()
+
+    # ---------- Encolar tareas ----------
+    def escribir(self, funcion: Callable, *args, **kwargs) -> Future:
+        """Encola funcion(*args, **kwargs) en el hilo escritor. Retorna un Future con su resultado."""
+        self.escrituras += 1
+        return self._encolar(self._cola_escrituras, funcion, args, kwargs)
+
+    def leer(self, funcion: Callable, *args, **kwargs) -> Future:
+        """Encola funcion(*args, **kwargs) en el primer hilo lector libre. Retorna un Future."""
+        self.lecturas += 1
+        return self._encolar(self._cola_lecturas, funcion, args, kwargs)
+
+    def es_escritor(self) -> bool:
+        """True si el hilo actual es el escritor."""
+        return threading.current_thread() is self._escritor
+
+    def despachar_escritura(self, operacion: Callable[[], Any]) -> Any:
+        """Ejecuta operacion() en el hilo escritor y espera su resultado (lo usa funciones_crud)."""
+        if self.es_escritor():
+            return operacion()
+        return self.escribir(operacion).result()
+
+    def pendientes(self):
+        """Tareas esperando en cada cola."""
+        return {"escrituras": self._cola_escrituras.qsize(), "lecturas": self._cola_lecturas.qsize()}
+
+    def detener(self):
+        """Termina los hilos después de atender lo ya encolado."""
+        self._cola_escrituras.put(None)
+        for _ in self._lectores:
+            self._cola_lecturas.put(None)
+        for hilo in [self._escritor] + self._lectores:
+            hilo.join()
+
+    # ---------- Internos ----------
+    @staticmethod
+    def _encolar(cola, funcion, args, kwargs):
+        futuro = Future()
+        cola.put((funcion, args, kwargs, futuro))
+        return futuro
+
+    @staticmethod
+    def _atender(cola):
+        conexion, origen = None, None
+        while True:
+            tarea = cola.get()
+            if tarea is None:
+                break
+            funcion, args, kwargs, futuro = tarea
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            try:
+                # Si cambió la base o el perfil de PRAGMAs (configurar_pool/configurar_perfil) se reconecta
+                actual = (funciones_crud.RUTA_BD, tuple(sorted(funciones_crud.PERFIL.items())))
+                if conexion is None or origen != actual:
+                    if conexion is not None:
+                        conexion.close()
+                    conexion, origen = funciones_crud.conectar(), actual
+                with funciones_crud.obtener_pool().fijar(conexion):
+                    resultado = funcion(*args, **kwargs)
+            except BaseException as error:
+                futuro.set_exception(error)
+            else:
+                futuro.set_result(resultado)
+            finally:
+                if conexion is not None and conexion.in_transaction:
+                    # Nada a medias pasa a la tarea siguiente
+                    try:
+                        conexion.rollback()
+                    except sqlite3.Error:
+                        conexion.close()
+                        conexion = None
+        if conexion is not None:
+            conexion.close()
+
+
+_trabajador: Optional[TrabajadorBD] = None
+_candado = threading.Lock()
+
+
+def iniciar(lectores=LECTORES, encolar_escrituras=None) -> TrabajadorBD:
+    """
+    Inicia los hilos (si no estaban). Retorna el TrabajadorBD del proceso.
+    Parámetros:
+        lectores: cantidad de hilos lectores
+        encolar_escrituras: registrar el escritor en funciones_crud (por defecto
+            ENCOLAR_ESCRITURAS); solo cuenta al crear los hilos
+    """
+    global _trabajador
+    with _candado:
+        if _trabajador is None:
+            _trabajador = TrabajadorBD(lectores)
+            if ENCOLAR_ESCRITURAS if encolar_escrituras is None else encolar_escrituras:
+                funciones_crud.usar_escritor(_trabajador.despachar_escritura)
+        return _trabajador
+
+
+def detener():
+    """Detiene los hilos; funciones_crud vuelve a escribir en el hilo que llama."""
+    global _trabajador
+    with _candado:
+        if _trabajador is not None:
+            funciones_crud.usar_escritor(None)
+            _trabajador.detener()
+            _trabajador = None
+
+
+def activo() -> bool:
+    return _trabajador is not None
+
+
+# =========================================
+# API ASYNC (imita a funciones_crud)
+# =========================================
+async def leer(funcion: Callable, *args, **kwargs):
+    """Ejecuta cualquier función de lectura en un hilo lector y espera su resultado."""
+    return await asyncio.wrap_future(iniciar().leer(funcion, *args, **kwargs))
+
+
+async def escribir(funcion: Callable, *args, **kwargs):
+    """Ejecuta cualquier función de escritura en el hilo escritor y espera su resultado."""
+    return await asyncio.wrap_future(iniciar().escribir(funcion, *args, **kwargs))
+
+
+async def consultar(nombre_tabla, columnas="*", condicion=None, valores_condicion=(), limite=None, desplazamiento=None, orden=None, despues_de_id=None, usar_cache=True):
+    """Versión async de funciones_crud.consultar (mismos parámetros)."""
+    return await leer(funciones_crud.consultar, nombre_tabla, columnas, condicion, valores_condicion, limite, desplazamiento, orden, despues_de_id, usar_cache)
+
+
+async def insertar(nombre_tabla, lista_columnas, lista_valores):
+    """Versión async de funciones_crud.insertar."""
+    return await escribir(funciones_crud.insertar, nombre_tabla, lista_columnas, lista_valores)
+
+
+async def actualizar(nombre_tabla, nuevos_datos, condicion, valores_condicion=()):
+    """Versión async de funciones_crud.actualizar."""
+    return await escribir(funciones_crud.actualizar, nombre_tabla, nuevos_datos, condicion, valores_condicion)
+
+
+async def eliminar(nombre_tabla, condicion, valores_condicion=()):
+    """Versión async de funciones_crud.eliminar."""
+    return await escribir(funciones_crud.eliminar, nombre_tabla, condicion, valores_condicion)
+
+
+# =========================================
+# USO DESDE CÓDIGO SINCRÓNICO (Streamlit)
+# =========================================
+def en_paralelo(*llamadas) -> List[Any]:
+    """
+    Ejecuta varias lecturas a la vez en los hilos lectores y retorna sus resultados
+    en el mismo orden. Cada llamada es (funcion, arg1, arg2, ...). Si alguna falla,
+    se lanza su excepción después de esperar a todas.
+    Ejemplo:
+        filas, vista = en_paralelo((funciones_crud.consultar, "Ruta"), (funciones_crud.consultar, "Bus"))
+    """
+    trabajador = iniciar()
+    futuros = [trabajador.leer(funcion, *args) for funcion, *args in llamadas]
+    errores = [f.exception() for f in futuros]
+    for error in errores:
+        if error is not None:
+            raise error
+    return [f.result() for f in futuros]
+
+
+def en_segundo_plano(funcion: Callable, *args, **kwargs) -> Future:
+    """Lanza una lectura en un hilo lector sin esperarla; el resultado se pide con .result()."""
+    return iniciar().leer(funcion, *args, **kwargs)
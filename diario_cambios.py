@@ -0,0 +1,486 @@
+"""
+Diario de cambios (CDC) y réplicas incrementales de la base.
+
+Los triggers anotan en _diario_cambios cada fila insertada, modificada o
+borrada de las tablas de la aplicación, en la misma transacción que el cambio:
+
+    seq       número de secuencia (AUTOINCREMENT: creciente, sin repetirse)
+    tabla     tabla modificada
+    op        'I' (insert), 'U' (update) o 'D' (delete)
+    fila_id   id de la fila (el anterior, si el update cambió el id)
+    datos     JSON con la fila completa ('I') o solo las columnas que cambiaron
+              con su valor nuevo ('U'); NULL en 'D'
+    momento   segundos desde 1970 (UTC) del cambio
+
+Cubren cualquier camino de escritura (funciones_crud, main.py, scripts SQL).
+El diario no se instala solo: se activa con "instalar" o con la primera
+réplica o exportación, y "desinstalar" lo quita (sin réplicas ni
+exportaciones nadie lo compactaría). Sobre el diario:
+    - sincronizar(replica): copia la base a otro archivo SQLite la primera vez
+      (Connection.backup, sin detener las ventas) y después le aplica solo los
+      cambios con seq mayor al último aplicado;
+    - exportar_jsonl(archivo): agrega al archivo los cambios nuevos, una línea
+      JSON por cambio (entrega al menos una vez: quien lee descarta los seq ya vistos);
+    - compactar(): borra lo que ya aplicaron todos los consumidores registrados;
+    - retrasos() / metricas_texto(): cambios pendientes y segundos de atraso
+      de cada consumidor.
+
+Uso:
+    python diario_cambios.py instalar
+    python diario_cambios.py replicar copia.db
+    python diario_cambios.py exportar cambios.jsonl
+    python diario_cambios.py compactar
+    python diario_cambios.py estado
+    python diario_cambios.py desinstalar
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import funciones_crud
+from catalogo import obtener_catalogo
+
+DIARIO = "_diario_cambios"
+CONSUMIDORES = "_diario_consumidores"
+ESTADO_REPLICA = "_replica_estado"
+TAMANO_LOTE = 5000  # cambios leídos y aplicados por transacción
+
+_CREAR_TABLAS = f"""
+CREATE TABLE IF NOT EXISTS {DIARIO} (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    tabla TEXT NOT NULL,
+    op TEXT NOT NULL,
+    fila_id INTEGER,
+    datos TEXT,
+    momento REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS {CONSUMIDORES} (
+    nombre TEXT PRIMARY KEY,
+    ultimo_seq INTEGER NOT NULL DEFAULT 0,
+    actualizado REAL
+);
+"""
+_AHORA = "((julianday('now') - 2440587.5) * 86400.0)"
+
+
+# =========================================
+# TRIGGERS (DESDE EL CATÁLOGO)
+# =========================================
+def _tablas(catalogo):
+    """Tablas de la aplicación con clave primaria "id" (las que se anotan)."""
+    return [t for t in catalogo.tablas_aplicacion() if catalogo.tablas[t].pk == ["id"]]
+
+
+def _triggers(catalogo=None):
+    """
+    Lista de (nombre, sql) de los triggers del diario, uno por tabla y operación.
+    El sql es el CREATE TRIGGER tal como queda guardado en sqlite_master, para
+    comparar con lo instalado: las columnas van escritas en el cuerpo.
+    """
+    catalogo = catalogo or obtener_catalogo()
+    t = []
+    for tabla in _tablas(catalogo):
+        columnas = catalogo.tablas[tabla].nombres_columnas
+        fila = ", ".join(f"'{c}', NEW.\"{c}\"" for c in columnas)
+        # Solo las columnas que cambiaron: un SELECT por columna, unido y agrupado como objeto JSON
+        cambiadas = " UNION ALL ".join(f"SELECT '{c}' AS c, NEW.\"{c}\" AS v WHERE NEW.\"{c}\" IS NOT OLD.\"{c}\"" for c in columnas)
+        alguna = " OR ".join(f'NEW."{c}" IS NOT OLD."{c}"' for c in columnas)
+        anotar = f"INSERT INTO {DIARIO} (tabla, op, fila_id, datos, momento) VALUES ('{tabla}', {{}}, {{}}, {{}}, {_AHORA});"
+        nombre = f"_trg_diario_{tabla.lower()}_ins"
+        t.append((nombre, f"""CREATE TRIGGER {nombre}
+    AFTER INSERT ON "{tabla}" BEGIN
+    {anotar.format("'I'", "NEW.id", f"json_object({fila})")}
+    END"""))
+        nombre = f"_trg_diario_{tabla.lower()}_upd"
+        t.append((nombre, f"""CREATE TRIGGER {nombre}
+    AFTER UPDATE ON "{tabla}" WHEN {alguna} BEGIN
+    {anotar.format("'U'", "OLD.id", f"(SELECT json_group_object(c, v) FROM ({cambiadas}) AS cambios)")}
+    END"""))
+        nombre = f"_trg_diario_{tabla.lower()}_del"
+        t.append((nombre, f"""CREATE TRIGGER {nombre}
+    AFTER DELETE ON "{tabla}" BEGIN
+    {anotar.format("'D'", "OLD.id", "NULL")}
+    END"""))
+    return t
+
+
+# =========================================
+# INSTALAR
+# =========================================
+_instalado: Dict[str, int] = {}  # archivo de base -> schema_version con que se verificó la instalación
+
+
+def _desactualizados(conexion, catalogo):
+    """Triggers del diario que faltan o cuyo SQL no coincide con las columnas actuales: [(nombre, sql)]."""
+    guardados = dict(conexion.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE '\\_trg\\_diario\\_%' ESCAPE '\\'"
+    ).fetchall())
+    return [(nombre, sql) for nombre, sql in _triggers(catalogo) if guardados.get(nombre) != sql]
+
+
+def instalado(conexion):
+    """
+    True si el diario, la tabla de consumidores y todos los triggers existen en la
+    base, con los triggers al día con el esquema (después de un ALTER TABLE ADD
+    COLUMN los triggers viejos no anotarían la columna nueva).
+    """
+    nombres = {r[0] for r in conexion.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)", (DIARIO, CONSUMIDORES))}
+    return {DIARIO, CONSUMIDORES} <= nombres and not _desactualizados(conexion, obtener_catalogo(conexion))
+
+
+def activo() -> bool:
+    """True si el diario está instalado en la base (aunque le falte algún trigger)."""
+    with funciones_crud.obtener_conexion() as conexion:
+        return conexion.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (DIARIO,)).fetchone() is not None
+
+
+def instalar(conexion=None):
+    """
+    Crea el diario y sus triggers si faltan, y vuelve a crear los triggers que
+    quedaron desactualizados por un cambio de columnas. Es idempotente. Retorna
+    True si instaló algo.
+    Los cambios anteriores a la instalación no quedan anotados: las réplicas
+    empiezan con una copia completa (ver sincronizar).
+    """
+    if conexion is None:
+        with funciones_crud.obtener_conexion() as propia:
+            # Solo se vuelve a revisar si cambió el esquema desde la última vez
+            if _instalado.get(funciones_crud.RUTA_BD) == propia.execute("PRAGMA schema_version").fetchone()[0]:
+                return False
+            resultado = funciones_crud.con_reintentos(lambda: instalar(propia))
+            _instalado[funciones_crud.RUTA_BD] = propia.execute("PRAGMA schema_version").fetchone()[0]
+        return resultado
+    if instalado(conexion):
+        return False
+    conexion.executescript("BEGIN IMMEDIATE;" + _CREAR_TABLAS)
+    try:
+        for nombre, sql in _desactualizados(conexion, obtener_catalogo(conexion)):
+            conexion.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+            conexion.execute(sql)
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+    return True
+
+
+def desinstalar(conexion):
+    """Borra los triggers y las tablas del diario (con las posiciones de los consumidores)."""
+    for (nombre,) in conexion.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '\\_trg\\_diario\\_%' ESCAPE '\\'").fetchall():
+        conexion.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    conexion.execute(f"DROP TABLE IF EXISTS {DIARIO}")
+    conexion.execute(f"DROP TABLE IF EXISTS {CONSUMIDORES}")
+    conexion.commit()
+    _instalado.clear()
+
+
+# =========================================
+# LECTURA DEL DIARIO Y CONSUMIDORES
+# =========================================
+def cambios_desde(seq: int, limite: int = TAMANO_LOTE) -> List[tuple]:
+    """[(seq, tabla, op, fila_id, datos, momento)] con seq mayor al dado, en orden."""
+    with funciones_crud.obtener_conexion() as conexion:
+        return conexion.execute(
+            f"SELECT seq, tabla, op, fila_id, datos, momento FROM {DIARIO} WHERE seq > ? ORDER BY seq LIMIT ?",
+            (seq, limite)).fetchall()
+
+
+def _verificar_continuidad(seq, cambios):
+    """Si el diario ya se compactó más allá de seq, faltan cambios: no se puede seguir."""
+    if cambios and cambios[0][0] > seq + 1:
+        with funciones_crud.obtener_conexion() as conexion:
+            borrados = conexion.execute(f"SELECT COUNT(*) FROM {DIARIO} WHERE seq <= ?", (seq,)).fetchone()[0]
+        if not borrados:
+            raise ValueError(f"El diario ya no tiene los cambios posteriores a seq={seq} (se compactó); "
+                             "hay que volver a copiar la base completa.")
+
+
+def registrar_posicion(consumidor: str, seq: int) -> None:
+    """Guarda hasta qué seq aplicó un consumidor (la compactación no borra lo que le falta)."""
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.execute(
+                f"INSERT INTO {CONSUMIDORES} (nombre, ultimo_seq, actualizado) VALUES (?, ?, ?) "
+                f"ON CONFLICT(nombre) DO UPDATE SET ultimo_seq = excluded.ultimo_seq, actualizado = excluded.actualizado",
+                (consumidor, seq, time.time()))
+            conexion.commit()
+
+    funciones_crud.en_escritor(lambda: funciones_crud.con_reintentos(operacion))
+
+
+def posicion(consumidor: str) -> Optional[int]:
+    """Último seq registrado por el consumidor, o None si no está registrado."""
+    with funciones_crud.obtener_conexion() as conexion:
+        fila = conexion.execute(f"SELECT ultimo_seq FROM {CONSUMIDORES} WHERE nombre = ?", (consumidor,)).fetchone()
+    return fila[0] if fila else None
+
+
+def olvidar(consumidor: str) -> None:
+    """Quita un consumidor: la compactación deja de esperarlo."""
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.execute(f"DELETE FROM {CONSUMIDORES} WHERE nombre = ?", (consumidor,))
+            conexion.commit()
+
+    funciones_crud.en_escritor(lambda: funciones_crud.con_reintentos(operacion))
+
+
+# =========================================
+# RÉPLICA EN OTRO ARCHIVO SQLITE
+# =========================================
+def _copiar_completa(ruta_replica):
+    """
+    Primera copia con Connection.backup en un solo paso: es una única transacción
+    de lectura, así que la copia es consistente y en modo WAL no detiene a los
+    escritores. El seq de partida sale del propio diario copiado.
+    """
+    destino = sqlite3.connect(ruta_replica)
+    try:
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.backup(destino)
+        seq = destino.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {DIARIO}").fetchone()[0]
+        if not seq:
+            # Diario vacío o compactado hasta el final: el último seq asignado está en sqlite_sequence
+            fila = destino.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (DIARIO,)).fetchone()
+            seq = fila[0] if fila else 0
+        # La réplica no anota sus propios cambios ni guarda el diario de la original
+        for (nombre,) in destino.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '\\_trg\\_diario\\_%' ESCAPE '\\'").fetchall():
+            destino.execute(f"DROP TRIGGER {nombre}")
+        destino.execute(f"DROP TABLE IF EXISTS {DIARIO}")
+        destino.execute(f"DROP TABLE IF EXISTS {CONSUMIDORES}")
+        destino.execute(f"CREATE TABLE {ESTADO_REPLICA} (ultimo_seq INTEGER NOT NULL, actualizado REAL)")
+        destino.execute(f"INSERT INTO {ESTADO_REPLICA} VALUES (?, ?)", (seq, time.time()))
+        destino.commit()
+    finally:
+        destino.close()
+    return seq
+
+
+def _aplicar(destino, cambios, sentencias):
+    """Aplica una lista de cambios del diario en la conexión destino (sin commit)."""
+    for _, tabla, op, fila_id, datos, _ in cambios:
+        if op == "D":
+            destino.execute(f'DELETE FROM "{tabla}" WHERE id = ?', (fila_id,))
+            continue
+        valores = json.loads(datos)
+        columnas = tuple(valores)
+        clave = (tabla, op, columnas)
+        sql = sentencias.get(clave)
+        if sql is None:
+            lista = ", ".join(f'"{c}"' for c in columnas)
+            if op == "I":
+                sql = f'INSERT OR REPLACE INTO "{tabla}" ({lista}) VALUES ({", ".join("?" for _ in columnas)})'
+            else:
+                sql = f'UPDATE "{tabla}" SET {", ".join(f"{chr(34)}{c}{chr(34)} = ?" for c in columnas)} WHERE id = ?'
+            sentencias[clave] = sql
+        destino.execute(sql, tuple(valores.values()) + ((fila_id,) if op == "U" else ()))
+
+
+def _completar_esquema(destino):
+    """
+    Crea en la réplica las tablas y columnas que se agregaron a la base después
+    de copiarla (el diario anota filas, no cambios de esquema).
+    """
+    catalogo = obtener_catalogo()
+    for tabla in _tablas(catalogo):
+        existentes = {r[1] for r in destino.execute(f'PRAGMA table_info("{tabla}")').fetchall()}
+        if not existentes:
+            with funciones_crud.obtener_conexion() as conexion:
+                destino.execute(conexion.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,)).fetchone()[0])
+            continue
+        for columna in catalogo.tablas[tabla].columnas:
+            if columna.nombre not in existentes:
+                defecto = f" DEFAULT {columna.por_defecto}" if columna.por_defecto is not None else ""
+                destino.execute(f'ALTER TABLE "{tabla}" ADD COLUMN "{columna.nombre}" {columna.tipo}{defecto}')
+    destino.commit()
+
+
+def sincronizar(ruta_replica: str, tamano_lote: int = TAMANO_LOTE) -> Dict[str, Any]:
+    """
+    Pone al día una réplica de la base en otro archivo SQLite.
+    La primera vez (archivo inexistente o sin _replica_estado) copia la base
+    completa; después agrega las columnas nuevas de la base, aplica solo los
+    cambios nuevos del diario, un lote por transacción de la réplica, y
+    registra la posición como consumidor.
+    Retorna {"copia_completa": bool, "aplicados": cambios, "ultimo_seq": seq}.
+    """
+    instalar()
+    consumidor = "replica:" + os.path.abspath(ruta_replica)
+    copia = False
+    destino = sqlite3.connect(ruta_replica)
+    try:
+        tiene_estado = destino.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (ESTADO_REPLICA,)).fetchone()
+        seq = destino.execute(f"SELECT ultimo_seq FROM {ESTADO_REPLICA}").fetchone()[0] if tiene_estado else None
+    finally:
+        destino.close()
+    if seq is None:
+        if os.path.exists(ruta_replica):
+            os.remove(ruta_replica)
+        seq = _copiar_completa(ruta_replica)
+        copia = True
+        registrar_posicion(consumidor, seq)
+    aplicados = 0
+    destino = sqlite3.connect(ruta_replica)
+    try:
+        _completar_esquema(destino)
+        sentencias: Dict[tuple, str] = {}
+        while True:
+            cambios = cambios_desde(seq, tamano_lote)
+            if not cambios:
+                break
+            _verificar_continuidad(seq, cambios)
+            destino.execute("BEGIN")
+            _aplicar(destino, cambios, sentencias)
+            seq = cambios[-1][0]
+            destino.execute(f"UPDATE {ESTADO_REPLICA} SET ultimo_seq = ?, actualizado = ?", (seq, time.time()))
+            destino.commit()
+            aplicados += len(cambios)
+            registrar_posicion(consumidor, seq)
+    finally:
+        destino.close()
+    return {"copia_completa": copia, "aplicados": aplicados, "ultimo_seq": seq}
+
+
+# =========================================
+# EXPORTACIÓN JSONL
+# =========================================
+def exportar_jsonl(ruta_archivo: str, desde: Optional[int] = None, consumidor: Optional[str] = None,
+                   tamano_lote: int = TAMANO_LOTE) -> Dict[str, Any]:
+    """
+    Agrega a ruta_archivo los cambios con seq mayor a 'desde', una línea por cambio:
+    {"seq", "tabla", "op", "id", "datos", "momento"}.
+    Sin 'desde' continúa desde la posición registrada del consumidor (por defecto
+    "jsonl:" + ruta absoluta), o desde el comienzo del diario.
+    Retorna {"exportados": cambios, "ultimo_seq": seq}.
+    """
+    instalar()
+    consumidor = consumidor or "jsonl:" + os.path.abspath(ruta_archivo)
+    seq = desde if desde is not None else (posicion(consumidor) or 0)
+    exportados = 0
+    with open(ruta_archivo, "a", encoding="utf-8") as archivo:
+        while True:
+            cambios = cambios_desde(seq, tamano_lote)
+            if not cambios:
+                break
+            _verificar_continuidad(seq, cambios)
+            for s, tabla, op, fila_id, datos, momento in cambios:
+                archivo.write(json.dumps({"seq": s, "tabla": tabla, "op": op, "id": fila_id,
+                                          "datos": json.loads(datos) if datos else None, "momento": momento},
+                                         ensure_ascii=False) + "\n")
+            archivo.flush()
+            os.fsync(archivo.fileno())
+            seq = cambios[-1][0]
+            exportados += len(cambios)
+            registrar_posicion(consumidor, seq)
+    return {"exportados": exportados, "ultimo_seq": seq}
+
+
+# =========================================
+# COMPACTACIÓN Y MÉTRICAS
+# =========================================
+def compactar(hasta: Optional[int] = None, tamano_lote: int = 50000) -> int:
+    """
+    Borra del diario los cambios que ya aplicaron todos los consumidores
+    registrados (o hasta 'hasta', si es menor), en lotes cortos.
+    Sin consumidores no borra nada salvo que se indique 'hasta'. Retorna las filas borradas.
+    """
+    if not activo():
+        return 0
+    with funciones_crud.obtener_conexion() as conexion:
+        minimo = conexion.execute(f"SELECT MIN(ultimo_seq) FROM {CONSUMIDORES}").fetchone()[0]
+    limite = min(x for x in (minimo, hasta) if x is not None) if (minimo, hasta) != (None, None) else None
+    if limite is None:
+        return 0
+    borradas = 0
+
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            cursor = conexion.execute(
+                f"DELETE FROM {DIARIO} WHERE seq IN (SELECT seq FROM {DIARIO} WHERE seq <= ? ORDER BY seq LIMIT ?)",
+                (limite, tamano_lote))
+            conexion.commit()
+            return cursor.rowcount
+
+    while True:
+        filas = funciones_crud.en_escritor(lambda: funciones_crud.con_reintentos(operacion))
+        borradas += filas
+        if filas < tamano_lote:
+            return borradas
+
+
+def retrasos() -> Dict[str, Any]:
+    """
+    Estado del diario y atraso de cada consumidor:
+    {"filas", "primer_seq", "ultimo_seq", "consumidores": [{"nombre", "ultimo_seq",
+     "pendientes", "atraso_s" (antigüedad del primer cambio pendiente), "actualizado"}]}.
+    Sin el diario instalado retorna filas 0 y ningún consumidor (no lo instala).
+    """
+    if not activo():
+        return {"filas": 0, "primer_seq": None, "ultimo_seq": None, "consumidores": []}
+    ahora = time.time()
+    with funciones_crud.obtener_conexion() as conexion:
+        filas, primero, ultimo = conexion.execute(f"SELECT COUNT(*), MIN(seq), MAX(seq) FROM {DIARIO}").fetchone()
+        consumidores = []
+        for nombre, seq, actualizado in conexion.execute(f"SELECT nombre, ultimo_seq, actualizado FROM {CONSUMIDORES} ORDER BY nombre").fetchall():
+            pendiente = conexion.execute(f"SELECT momento FROM {DIARIO} WHERE seq > ? ORDER BY seq LIMIT 1", (seq,)).fetchone()
+            consumidores.append({
+                "nombre": nombre,
+                "ultimo_seq": seq,
+                "pendientes": max(0, (ultimo or 0) - seq),
+                "atraso_s": round(ahora - pendiente[0], 3) if pendiente else 0.0,
+                "actualizado": actualizado,
+            })
+    return {"filas": filas, "primer_seq": primero, "ultimo_seq": ultimo, "consumidores": consumidores}
+
+
+def metricas_texto(prefijo="transportes_diario"):
+    """Tamaño del diario y atraso por consumidor en formato de texto de Prometheus."""
+    estado = retrasos()
+    lineas = [f"{prefijo}_filas {estado['filas']}", f"{prefijo}_ultimo_seq {estado['ultimo_seq'] or 0}"]
+    for c in estado["consumidores"]:
+        etiqueta = c["nombre"].replace("\\", "\\\\").replace('"', '\\"')
+        lineas.append(f'{prefijo}_pendientes{{consumidor="{etiqueta}"}} {c["pendientes"]}')
+        lineas.append(f'{prefijo}_atraso_segundos{{consumidor="{etiqueta}"}} {c["atraso_s"]}')
+    return "\n".join(lineas) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=["instalar", "replicar", "exportar", "compactar", "estado", "desinstalar"])
+    parser.add_argument("destino", nargs="?", help="archivo de la réplica (replicar) o .jsonl (exportar)")
+    parser.add_argument("--desde", type=int, help="exportar: seq desde el que exportar (por defecto, la posición registrada)")
+    parser.add_argument("--hasta", type=int, help="compactar: no borrar cambios con seq mayor a este")
+    parser.add_argument("--bd", help="archivo de base de datos (por defecto " + funciones_crud.RUTA_BD + ")")
+    args = parser.parse_args(argv)
+    if args.bd:
+        funciones_crud.configurar_pool(ruta_bd=args.bd)
+    if args.comando in ("replicar", "exportar") and not args.destino:
+        parser.error(f"{args.comando} necesita el archivo de destino")
+    inicio = time.perf_counter()
+    if args.comando == "instalar":
+        print("Diario instalado." if instalar() else "El diario ya estaba instalado.")
+    elif args.comando == "replicar":
+        r = sincronizar(args.destino)
+        print(("Copia completa y " if r["copia_completa"] else "") +
+              f"{r['aplicados']} cambios aplicados (seq {r['ultimo_seq']}) en {time.perf_counter() - inicio:.2f} s.")
+    elif args.comando == "exportar":
+        r = exportar_jsonl(args.destino, args.desde)
+        print(f"{r['exportados']} cambios exportados (hasta seq {r['ultimo_seq']}).")
+    elif args.comando == "compactar":
+        print(f"{compactar(args.hasta)} cambios borrados del diario.")
+    elif args.comando == "estado":
+        sys.stdout.write(metricas_texto())
+    else:
+        with funciones_crud.obtener_conexion() as conexion:
+            desinstalar(conexion)
+        print("Diario eliminado.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
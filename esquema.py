@@ -0,0 +1,92 @@
+# Definición de las tablas que maneja la aplicación.
+# Vive en un módulo aparte (sin Streamlit) para que funciones_crud, las
+# herramientas de línea de comandos y main.py compartan la misma definición.
+
+# -- Definición mínima de esquemas: solo los nombres de campos que usa la UI
+SCHEMAS = {
+    "Boleto": ["codigo", "servicio_id", "cliente_id", "asiento", "precio"],
+    "Bus": ["patente", "modelo", "capacidad"],
+    "Chofer": ["rut", "nombre", "telefono", "email"],
+    "Cliente": ["rut", "nombre", "email", "telefono", "direccion"],
+    "Pago": ["boleto_id", "monto", "fecha_pago", "metodo"],
+    "Parada": ["nombre", "ciudad"],
+    "Ruta": ["codigo", "nombre", "origen", "destino"],
+    "RutaParadas": ["ruta_id", "parada_id", "orden"],
+    "Servicio": ["codigo", "ruta_id", "bus_id", "chofer_id", "fecha_salida", "fecha_llegada"],
+    "Tarifa": ["ruta_id", "nombre", "monto", "fecha_inicio", "fecha_fin"],
+}
+#
+# Metadatos simples extraídos del esquema SQL (NOT NULL / UNIQUE / tipos especiales)
+# Esto permite validar en la UI antes de enviar al DB.
+SCHEMA_META = {
+    "Ruta": {"required": ["codigo", "nombre", "origen", "destino"], "unique": ["codigo"]},
+    "Parada": {"required": ["nombre", "ciudad"], "unique": []},
+    "RutaParadas": {"required": ["ruta_id", "parada_id", "orden"], "unique": []},
+    "Bus": {"required": ["patente", "capacidad"], "unique": ["patente"]},
+    "Chofer": {"required": ["rut", "nombre"], "unique": ["rut"], "types": {"rut": "rut"}},
+    "Cliente": {"required": ["rut", "nombre"], "unique": ["rut"], "types": {"rut": "rut"}},
+    "Servicio": {"required": ["codigo", "ruta_id", "bus_id", "chofer_id", "fecha_salida"], "unique": ["codigo"], "types": {"fecha_salida": "datetime", "fecha_llegada": "datetime"}},
+    "Tarifa": {"required": ["ruta_id", "monto"], "unique": [], "types": {"fecha_inicio": "datetime", "fecha_fin": "datetime"}},
+    "Boleto": {"required": ["codigo", "servicio_id", "cliente_id", "asiento", "precio"], "unique": ["codigo"]},
+    "Pago": {"required": ["boleto_id", "monto", "metodo"], "unique": ["boleto_id"], "types": {"fecha_pago": "datetime"}},
+}
+
+
+# -- Derivación desde el esquema real de la base
+# Los diccionarios de arriba son el respaldo cuando la base todavía no tiene tablas;
+# si la base existe, cargar_desde_base() los rehace a partir del catálogo
+# (catalogo.py), así no hay que mantenerlos a mano cuando cambia el script SQL.
+def derivar_esquemas(catalogo):
+    """Construye (SCHEMAS, SCHEMA_META) a partir de un CatalogoEsquema.
+    - campos: todas las columnas menos la clave primaria
+    - required: columnas NOT NULL sin valor por defecto
+    - unique: columnas con índice UNIQUE propio
+    - types: "rut" para la columna rut, "datetime" para las columnas fecha_*
+    """
+    schemas = {}
+    meta = {}
+    for nombre in catalogo.tablas_aplicacion():
+        tabla = catalogo.tablas[nombre]
+        campos = [c for c in tabla.columnas if not c.pk]
+        schemas[nombre] = [c.nombre for c in campos]
+        info = {
+            "required": [c.nombre for c in campos if c.not_null and c.por_defecto is None],
+            "unique": catalogo.columnas_unicas(nombre),
+        }
+        tipos = {}
+        for c in campos:
+            if c.nombre == "rut":
+                tipos[c.nombre] = "rut"
+            elif c.nombre.startswith("fecha"):
+                tipos[c.nombre] = "datetime"
+        if tipos:
+            info["types"] = tipos
+        meta[nombre] = info
+    return schemas, meta
+
+
+_catalogo_cargado = None
+
+
+def cargar_desde_base(conexion=None):
+    """Rehace SCHEMAS y SCHEMA_META (en el lugar, para que todos los módulos que los
+    importaron vean el cambio) desde el catálogo de la base. Si la base no tiene
+    tablas se conservan las definiciones de respaldo. Retorna True si se derivaron.
+    """
+    global _catalogo_cargado
+    from catalogo import obtener_catalogo
+    try:
+        catalogo = obtener_catalogo(conexion)
+    except Exception:
+        return False
+    if catalogo is _catalogo_cargado:
+        return True  # el esquema no cambió desde la última vez
+    schemas, meta = derivar_esquemas(catalogo)
+    if not schemas:
+        return False
+    _catalogo_cargado = catalogo
+    SCHEMAS.clear()
+    SCHEMAS.update(schemas)
+    SCHEMA_META.clear()
+    SCHEMA_META.update(meta)
+    return True
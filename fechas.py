@@ -0,0 +1,297 @@
+"""
+Fechas en un solo formato: texto "YYYY-MM-DD HH:MM".
+
+El script SQL y los datos de prueba usan "YYYY-MM-DD HH:MM", pero la interfaz
+pedía "YYYY/MM/DD" y algunas filas quedaron solo con la fecha. Con formatos
+mezclados las comparaciones de texto fallan ("2025/10/22" > "2025-12-01") y un
+rango sobre idx_servicio_salida devuelve filas de más o de menos.
+
+Con un único formato de largo fijo el orden del texto es el orden cronológico:
+  - funciones_crud convierte al escribir (insertar, actualizar, lotes) las
+    columnas fecha_* de SCHEMA_META;
+  - "migrar" reescribe las filas existentes por lotes cortos, sin bloquear la
+    base mientras la aplicación sigue en uso (se puede repetir sin riesgo);
+  - rango() y consultar_rango() arman condiciones "col >= ? AND col < ?" con la
+    columna sola a la izquierda, así SQLite recorre solo el tramo del índice.
+
+Una fecha sin hora es el comienzo del día (00:00), salvo en fecha_fin, donde
+incluye el día completo (23:59), igual que la vigencia de Tarifa en tarifas.py.
+
+Uso:
+    python fechas.py revisar                (cuenta los valores fuera de formato)
+    python fechas.py migrar [--lote 500]    (los convierte)
+"""
+import argparse
+import datetime
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from esquema import SCHEMA_META
+
+FORMATO = "%Y-%m-%d %H:%M"
+COLUMNAS_FIN = {"fecha_fin"}  # sin hora = hasta el final del día
+TAMANO_LOTE = 500  # filas por transacción al migrar
+
+# Acepta "-" o "/" como separador, mes/día/hora de uno o dos dígitos, "T" o espacio
+# antes de la hora y segundos opcionales (se descartan)
+_PATRON = re.compile(r"^(\d{4})[-/](\d{1,2})[-/](\d{1,2})(?:[ T]+(\d{1,2}):(\d{2})(?::\d{2}(?:\.\d+)?)?)?$")
+_GLOB_CANONICA = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]"
+
+
+# =========================================
+# CONVERSIÓN
+# =========================================
+def interpretar(valor) -> Tuple[datetime.datetime, bool]:
+    """
+    Convierte texto, date o datetime en (datetime, tiene_hora).
+    Lanza ValueError si no es una fecha válida.
+    """
+    if isinstance(valor, datetime.datetime):
+        return valor.replace(second=0, microsecond=0), True
+    if isinstance(valor, datetime.date):
+        return datetime.datetime(valor.year, valor.month, valor.day), False
+    coincide = _PATRON.match(str(valor).strip())
+    if not coincide:
+        raise ValueError(f"Fecha no válida: {valor!r} (use YYYY-MM-DD o YYYY-MM-DD HH:MM).")
+    anio, mes, dia, hora, minuto = coincide.groups()
+    try:
+        momento = datetime.datetime(int(anio), int(mes), int(dia), int(hora or 0), int(minuto or 0))
+    except ValueError:
+        raise ValueError(f"Fecha no válida: {valor!r} (use YYYY-MM-DD o YYYY-MM-DD HH:MM).") from None
+    return momento, hora is not None
+
+
+def normalizar(valor, fin: bool = False) -> Optional[str]:
+    """
+    Texto "YYYY-MM-DD HH:MM" de una fecha. None o vacío -> None.
+    Parámetros:
+        valor: texto (con "-" o "/", con o sin hora), date o datetime
+        fin: una fecha sin hora es el final del día (23:59) en vez del comienzo
+    Lanza ValueError si no es una fecha válida.
+    """
+    if valor is None or (isinstance(valor, str) and not valor.strip()):
+        return None
+    momento, tiene_hora = interpretar(valor)
+    if fin and not tiene_hora:
+        momento = momento.replace(hour=23, minute=59)
+    return momento.strftime(FORMATO)
+
+
+def inicio(valor) -> str:
+    """Cota inferior inclusiva de un rango: el minuto indicado o el comienzo del día."""
+    return interpretar(valor)[0].strftime(FORMATO)
+
+
+def fin_exclusivo(valor) -> str:
+    """Cota superior exclusiva: el minuto siguiente, o el día siguiente si no trae hora."""
+    momento, tiene_hora = interpretar(valor)
+    momento += datetime.timedelta(minutes=1) if tiene_hora else datetime.timedelta(days=1)
+    return momento.strftime(FORMATO)
+
+
+def columnas_fecha(tabla: str) -> List[str]:
+    """Columnas de fecha de la tabla según SCHEMA_META (types == "datetime")."""
+    return [c for c, tipo in SCHEMA_META.get(tabla, {}).get("types", {}).items() if tipo == "datetime"]
+
+
+def normalizar_datos(tabla: str, datos: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia de datos con las columnas de fecha de la tabla normalizadas. Lanza ValueError."""
+    columnas = [c for c in columnas_fecha(tabla) if c in datos]
+    if not columnas:
+        return datos
+    datos = dict(datos)
+    for c in columnas:
+        datos[c] = normalizar(datos[c], fin=c in COLUMNAS_FIN)
+    return datos
+
+
+def normalizar_valores(tabla: str, lista_columnas: Sequence[str], lista_valores: Sequence[Any]) -> list:
+    """Como normalizar_datos, para columnas y valores en listas paralelas. Lanza ValueError."""
+    datos = normalizar_datos(tabla, dict(zip(lista_columnas, lista_valores)))
+    return [datos[c] for c in lista_columnas]
+
+
+def convertidor_filas(tabla: str, lista_columnas: Sequence[str]):
+    """
+    Función fila -> fila que normaliza las fechas de una tupla en el orden de
+    lista_columnas, o None si la tabla no tiene fechas en esas columnas.
+    Los valores que no son fechas válidas quedan como están: en una carga por
+    lotes no se aborta todo por una fila (validar_lote ya los informa antes).
+    """
+    posiciones = [(i, c in COLUMNAS_FIN) for i, c in enumerate(lista_columnas) if c in columnas_fecha(tabla)]
+    if not posiciones:
+        return None
+
+    def convertir(fila):
+        fila = list(fila)
+        for i, es_fin in posiciones:
+            try:
+                fila[i] = normalizar(fila[i], fin=es_fin)
+            except ValueError:
+                pass
+        return tuple(fila)
+
+    return convertir
+
+
+# =========================================
+# RANGOS SOBRE EL ÍNDICE
+# =========================================
+def rango(columna: str, desde=None, hasta=None) -> Tuple[Optional[str], tuple]:
+    """
+    Condición para funciones_crud.consultar que cubre de 'desde' a 'hasta', ambos
+    incluidos (una fecha sin hora incluye el día completo).
+    Retorna (condicion, valores); condicion es None si no hay límites.
+    Se traduce a "col >= ? AND col < ?": la columna queda sola, sin funciones
+    (nunca date(col) ni replace(col)), y SQLite puede usar su índice.
+    """
+    nombre = f'"{columna}"'
+    partes, valores = [], []
+    if desde not in (None, ""):
+        partes.append(f"{nombre} >= ?")
+        valores.append(inicio(desde))
+    if hasta not in (None, ""):
+        partes.append(f"{nombre} < ?")
+        valores.append(fin_exclusivo(hasta))
+    return (" AND ".join(partes) or None), tuple(valores)
+
+
+def consultar_rango(tabla: str, columna: str, desde=None, hasta=None, columnas="*", limite=None,
+                    descendente=False, exigir_indice=True):
+    """
+    Filas de la tabla con la columna de fecha entre desde y hasta, ordenadas por ella.
+    Parámetros:
+        tabla, columna: columna de fecha de la tabla (ej. "Servicio", "fecha_salida")
+        desde, hasta: límites incluidos (texto, date o datetime); None = sin límite
+        columnas: columnas a traer (como en funciones_crud.consultar)
+        limite: máximo de filas
+        descendente: ORDER BY columna DESC
+        exigir_indice: lanza ValueError si ningún índice empieza por la columna,
+            en vez de recorrer la tabla completa
+    El filtro y el orden salen del mismo índice: no hay ordenamiento en memoria.
+    """
+    # funciones_crud importa este módulo, por eso se importa aquí
+    import funciones_crud
+    from catalogo import obtener_catalogo
+    if columna not in columnas_fecha(tabla):
+        raise ValueError(f"{tabla}.{columna} no es una columna de fecha.")
+    if exigir_indice and obtener_catalogo().indice_para(tabla, columna) is None:
+        raise ValueError(f"{tabla}.{columna} no tiene índice: la consulta recorrería la tabla completa.")
+    condicion, valores = rango(columna, desde, hasta)
+    orden = f'"{columna}"' + (" DESC" if descendente else "")
+    return funciones_crud.consultar(tabla, columnas, condicion, valores, limite=limite, orden=orden)
+
+
+# =========================================
+# MIGRACIÓN EN LÍNEA
+# =========================================
+def revisar() -> Dict[str, int]:
+    """Cantidad de valores fuera de formato en cada columna de fecha: {"Tabla.columna": n}."""
+    import funciones_crud
+    resultado = {}
+    with funciones_crud.obtener_conexion() as conexion:
+        for tabla in SCHEMA_META:
+            for columna in columnas_fecha(tabla):
+                resultado[f"{tabla}.{columna}"] = conexion.execute(
+                    f'SELECT COUNT(*) FROM "{tabla}" WHERE "{columna}" IS NOT NULL AND "{columna}" NOT GLOB ?',
+                    (_GLOB_CANONICA,)).fetchone()[0]
+    return resultado
+
+
+def _migrar_lote(tabla, columna, cambios):
+    """Aplica un lote de (nuevo, id, anterior) en una transacción corta; retorna las filas cambiadas."""
+    import funciones_crud
+
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                # "AND columna = anterior": si otro proceso la cambió mientras tanto, no se pisa
+                cursor = conexion.executemany(f'UPDATE "{tabla}" SET "{columna}" = ? WHERE id = ? AND "{columna}" = ?', cambios)
+                conexion.commit()
+            except Exception:
+                conexion.rollback()
+                raise
+            return cursor.rowcount
+
+    return funciones_crud.en_escritor(lambda: funciones_crud.con_reintentos(operacion))
+
+
+def migrar(tamano_lote: int = TAMANO_LOTE, pausa: float = 0.0, tablas: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Reescribe en formato "YYYY-MM-DD HH:MM" las fechas guardadas en otro formato.
+    Recorre cada tabla por id en lotes de tamano_lote filas y cada lote cambiado se
+    guarda en su propia transacción (pasando por el hilo escritor si está iniciado),
+    así las demás escrituras solo esperan un lote. Se puede interrumpir y repetir.
+    Parámetros:
+        tamano_lote: filas leídas y escritas por transacción
+        pausa: segundos de espera entre lotes (para dejar pasar otras escrituras)
+        tablas: tablas a migrar (por defecto todas las que tienen columnas de fecha)
+    Retorna {"Tabla.columna": {"revisadas", "convertidas", "invalidas": [(id, valor), ...]}}.
+    """
+    import funciones_crud
+    resultado = {}
+    for tabla in (tablas or list(SCHEMA_META)):
+        for columna in columnas_fecha(tabla):
+            es_fin = columna in COLUMNAS_FIN
+            detalle = {"revisadas": 0, "convertidas": 0, "invalidas": []}
+            ultimo_id = 0
+            while True:
+                with funciones_crud.obtener_conexion() as conexion:
+                    # Solo las filas fuera de formato, recorridas por la clave primaria
+                    filas = conexion.execute(
+                        f'SELECT id, "{columna}" FROM "{tabla}" WHERE id > ? AND "{columna}" IS NOT NULL '
+                        f'AND "{columna}" NOT GLOB ? ORDER BY id LIMIT ?',
+                        (ultimo_id, _GLOB_CANONICA, tamano_lote)).fetchall()
+                if not filas:
+                    break
+                cambios = []
+                for fila_id, valor in filas:
+                    try:
+                        nuevo = normalizar(valor, fin=es_fin)
+                    except ValueError:
+                        detalle["invalidas"].append((fila_id, valor))
+                        continue
+                    if nuevo != valor:
+                        cambios.append((nuevo, fila_id, valor))
+                detalle["revisadas"] += len(filas)
+                if cambios:
+                    detalle["convertidas"] += _migrar_lote(tabla, columna, cambios)
+                ultimo_id = filas[-1][0]
+                if pausa:
+                    time.sleep(pausa)
+            if detalle["convertidas"]:
+                funciones_crud.invalidar_cache(tabla)
+            resultado[f"{tabla}.{columna}"] = detalle
+    return resultado
+
+
+def main(argv=None):
+    import funciones_crud
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=["revisar", "migrar"])
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="filas por transacción")
+    parser.add_argument("--pausa", type=float, default=0.0, help="segundos entre lotes")
+    parser.add_argument("--bd", help="archivo de base de datos (por defecto " + funciones_crud.RUTA_BD + ")")
+    args = parser.parse_args(argv)
+    if args.bd:
+        funciones_crud.configurar_pool(ruta_bd=args.bd)
+    if args.comando == "revisar":
+        pendientes = revisar()
+        for nombre, cantidad in pendientes.items():
+            print(f"{nombre:<28}{cantidad:>10} fuera de formato")
+        return 1 if any(pendientes.values()) else 0
+    inicio_migracion = time.perf_counter()
+    resultado = migrar(args.lote, args.pausa)
+    for nombre, detalle in resultado.items():
+        print(f"{nombre:<28}{detalle['convertidas']:>10} convertidas, {len(detalle['invalidas'])} inválidas")
+        for fila_id, valor in detalle["invalidas"][:10]:
+            print(f"    id={fila_id}: {valor!r}")
+    print(f"Migración terminada en {time.perf_counter() - inicio_migracion:.1f} s")
+    return 1 if any(d["invalidas"] for d in resultado.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from catalogo import obtener_catalogo
+import fechas
+import instrumentacion
+
+# =========================================
+# CONSTRUCTOR DE FILTROS TIPADOS
+# =========================================
+# Arma la condición WHERE y el ORDER BY para funciones_crud.consultar a partir
+# de filtros por columna, generando solo SQL que puede usar los índices:
+#   - la columna siempre queda sola a la izquierda (nunca lower(col), substr(col)...);
+#   - "prefijo" se traduce a un rango col >= 'abc' AND col < 'abd' en vez de
+#     LIKE 'abc%' (el LIKE de SQLite no usa índices con la configuración por defecto);
+#     solo en columnas de texto: en una INTEGER el '1' se compara como el número 1,
+#     y asiento >= '1' AND asiento < '2' no encuentra 10..19;
+#   - los valores se convierten al tipo declarado de la columna, para que
+#     comparen igual que los datos guardados (id = '5' no usa el índice como id = 5);
+#   - en las columnas de fecha los valores pasan a "YYYY-MM-DD HH:MM" y una fecha
+#     sin hora abarca el día completo ("= 2025-10-22" es un rango de ese día).
+# Las columnas se validan contra el catálogo, así que nunca se arma SQL con
+# nombres que no existen en la tabla.
+
+# operador -> texto para la interfaz
+OPERADORES = {
+    "=": "igual a",
+    ">=": "mayor o igual",
+    "<=": "menor o igual",
+    ">": "mayor que",
+    "<": "menor que",
+    "entre": "entre (desde..hasta)",
+    "prefijo": "empieza con",
+    "en": "en la lista (a, b, c)",
+}
+
+_PATRON_INDICE = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+
+@dataclass(frozen=True)
+class Filtro:
+    columna: str
+    operador: str  # una clave de OPERADORES
+    valor: Any  # "entre": (desde, hasta); "en": lista de valores
+
+
+def _convertir(tipo: str, valor: Any) -> Any:
+    """Convierte valor al tipo declarado de la columna (INTEGER/REAL); el resto queda como texto."""
+    tipo = tipo.upper()
+    if "INT" in tipo:
+        return int(valor)
+    if any(t in tipo for t in ("REAL", "FLOA", "DOUB")):
+        return float(valor)
+    return str(valor)
+
+
+def _es_texto(tipo: str) -> bool:
+    """True si la columna tiene afinidad de texto en SQLite (CHAR, CLOB o TEXT en el tipo declarado)."""
+    tipo = tipo.upper()
+    return "INT" not in tipo and any(t in tipo for t in ("CHAR", "CLOB", "TEXT"))
+
+
+def _siguiente_prefijo(prefijo: str) -> str:
+    """Menor texto mayor que todos los que empiezan con prefijo ("abc" -> "abd")."""
+    return prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+
+
+def _filtro_fecha(nombre: str, operador: str, valor: Any) -> Tuple[str, List[Any]]:
+    """Condición sobre una columna de fecha con las cotas de fechas.py (ValueError si no es fecha)."""
+    if operador == "entre":
+        desde, hasta = valor
+        return f"{nombre} >= ? AND {nombre} < ?", [fechas.inicio(desde), fechas.fin_exclusivo(hasta)]
+    if operador == "en":
+        lista = [fechas.normalizar(v) for v in valor]
+        return f"{nombre} IN ({', '.join('?' * len(lista))})", lista
+    cotas = {
+        "=": lambda v: (f"{nombre} >= ? AND {nombre} < ?", [fechas.inicio(v), fechas.fin_exclusivo(v)]),
+        ">=": lambda v: (f"{nombre} >= ?", [fechas.inicio(v)]),
+        ">": lambda v: (f"{nombre} >= ?", [fechas.fin_exclusivo(v)]),
+        "<": lambda v: (f"{nombre} < ?", [fechas.inicio(v)]),
+        "<=": lambda v: (f"{nombre} < ?", [fechas.fin_exclusivo(v)]),
+    }
+    return cotas[operador](valor)
+
+
+def construir(tabla: str, filtros: Sequence[Filtro], orden: Optional[str] = None, descendente: bool = False,
+              conexion: Optional[sqlite3.Connection] = None) -> Tuple[Optional[str], tuple, Optional[str]]:
+    """
+    Traduce los filtros a (condicion, valores, orden) para funciones_crud.consultar.
+    Parámetros:
+        tabla: tabla a consultar
+        filtros: lista de Filtro (se combinan con AND)
+        orden: columna para ORDER BY (opcional)
+        descendente: True para ORDER BY ... DESC
+        conexion: conexión para leer el catálogo (por defecto una del pool)
+    Lanza ValueError si una columna no existe, el operador no es válido o un
+    valor no se puede convertir al tipo de la columna.
+    """
+    info = obtener_catalogo(conexion).tablas.get(tabla)
+    if info is None:
+        raise ValueError(f"No existe la tabla {tabla}.")
+    partes: List[str] = []
+    valores: List[Any] = []
+    columnas_fecha = set(fechas.columnas_fecha(tabla))
+    for filtro in filtros:
+        columna = info.columna(filtro.columna)
+        if columna is None:
+            raise ValueError(f"La tabla {tabla} no tiene la columna {filtro.columna}.")
+        if filtro.operador not in OPERADORES:
+            raise ValueError(f"Operador no válido: {filtro.operador}.")
+        if filtro.operador == "prefijo" and not _es_texto(columna.tipo):
+            raise ValueError(f"\"{OPERADORES['prefijo']}\" solo se aplica a columnas de texto; "
+                             f"{columna.nombre} es {columna.tipo or 'sin tipo'} (use \"entre\").")
+        nombre = f'"{columna.nombre}"'
+        try:
+            if columna.nombre in columnas_fecha and filtro.operador != "prefijo":
+                if filtro.operador == "en" and not filtro.valor:
+                    partes.append("0")
+                    continue
+                condicion, nuevos = _filtro_fecha(nombre, filtro.operador, filtro.valor)
+                partes.append(condicion)
+                valores += nuevos
+            elif filtro.operador == "entre":
+                desde, hasta = filtro.valor
+                partes.append(f"{nombre} BETWEEN ? AND ?")
+                valores += [_convertir(columna.tipo, desde), _convertir(columna.tipo, hasta)]
+            elif filtro.operador == "prefijo":
+                prefijo = str(filtro.valor)
+                if not prefijo:
+                    continue
+                partes.append(f"{nombre} >= ? AND {nombre} < ?")
+                valores += [prefijo, _siguiente_prefijo(prefijo)]
+            elif filtro.operador == "en":
+                lista = [_convertir(columna.tipo, v) for v in filtro.valor]
+                if not lista:
+                    partes.append("0")  # lista vacía: ninguna fila
+                    continue
+                partes.append(f"{nombre} IN ({', '.join('?' * len(lista))})")
+                valores += lista
+            else:
+                partes.append(f"{nombre} {filtro.operador} ?")
+                valores.append(_convertir(columna.tipo, filtro.valor))
+        except (TypeError, ValueError):
+            raise ValueError(f"Valor no válido para {columna.nombre} ({columna.tipo or 'texto'}): {filtro.valor!r}") from None
+    texto_orden = None
+    if orden:
+        if info.columna(orden) is None:
+            raise ValueError(f"La tabla {tabla} no tiene la columna {orden}.")
+        texto_orden = f'"{orden}"' + (" DESC" if descendente else "")
+    return (" AND ".join(partes) or None), tuple(valores), texto_orden
+
+
+def filtro_desde_texto(columna: str, operador: str, texto: str) -> Optional[Filtro]:
+    """
+    Arma un Filtro desde lo que escribe el usuario en la interfaz:
+    "entre" usa "desde..hasta" y "en" una lista separada por comas.
+    Retorna None si el texto está vacío (sin filtro).
+    """
+    texto = (texto or "").strip()
+    if not texto or operador not in OPERADORES:
+        return None
+    if operador == "entre":
+        if ".." not in texto:
+            raise ValueError(f"Para {columna} use el formato desde..hasta.")
+        desde, hasta = (t.strip() for t in texto.split("..", 1))
+        return Filtro(columna, operador, (desde, hasta))
+    if operador == "en":
+        return Filtro(columna, operador, [t.strip() for t in texto.split(",") if t.strip()])
+    return Filtro(columna, operador, texto)
+
+
+# =========================================
+# ÍNDICE USADO POR UNA CONSULTA
+# =========================================
+def explicar(tabla: str, columnas: Sequence[str], condicion: Optional[str], valores: tuple, orden: Optional[str] = None,
+             limite: Optional[int] = None, conexion: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+    """
+    EXPLAIN QUERY PLAN de la misma consulta que arma funciones_crud.consultar
+    (el mismo texto, pedido al constructor de sentencias; ValueError si no es válida).
+    Retorna {"indices": [...], "escaneo_completo": [...], "ordena_en_memoria": bool, "plan": [...]}.
+    """
+    import funciones_crud
+    consulta_sql = funciones_crud.sentencias.seleccionar(tabla, list(columnas), condicion, orden, limite is not None)
+    if limite is not None:
+        valores = tuple(valores) + (int(limite),)
+    if conexion is None:
+        with funciones_crud.obtener_conexion() as propia:
+            return _explicar_sql(propia, consulta_sql, valores)
+    return _explicar_sql(conexion, consulta_sql, valores)
+
+
+def _explicar_sql(conexion: sqlite3.Connection, consulta_sql: str, valores: tuple) -> Dict[str, Any]:
+    pasos, escaneos = instrumentacion.plan_consulta(conexion, consulta_sql, valores)
+    indices: List[str] = []
+    for paso in pasos:
+        encontrado = _PATRON_INDICE.search(paso)
+        nombre = encontrado.group(1) if encontrado else ("PRIMARY KEY" if "INTEGER PRIMARY KEY" in paso else None)
+        if nombre and nombre not in indices:
+            indices.append(nombre)
+    return {
+        "indices": indices,
+        "escaneo_completo": escaneos,
+        "ordena_en_memoria": any("TEMP B-TREE" in paso for paso in pasos),
+        "plan": pasos,
+    }
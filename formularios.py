@@ -0,0 +1,228 @@
+"""
+Especificación de los formularios de Crear y Actualizar, derivada del esquema.
+
+Antes main.py decidía en cada redibujo el widget de cada campo adivinando por
+el nombre ("id", "monto", "fecha"...). Ahora, por tabla, se arma una sola vez
+desde el catálogo (catalogo.py) un Formulario inmutable con un Campo por
+columna: tipo declarado (INTEGER, VARCHAR(n)...), NOT NULL, UNIQUE, clave
+foránea y si es fecha (fechas.columnas_fecha). Pedir un formulario ya armado
+no toca la base: el esquema se revisa una vez por redibujo (revisar_esquema) y
+los formularios se vuelven a armar solo si cambió (el catálogo es otro objeto).
+
+Las claves foráneas se eligen con un selector que busca en la base, por páginas:
+    - sin texto: las filas en orden de id (paginación por clave, "id > ?");
+    - con números: esa fila por id;
+    - con texto: el índice FTS5 de la tabla si tiene (ver busqueda.py) o el
+      comienzo de su columna UNIQUE (codigo, patente...) por su índice.
+"""
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import fechas
+from busqueda import COLUMNAS_BUSQUEDA
+from esquema import SCHEMA_META, SCHEMAS
+
+# Valores permitidos de columnas sin tabla propia (comentario del script SQL)
+OPCIONES = {
+    ("Pago", "metodo"): ("Efectivo", "Debito", "Credito", "Transferencia"),
+}
+POR_PAGINA = 20  # filas por página de un selector de clave foránea
+HORA_POR_DEFECTO = "00:00"
+
+_LARGO = re.compile(r"\(\s*(\d+)\s*\)")
+
+
+@dataclass(frozen=True)
+class Campo:
+    nombre: str
+    tipo: str  # "entero", "texto", "fecha", "referencia" u "opciones"
+    requerido: bool
+    unico: bool = False
+    largo: Optional[int] = None  # VARCHAR(n)
+    tabla_ref: Optional[str] = None  # tipo "referencia": tabla referida...
+    etiqueta_ref: Optional[str] = None  # ...y columna que se muestra en el selector
+    opciones: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class Formulario:
+    tabla: str
+    campos: Tuple[Campo, ...]
+
+    @property
+    def referencias(self) -> Tuple[Campo, ...]:
+        return tuple(c for c in self.campos if c.tipo == "referencia")
+
+
+# =========================================
+# ARMADO DESDE EL CATÁLOGO
+# =========================================
+def _etiqueta(catalogo, tabla):
+    """Columna que identifica una fila de tabla para una persona (nombre, codigo, patente...)."""
+    if tabla in COLUMNAS_BUSQUEDA and "nombre" in catalogo.tablas[tabla].nombres_columnas:
+        return "nombre"
+    unicas = catalogo.columnas_unicas(tabla)
+    return unicas[0] if unicas else "id"
+
+
+def _armar(catalogo, tabla):
+    info = catalogo.tablas.get(tabla)
+    if info is None or tabla.startswith("_"):
+        raise ValueError(f"No existe la tabla {tabla}.")
+    referidas = {fk.columna: fk for fk in info.claves_foraneas}
+    unicas = set(catalogo.columnas_unicas(tabla))
+    de_fecha = set(fechas.columnas_fecha(tabla))
+    campos = []
+    for columna in info.columnas:
+        if columna.pk:
+            continue
+        nombre, tipo_sql = columna.nombre, columna.tipo.upper()
+        comunes = {"nombre": nombre, "requerido": columna.not_null and columna.por_defecto is None, "unico": nombre in unicas}
+        if nombre in referidas:
+            fk = referidas[nombre]
+            campo = Campo(tipo="referencia", tabla_ref=fk.tabla_ref, etiqueta_ref=_etiqueta(catalogo, fk.tabla_ref), **comunes)
+        elif (tabla, nombre) in OPCIONES:
+            campo = Campo(tipo="opciones", opciones=OPCIONES[(tabla, nombre)], **comunes)
+        elif nombre in de_fecha:
+            campo = Campo(tipo="fecha", **comunes)
+        elif "INT" in tipo_sql:  # afinidad INTEGER de SQLite
+            campo = Campo(tipo="entero", **comunes)
+        else:
+            largo = _LARGO.search(tipo_sql)
+            campo = Campo(tipo="texto", largo=int(largo.group(1)) if largo else None, **comunes)
+        campos.append(campo)
+    return Formulario(tabla, tuple(campos))
+
+
+def _armar_respaldo(tabla):
+    """Sin base: campos de esquema.SCHEMAS, todos de texto salvo las fechas."""
+    if tabla not in SCHEMAS:
+        raise ValueError(f"No existe la tabla {tabla}.")
+    meta = SCHEMA_META.get(tabla, {})
+    tipos = meta.get("types", {})
+    return Formulario(tabla, tuple(
+        Campo(nombre=c, tipo="fecha" if tipos.get(c) == "datetime" else "texto",
+              requerido=c in meta.get("required", []), unico=c in meta.get("unique", []))
+        for c in SCHEMAS[tabla]))
+
+
+_formularios: Dict[str, Formulario] = {}  # tabla -> formulario armado con _catalogo_usado
+_catalogo_usado = None
+_candado = threading.Lock()
+
+
+def revisar_esquema():
+    """
+    Vuelve a mirar el catálogo de la base (PRAGMA schema_version) y olvida los
+    formularios guardados si cambió el esquema o el archivo. main.py la llama una
+    vez por redibujo; formulario() no consulta la base para una tabla ya guardada.
+    Retorna el catálogo, o None sin base disponible o con la base todavía sin tablas.
+    """
+    global _catalogo_usado
+    from catalogo import obtener_catalogo
+    try:
+        catalogo = obtener_catalogo()
+    except ImportError:
+        catalogo = None
+    if catalogo is not None and not catalogo.tablas_aplicacion():
+        catalogo = None
+    with _candado:
+        if catalogo is not _catalogo_usado:
+            _formularios.clear()
+            _catalogo_usado = catalogo
+    return catalogo
+
+
+def formulario(tabla: str) -> Formulario:
+    """
+    Formulario de la tabla, armado una vez por esquema y guardado (es inmutable).
+    Sin base de datos disponible (no se puede importar funciones_crud) o con la base
+    todavía sin tablas se arma desde las definiciones de respaldo de esquema.py;
+    cualquier otro error de la base se propaga.
+    Lanza ValueError si la tabla no existe.
+    """
+    espec = _formularios.get(tabla)  # lectura sin candado (un dict.get es atómico)
+    if espec is not None:
+        return espec
+    catalogo = _catalogo_usado or revisar_esquema()
+    if catalogo is None:
+        return _armar_respaldo(tabla)
+    espec = _armar(catalogo, tabla)
+    with _candado:
+        if catalogo is _catalogo_usado:
+            _formularios[tabla] = espec
+    return espec
+
+
+# =========================================
+# VALORES DE LOS WIDGETS -> DATOS
+# =========================================
+def convertir(espec: Formulario, valores: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Convierte lo ingresado en los widgets a los datos que espera operaciones.py.
+    Parámetros:
+        espec: formulario de la tabla
+        valores: {campo: valor}; las fechas como (fecha, hora). Los campos vacíos
+            ("" o None) se omiten: en Actualizar significan "sin cambio".
+    Retorna (datos, errores); errores es una lista de mensajes legibles.
+    """
+    datos, errores = {}, []
+    for campo in espec.campos:
+        valor = valores.get(campo.nombre)
+        if campo.tipo == "fecha":
+            fecha, hora = valor if isinstance(valor, tuple) else (valor, None)
+            fecha = (fecha or "").strip()
+            if fecha:
+                datos[campo.nombre] = fecha if " " in fecha else f"{fecha} {(hora or '').strip() or HORA_POR_DEFECTO}"
+            continue
+        if isinstance(valor, str):
+            valor = valor.strip()
+        if valor is None or valor == "":
+            continue
+        if campo.tipo in ("entero", "referencia"):
+            try:
+                valor = int(valor)
+            except (TypeError, ValueError):
+                errores.append(f"{campo.nombre} debe ser un número entero.")
+                continue
+        datos[campo.nombre] = valor
+    return datos, errores
+
+
+# =========================================
+# SELECTOR DE CLAVES FORÁNEAS
+# =========================================
+def opciones_referencia(campo: Campo, texto: str = "", despues=None, limite: int = POR_PAGINA):
+    """
+    Una página de filas de campo.tabla_ref para elegir, buscadas en la base.
+    Parámetros:
+        campo: Campo de tipo "referencia"
+        texto: lo que escribió el usuario (vacío = todas, por id)
+        despues: el "siguiente" que devolvió la página anterior (None = primera página)
+        limite: filas por página
+    Retorna ([(id, etiqueta)], siguiente); siguiente es None si no hay más páginas.
+    """
+    import funciones_crud
+
+    tabla, columna = campo.tabla_ref, campo.etiqueta_ref
+    columnas = ["id"] if columna == "id" else ["id", columna]
+    texto = (texto or "").strip()
+    if texto.isdigit():
+        filas, siguiente = funciones_crud.consultar(tabla, columnas, "id = ?", (int(texto),), limite=1), None
+    elif texto and tabla in COLUMNAS_BUSQUEDA:
+        # FTS5 en orden de id; la página se salta contando filas (pocas páginas en la práctica)
+        saltar = despues or 0
+        filas = funciones_crud.buscar_texto(tabla, texto, limite=saltar + limite + 1, columnas=columnas, por_relevancia=False)[saltar:]
+        siguiente = saltar + limite if len(filas) > limite else None
+    elif texto:
+        # Comienzo de la columna única (codigo, patente...): rango sobre su índice
+        condicion = f'"{columna}" > ? AND "{columna}" < ?' if despues is not None else f'"{columna}" >= ? AND "{columna}" < ?'
+        filas = funciones_crud.consultar(tabla, columnas, condicion, (despues if despues is not None else texto, texto + "\U0010ffff"),
+                                         limite=limite + 1, orden=columna)
+        siguiente = filas[limite - 1][-1] if len(filas) > limite else None
+    else:
+        filas = funciones_crud.consultar(tabla, columnas, limite=limite + 1, despues_de_id=despues or 0)
+        siguiente = filas[limite - 1][0] if len(filas) > limite else None
+    return [(fila[0], str(fila[-1]) if columna != "id" else f"id {fila[0]}") for fila in filas[:limite]], siguiente
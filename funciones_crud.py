@@ -1,17 +1,295 @@
+import random
 import sqlite3 
+import threading
+import time
+import busqueda
+import fechas
+import instrumentacion
+from cache_consultas import CacheConsultas
+from catalogo import obtener_catalogo
+from pool_conexiones import PoolConexiones
+from sentencias import ConstructorSentencias
+
+# Archivo de base de datos usado por todas las funciones de este módulo
+RUTA_BD = "base_de_datos_transportes.db"
+
+# Parámetros del pool de conexiones compartido (ver configurar_pool)
+TAMANO_POOL = 5
+INACTIVIDAD_MAX = 300.0  # segundos sin uso antes de cerrar una conexión libre
+INTERVALO_VERIFICACION = 30.0  # segundos entre chequeos de salud de una conexión libre
+SENTENCIAS_PREPARADAS = 256  # sentencias compiladas que guarda cada conexión (cached_statements)
+
+_pool = None
+
+# =========================================
+# PERFILES DE DURABILIDAD / RENDIMIENTO
+# =========================================
+# PRAGMAs que conectar() aplica a cada conexión nueva.
+#   journal_mode=WAL: los lectores no se bloquean con un escritor (y viceversa).
+#   synchronous: FULL = fsync en cada commit; NORMAL (con WAL) = fsync solo al hacer
+#       checkpoint, una caída de energía puede perder los últimos commits pero nunca corrompe.
+#   busy_timeout: milisegundos que SQLite espera un bloqueo antes de dar "database is locked".
+#   cache_size: páginas en caché (negativo = KiB).  mmap_size: bytes leídos vía mmap.
+#   temp_store: dónde van las tablas/índices temporales (MEMORY evita archivos temporales).
+#   wal_autocheckpoint: páginas de WAL tras las que SQLite hace checkpoint automático.
+PERFILES = {
+    # Comportamiento anterior: diario de rollback, un escritor bloquea a los lectores
+    "compatible": {"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout": 5000, "cache_size": -2000, "mmap_size": 0, "temp_store": "DEFAULT"},
+    # WAL con fsync en cada commit
+    "seguro": {"journal_mode": "WAL", "synchronous": "FULL", "busy_timeout": 5000, "cache_size": -16000, "mmap_size": 0, "temp_store": "MEMORY", "wal_autocheckpoint": 1000},
+    # WAL con synchronous=NORMAL: recomendado para varias sesiones de boletería
+    "equilibrado": {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 5000, "cache_size": -32000, "mmap_size": 128 * 1024 * 1024, "temp_store": "MEMORY", "wal_autocheckpoint": 1000},
+}
+PERFIL = dict(PERFILES["equilibrado"])
+
+# Reintentos cuando la base está ocupada (SQLITE_BUSY / "database is locked")
+REINTENTOS_MAX = 5
+ESPERA_INICIAL = 0.05  # segundos; se duplica en cada reintento (con algo de azar)
+
+# Checkpoint pasivo cada cierta cantidad de escrituras confirmadas (0 = solo el automático)
+CHECKPOINT_CADA = 1000
+_escrituras = 0
+_candado_escrituras = threading.Lock()
+
+# Caché de resultados de consultar(), compartida por todo el proceso (ver cache_consultas.py)
+cache = CacheConsultas(max_entradas=256, max_bytes=32 * 1024 * 1024, ttl=60.0)
+
+# Textos SQL de insertar/consultar/actualizar/eliminar ya armados y validados (ver sentencias.py)
+sentencias = ConstructorSentencias(lambda: obtener_catalogo(), max_entradas=512)
+
 # =========================================
 # FUNCIÓN: CONECTAR A LA BASE DE DATOS
 # =========================================
 def conectar():
     """
-    Abre la conexión con la base de datos 'HHH.db'.
+    Abre una conexión nueva con la base de datos RUTA_BD.
     La línea PRAGMA foreign_keys = ON activa el uso de claves foráneas,
     lo que asegura que las relaciones entre tablas sean respetadas.
+    Normalmente no se llama directo: el pool la usa para crear sus conexiones.
     """
-    conexion = sqlite3.connect("base_de_datos_transportes.db")  # Abre el archivo de base de datos
+    # check_same_thread=False: la conexión puede pasar de un hilo a otro dentro del pool,
+    # el pool garantiza que solo un hilo la use a la vez.
+    # cached_statements: como la conexión vive en el pool, un mismo texto SQL (ver
+    # sentencias.py) se compila una vez y se reutiliza en las llamadas siguientes.
+    conexion = sqlite3.connect(RUTA_BD, check_same_thread=False, cached_statements=SENTENCIAS_PREPARADAS)  # Abre el archivo de base de datos
     conexion.execute("PRAGMA foreign_keys = ON")  # activa la comprobación de claves foráneas en SQLite, Esto evita insertar o eliminar filas que rompan relaciones.
+    # Perfil de durabilidad/rendimiento (ver PERFILES). busy_timeout va primero para que
+    # el cambio de journal_mode también espere si otra conexión tiene la base tomada.
+    for pragma in ("busy_timeout", "journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "wal_autocheckpoint"):
+        if pragma in PERFIL:
+            conexion.execute("PRAGMA " + pragma + " = " + str(PERFIL[pragma]))
     return conexion  # Devuelve el objeto conexión
 
+
+def configurar_perfil(perfil):
+    """
+    Elige el perfil de PRAGMAs que se aplica a las conexiones nuevas.
+    Parámetros:
+        perfil: nombre de PERFILES ("compatible", "seguro", "equilibrado") o un diccionario
+            con los PRAGMAs a cambiar sobre el perfil actual (ej: {"synchronous": "FULL"})
+    Cierra las conexiones del pool para que las próximas usen el perfil nuevo.
+    """
+    global PERFIL
+    if isinstance(perfil, str):
+        if perfil not in PERFILES:
+            raise ValueError("Perfil desconocido: " + perfil)
+        PERFIL = dict(PERFILES[perfil])
+    else:
+        PERFIL = dict(PERFIL, **perfil)
+    cerrar_pool()
+
+
+# =========================================
+# FUNCIÓN: REINTENTOS Y CHECKPOINTS
+# =========================================
+def _base_ocupada(error):
+    """True si el error es un bloqueo temporal (SQLITE_BUSY / SQLITE_LOCKED)."""
+    texto = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in texto or "busy" in texto)
+
+
+def con_reintentos(operacion):
+    """
+    Ejecuta operacion() y, si la base está ocupada, la reintenta con espera exponencial
+    (ESPERA_INICIAL, el doble, ...) hasta REINTENTOS_MAX veces. Otros errores se propagan.
+    operacion debe poder repetirse desde cero (por ejemplo: tomar conexión, ejecutar, commit).
+    """
+    espera = ESPERA_INICIAL
+    for intento in range(REINTENTOS_MAX + 1):
+        try:
+            return operacion()
+        except sqlite3.OperationalError as error:
+            if not _base_ocupada(error) or intento == REINTENTOS_MAX:
+                raise
+            time.sleep(espera * (0.5 + random.random()))
+            espera *= 2
+
+
+def checkpoint(modo="PASSIVE"):
+    """
+    Traspasa el WAL al archivo principal de la base.
+    Parámetros:
+        modo: "PASSIVE" (no espera a nadie), "FULL", "RESTART" o "TRUNCATE" (además vacía el -wal)
+    Retorna (bloqueado, paginas_en_wal, paginas_traspasadas) o None si la base no usa WAL.
+    """
+    if modo.upper() not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError("Modo de checkpoint inválido: " + modo)
+    with obtener_conexion() as conexion:
+        if conexion.execute("PRAGMA journal_mode").fetchone()[0].lower() != "wal":
+            return None
+        return tuple(conexion.execute("PRAGMA wal_checkpoint(" + modo.upper() + ")").fetchone())
+
+
+def _registrar_escritura():
+    """Cuenta escrituras confirmadas y lanza un checkpoint pasivo cada CHECKPOINT_CADA."""
+    global _escrituras
+    if not CHECKPOINT_CADA:
+        return
+    with _candado_escrituras:
+        _escrituras += 1
+        toca = _escrituras % CHECKPOINT_CADA == 0
+    if toca:
+        try:
+            checkpoint("PASSIVE")
+        except sqlite3.Error:
+            pass  # el checkpoint es solo mantenimiento; el automático de SQLite sigue activo
+
+
+# Si crud_asincrono se inició con ENCOLAR_ESCRITURAS, todas las escrituras pasan por
+# su único hilo escritor: se ejecutan de a una, sin competir por el bloqueo de SQLite.
+_escritor = None  # función que recibe operacion() y la ejecuta en el hilo escritor
+
+
+def usar_escritor(despachar):
+    """Registra (o quita, con None) el despachador de escrituras de crud_asincrono."""
+    global _escritor
+    _escritor = despachar
+
+
+def en_escritor(operacion):
+    """
+    Ejecuta operacion() en el hilo escritor si hay uno registrado, o en el hilo actual.
+    También se ejecuta en el hilo actual si su conexión tiene una transacción abierta:
+    el escritor tendría que esperar el bloqueo que esa transacción tiene tomado. (Si
+    el que llama es el propio escritor, el despachador la ejecuta ahí mismo.)
+    """
+    if _escritor is None:
+        return operacion()
+    propia = _pool.actual() if _pool is not None else None
+    if propia is not None and propia.in_transaction:
+        return operacion()
+    return _escritor(operacion)
+
+
+def _escribir(consulta_sql, valores, nombre_operacion=None, nombre_tabla=None):
+    """
+    Ejecuta una instrucción de escritura con su commit, reintentando si la base está ocupada.
+    nombre_operacion y nombre_tabla identifican la sentencia en la instrumentación.
+    Retorna la cantidad de filas afectadas.
+    """
+    def operacion():
+        with obtener_conexion() as conexion:  # Toma una conexión del pool (se devuelve al salir)
+            espera = obtener_pool().ultima_espera()
+            with instrumentacion.medir(nombre_operacion, nombre_tabla, consulta_sql, valores, conexion, espera) as medicion:
+                cursor = conexion.cursor()  # Crea un cursor para ejecutar comandos SQL
+                cursor.execute(consulta_sql, valores)  # Envía la instrucción SQL con los valores
+                conexion.commit()  # Guarda los cambios permanentemente
+                medicion["filas"] = cursor.rowcount
+            return cursor.rowcount
+    afectadas = en_escritor(lambda: con_reintentos(operacion))
+    _registrar_escritura()
+    return afectadas
+
+
+def _leer(consulta_sql, valores, nombre_operacion=None, nombre_tabla=None):
+    """Ejecuta una consulta y retorna todas sus filas, reintentando si la base está ocupada."""
+    def operacion():
+        with obtener_conexion() as conexion:
+            espera = obtener_pool().ultima_espera()
+            with instrumentacion.medir(nombre_operacion, nombre_tabla, consulta_sql, valores, conexion, espera) as medicion:
+                cursor = conexion.cursor()
+                cursor.execute(consulta_sql, valores)
+                filas = cursor.fetchall()  # fetchall() obtiene todas las filas de la consulta
+                medicion["filas"] = len(filas)
+            return filas
+    return con_reintentos(operacion)
+
+# =========================================
+# FUNCIÓN: POOL DE CONEXIONES COMPARTIDO
+# =========================================
+def obtener_pool():
+    """
+    Devuelve el pool de conexiones del proceso, creándolo la primera vez.
+    """
+    global _pool
+    if _pool is None:
+        _pool = PoolConexiones(conectar, tamano_max=TAMANO_POOL, inactividad_max=INACTIVIDAD_MAX, intervalo_verificacion=INTERVALO_VERIFICACION)
+    return _pool
+
+
+def obtener_conexion():
+    """
+    Entrega una conexión del pool para usar con "with":
+        with obtener_conexion() as conexion:
+            conexion.execute(...)
+    Al terminar el bloque la conexión vuelve al pool en vez de cerrarse.
+    """
+    return obtener_pool().conexion()
+
+
+def configurar_pool(ruta_bd=None, tamano_max=None, inactividad_max=None, intervalo_verificacion=None):
+    """
+    Cambia la configuración del pool (y opcionalmente el archivo de base de datos).
+    Cierra las conexiones actuales; el pool nuevo se crea en el próximo uso.
+    Parámetros:
+        ruta_bd: archivo de base de datos a usar
+        tamano_max: cantidad máxima de conexiones abiertas
+        inactividad_max: segundos sin uso antes de cerrar una conexión libre
+        intervalo_verificacion: segundos entre chequeos de salud
+    """
+    global RUTA_BD, TAMANO_POOL, INACTIVIDAD_MAX, INTERVALO_VERIFICACION
+    if ruta_bd is not None:
+        RUTA_BD = ruta_bd
+    if tamano_max is not None:
+        TAMANO_POOL = tamano_max
+    if inactividad_max is not None:
+        INACTIVIDAD_MAX = inactividad_max
+    if intervalo_verificacion is not None:
+        INTERVALO_VERIFICACION = intervalo_verificacion
+    cerrar_pool()
+
+
+def cerrar_pool():
+    """Cierra todas las conexiones del pool."""
+    global _pool
+    if _pool is not None:
+        _pool.cerrar_todo()
+        _pool = None
+    cache.limpiar()  # los resultados guardados podían ser de otro archivo
+    sentencias.limpiar()  # y las sentencias se validaron contra su esquema
+
+
+# =========================================
+# FUNCIÓN: CACHÉ DE CONSULTAS
+# =========================================
+def invalidar_cache(nombre_tabla):
+    """
+    Descarta los resultados guardados de una tabla. Lo llaman las funciones de
+    escritura de este módulo después de cada commit; código que escriba por su
+    cuenta (por ejemplo main.eliminar_registro) debe llamarla también.
+    """
+    cache.invalidar_tabla(nombre_tabla)
+
+
+def estadisticas_cache():
+    """Contadores de la caché de consultas (aciertos, fallos, entradas, bytes...)."""
+    return cache.estadisticas()
+
+
+def estadisticas_sentencias():
+    """Contadores del constructor de sentencias (aciertos, fallos, rechazadas, entradas)."""
+    return sentencias.estadisticas()
+
 # =========================================
 # FUNCIÓN: INSERTAR REGISTROS
 # =========================================
@@ -22,28 +300,149 @@ def insertar(nombre_tabla, lista_columnas, lista_valores):
         nombre_tabla: nombre de la tabla (texto)
         lista_columnas: lista con los nombres de las columnas
         lista_valores: lista con los valores que se insertarán
+    Las columnas de fecha se guardan como "YYYY-MM-DD HH:MM" (ver fechas.py).
     """
-    conexion = conectar() #para obtener una conexión limpia.
-    cursor = conexion.cursor()  # Crea un cursor para ejecutar comandos SQL
-    # Se generan los signos "?" para los valores (uno por cada dato)
-    signos_interrogacion = ", ".join(["?"] * len(lista_valores))
-    # Une los nombres de las columnas separadas por comas
-    columnas_texto = ", ".join(lista_columnas)
-    # Crea la instrucción SQL completa
-    consulta_sql = "INSERT INTO " + nombre_tabla + " (" + columnas_texto + ") VALUES (" + signos_interrogacion + ")"
     try:
-        cursor.execute(consulta_sql, lista_valores)  # Envía la instrucción SQL con los valores
-        conexion.commit()  # Guarda los cambios permanentemente
+        # Texto "INSERT INTO tabla (...) VALUES (?, ...)" armado una vez por tabla y columnas
+        consulta_sql = sentencias.insertar(nombre_tabla, lista_columnas)
+        lista_valores = fechas.normalizar_valores(nombre_tabla, lista_columnas, lista_valores)
+    except ValueError as error:
+        print("Error al insertar datos:", error)
+        return
+    try:
+        _escribir(consulta_sql, lista_valores, "insertar", nombre_tabla)  # Ejecuta y guarda los cambios (con reintentos si la base está ocupada)
+        invalidar_cache(nombre_tabla)
         print("Registro insertado correctamente en la tabla", nombre_tabla)
     except sqlite3.Error as error:
         print("Error al insertar datos:", error)
-    finally:
-        conexion.close()  # Cierra la conexión con la base
+
+# =========================================
+# FUNCIÓN: INSERTAR / UPSERT EN LOTE
+# =========================================
+TAMANO_LOTE = 500  # filas por executemany cuando no se indica otro tamaño
+
+
+def _trocear(filas, lista_columnas, tamano_lote, convertir=None):
+    """
+    Recorre cualquier iterable de filas (listas/tuplas en el orden de lista_columnas,
+    o diccionarios columna -> valor) y lo entrega en trozos de tamano_lote tuplas.
+    No necesita tener todas las filas en memoria. convertir (opcional) se aplica a cada tupla.
+    """
+    trozo = []
+    for fila in filas:
+        if isinstance(fila, dict):
+            fila = tuple(fila.get(c) for c in lista_columnas)
+        trozo.append(convertir(fila) if convertir else tuple(fila))
+        if len(trozo) >= tamano_lote:
+            yield trozo
+            trozo = []
+    if trozo:
+        yield trozo
+
+
+def _ejecutar_lotes(nombre_tabla, consulta_sql, lista_columnas, filas, tamano_lote):
+    """Carga por lotes en el hilo escritor (si hay uno) o en el hilo actual."""
+    return en_escritor(lambda: _aplicar_lotes(nombre_tabla, consulta_sql, lista_columnas, filas, tamano_lote))
+
+
+def _aplicar_lotes(nombre_tabla, consulta_sql, lista_columnas, filas, tamano_lote):
+    """
+    Ejecuta consulta_sql con executemany, trozo por trozo, dentro de una sola transacción.
+    Cada trozo corre en un SAVEPOINT: si falla, se deshace solo ese trozo y se reintenta
+    fila a fila para aislar las filas con error sin abortar la carga completa.
+    Retorna un diccionario con los totales y el detalle por trozo.
+    """
+    resumen = {"tabla": nombre_tabla, "filas": 0, "afectadas": 0, "fallidas": 0, "lotes": []}
+    with obtener_conexion() as conexion:
+        cursor = conexion.cursor()
+        try:
+            # BEGIN IMMEDIATE toma el bloqueo de escritura al empezar; si otro escritor lo
+            # tiene, se reintenta solo este paso (las filas del iterable aún no se consumieron)
+            con_reintentos(lambda: cursor.execute("BEGIN IMMEDIATE"))
+            inicio = 0
+            convertir = fechas.convertidor_filas(nombre_tabla, lista_columnas)
+            for numero, trozo in enumerate(_trocear(filas, lista_columnas, tamano_lote, convertir)):
+                detalle = {"lote": numero, "filas": len(trozo), "afectadas": 0, "errores": []}
+                cursor.execute("SAVEPOINT lote")
+                try:
+                    cursor.executemany(consulta_sql, trozo)
+                    detalle["afectadas"] = cursor.rowcount
+                except sqlite3.Error:
+                    # Se descarta el trozo y se reintenta fila a fila
+                    cursor.execute("ROLLBACK TO lote")
+                    for posicion, fila in enumerate(trozo):
+                        try:
+                            cursor.execute(consulta_sql, fila)
+                            detalle["afectadas"] += cursor.rowcount
+                        except sqlite3.Error as error:
+                            detalle["errores"].append({"fila": inicio + posicion, "error": str(error)})
+                cursor.execute("RELEASE lote")
+                inicio += len(trozo)
+                resumen["filas"] += detalle["filas"]
+                resumen["afectadas"] += detalle["afectadas"]
+                resumen["fallidas"] += len(detalle["errores"])
+                resumen["lotes"].append(detalle)
+            conexion.commit()  # Un solo commit (un solo fsync) para toda la carga
+        except Exception:
+            conexion.rollback()
+            raise
+    invalidar_cache(nombre_tabla)
+    _registrar_escritura()
+    return resumen
+
+
+def insertar_lote(nombre_tabla, lista_columnas, filas, tamano_lote=TAMANO_LOTE):
+    """
+    Inserta muchas filas en una tabla usando executemany dentro de una sola transacción.
+    Parámetros:
+        nombre_tabla: nombre de la tabla
+        lista_columnas: lista con los nombres de las columnas
+        filas: iterable de filas (listas/tuplas en el orden de lista_columnas o diccionarios)
+        tamano_lote: filas por cada executemany
+    Retorna un diccionario {"tabla", "filas", "afectadas", "fallidas", "lotes": [...]}
+    donde cada lote trae sus filas, afectadas y errores (posición de la fila y mensaje).
+    """
+    try:
+        consulta_sql = sentencias.insertar(nombre_tabla, lista_columnas)
+        resumen = _ejecutar_lotes(nombre_tabla, consulta_sql, lista_columnas, filas, tamano_lote)
+    except (sqlite3.Error, ValueError) as error:
+        print("Error al insertar lote:", error)
+        return {"tabla": nombre_tabla, "filas": 0, "afectadas": 0, "fallidas": 0, "lotes": [], "error": str(error)}
+    print("Lote insertado en la tabla", nombre_tabla, "-", resumen["afectadas"], "filas,", resumen["fallidas"], "con error")
+    return resumen
+
+
+def upsert_lote(nombre_tabla, lista_columnas, filas, columnas_conflicto=None, tamano_lote=TAMANO_LOTE):
+    """
+    Inserta o actualiza muchas filas (INSERT ... ON CONFLICT DO UPDATE) en una sola transacción.
+    Parámetros:
+        nombre_tabla: nombre de la tabla
+        lista_columnas: lista con los nombres de las columnas (debe incluir las de conflicto)
+        filas: iterable de filas (listas/tuplas en el orden de lista_columnas o diccionarios)
+        columnas_conflicto: columnas UNIQUE que identifican la fila existente;
+            por defecto las listadas como "unique" en SCHEMA_META (esquema.py)
+        tamano_lote: filas por cada executemany
+    Retorna el mismo resumen que insertar_lote (con "error" si no se pudo armar o ejecutar).
+    """
+    if columnas_conflicto is None:
+        from esquema import SCHEMA_META
+        columnas_conflicto = SCHEMA_META.get(nombre_tabla, {}).get("unique", [])
+    try:
+        if not columnas_conflicto:
+            raise ValueError("La tabla " + nombre_tabla + " no tiene columnas UNIQUE para resolver el conflicto")
+        # ValueError si faltan las columnas de conflicto o alguna no existe
+        consulta_sql = sentencias.upsert(nombre_tabla, lista_columnas, columnas_conflicto)
+        resumen = _ejecutar_lotes(nombre_tabla, consulta_sql, lista_columnas, filas, tamano_lote)
+    except (sqlite3.Error, ValueError) as error:
+        print("Error en upsert de lote:", error)
+        return {"tabla": nombre_tabla, "filas": 0, "afectadas": 0, "fallidas": 0, "lotes": [], "error": str(error)}
+    print("Upsert de lote en la tabla", nombre_tabla, "-", resumen["afectadas"], "filas,", resumen["fallidas"], "con error")
+    return resumen
 
 # =========================================
 # FUNCIÓN: CONSULTAR REGISTROS
 # =========================================
-def consultar(nombre_tabla, columnas="*", condicion=None, valores_condicion=()):
+def consultar(nombre_tabla, columnas="*", condicion=None, valores_condicion=(), limite=None, desplazamiento=None, orden=None, despues_de_id=None, usar_cache=True):
     """
     Consulta registros desde una tabla.
     Parámetros:
@@ -51,27 +450,143 @@ def consultar(nombre_tabla, columnas="*", condicion=None, valores_condicion=()):
         columnas: lista con los nombres de las columnas o "*" para todas
         condicion: texto opcional (por ejemplo "id = ?")
         valores_condicion: valores usados en la condición (tupla)
+        limite: cantidad máxima de filas a traer (LIMIT), None para todas
+        desplazamiento: filas a saltar antes de empezar (OFFSET)
+        orden: texto del ORDER BY (por ejemplo "fecha_salida DESC") o lista de columnas
+        despues_de_id: paginación por clave (keyset): solo filas con id mayor a este valor,
+            ordenadas por id. Es más rápida que OFFSET en páginas profundas porque
+            salta directo al id usando la clave primaria.
+        usar_cache: si es True, el resultado se lee de / guarda en la caché de consultas
+            (se invalida sola cuando este módulo escribe en la tabla)
     Retorna una lista con los resultados encontrados.
     """
-    conexion = conectar()
-    cursor = conexion.cursor()
-    # Si el parámetro columnas viene en lista, se convierte a texto
-    if isinstance(columnas, list):
-        columnas = ", ".join(columnas)
-    # Comienza a formar la consulta SQL
-    consulta_sql = "SELECT " + columnas + " FROM " + nombre_tabla
-    # Si hay condición, se agrega la parte del WHERE
-    if condicion:
-        consulta_sql += " WHERE " + condicion
+    if isinstance(orden, list):
+        orden = ", ".join(orden)
+    # El texto SQL (columnas, WHERE, ORDER BY, LIMIT/OFFSET) se arma y valida una vez
+    # por combinación; la paginación por clave agrega "id > ?" y ordena por id
     try:
-        cursor.execute(consulta_sql, valores_condicion)
-        filas = cursor.fetchall()  # fetchall() obtiene todas las filas de la consulta
+        consulta_sql = sentencias.seleccionar(nombre_tabla, columnas, condicion, orden, limite is not None,
+                                              bool(desplazamiento), despues_de_id is not None)
+    except ValueError as error:
+        print("Error al consultar datos:", error)
+        return []
+    valores_condicion = tuple(valores_condicion)
+    if despues_de_id is not None:
+        valores_condicion += (despues_de_id,)
+    # LIMIT/OFFSET se resuelven en SQLite: solo viajan las filas que se van a mostrar
+    if limite is not None:
+        valores_condicion += (int(limite),)
+    if desplazamiento:
+        valores_condicion += (int(desplazamiento),)
+    if usar_cache:
+        # La consulta SQL ya incluye columnas, condición, orden y límites; los valores van aparte
+        clave = (nombre_tabla, consulta_sql, valores_condicion)
+        filas = cache.obtener(nombre_tabla, clave)
+        if filas is not None:
+            return filas
+        generacion = cache.generacion(nombre_tabla)
+    try:
+        filas = _leer(consulta_sql, valores_condicion, "consultar", nombre_tabla)
+        if usar_cache:
+            cache.guardar(nombre_tabla, clave, filas, generacion)
         return filas
     except sqlite3.Error as error:
         print("Error al consultar datos:", error)
         return []
-    finally:
-        conexion.close()
+
+# =========================================
+# FUNCIÓN: RECORRER UNA TABLA POR LOTES
+# =========================================
+def iterar_registros(nombre_tabla, columnas="*", condicion=None, valores_condicion=(), tamano_lote=TAMANO_LOTE):
+    """
+    Generador que recorre una tabla completa en lotes de tamano_lote filas.
+    Usa paginación por clave (id > último id visto), así cada lote es una consulta
+    corta por la clave primaria y nunca hay más de un lote en memoria.
+    Parámetros:
+        nombre_tabla, columnas, condicion, valores_condicion: igual que en consultar
+            (columnas debe incluir "id" en la primera posición, o ser "*")
+        tamano_lote: filas por lote
+    Entrega listas de filas (tuplas).
+    """
+    ultimo_id = 0
+    while True:
+        # Sin caché: un recorrido completo solo llenaría la caché con lotes que no se repiten
+        filas = consultar(nombre_tabla, columnas, condicion, valores_condicion, limite=tamano_lote, despues_de_id=ultimo_id, usar_cache=False)
+        if not filas:
+            return
+        yield filas
+        if len(filas) < tamano_lote:
+            return
+        ultimo_id = filas[-1][0]
+
+# =========================================
+# FUNCIÓN: BÚSQUEDA DE TEXTO (FTS5)
+# =========================================
+_busqueda_instalada = set()  # archivos de base donde ya se verificaron los índices FTS
+
+
+def preparar_busqueda():
+    """Crea y llena los índices FTS5 si faltan (la primera vez puede tardar en tablas grandes)."""
+    if RUTA_BD in _busqueda_instalada:
+        return
+    with obtener_conexion() as conexion:
+        con_reintentos(lambda: busqueda.instalar(conexion))
+    _busqueda_instalada.add(RUTA_BD)
+
+
+def buscar_texto(nombre_tabla, texto, limite=10, columnas=None, por_relevancia=True):
+    """
+    Busca registros por palabras o comienzos de palabra en las columnas de texto
+    (ver busqueda.COLUMNAS_BUSQUEDA), usando el índice FTS5 de la tabla.
+    Parámetros:
+        nombre_tabla: "Cliente", "Chofer", "Parada" o "Ruta"
+        texto: lo que escribió el usuario, por ejemplo "juan pe" o "valpa"
+        limite: cantidad máxima de resultados
+        columnas: columnas a devolver (por defecto id y las columnas indexadas)
+        por_relevancia: ordena por relevancia (bm25); con False devuelve en orden
+            de id, más rápido cuando el texto coincide con muchísimas filas
+    Retorna una lista de filas (tuplas); vacía si el texto es muy corto.
+    """
+    if nombre_tabla not in busqueda.COLUMNAS_BUSQUEDA:
+        raise ValueError("No hay índice de búsqueda para la tabla " + nombre_tabla)
+    expresion = busqueda.expresion(texto)
+    if expresion is None:
+        return []
+    preparar_busqueda()
+    columnas = columnas or ["id"] + list(busqueda.COLUMNAS_BUSQUEDA[nombre_tabla])
+    consulta_sql = busqueda.consulta(nombre_tabla, columnas, por_relevancia)
+    valores = (expresion, int(limite))
+    # Se guarda en la misma caché que consultar: las escrituras en la tabla la invalidan
+    clave = (nombre_tabla, consulta_sql, valores)
+    filas = cache.obtener(nombre_tabla, clave)
+    if filas is not None:
+        return filas
+    generacion = cache.generacion(nombre_tabla)
+    try:
+        _sincronizar_busqueda()
+        filas = _leer(consulta_sql, valores, "buscar_texto", nombre_tabla)
+    except sqlite3.Error as error:
+        print("Error al buscar:", error)
+        return []
+    cache.guardar(nombre_tabla, clave, filas, generacion)
+    return filas
+
+
+def _sincronizar_busqueda():
+    """
+    Aplica a los índices FTS los cambios anotados por los triggers (ver busqueda.py).
+    Revisar la cola es una lectura; aplicarla es una escritura y va por el hilo
+    escritor, como las demás.
+    """
+    with obtener_conexion() as conexion:
+        if not busqueda.hay_pendientes(conexion):
+            return
+
+    def operacion():
+        with obtener_conexion() as conexion:
+            return busqueda.sincronizar(conexion)
+    if en_escritor(lambda: con_reintentos(operacion)):
+        _registrar_escritura()
 
 # =========================================
 # FUNCIÓN: ACTUALIZAR REGISTROS
@@ -84,26 +599,23 @@ def actualizar(nombre_tabla, nuevos_datos, condicion, valores_condicion=()):
         nuevos_datos: diccionario con los campos a cambiar (ej: {"email": "nuevo@correo.com"})
         condicion: condición para elegir el registro (ej: "id = ?")
         valores_condicion: valores para reemplazar el "?" de la condición
+    Las columnas de fecha se guardan como "YYYY-MM-DD HH:MM" (ver fechas.py).
     """
-    conexion = conectar()
-    cursor = conexion.cursor()
-    # Construye la parte SET de forma simple: "columna1 = ?, columna2 = ?"
-    texto_actualizacion = ""
-    for campo in nuevos_datos.keys():
-        texto_actualizacion += campo + " = ?, "
-    texto_actualizacion = texto_actualizacion[:-2]  # Quita la última coma y espacio
-    # Crea la instrucción SQL completa
-    consulta_sql = "UPDATE " + nombre_tabla + " SET " + texto_actualizacion + " WHERE " + condicion
+    try:
+        # "UPDATE tabla SET columna1 = ?, columna2 = ? WHERE condicion", armado una vez por combinación
+        consulta_sql = sentencias.actualizar(nombre_tabla, list(nuevos_datos), condicion)
+        nuevos_datos = fechas.normalizar_datos(nombre_tabla, nuevos_datos)
+    except ValueError as error:
+        print("Error al actualizar datos:", error)
+        return
     # Combina los valores nuevos con los de la condición
     valores_finales = tuple(nuevos_datos.values()) + tuple(valores_condicion)
     try:
-        cursor.execute(consulta_sql, valores_finales)
-        conexion.commit()
+        _escribir(consulta_sql, valores_finales, "actualizar", nombre_tabla)
+        invalidar_cache(nombre_tabla)
         print("Registro actualizado correctamente en la tabla", nombre_tabla)
     except sqlite3.Error as error:
         print("Error al actualizar datos:", error)
-    finally:
-        conexion.close()
 
 # =========================================
 # FUNCIÓN: ELIMINAR REGISTROS
@@ -116,14 +628,14 @@ def eliminar(nombre_tabla, condicion, valores_condicion=()):
         condicion: texto de la condición (por ejemplo "id = ?")
         valores_condicion: valores usados para reemplazar el "?"
     """
-    conexion = conectar()
-    cursor = conexion.cursor()
-    consulta_sql = "DELETE FROM " + nombre_tabla + " WHERE " + condicion
     try:
-        cursor.execute(consulta_sql, valores_condicion)
-        conexion.commit()
+        consulta_sql = sentencias.eliminar(nombre_tabla, condicion)
+    except ValueError as error:
+        print("Error al eliminar datos:", error)
+        return
+    try:
+        _escribir(consulta_sql, valores_condicion, "eliminar", nombre_tabla)
+        invalidar_cache(nombre_tabla)
         print("Registro eliminado correctamente de la tabla", nombre_tabla)
     except sqlite3.Error as error:
         print("Error al eliminar datos:", error)
-    finally:
-        conexion.close()
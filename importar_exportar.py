@@ -0,0 +1,204 @@
+"""
+Importación y exportación masiva de tablas en CSV o JSONL.
+
+Las tablas y columnas salen de SCHEMAS (esquema.py); al importar se aplican
+las mismas reglas que validar_datos, pero por lotes (validar_lote).
+Las filas se procesan con generadores: nunca hay más de un lote en memoria.
+
+Uso:
+    python importar_exportar.py exportar Boleto boletos.csv
+    python importar_exportar.py exportar Pago pagos.jsonl --formato jsonl
+    python importar_exportar.py importar Cliente clientes.csv --tamano-lote 1000
+    python importar_exportar.py importar Ruta rutas.jsonl --upsert --rechazos rechazos.jsonl
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+
+import esquema
+import funciones_crud
+from esquema import SCHEMAS
+from validaciones import validar_lote
+
+
+# =========================================
+# LECTURA / ESCRITURA DE ARCHIVOS
+# =========================================
+def _formato_de(ruta, formato):
+    """Devuelve el formato indicado o lo deduce de la extensión del archivo."""
+    if formato:
+        return formato
+    return "jsonl" if ruta.lower().endswith((".jsonl", ".json")) else "csv"
+
+
+def leer_filas(archivo, formato):
+    """Generador de diccionarios columna -> valor desde un archivo CSV o JSONL."""
+    if formato == "csv":
+        for fila in csv.DictReader(archivo):
+            yield fila
+    else:
+        for linea in archivo:
+            linea = linea.strip()
+            if linea:
+                yield json.loads(linea)
+
+
+def _lotes(filas, tamano_lote):
+    """Agrupa un generador de filas en listas de tamano_lote elementos."""
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _tipos_enteros(tabla):
+    """Columnas declaradas INTEGER en la tabla (para convertir los textos del CSV)."""
+    with funciones_crud.obtener_conexion() as conexion:
+        info = conexion.execute(f'PRAGMA table_info("{tabla}")').fetchall()
+    return {fila[1] for fila in info if "INT" in (fila[2] or "").upper()}
+
+
+def _normalizar(fila, columnas, enteros):
+    """Deja solo las columnas conocidas, convierte "" en None y los enteros a int."""
+    datos = {}
+    for col in columnas:
+        if col not in fila:
+            continue
+        val = fila[col]
+        if isinstance(val, str):
+            val = val.strip()
+            if val == "":
+                val = None
+            elif col in enteros:
+                try:
+                    val = int(val)
+                except ValueError:
+                    pass
+        datos[col] = val
+    return datos
+
+
+# =========================================
+# EXPORTAR
+# =========================================
+def exportar(tabla, ruta, formato=None, tamano_lote=funciones_crud.TAMANO_LOTE):
+    """
+    Exporta la tabla completa (id + columnas de SCHEMAS) a un archivo CSV o JSONL.
+    Retorna la cantidad de filas escritas.
+    """
+    formato = _formato_de(ruta, formato)
+    columnas = ["id"] + SCHEMAS[tabla]
+    total = 0
+    inicio = time.perf_counter()
+    with open(ruta, "w", encoding="utf-8", newline="") as archivo:
+        escritor = csv.writer(archivo) if formato == "csv" else None
+        if escritor:
+            escritor.writerow(columnas)
+        for lote in funciones_crud.iterar_registros(tabla, columnas, tamano_lote=tamano_lote):
+            if escritor:
+                escritor.writerows(lote)
+            else:
+                archivo.writelines(json.dumps(dict(zip(columnas, fila)), ensure_ascii=False) + "\n" for fila in lote)
+            total += len(lote)
+    duracion = time.perf_counter() - inicio
+    print(f"Exportadas {total} filas de {tabla} a {ruta} en {duracion:.2f} s ({_por_segundo(total, duracion):.0f} filas/s)")
+    return total
+
+
+# =========================================
+# IMPORTAR
+# =========================================
+def importar(tabla, ruta, formato=None, tamano_lote=funciones_crud.TAMANO_LOTE, upsert=False, ruta_rechazos=None):
+    """
+    Importa un archivo CSV o JSONL a la tabla, validando y escribiendo por lotes.
+    Se aceptan las columnas de SCHEMAS más "id" (si viene, se conserva).
+    Retorna un diccionario con filas leídas, insertadas, rechazadas, duración y filas/s.
+    """
+    formato = _formato_de(ruta, formato)
+    columnas = ["id"] + SCHEMAS[tabla]
+    enteros = _tipos_enteros(tabla)
+    resumen = {"tabla": tabla, "leidas": 0, "insertadas": 0, "rechazadas": 0}
+    rechazos = open(ruta_rechazos, "w", encoding="utf-8") if ruta_rechazos else None
+    inicio = time.perf_counter()
+    try:
+        with open(ruta, encoding="utf-8", newline="") as archivo:
+            filas = (_normalizar(f, columnas, enteros) for f in leer_filas(archivo, formato))
+            for numero, lote in enumerate(_lotes(filas, tamano_lote)):
+                errores = validar_lote(tabla, lote, permitir_existentes=upsert)
+                validas = [f for f, e in zip(lote, errores) if e is None]
+                descartadas = [(resumen["leidas"] + i, f, e) for i, (f, e) in enumerate(zip(lote, errores)) if e is not None]
+                resumen["leidas"] += len(lote)
+                if validas:
+                    # Las columnas del lote son las que traen las filas (puede venir o no "id")
+                    cols_lote = [c for c in columnas if any(c in f for f in validas)]
+                    if upsert:
+                        res = funciones_crud.upsert_lote(tabla, cols_lote, validas, tamano_lote=tamano_lote)
+                    else:
+                        res = funciones_crud.insertar_lote(tabla, cols_lote, validas, tamano_lote=tamano_lote)
+                    resumen["insertadas"] += res.get("afectadas", 0)
+                    # Filas que la base rechazó (claves foráneas, NOT NULL, ...)
+                    for detalle in res.get("lotes", []):
+                        for err in detalle["errores"]:
+                            descartadas.append((None, validas[err["fila"]], err["error"]))
+                    if res.get("error"):
+                        descartadas.extend((None, f, res["error"]) for f in validas)
+                resumen["rechazadas"] += len(descartadas)
+                if rechazos:
+                    for posicion, fila, error in descartadas:
+                        rechazos.write(json.dumps({"fila": posicion, "datos": fila, "error": error}, ensure_ascii=False) + "\n")
+                duracion = time.perf_counter() - inicio
+                print(f"  lote {numero}: {resumen['leidas']} leídas, {resumen['insertadas']} insertadas, "
+                      f"{resumen['rechazadas']} rechazadas ({_por_segundo(resumen['leidas'], duracion):.0f} filas/s)", file=sys.stderr)
+    finally:
+        if rechazos:
+            rechazos.close()
+    resumen["segundos"] = time.perf_counter() - inicio
+    resumen["filas_por_segundo"] = _por_segundo(resumen["leidas"], resumen["segundos"])
+    print(f"Importadas {resumen['insertadas']} de {resumen['leidas']} filas en {tabla} "
+          f"({resumen['rechazadas']} rechazadas) en {resumen['segundos']:.2f} s "
+          f"-> {resumen['filas_por_segundo']:.0f} filas/s")
+    return resumen
+
+
+def _por_segundo(filas, segundos):
+    return filas / segundos if segundos > 0 else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bd", help="archivo de base de datos (por defecto " + funciones_crud.RUTA_BD + ")")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_exp = sub.add_parser("exportar", help="exportar una tabla a CSV/JSONL")
+    p_exp.add_argument("tabla", choices=list(SCHEMAS.keys()))
+    p_exp.add_argument("archivo")
+    p_exp.add_argument("--formato", choices=["csv", "jsonl"])
+    p_exp.add_argument("--tamano-lote", type=int, default=funciones_crud.TAMANO_LOTE)
+
+    p_imp = sub.add_parser("importar", help="importar un CSV/JSONL a una tabla")
+    p_imp.add_argument("tabla", choices=list(SCHEMAS.keys()))
+    p_imp.add_argument("archivo")
+    p_imp.add_argument("--formato", choices=["csv", "jsonl"])
+    p_imp.add_argument("--tamano-lote", type=int, default=funciones_crud.TAMANO_LOTE)
+    p_imp.add_argument("--upsert", action="store_true", help="actualizar filas existentes según las columnas UNIQUE")
+    p_imp.add_argument("--rechazos", help="archivo JSONL donde guardar las filas rechazadas")
+
+    args = parser.parse_args(argv)
+    if args.bd:
+        funciones_crud.configurar_pool(ruta_bd=args.bd)
+    esquema.cargar_desde_base()
+    if args.comando == "exportar":
+        exportar(args.tabla, args.archivo, args.formato, args.tamano_lote)
+    else:
+        importar(args.tabla, args.archivo, args.formato, args.tamano_lote, args.upsert, args.rechazos)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# =========================================
+# INSTRUMENTACIÓN DE CONSULTAS
+# =========================================
+# Mide cada sentencia que pasa por funciones_crud (y el SQL propio de main.py):
+#   - duración de la ejecución, filas devueltas/afectadas y espera por una
+#     conexión del pool;
+#   - si la sentencia tarda más que UMBRAL_LENTA se guarda su EXPLAIN QUERY PLAN
+#     y se marca si recorre alguna tabla completa (SCAN sin índice);
+#   - cada medición se agrega a las muestras en memoria con las que se calculan
+#     p50/p95/p99 por tabla y operación (ver pages/1_Diagnostico.py) y como una
+#     línea JSON a RUTA_LOG. Las líneas se juntan en memoria y se escriben de a
+#     LOG_CADA_LINEAS (o cada LOG_CADA_SEGUNDOS), fuera del candado de las
+#     muestras: medir una sentencia no espera al disco.
+# Los valores de los parámetros no se registran (pueden traer RUT, correos...),
+# solo su cantidad.
+
+ACTIVA = True
+RUTA_LOG = "registro_consultas.jsonl"  # None = no escribir archivo
+MAX_BYTES_LOG = 10 * 1024 * 1024  # al superarlo el log se renombra a .1 y se empieza otro
+LOG_CADA_LINEAS = 200  # líneas juntadas en memoria antes de escribirlas al log
+LOG_CADA_SEGUNDOS = 2.0  # o cada tantos segundos, lo que ocurra primero
+UMBRAL_LENTA = 0.05  # segundos; sobre este tiempo se captura el plan de ejecución
+MAX_MUESTRAS = 5000  # duraciones guardadas por (tabla, operación) para los percentiles
+MAX_LENTAS = 200  # últimas sentencias lentas guardadas en memoria
+
+_candado = threading.Lock()
+_muestras = {}  # (tabla, operacion) -> {"duraciones": deque, "esperas": deque, "llamadas", "filas", "errores", "lentas", "escaneos"}
+_lentas = deque(maxlen=MAX_LENTAS)
+_planes = {}  # sql -> (plan, tablas_escaneadas): el plan de una misma sentencia se captura una vez
+_archivo = None
+_candado_archivo = threading.Lock()  # escritura y rotación del archivo de log
+_pendientes = []  # líneas del log todavía no escritas (con _candado_pendientes)
+_candado_pendientes = threading.Lock()
+_ultimo_volcado = time.monotonic()
+_observadores = []  # funciones(registro, valores) llamadas con cada medición (ver observar)
+
+
+def configurar(activa=None, ruta_log=None, umbral_lenta=None):
+    """
+    Cambia la configuración de la instrumentación.
+    Parámetros:
+        activa: False para no medir nada (medir() queda sin costo)
+        ruta_log: archivo JSONL de salida ("" para no escribir archivo)
+        umbral_lenta: segundos desde los que una sentencia se considera lenta
+    """
+    global ACTIVA, RUTA_LOG, UMBRAL_LENTA
+    if activa is not None:
+        ACTIVA = activa
+    if ruta_log is not None:
+        _cerrar_archivo()
+        RUTA_LOG = ruta_log or None
+    if umbral_lenta is not None:
+        UMBRAL_LENTA = umbral_lenta
+
+
+def observar(funcion):
+    """
+    Registra funcion(registro, valores), que recibe cada medición junto con los
+    valores de sus parámetros (que no van al log). La usa asesor_indices.py para
+    capturar la carga de una sesión.
+    """
+    if funcion not in _observadores:
+        _observadores.append(funcion)
+
+
+def dejar_de_observar(funcion):
+    if funcion in _observadores:
+        _observadores.remove(funcion)
+
+
+def reiniciar():
+    """Borra las muestras y sentencias lentas en memoria (el archivo de log no se toca)."""
+    with _candado:
+        _muestras.clear()
+        _lentas.clear()
+        _planes.clear()
+
+
+# =========================================
+# PLAN DE EJECUCIÓN
+# =========================================
+def plan_consulta(conexion, consulta_sql, valores=()):
+    """
+    Ejecuta EXPLAIN QUERY PLAN de la sentencia.
+    Retorna (lista de pasos del plan, lista de tablas recorridas completas).
+    Un paso "SCAN tabla" sin "USING ... INDEX" es un recorrido completo de la tabla;
+    "SCAN tabla USING COVERING INDEX" recorre el índice completo y también se informa.
+    """
+    pasos = [fila[3] for fila in conexion.execute("EXPLAIN QUERY PLAN " + consulta_sql, tuple(valores))]
+    escaneos = []
+    for paso in pasos:
+        if paso.startswith("SCAN ") and not paso.startswith("SCAN CONSTANT ROW"):
+            tabla = paso.split()[1]
+            if "USING INTEGER PRIMARY KEY" not in paso and tabla not in escaneos:
+                escaneos.append(tabla)
+    return pasos, escaneos
+
+
+def _capturar_plan(conexion, consulta_sql, valores):
+    with _candado:
+        guardado = _planes.get(consulta_sql)
+    if guardado is not None:
+        return guardado
+    try:
+        guardado = plan_consulta(conexion, consulta_sql, valores)
+    except Exception as error:  # por ejemplo, sentencias que no admiten EXPLAIN
+        guardado = ([f"sin plan: {error}"], [])
+    with _candado:
+        _planes[consulta_sql] = guardado
+    return guardado
+
+
+# =========================================
+# MEDICIÓN
+# =========================================
+@contextmanager
+def medir(operacion, tabla, consulta_sql, valores=(), conexion=None, espera=0.0):
+    """
+    Mide una sentencia ejecutada dentro del bloque "with":
+        with medir("consultar", "Cliente", sql, valores, conexion, espera) as medicion:
+            filas = conexion.execute(sql, valores).fetchall()
+            medicion["filas"] = len(filas)
+    Parámetros:
+        operacion: nombre de la operación (consultar, insertar, eliminar...)
+        tabla: tabla principal de la sentencia
+        consulta_sql, valores: la sentencia y sus parámetros
+        conexion: conexión donde se ejecuta (para capturar el plan si es lenta)
+        espera: segundos que se esperó por la conexión del pool
+    El bloque debe poner en medicion["filas"] las filas devueltas o afectadas.
+    """
+    medicion = {"filas": None}
+    if not ACTIVA:
+        yield medicion
+        return
+    inicio = time.perf_counter()
+    error = None
+    try:
+        yield medicion
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        duracion = time.perf_counter() - inicio
+        plan = escaneos = None
+        if duracion >= UMBRAL_LENTA and conexion is not None and error is None:
+            plan, escaneos = _capturar_plan(conexion, consulta_sql, valores)
+        registro = {
+            "ts": round(time.time(), 3),
+            "operacion": operacion,
+            "tabla": tabla,
+            "sql": consulta_sql,
+            "parametros": len(valores) if valores else 0,
+            "duracion_ms": round(duracion * 1000, 3),
+            "espera_ms": round(espera * 1000, 3),
+            "filas": medicion["filas"],
+            "error": str(error) if error is not None else None,
+            "lenta": duracion >= UMBRAL_LENTA,
+            "plan": plan,
+            "escaneo_completo": escaneos,
+        }
+        _registrar(registro)
+        _encolar_log(registro)
+        for observador in tuple(_observadores):
+            try:
+                observador(registro, valores)
+            except Exception:
+                pass  # un observador nunca debe hacer fallar una operación
+
+
+def _registrar(registro):
+    clave = (registro["tabla"], registro["operacion"])
+    with _candado:
+        datos = _muestras.get(clave)
+        if datos is None:
+            datos = _muestras[clave] = {
+                "duraciones": deque(maxlen=MAX_MUESTRAS), "esperas": deque(maxlen=MAX_MUESTRAS),
+                "llamadas": 0, "filas": 0, "errores": 0, "lentas": 0, "escaneos": 0,
+            }
+        datos["duraciones"].append(registro["duracion_ms"])
+        datos["esperas"].append(registro["espera_ms"])
+        datos["llamadas"] += 1
+        datos["filas"] += registro["filas"] or 0
+        datos["errores"] += registro["error"] is not None
+        if registro["lenta"]:
+            datos["lentas"] += 1
+            datos["escaneos"] += bool(registro["escaneo_completo"])
+            _lentas.append(registro)
+
+
+def _encolar_log(registro):
+    """Junta la línea del registro; escribe el lote al llegar a LOG_CADA_LINEAS o LOG_CADA_SEGUNDOS."""
+    if not RUTA_LOG:
+        return
+    linea = json.dumps(registro, ensure_ascii=False) + "\n"
+    with _candado_pendientes:
+        _pendientes.append(linea)
+        toca = len(_pendientes) >= LOG_CADA_LINEAS or time.monotonic() - _ultimo_volcado >= LOG_CADA_SEGUNDOS
+    if toca:
+        volcar_log()
+
+
+def volcar_log():
+    """Escribe en RUTA_LOG las líneas juntadas en memoria (también al terminar el proceso)."""
+    global _archivo, _ultimo_volcado
+    with _candado_archivo:
+        with _candado_pendientes:
+            lineas = _pendientes[:]
+            _pendientes.clear()
+            _ultimo_volcado = time.monotonic()
+        if not lineas or not RUTA_LOG:
+            return
+        try:
+            if _archivo is None:
+                _archivo = open(RUTA_LOG, "a", encoding="utf-8")
+            _archivo.writelines(lineas)
+            _archivo.flush()
+            if _archivo.tell() > MAX_BYTES_LOG:
+                _archivo.close()
+                _archivo = None
+                os.replace(RUTA_LOG, RUTA_LOG + ".1")
+        except OSError:
+            pass  # el log es solo diagnóstico: nunca debe hacer fallar una operación
+
+
+atexit.register(volcar_log)
+
+
+def _cerrar_archivo():
+    global _archivo
+    volcar_log()
+    with _candado_archivo:
+        if _archivo is not None:
+            _archivo.close()
+            _archivo = None
+
+
+# =========================================
+# RESÚMENES
+# =========================================
+def _percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def _resumir(clave, duraciones, esperas, llamadas, filas, errores, lentas, escaneos):
+    duraciones = sorted(duraciones)
+    esperas = sorted(esperas)
+    return {
+        "tabla": clave[0],
+        "operacion": clave[1],
+        "llamadas": llamadas,
+        "p50_ms": _percentil(duraciones, 50),
+        "p95_ms": _percentil(duraciones, 95),
+        "p99_ms": _percentil(duraciones, 99),
+        "max_ms": duraciones[-1] if duraciones else 0.0,
+        "espera_p95_ms": _percentil(esperas, 95),
+        "filas_promedio": round(filas / llamadas, 1) if llamadas else 0.0,
+        "errores": errores,
+        "lentas": lentas,
+        "escaneos_completos": escaneos,
+    }
+
+
+def percentiles():
+    """Lista de resúmenes (p50/p95/p99, llamadas, lentas...) por tabla y operación, desde memoria."""
+    with _candado:
+        copia = {clave: dict(datos, duraciones=list(datos["duraciones"]), esperas=list(datos["esperas"]))
+                 for clave, datos in _muestras.items()}
+    resumen = [_resumir(clave, **datos) for clave, datos in copia.items()]
+    return sorted(resumen, key=lambda r: r["p95_ms"], reverse=True)
+
+
+def lentas(cantidad=50):
+    """Las últimas sentencias lentas (más recientes primero), con su plan y escaneos completos."""
+    with _candado:
+        return list(_lentas)[-cantidad:][::-1]
+
+
+def percentiles_desde_log(ruta=None):
+    """Igual que percentiles(), pero calculado desde el archivo JSONL (incluye sesiones anteriores)."""
+    volcar_log()
+    ruta = ruta or RUTA_LOG
+    acumulado = {}
+    if not ruta or not os.path.exists(ruta):
+        return []
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                continue  # línea cortada (por ejemplo, si el proceso terminó mientras escribía)
+            clave = (registro.get("tabla"), registro.get("operacion"))
+            datos = acumulado.setdefault(clave, {"duraciones": [], "esperas": [], "llamadas": 0, "filas": 0, "errores": 0, "lentas": 0, "escaneos": 0})
+            datos["duraciones"].append(registro.get("duracion_ms", 0.0))
+            datos["esperas"].append(registro.get("espera_ms", 0.0))
+            datos["llamadas"] += 1
+            datos["filas"] += registro.get("filas") or 0
+            datos["errores"] += registro.get("error") is not None
+            datos["lentas"] += bool(registro.get("lenta"))
+            datos["escaneos"] += bool(registro.get("escaneo_completo"))
+    resumen = [_resumir(clave, **datos) for clave, datos in acumulado.items()]
+    return sorted(resumen, key=lambda r: r["p95_ms"], reverse=True)
@@ -1,41 +1,19 @@
 import streamlit as st
-from typing import Any, Dict, List, Optional, Tuple
-import sqlite3
-import re
+from typing import Any, Dict
 
 # Interfaz CRUD muy simple, todo en español y con menos código.
 # Usa tu módulo `funciones_crud.py` existente para las operaciones.
 
 st.set_page_config(page_title="Interfaz transportes", layout="wide")
 
-# -- Definición mínima de esquemas: solo los nombres de campos que usa la UI
-SCHEMAS = {
-    "Boleto": ["codigo", "servicio_id", "cliente_id", "asiento", "precio"],
-    "Bus": ["patente", "modelo", "capacidad"],
-    "Chofer": ["rut", "nombre", "telefono", "email"],
-    "Cliente": ["rut", "nombre", "email", "telefono", "direccion"],
-    "Pago": ["boleto_id", "monto", "fecha_pago", "metodo"],
-    "Parada": ["nombre", "ciudad"],
-    "Ruta": ["codigo", "nombre", "origen", "destino"],
-    "RutaParadas": ["ruta_id", "parada_id", "orden"],
-    "Servicio": ["codigo", "ruta_id", "bus_id", "chofer_id", "fecha_salida", "fecha_llegada"],
-    "Tarifa": ["ruta_id", "nombre", "monto", "fecha_inicio", "fecha_fin"],
-}
-#
-# Metadatos simples extraídos del esquema SQL (NOT NULL / UNIQUE / tipos especiales)
-# Esto permite validar en la UI antes de enviar al DB.
-SCHEMA_META = {
-    "Ruta": {"required": ["codigo", "nombre", "origen", "destino"], "unique": ["codigo"]},
-    "Parada": {"required": ["nombre", "ciudad"], "unique": []},
-    "RutaParadas": {"required": ["ruta_id", "parada_id", "orden"], "unique": []},
-    "Bus": {"required": ["patente", "capacidad"], "unique": ["patente"]},
-    "Chofer": {"required": ["rut", "nombre"], "unique": ["rut"], "types": {"rut": "rut"}},
-    "Cliente": {"required": ["rut", "nombre"], "unique": ["rut"], "types": {"rut": "rut"}},
-    "Servicio": {"required": ["codigo", "ruta_id", "bus_id", "chofer_id", "fecha_salida"], "unique": ["codigo"], "types": {"fecha_salida": "datetime", "fecha_llegada": "datetime"}},
-    "Tarifa": {"required": ["ruta_id", "monto"], "unique": [], "types": {"fecha_inicio": "datetime", "fecha_fin": "datetime"}},
-    "Boleto": {"required": ["codigo", "servicio_id", "cliente_id", "asiento", "precio"], "unique": ["codigo"]},
-    "Pago": {"required": ["boleto_id", "monto", "metodo"], "unique": ["boleto_id"], "types": {"fecha_pago": "datetime"}},
-}
+# -- Esquemas (campos por tabla) y metadatos de validación: ver esquema.py
+import esquema
+import formularios
+from esquema import SCHEMAS
+from operaciones import insertar_registro, buscar_registros, actualizar_registro, eliminar_registro
+from operaciones import planificar_eliminacion, eliminar_en_cascada
+from filtros import OPERADORES, filtro_desde_texto
+from busqueda import COLUMNAS_BUSQUEDA
 
 # --------- Conectar con tu módulo de base de datos --------------------
 try:
@@ -45,6 +23,29 @@ except Exception:
     funciones_crud = None  # type: ignore
     HAS_DB = False
 
+if HAS_DB:
+    import asientos
+    import crud_asincrono
+    import mantenimiento
+    import tarifas
+    # Hilos lectores para las consultas en paralelo; las escrituras solo pasan por el
+    # hilo escritor con crud_asincrono.ENCOLAR_ESCRITURAS
+    crud_asincrono.iniciar()
+    # Índice único de asientos, tablas de resumen (reportes.py), acumulados del tablero,
+    # triggers del diario (si ya se activó) e índices FTS5: se crean una vez por proceso
+    # en un hilo propio (ver mantenimiento.preparar), sin bloquear el primer redibujo
+    preparacion = mantenimiento.preparar()
+    # Optimize, análisis, vacuum, chequeos y respaldo diario en segundo plano: opcional,
+    # apagado por defecto (ver mantenimiento.PROGRAMADOR_EN_APP)
+    if mantenimiento.PROGRAMADOR_EN_APP:
+        mantenimiento.iniciar()
+
+# SCHEMAS/SCHEMA_META se derivan del esquema real de la base (catálogo en caché,
+# solo se vuelve a leer si cambia el esquema); sin base quedan los de respaldo.
+if HAS_DB:
+    esquema.cargar_desde_base()
+    formularios.revisar_esquema()  # los formularios guardados se rearman si cambió el esquema
+
 
 def requiere_db():
     """Mostrar aviso si falta el módulo de base de datos."""
@@ -54,56 +55,73 @@ def requiere_db():
     return True
 
 
-def caster(campo: str, valor: str) -> Any:
-    """Convertir a entero si el nombre del campo sugiere número."""
-    if valor is None or valor == "":
-        return None
-    if any(k in campo.lower() for k in ("id", "monto", "asiento", "precio", "capacidad")):
-        try:
-            return int(valor)
-        except Exception:
-            return valor
-    return valor
-
-
-def is_integer_field(campo: str) -> bool:
-    """Heurística simple para determinar si un campo debe ser integer.
-    Basada en nombres comunes (id, monto, asiento, precio, capacidad, orden).
-    Excluye campos de fecha/hora.
+def _selector_referencia(prefijo: str, tabla: str, campo) -> None:
+    """Selector de una clave foránea: busca en la base por páginas (ver formularios.py).
+    Va fuera del formulario para que la búsqueda responda mientras se escribe; el id
+    elegido queda en st.session_state con la misma key que los demás campos.
     """
-    # Campos que NO deben ser tratados como enteros
-    if any(k in campo.lower() for k in ("fecha", "date", "datetime", "hora", "time")):
-        return False
-    
-    # Campos que SÍ deben ser enteros
-    integer_fields = ("id", "monto", "asiento", "precio", "capacidad", "orden", "codigo")
-    return any(k in campo.lower() for k in integer_fields)
+    clave = f"{prefijo}_{tabla}_{campo.nombre}"
+    col_texto, col_anterior, col_siguiente = st.columns([4, 1, 1])
+    with col_texto:
+        texto = st.text_input(f"{campo.nombre}: buscar en {campo.tabla_ref}", key=f"{clave}_buscar",
+                              placeholder=f"{campo.etiqueta_ref} o id")
+    # Cursores de las páginas visitadas (como el panel de datos); se reinician al cambiar el texto
+    estado = st.session_state.setdefault(f"{clave}_paginas", {"texto": texto, "cursores": [None], "siguiente": None})
+    if estado["texto"] != texto:
+        estado.update(texto=texto, cursores=[None], siguiente=None)
+    with col_anterior:
+        if st.button("◀", key=f"{clave}_anterior", disabled=len(estado["cursores"]) <= 1):
+            estado["cursores"].pop()
+    with col_siguiente:
+        if st.button("▶", key=f"{clave}_siguiente", disabled=estado["siguiente"] is None):
+            estado["cursores"].append(estado["siguiente"])
+    filas, estado["siguiente"] = formularios.opciones_referencia(campo, texto, estado["cursores"][-1])
+    etiquetas = dict(filas)
+    elegido = st.session_state.get(clave)
+    if elegido is not None and elegido not in etiquetas:
+        etiquetas[elegido] = f"id {elegido}"  # lo ya elegido sigue disponible al cambiar de página
+    st.selectbox(campo.nombre + (" *" if campo.requerido and prefijo == "crear" else ""), options=[None] + list(etiquetas),
+                 format_func=lambda i: "(sin elegir)" if i is None else f"{etiquetas[i]} (id {i})", key=clave)
+
+
+def mostrar_campo(prefijo: str, tabla: str, campo) -> None:
+    """Widget de un campo según su especificación (tipo, largo, opciones).
+    En Actualizar (prefijo "upd") los números también son texto: vacío = sin cambio.
+    """
+    clave = f"{prefijo}_{tabla}_{campo.nombre}"
+    actualizar = prefijo == "upd"
+    etiqueta = campo.nombre + (" *" if campo.requerido and not actualizar else "")
+    if campo.tipo == "fecha":
+        st.write(f"**{etiqueta}**")
+        col_fecha, col_hora = st.columns(2)
+        with col_fecha:
+            st.text_input("Fecha (YYYY-MM-DD)", key=clave, placeholder="YYYY-MM-DD")
+        with col_hora:
+            st.text_input("Hora (HH:MM)", key=f"{clave}_hora", placeholder="HH:MM", value=formularios.HORA_POR_DEFECTO)
+    elif campo.tipo == "opciones":
+        vacio = [""] if actualizar or not campo.requerido else []
+        st.selectbox(etiqueta, options=vacio + list(campo.opciones), key=clave)
+    elif campo.tipo == "entero" and not actualizar:
+        st.number_input(etiqueta, min_value=0, step=1, key=clave)
+    else:
+        st.text_input(etiqueta, key=clave, max_chars=campo.largo, placeholder="(sin cambio)" if actualizar else "")
 
 
-def leer_campos(prefijo: str, campos: List[str], tabla: str) -> Dict[str, Any]:
-    """Leer valores desde st.session_state (inputs) y castear.
-    Maneja campos de fecha y hora combinándolos en el formato correcto.
+def leer_campos(prefijo: str, tabla: str, espec) -> Dict[str, Any]:
+    """Leer de st.session_state lo ingresado en cada campo y convertirlo según la especificación.
+    Los errores de conversión se muestran y esos campos se omiten.
     """
-    out: Dict[str, Any] = {}
-    for c in campos:
-        key = f"{prefijo}_{tabla}_{c}"
-        val = st.session_state.get(key, "") if hasattr(st, "session_state") else ""
-        
-        # Si es un campo de fecha, buscar también el campo de hora correspondiente
-        if c in ["fecha_salida", "fecha_llegada"]:
-            # Determinar el campo de hora correspondiente
-            hora_field = "hora_salida" if c == "fecha_salida" else "hora_llegada"
-            hora_key = f"{prefijo}_{tabla}_{hora_field}"
-            hora_val = st.session_state.get(hora_key, "00:00") if hasattr(st, "session_state") else "00:00"
-            
-            # Combinar fecha y hora si la fecha está presente
-            if val:
-                val = f"{val} {hora_val}"
-        
-        v = caster(c, val)
-        if v is not None and v != "":
-            out[c] = v
-    return out
+    valores: Dict[str, Any] = {}
+    for campo in espec.campos:
+        clave = f"{prefijo}_{tabla}_{campo.nombre}"
+        if campo.tipo == "fecha":
+            valores[campo.nombre] = (st.session_state.get(clave, ""), st.session_state.get(f"{clave}_hora", ""))
+        else:
+            valores[campo.nombre] = st.session_state.get(clave)
+    datos, errores = formularios.convertir(espec, valores)
+    for error in errores:
+        st.error(error)
+    return datos
 
 
 def _pretty_result(res: Any) -> str:
@@ -129,261 +147,116 @@ def _pretty_result(res: Any) -> str:
     return str(res)
 
 
-# Wrappers muy simples que llaman a funciones_crud con los parámetros que espera
-def insertar_registro(tabla: str, datos: Dict[str, Any]):
-    if not funciones_crud:
-        return {"error": "no_db", "message": "Módulo funciones_crud no disponible."}
-    # Validar según metadatos
-    valid, msg = validar_datos(tabla, datos, is_update=False)
-    if not valid:
-        return {"error": "validation", "message": msg}
-    cols = list(datos.keys())
-    vals = [datos[c] for c in cols]
-    try:
-        return funciones_crud.insertar(tabla, cols, vals)
-    except sqlite3.IntegrityError as e:
-        # Capturar violaciones de UNIQUE u otras restricciones de integridad
-        return {"error": "unique", "message": str(e)}
-    except Exception as e:
-        return {"error": "db_error", "message": str(e)}
-
-
-def leer_registros(tabla: str, filtros: Optional[Dict[str, Any]], limite: int) -> List[Dict[str, Any]]:
-    cols = ["id"] + SCHEMAS[tabla]
-    condicion = None
-    valores: tuple = ()
-    if filtros:
-        partes = [f"{k} = ?" for k in filtros.keys()]
-        condicion = " AND ".join(partes)
-        valores = tuple(filtros.values())
-    if not funciones_crud:
-        return []
-    try:
-        if condicion:
-            filas = funciones_crud.consultar(tabla, columnas=cols, condicion=condicion, valores_condicion=valores)
-        else:
-            filas = funciones_crud.consultar(tabla, columnas=cols, condicion=None, valores_condicion=())
-    except Exception:
-        return []
-    resultado: List[Dict[str, Any]] = []
-    for row in (filas or [])[:limite]:
-        d = {cols[i]: row[i] for i in range(min(len(cols), len(row)))}
-        resultado.append(d)
-    return resultado
-
-
-def actualizar_registro(tabla: str, id_registro, datos: Dict[str, Any]):
-    condicion = "id = ?"
-    if not funciones_crud:
-        return {"error": "no_db", "message": "Módulo funciones_crud no disponible."}
-    # Validar según metadatos (indicar que es update para permitir same-row unique)
-    valid, msg = validar_datos(tabla, datos, is_update=True, current_id=id_registro)
-    if not valid:
-        return {"error": "validation", "message": msg}
-    try:
-        return funciones_crud.actualizar(tabla, datos, condicion, (id_registro,))
-    except Exception as e:
-        return {"error": "db_error", "message": str(e)}
-
-
-def validar_datos(tabla: str, datos: Dict[str, Any], is_update: bool = False, current_id: Optional[int] = None) -> Tuple[bool, Optional[str]]:
-    """Valida datos contra SCHEMA_META: campos requeridos, formato de RUT, fechas, y unicidad simple.
-    Retorna (True, None) si pasa, o (False, mensaje) si falla.
-    """
-    meta = SCHEMA_META.get(tabla, {})
-    # Required
-    for req in meta.get("required", []):
-        # Si es update y campo no está presente, no lo exigimos
-        if is_update and req not in datos:
-            continue
-        val = datos.get(req)
-        if val is None or (isinstance(val, str) and val.strip() == ""):
-            return False, f"El campo '{req}' es obligatorio para la tabla {tabla}."
-
-    # Tipos especiales
-    types = meta.get("types", {})
-    for field, kind in types.items():
-        if field not in datos:
-            continue
-        val = datos.get(field)
-        if val is None:
-            continue
-        if kind == "rut":
-            # formato 12.345.678-9 o 1.234.567-8; permitir K/k
-            if not re.match(r"^\d{1,2}\.\d{3}\.\d{3}-[\dkK]$", str(val)):
-                return False, f"El campo '{field}' debe tener formato RUT: xx.xxx.xxx-x"
-        if kind == "datetime":
-            s = str(val).strip()
-            # Aceptar YYYY/MM/DD o YYYY/MM/DD HH:MM (ahora con validación de hora)
-            if not (re.match(r"^\d{4}/\d{2}/\d{2}$", s) or re.match(r"^\d{4}/\d{2}/\d{2}\s+\d{2}:\d{2}$", s)):
-                return False, f"El campo '{field}' debe tener formato fecha 'YYYY/MM/DD' o 'YYYY/MM/DD HH:MM'"
-            # Validar formato de hora si está presente
-            if " " in s:
-                fecha_part, hora_part = s.split(" ", 1)
-                if not re.match(r"^\d{2}:\d{2}$", hora_part):
-                    return False, f"El campo '{field}' tiene formato de hora inválido. Use 'HH:MM'"
-
-    # Unicidad: comprobación simple consultando la DB
-    uniques = meta.get("unique", [])
-    if uniques and funciones_crud:
-        for col in uniques:
-            if col not in datos:
-                continue
-            val = datos.get(col)
-            if val is None or (isinstance(val, str) and val == ""):
-                continue
-            try:
-                rows = funciones_crud.consultar(tabla, columnas=["id", col], condicion=f"{col} = ?", valores_condicion=(val,)) or []
-            except Exception:
-                rows = []
-            if not rows:
-                continue
-            # Si es update y la única fila encontrada es la misma id, ok
-            if is_update and current_id is not None:
-                other = [r for r in rows if r[0] != current_id]
-                if other:
-                    return False, f"El valor '{val}' para '{col}' ya existe en {tabla}."
-            else:
-                # insert: cualquier fila existente es conflicto
-                if rows:
-                    return False, f"El valor '{val}' para '{col}' ya existe en {tabla}."
-
-    return True, None
-
-
-def eliminar_registro(tabla: str, id_registro):
-    """
-    Intentamos borrar directamente usando la conexión SQLite para poder
-    capturar errores de integridad (foreign key) y devolver una estructura
-    informativa que la UI puede interpretar.
-    """
-    conn = None
-    try:
-        # Preferir usar la función conectar si está disponible en funciones_crud
-        if funciones_crud and hasattr(funciones_crud, "conectar"):
-            conn = funciones_crud.conectar()
-        else:
-            conn = sqlite3.connect("base_de_datos_transportes.db")
-            conn.execute("PRAGMA foreign_keys = ON")
-
-        cur = conn.cursor()
-        cur.execute(f"DELETE FROM \"{tabla}\" WHERE id = ?", (id_registro,))
-        # Si no se eliminó ninguna fila, el registro no existe
-        if cur.rowcount == 0:
-            conn.commit()
-            return {"deleted": False, "error": "not_found", "message": f"Registro id={id_registro} no encontrado en {tabla}."}
-        conn.commit()
-        return {"deleted": True, "id": id_registro}
-    except sqlite3.IntegrityError as e:
-        # Falló por restricción de clave foránea
-        # Buscar qué tablas contienen referencias a este registro
-        # Si no hay conexión válida, intentar abrir una temporal para buscar dependientes
-        dependientes = None
-        try:
-            if not conn:
-                conn = sqlite3.connect("base_de_datos_transportes.db")
-                conn.execute("PRAGMA foreign_keys = ON")
-            dependientes = _buscar_referencias(conn, tabla, id_registro)
-        except Exception:
-            dependientes = None
-        return {"deleted": False, "error": "foreign_key", "message": str(e), "dependents": dependientes}
-    except sqlite3.Error as e:
-        return {"deleted": False, "error": "db_error", "message": str(e)}
-    finally:
-        if conn:
-            conn.close()
-
-
-def _buscar_referencias(conn: sqlite3.Connection, tabla: str, id_val) -> Dict[str, List[Dict[str, Any]]]:
-    """Busca en la base de datos las filas que referencian a (tabla,id_val).
-    Retorna un dict {tabla_referente: [ {pk: val, col: val, ...}, ... ] }
-    Limitamos a 10 filas por tabla para no sobrecargar la UI.
-    """
-    res: Dict[str, List[Dict[str, Any]]] = {}
-    cur = conn.cursor()
-    # Obtener todas las tablas de usuario
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
-    tablas = [r[0] for r in cur.fetchall()]
-    for t in tablas:
-        try:
-            # PRAGMA foreign_key_list devuelve las FK definidas en la tabla 't'
-            fk_rows = cur.execute(f'PRAGMA foreign_key_list("{t}")').fetchall()
-            # fk_rows columns: (id, seq, table, from, to, on_update, on_delete, match)
-            for fk in fk_rows:
-                ref_table = fk[2]
-                from_col = fk[3]
-                to_col = fk[4]
-                if ref_table == tabla:
-                    # determinar pk de la tabla 't'
-                    info = cur.execute(f'PRAGMA table_info("{t}")').fetchall()
-                    pk_cols = [row[1] for row in info if row[5] > 0]
-                    pk = pk_cols[0] if pk_cols else None
-                    # construir consulta segura: usar nombres ya validados por sqlite_master/pragma
-                    q = f'SELECT * FROM "{t}" WHERE "{from_col}" = ? LIMIT 10'
-                    rows = cur.execute(q, (id_val,)).fetchall()
-                    if rows:
-                        cols = [c[0] for c in cur.description]
-                        lista = []
-                        for row in rows:
-                            d = {cols[i]: row[i] for i in range(len(cols))}
-                            lista.append(d)
-                        res[t] = lista
-        except Exception:
-            # ignorar errores en tablas individuales y continuar
-            continue
-    return res
-
-
 # ----------------------- Interfaz (muy simple) -------------------------
 st.title("Interfaz transportes")
 st.write("Interfaz mínima. Selecciona operación y tabla en la barra lateral.")
+if HAS_DB and not preparacion["lista"]:
+    st.info("Preparando índices y resúmenes de la base (solo la primera vez; en una base grande puede tardar). "
+            "La búsqueda rápida queda disponible al terminar.")
+elif HAS_DB and preparacion["errores"]:
+    st.warning("No se pudo preparar: " + "; ".join(f"{paso}: {error}" for paso, error in preparacion["errores"].items()))
 
 with st.sidebar:
     operacion = st.selectbox("Operación", ["Crear", "Leer", "Actualizar", "Eliminar"])
     tabla = st.selectbox("Tabla", options=list(SCHEMAS.keys()))
+    if HAS_DB:
+        # Contadores de la caché de consultas: muestran si las recargas evitan el disco
+        with st.expander("Caché de consultas"):
+            stats = funciones_crud.estadisticas_cache()
+            st.caption(f"Aciertos: {stats['aciertos']} — Fallos: {stats['fallos']} — Tasa: {stats['tasa_aciertos']:.0%}")
+            st.caption(f"Entradas: {stats['entradas']} ({stats['bytes'] / 1024:.0f} KiB) — Invalidaciones: {stats['invalidaciones']}")
+        # Búsqueda por nombre, email, dirección o ciudad mientras se escribe (índice FTS5)
+        with st.expander("Búsqueda rápida", expanded=True):
+            tabla_busqueda = st.selectbox("Buscar en", options=list(COLUMNAS_BUSQUEDA), key="busqueda_tabla")
+            texto_busqueda = st.text_input("Nombre, email, ciudad...", key="busqueda_texto", placeholder="ej: juan pe")
+            if texto_busqueda and not preparacion["lista"]:
+                st.caption("Preparando los índices de búsqueda...")
+            elif texto_busqueda:
+                encontrados = funciones_crud.buscar_texto(tabla_busqueda, texto_busqueda, limite=10)
+                cols_busqueda = ["id"] + list(COLUMNAS_BUSQUEDA[tabla_busqueda])
+                if encontrados:
+                    st.table([dict(zip(cols_busqueda, fila)) for fila in encontrados])
+                else:
+                    st.caption("Sin resultados.")
 
 col1, col2 = st.columns(2)
 
+# Panel derecho primero: sus controles definen la consulta que se lanza en segundo plano
+vista_futuro = None
+with col2:
+    st.header("Datos desde la base de datos")
+    # Con el panel oculto no se consulta ninguna tabla
+    mostrar_vista = st.checkbox("Mostrar tabla", value=True, key="view_visible")
+    # Selector independiente para ver tablas en el panel derecho
+    try:
+        default_idx = list(SCHEMAS.keys()).index(tabla)
+    except Exception:
+        default_idx = 0
+    if mostrar_vista:
+        view_table = st.selectbox("Tabla a ver", options=list(SCHEMAS.keys()), index=default_idx, key="view_table")
+        st.subheader(f"Tabla: {view_table}")
+
+    if not mostrar_vista:
+        st.caption("Tabla oculta: no se consulta la base.")
+    elif not HAS_DB:
+        st.info("Módulo `funciones_crud.py` no disponible: no se pueden mostrar datos en vivo.")
+    else:
+        # Límite visible configurable
+        limite_vista = st.number_input("Filas a mostrar", min_value=1, max_value=100, value=10, key="view_limit")
+        # Paginación por clave (keyset): se guarda el último id de cada página visitada,
+        # así cada página se pide con "id > ?" y LIMIT sin recorrer las anteriores.
+        clave_cursores = f"view_cursores_{view_table}"
+        if clave_cursores not in st.session_state:
+            st.session_state[clave_cursores] = [0]
+        cursores = st.session_state[clave_cursores]
+        nav_anterior, nav_siguiente = st.columns(2)
+        with nav_anterior:
+            if st.button("◀ Anterior", key=f"view_prev_{view_table}", disabled=len(cursores) <= 1):
+                cursores.pop()
+        with nav_siguiente:
+            if st.button("Siguiente ▶", key=f"view_next_{view_table}", disabled=not st.session_state.get(f"view_hay_mas_{view_table}")):
+                cursores.append(st.session_state.get(f"view_ultimo_id_{view_table}", cursores[-1]))
+        # La consulta del panel corre en un hilo lector (crud_asincrono) mientras se
+        # resuelve el formulario de la izquierda; el resultado se muestra al final.
+        # Se pide una fila extra solo para saber si existe una página siguiente.
+        cols_vista = ["id"] + SCHEMAS.get(view_table, [])
+        vista_futuro = crud_asincrono.en_segundo_plano(
+            funciones_crud.consultar, view_table, columnas=cols_vista, limite=int(limite_vista) + 1, despues_de_id=cursores[-1]
+        )
+
+
 with col1:
     st.header(operacion)
 
     if operacion == "Crear":
-        with st.form("form_crear"):
-            for f in SCHEMAS[tabla]:
-                # CORREGIDO: Agregar tabla a la key
-                key = f"crear_{tabla}_{f}"
-                if is_integer_field(f):
-                    st.number_input(f, min_value=0, step=1, key=key)
-                else:
-                    if f == "fecha_salida":
-                        st.write("**Fecha y Hora de Salida**")
-                        col_fecha, col_hora = st.columns(2)
-                        with col_fecha:
-                            st.text_input("Fecha (YYYY/MM/DD)", key=key, placeholder="YYYY/MM/DD")
-                        with col_hora:
-                            st.text_input("Hora (HH:MM)", key=f"crear_{tabla}_hora_salida", placeholder="HH:MM", value="00:00")
-                    elif f == "fecha_llegada":
-                        st.write("**Fecha y Hora de Llegada**")
-                        col_fecha, col_hora = st.columns(2)
-                        with col_fecha:
-                            st.text_input("Fecha (YYYY/MM/DD)", key=key, placeholder="YYYY/MM/DD")
-                        with col_hora:
-                            st.text_input("Hora (HH:MM)", key=f"crear_{tabla}_hora_llegada", placeholder="HH:MM", value="00:00")
+        if tabla == "Boleto" and HAS_DB:
+            # Disponibilidad de asientos antes de vender (fuera del formulario para que responda al instante)
+            with st.expander("Asientos libres por servicio"):
+                servicio_consulta = st.number_input("Servicio (id)", min_value=0, value=0, step=1, key="asientos_servicio")
+                if servicio_consulta:
+                    info = asientos.resumen_servicio(int(servicio_consulta))
+                    if info is None:
+                        st.warning("No existe ese servicio.")
                     else:
-                        # Para otros campos de fecha genéricos
-                        if any(k in f.lower() for k in ("fecha", "date", "datetime")) and f not in ["fecha_salida", "fecha_llegada"]:
-                            st.write(f"**{f}**")
-                            col_fecha, col_hora = st.columns(2)
-                            with col_fecha:
-                                st.text_input("Fecha (YYYY/MM/DD)", key=key, placeholder="YYYY/MM/DD")
-                            with col_hora:
-                                hora_field = f.replace("fecha", "hora")
-                                st.text_input("Hora (HH:MM)", key=f"crear_{tabla}_{hora_field}", placeholder="HH:MM", value="00:00")
+                        st.caption(f"Capacidad {info['capacidad']} — vendidos {info['vendidos']} — libres {info['libres']}")
+                        # Precio 0 en el formulario = se cobra esta tarifa (ver tarifas.py)
+                        tarifa = tarifas.precio_servicio(int(servicio_consulta))
+                        if tarifa:
+                            st.caption(f"Tarifa vigente: {tarifa['nombre'] or 'sin nombre'} — ${tarifa['monto']} (precio 0 = usar esta tarifa)")
                         else:
-                            st.text_input(f, key=key)
+                            st.caption("Sin tarifa vigente en la fecha del servicio: ingrese el precio.")
+                        st.write(", ".join(str(n) for n in asientos.asientos_libres(int(servicio_consulta))) or "Sin asientos libres.")
+        # Widgets armados desde el esquema (formularios.py): tipos, largos, opciones y claves foráneas
+        espec = formularios.formulario(tabla)
+        for campo in espec.referencias:
+            _selector_referencia("crear", tabla, campo)
+        with st.form("form_crear"):
+            for campo in espec.campos:
+                if campo.tipo != "referencia":
+                    mostrar_campo("crear", tabla, campo)
             enviar = st.form_submit_button("Crear")
         if enviar:
-            datos = leer_campos("crear", SCHEMAS[tabla], tabla)
+            datos = leer_campos("crear", tabla, espec)
             if not datos:
                 st.info("No se ingresaron datos.")
             elif requiere_db():
@@ -397,6 +270,8 @@ with col1:
                         st.error(f"Validación: {msg}")
                     elif err == "unique":
                         st.error("Error: valor duplicado para un campo único. " + str(msg))
+                    elif err in ("ocupado", "lleno"):
+                        st.error(f"Asiento no disponible: {msg}")
                     elif err == "no_db":
                         st.error("Error: módulo de base de datos no disponible.")
                         st.write(res)
@@ -409,60 +284,53 @@ with col1:
 
     elif operacion == "Leer":
         with st.form("form_leer"):
-            filtros: Dict[str, Any] = {}
-            for f in SCHEMAS[tabla]:
-                # CORREGIDO: Agregar tabla a la key
-                key = f"leer_{tabla}_{f}"
-                if is_integer_field(f):
-                    # Usamos 0 como sentinel "sin filtro" (IDs/autoincrement empiezan en 1)
-                    filtros[f] = st.number_input(f, min_value=0, value=0, step=1, key=key)
-                else:
-                    filtros[f] = st.text_input(f, key=key)
+            # Un operador y un valor por campo; campo vacío = sin filtro (ver filtros.py)
+            filtros_texto: Dict[str, Any] = {}
+            for f in ["id"] + SCHEMAS[tabla]:
+                col_op, col_valor = st.columns([1, 2])
+                with col_op:
+                    op = st.selectbox(f, options=list(OPERADORES), format_func=OPERADORES.get, key=f"leer_{tabla}_{f}_op")
+                with col_valor:
+                    valor = st.text_input(f"Valor de {f}", key=f"leer_{tabla}_{f}", label_visibility="hidden")
+                filtros_texto[f] = (op, valor)
+            col_orden, col_desc = st.columns([2, 1])
+            with col_orden:
+                orden = st.selectbox("Ordenar por", options=["id"] + SCHEMAS[tabla], key=f"leer_{tabla}_orden")
+            with col_desc:
+                descendente = st.checkbox("Descendente", key=f"leer_{tabla}_desc")
             limite = st.number_input("Límite", min_value=1, value=20, key=f"leer_{tabla}_limite")
             enviar = st.form_submit_button("Buscar")
-        if enviar:
-            filt = {k: caster(k, v) for k, v in filtros.items() if v}
-            if requiere_db():
-                rows = leer_registros(tabla, filt or None, int(limite))
-                st.write(f"Resultados: {len(rows)}")
-                st.table(rows)
+        if enviar and requiere_db():
+            try:
+                filtros_lista = [fl for fl in (filtro_desde_texto(k, op, v) for k, (op, v) in filtros_texto.items()) if fl]
+            except ValueError as e:
+                filtros_lista = None
+                st.error(str(e))
+            if filtros_lista is not None:
+                res = buscar_registros(tabla, filtros_lista, orden, descendente, int(limite))
+                if res.get("error"):
+                    st.error(_pretty_result(res))
+                else:
+                    st.write(f"Resultados: {len(res['filas'])}")
+                    indices = ", ".join(res["indices"]) or "ninguno"
+                    if res["escaneo_completo"]:
+                        st.warning(f"Índice usado: {indices} — recorre completa: {', '.join(res['escaneo_completo'])}")
+                    else:
+                        st.caption(f"Índice usado: {indices}" + (" (ordena en memoria)" if res["ordena_en_memoria"] else ""))
+                    with st.expander("Plan de ejecución"):
+                        st.text("\n".join(res["plan"]))
+                    st.table(res["filas"])
 
     elif operacion == "Actualizar":
+        espec = formularios.formulario(tabla)
+        for campo in espec.referencias:
+            _selector_referencia("upd", tabla, campo)
         with st.form("form_actualizar"):
             # CORREGIDO: Agregar tabla a la key del ID
             id_reg = st.number_input("ID del registro", min_value=0, value=0, step=1, key=f"upd_{tabla}_id")
-            for f in SCHEMAS[tabla]:
-                # CORREGIDO: Agregar tabla a la key
-                key = f"upd_{tabla}_{f}"
-                if is_integer_field(f):
-                    st.number_input(f, min_value=0, step=1, key=key)
-                else:
-                    if f == "fecha_salida":
-                        st.write("**Fecha y Hora de Salida**")
-                        col_fecha, col_hora = st.columns(2)
-                        with col_fecha:
-                            st.text_input("Fecha (YYYY/MM/DD)", key=key, placeholder="YYYY/MM/DD")
-                        with col_hora:
-                            st.text_input("Hora (HH:MM)", key=f"upd_{tabla}_hora_salida", placeholder="HH:MM", value="00:00")
-                    elif f == "fecha_llegada":
-                        st.write("**Fecha y Hora de Llegada**")
-                        col_fecha, col_hora = st.columns(2)
-                        with col_fecha:
-                            st.text_input("Fecha (YYYY/MM/DD)", key=key, placeholder="YYYY/MM/DD")
-                        with col_hora:
-                            st.text_input("Hora (HH:MM)", key=f"upd_{tabla}_hora_llegada", placeholder="HH:MM", value="00:00")
-                    else:
-                        # Para otros campos de fecha genéricos
-                        if any(k in f.lower() for k in ("fecha", "date", "datetime")) and f not in ["fecha_salida", "fecha_llegada"]:
-                            st.write(f"**{f}**")
-                            col_fecha, col_hora = st.columns(2)
-                            with col_fecha:
-                                st.text_input("Fecha (YYYY/MM/DD)", key=key, placeholder="YYYY/MM/DD")
-                            with col_hora:
-                                hora_field = f.replace("fecha", "hora")
-                                st.text_input("Hora (HH:MM)", key=f"upd_{tabla}_{hora_field}", placeholder="HH:MM", value="00:00")
-                        else:
-                            st.text_input(f, key=key)
+            for campo in espec.campos:
+                if campo.tipo != "referencia":
+                    mostrar_campo("upd", tabla, campo)
             enviar = st.form_submit_button("Actualizar")
         if enviar:
             if not id_reg:
@@ -478,7 +346,7 @@ with col1:
                 if id_int is None:
                     pass
                 else:
-                    datos = leer_campos("upd", SCHEMAS[tabla], tabla)
+                    datos = leer_campos("upd", tabla, espec)
                     if not datos:
                         st.info("No hay campos para actualizar.")
                     elif requiere_db():
@@ -525,6 +393,10 @@ with col1:
                             for tname, rows in dependents.items():
                                 st.markdown(f"**Tabla:** {tname}")
                                 st.table(rows)
+                        # Plan del borrado en cascada: se muestra abajo para confirmarlo
+                        plan = planificar_eliminacion(tabla, id_int)
+                        if plan.get("existe"):
+                            st.session_state[f"del_{tabla}_plan"] = plan
                     elif err == "not_found":
                         st.warning("No existe el registro que intentas eliminar.")
                         st.write(res.get("message"))
@@ -534,26 +406,36 @@ with col1:
                     st.success("Eliminado")
                     st.info(_pretty_result(res))
 
-with col2:
-    st.header("Datos desde la base de datos")
-    # Selector independiente para ver tablas en el panel derecho
-    try:
-        default_idx = list(SCHEMAS.keys()).index(tabla)
-    except Exception:
-        default_idx = 0
-    view_table = st.selectbox("Tabla a ver", options=list(SCHEMAS.keys()), index=default_idx, key="view_table")
-    st.subheader(f"Tabla: {view_table}")
+        plan = st.session_state.get(f"del_{tabla}_plan")
+        if plan and HAS_DB:
+            st.subheader(f"Borrado en cascada de {tabla} id={plan['id']}")
+            st.table([{"Tabla": t, "Filas a eliminar": n} for t, n in plan["conteos"].items() if n])
+            col_si, col_no = st.columns(2)
+            if col_si.button(f"Eliminar todo ({plan['total']} filas)", key=f"del_{tabla}_cascada"):
+                res = eliminar_en_cascada(tabla, plan["id"], esperado=plan["conteos"])
+                if res.get("deleted"):
+                    st.session_state.pop(f"del_{tabla}_plan", None)
+                    st.success(f"Eliminadas {res['total']} filas en total.")
+                elif res.get("error") == "changed":
+                    st.session_state[f"del_{tabla}_plan"] = res["plan"]
+                    st.warning(res["message"])
+                else:
+                    st.session_state.pop(f"del_{tabla}_plan", None)
+                    st.error(f"Error al eliminar: {res.get('message')}")
+            if col_no.button("Cancelar", key=f"del_{tabla}_cancelar"):
+                st.session_state.pop(f"del_{tabla}_plan", None)
 
-    if not HAS_DB:
-        st.info("Módulo `funciones_crud.py` no disponible: no se pueden mostrar datos en vivo.")
-    else:
-        # Límite visible configurable
-        limite = st.number_input("Filas a mostrar", min_value=1, max_value=100, value=10, key="view_limit")
+if vista_futuro is not None:
+    with col2:
         try:
-            cols = ["id"] + SCHEMAS.get(view_table, [])
-            filas_db = funciones_crud.consultar(view_table, columnas=cols, condicion=None, valores_condicion=()) or []
-            muestra = [{cols[i]: row[i] for i in range(min(len(cols), len(row)))} for row in filas_db[:int(limite)]]
+            filas_db = vista_futuro.result() or []
+            hay_mas = len(filas_db) > int(limite_vista)
+            filas_db = filas_db[:int(limite_vista)]
+            st.session_state[f"view_hay_mas_{view_table}"] = hay_mas
+            st.session_state[f"view_ultimo_id_{view_table}"] = filas_db[-1][0] if filas_db else cursores[-1]
+            muestra = [{cols_vista[i]: row[i] for i in range(min(len(cols_vista), len(row)))} for row in filas_db]
             if muestra:
+                st.caption(f"Página {len(cursores)}")
                 st.table(muestra)
             else:
                 st.info("La tabla está vacía o no hay filas que mostrar.")
@@ -0,0 +1,558 @@
+"""
+Mantenimiento del archivo SQLite: respaldos en línea, estadísticas del
+planificador, recuperación de espacio y chequeos de integridad.
+
+Tareas (cada una se puede correr sola desde la consola o dejar programada):
+    respaldo     copia con Connection.backup de a PAGINAS_POR_PASO páginas, con
+                 una pausa entre pasos: entre paso y paso la base queda libre,
+                 así un escritor nunca espera más que un paso. La copia se
+                 escribe en un archivo ".parcial" y se renombra al terminar;
+                 se conservan los últimos CONSERVAR_RESPALDOS.
+    optimizar    PRAGMA optimize: vuelve a analizar solo las tablas que cambiaron
+                 mucho desde el último análisis (barato, cada hora).
+    analizar     ANALYZE de todas las tablas (muestreado con LIMITE_ANALISIS filas
+                 por índice), para que el planificador siga eligiendo bien los
+                 índices a medida que crecen Boleto y Pago.
+    vacuum       VACUUM incremental: devuelve al sistema de archivos las páginas
+                 libres (después de borrados grandes). Requiere auto_vacuum =
+                 INCREMENTAL, que se activa una sola vez con "vacuum --completo".
+    checkpoint   vacía el archivo -wal (checkpoint TRUNCATE).
+    integridad   PRAGMA quick_check (o integrity_check) y foreign_key_check.
+
+Además, preparar() crea en segundo plano, una vez por proceso, los índices y
+tablas de resumen que la interfaz necesita (main.py la llama al iniciar).
+
+El programador en el proceso de la interfaz es opcional: main.py solo lo
+inicia con PROGRAMADOR_EN_APP = True. Sin él, las tareas se corren a mano o
+con "pendientes" desde cron / el programador de tareas del sistema.
+
+Cada ejecución queda registrada en la tabla _mantenimiento de la propia base
+(inicio, duración, bytes liberados, detalle), que también sirve al programador
+para saber cuándo toca cada tarea aunque el proceso se reinicie.
+
+Uso:
+    python mantenimiento.py respaldo [archivo]
+    python mantenimiento.py optimizar | analizar | checkpoint
+    python mantenimiento.py vacuum [--completo]
+    python mantenimiento.py integridad [--completa]
+    python mantenimiento.py pendientes      (corre las tareas que ya tocan)
+    python mantenimiento.py historial
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import funciones_crud
+
+# Segundos entre ejecuciones de cada tarea programada
+INTERVALOS = {
+    "optimizar": 3600,
+    "checkpoint": 3600,
+    "vacuum": 86400,
+    "integridad": 86400,
+    "respaldo": 86400,
+    "analizar": 7 * 86400,
+}
+REVISAR_CADA = 60.0  # segundos entre revisiones del programador
+PROGRAMADOR_EN_APP = False  # True: main.py inicia el programador (respaldo diario en respaldos/, etc.)
+
+PAGINAS_POR_PASO = 1024  # páginas copiadas por paso del respaldo (4 MiB con páginas de 4 KiB)
+PAUSA_ENTRE_PASOS = 0.005  # segundos sin bloqueo entre un paso y el siguiente
+REINICIOS_MAX = 3  # si otra conexión escribe, SQLite recomienza el respaldo por pasos
+CARPETA_RESPALDOS = "respaldos"  # relativa a la carpeta de la base
+CONSERVAR_RESPALDOS = 7
+
+LIMITE_ANALISIS = 1000  # filas muestreadas por índice en ANALYZE (0 = todas)
+PAGINAS_VACUUM = None  # páginas liberadas por vacuum incremental (None = todas las libres)
+
+REGISTRO = "_mantenimiento"
+_CREAR_REGISTRO = f"""
+CREATE TABLE IF NOT EXISTS {REGISTRO} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tarea TEXT NOT NULL,
+    inicio REAL NOT NULL,
+    duracion_s REAL,
+    liberado_bytes INTEGER,
+    ok INTEGER,
+    detalle TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_mantenimiento_tarea ON {REGISTRO} (tarea, inicio);
+"""
+
+
+# =========================================
+# TAMAÑO DE LA BASE
+# =========================================
+def _tamano(conexion):
+    """Bytes ocupados por la base: páginas del archivo principal más el -wal."""
+    paginas = conexion.execute("PRAGMA page_count").fetchone()[0]
+    tamano_pagina = conexion.execute("PRAGMA page_size").fetchone()[0]
+    wal = funciones_crud.RUTA_BD + "-wal"
+    return paginas * tamano_pagina + (os.path.getsize(wal) if os.path.exists(wal) else 0)
+
+
+def _escribir(operacion):
+    """Corre una tarea que escribe en la base en el hilo escritor, con reintentos."""
+    return funciones_crud.en_escritor(lambda: funciones_crud.con_reintentos(operacion))
+
+
+# =========================================
+# TAREAS
+# =========================================
+def _nombre_respaldo():
+    carpeta = os.path.join(os.path.dirname(os.path.abspath(funciones_crud.RUTA_BD)), CARPETA_RESPALDOS)
+    base = os.path.splitext(os.path.basename(funciones_crud.RUTA_BD))[0]
+    nombre = os.path.join(carpeta, f"{base}-{datetime.datetime.now():%Y%m%d-%H%M%S}")
+    numero = 1
+    while os.path.exists(f"{nombre}-{numero}.db" if numero > 1 else nombre + ".db"):
+        numero += 1  # dos respaldos en el mismo segundo
+    return f"{nombre}-{numero}.db" if numero > 1 else nombre + ".db"
+
+
+def _rotar(destino):
+    """Borra los respaldos más viejos de la carpeta de destino, dejando CONSERVAR_RESPALDOS."""
+    base = os.path.splitext(os.path.basename(funciones_crud.RUTA_BD))[0]
+    respaldos = sorted(glob.glob(os.path.join(os.path.dirname(destino), f"{base}-*.db")), key=os.path.getmtime)
+    for viejo in respaldos[:-CONSERVAR_RESPALDOS] if CONSERVAR_RESPALDOS else []:
+        os.remove(viejo)
+
+
+def respaldar(destino: Optional[str] = None, paginas: int = PAGINAS_POR_PASO, pausa: float = PAUSA_ENTRE_PASOS,
+              verificar: bool = True) -> Dict[str, Any]:
+    """
+    Copia la base en línea con Connection.backup, de a 'paginas' páginas por paso.
+    Parámetros:
+        destino: archivo del respaldo (por defecto respaldos/<base>-AAAAMMDD-HHMMSS.db,
+            rotando los viejos)
+        paginas: páginas por paso (-1 = todo en un paso, una sola transacción de lectura)
+        pausa: segundos de espera entre pasos
+        verificar: corre PRAGMA quick_check sobre la copia antes de darla por buena
+    Si mientras tanto otra conexión escribe, SQLite recomienza la copia; después de
+    REINICIOS_MAX reinicios se copia en un solo paso (en modo WAL no detiene a los
+    escritores). Con escrituras frecuentes es lo normal: "modo" lo deja a la vista
+    en el historial.
+    Retorna {"archivo", "bytes", "pasos", "reinicios", "modo"}, con modo "por pasos",
+    "un paso" (paginas=-1) o "un paso tras reinicios".
+    """
+    rotar = destino is None
+    destino = destino or _nombre_respaldo()
+    os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+    parcial = destino + ".parcial"
+    estado = {"pasos": 0, "reinicios": 0, "restantes": None, "modo": "un paso" if paginas < 0 else "por pasos"}
+
+    def progreso(_, restantes, total):
+        estado["pasos"] += 1
+        # Un paso que no avanzó (o retrocedió) es un reinicio: otra conexión escribió
+        if estado["restantes"] is not None and restantes >= estado["restantes"]:
+            estado["reinicios"] += 1
+            if estado["reinicios"] > REINICIOS_MAX:
+                raise InterruptedError("respaldo reiniciado demasiadas veces")
+        estado["restantes"] = restantes
+        if pausa and restantes:
+            time.sleep(pausa)
+
+    origen = funciones_crud.conectar()
+    try:
+        copia = sqlite3.connect(parcial)
+        try:
+            try:
+                origen.backup(copia, pages=paginas, progress=progreso)
+            except InterruptedError:
+                origen.backup(copia, pages=-1)
+                estado["pasos"] += 1
+                estado["modo"] = "un paso tras reinicios"
+            # El respaldo queda como un único archivo, sin -wal
+            copia.execute("PRAGMA journal_mode = DELETE")
+            if verificar:
+                problemas = [r[0] for r in copia.execute("PRAGMA quick_check").fetchall()]
+                if problemas != ["ok"]:
+                    raise sqlite3.DatabaseError("El respaldo no pasó quick_check: " + "; ".join(problemas[:5]))
+        finally:
+            copia.close()
+    except BaseException:
+        if os.path.exists(parcial):
+            os.remove(parcial)
+        raise
+    finally:
+        origen.close()
+    os.replace(parcial, destino)
+    if rotar:
+        _rotar(destino)
+    return {"archivo": destino, "bytes": os.path.getsize(destino), "pasos": estado["pasos"], "reinicios": estado["reinicios"],
+            "modo": estado["modo"]}
+
+
+def optimizar() -> Dict[str, Any]:
+    """PRAGMA optimize: analiza solo las tablas cuyas estadísticas quedaron viejas."""
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.execute(f"PRAGMA analysis_limit = {LIMITE_ANALISIS}")
+            conexion.execute("PRAGMA optimize")
+            conexion.commit()
+    _escribir(operacion)
+    return {}
+
+
+def analizar(limite: int = LIMITE_ANALISIS) -> Dict[str, Any]:
+    """ANALYZE de toda la base, muestreando 'limite' filas por índice (0 = todas)."""
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.execute(f"PRAGMA analysis_limit = {int(limite)}")
+            conexion.execute("ANALYZE")
+            conexion.commit()
+            return conexion.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0]
+    return {"estadisticas": _escribir(operacion)}
+
+
+def vacuum(completo: bool = False, paginas: Optional[int] = PAGINAS_VACUUM) -> Dict[str, Any]:
+    """
+    Devuelve al sistema de archivos las páginas libres de la base.
+    Parámetros:
+        completo: VACUUM completo (reescribe toda la base y bloquea las escrituras
+            mientras dura); además deja auto_vacuum = INCREMENTAL para las siguientes
+        paginas: máximo de páginas del vacuum incremental (None = todas)
+    Sin auto_vacuum = INCREMENTAL el vacuum incremental no hace nada: el detalle lo avisa.
+    Retorna {"paginas_libres" (antes), "auto_vacuum"}.
+    """
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            libres = conexion.execute("PRAGMA freelist_count").fetchone()[0]
+            modo = conexion.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if completo:
+                conexion.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conexion.execute("VACUUM")
+                modo = 2
+            elif modo == 2 and libres:
+                # execute() da un solo paso a una sentencia sin columnas (libera una página);
+                # executescript la corre hasta el final
+                conexion.executescript(f"PRAGMA incremental_vacuum({int(paginas) if paginas else 0});")
+            return {"paginas_libres": libres, "auto_vacuum": {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}[modo]}
+    resultado = _escribir(operacion)
+    if completo:
+        funciones_crud.checkpoint("TRUNCATE")  # el VACUUM pasa toda la base por el -wal
+    return resultado
+
+
+def checkpoint() -> Dict[str, Any]:
+    """Checkpoint TRUNCATE: traspasa el -wal a la base y lo deja vacío."""
+    resultado = funciones_crud.checkpoint("TRUNCATE")
+    if resultado is None:
+        return {"wal": False}
+    bloqueado, paginas, traspasadas = resultado
+    return {"bloqueado": bool(bloqueado), "paginas_wal": paginas, "traspasadas": traspasadas}
+
+
+def verificar_integridad(completa: bool = False) -> Dict[str, Any]:
+    """
+    PRAGMA quick_check (o integrity_check con completa=True, que además revisa
+    los índices contra las tablas) y PRAGMA foreign_key_check.
+    Retorna {"integridad": [problemas], "claves_foraneas": [{"tabla", "id", "tabla_ref"}]};
+    listas vacías si todo está bien.
+    """
+    with funciones_crud.obtener_conexion() as conexion:
+        chequeo = "integrity_check" if completa else "quick_check"
+        problemas = [r[0] for r in conexion.execute(f"PRAGMA {chequeo}").fetchall()]
+        huerfanas = [{"tabla": t, "id": fila, "tabla_ref": ref}
+                     for t, fila, ref, _ in conexion.execute("PRAGMA foreign_key_check").fetchall()]
+    return {"integridad": [] if problemas == ["ok"] else problemas, "claves_foraneas": huerfanas}
+
+
+# Nombre -> función sin argumentos obligatorios; "ok" es False si la función
+# retorna problemas (integridad) o lanza una excepción
+TAREAS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "respaldo": respaldar,
+    "optimizar": optimizar,
+    "analizar": analizar,
+    "vacuum": vacuum,
+    "checkpoint": checkpoint,
+    "integridad": verificar_integridad,
+}
+
+
+# =========================================
+# REGISTRO DE EJECUCIONES
+# =========================================
+_instalado = set()  # archivos de base donde ya existe la tabla _mantenimiento
+
+
+def instalar():
+    """Crea la tabla _mantenimiento si falta."""
+    if funciones_crud.RUTA_BD in _instalado:
+        return
+
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.executescript(_CREAR_REGISTRO)
+    _escribir(operacion)
+    _instalado.add(funciones_crud.RUTA_BD)
+
+
+def _ultima(tarea):
+    """Inicio de la última ejecución registrada de la tarea (o None), con una lectura simple."""
+    with funciones_crud.obtener_conexion() as conexion:
+        return conexion.execute(f"SELECT MAX(inicio) FROM {REGISTRO} WHERE tarea = ?", (tarea,)).fetchone()[0]
+
+
+def _toca(ultima, intervalo, ahora):
+    return intervalo is None or ultima is None or ahora - ultima >= intervalo
+
+
+def _reservar(tarea, intervalo, ahora):
+    """
+    Anota el comienzo de la tarea si ya toca (o si intervalo es None) y retorna el id
+    del registro; None si no toca. Primero lo revisa con una lectura; solo si toca
+    abre una transacción BEGIN IMMEDIATE que lo vuelve a revisar: si varios
+    procesos comparten la base, solo uno corre cada tarea.
+    """
+    if not _toca(_ultima(tarea), intervalo, ahora):
+        return None
+
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                ultima = conexion.execute(f"SELECT MAX(inicio) FROM {REGISTRO} WHERE tarea = ?", (tarea,)).fetchone()[0]
+                if not _toca(ultima, intervalo, ahora):
+                    conexion.rollback()
+                    return None
+                cursor = conexion.execute(f"INSERT INTO {REGISTRO} (tarea, inicio) VALUES (?, ?)", (tarea, ahora))
+                conexion.commit()
+                return cursor.lastrowid
+            except Exception:
+                conexion.rollback()
+                raise
+    return _escribir(operacion)
+
+
+def _terminar(registro_id, duracion, liberado, ok, detalle):
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.execute(f"UPDATE {REGISTRO} SET duracion_s = ?, liberado_bytes = ?, ok = ?, detalle = ? WHERE id = ?",
+                             (round(duracion, 4), liberado, int(ok), json.dumps(detalle, ensure_ascii=False, default=str), registro_id))
+            conexion.commit()
+    _escribir(operacion)
+
+
+def ejecutar(tarea: str, intervalo: Optional[float] = None, **opciones) -> Optional[Dict[str, Any]]:
+    """
+    Corre una tarea de TAREAS y registra duración, bytes liberados y resultado.
+    Parámetros:
+        tarea: nombre en TAREAS
+        intervalo: si se indica, solo corre si pasaron al menos esos segundos desde
+            la última ejecución registrada
+        opciones: argumentos para la función de la tarea
+    Retorna {"tarea", "duracion_s", "liberado_bytes", "ok", "detalle"} o None si no tocaba.
+    Los errores de la tarea quedan registrados (ok False) y no se propagan.
+    """
+    if tarea not in TAREAS:
+        raise ValueError(f"Tarea desconocida: {tarea}. Opciones: {', '.join(TAREAS)}")
+    instalar()
+    registro_id = _reservar(tarea, intervalo, time.time())
+    if registro_id is None:
+        return None
+    with funciones_crud.obtener_conexion() as conexion:
+        antes = _tamano(conexion)
+    inicio = time.perf_counter()
+    try:
+        detalle = TAREAS[tarea](**opciones)
+        ok = not (detalle.get("integridad") or detalle.get("claves_foraneas"))
+    except Exception as error:
+        detalle, ok = {"error": f"{type(error).__name__}: {error}"}, False
+    duracion = time.perf_counter() - inicio
+    with funciones_crud.obtener_conexion() as conexion:
+        liberado = antes - _tamano(conexion)
+    _terminar(registro_id, duracion, liberado, ok, detalle)
+    return {"tarea": tarea, "duracion_s": duracion, "liberado_bytes": liberado, "ok": ok, "detalle": detalle}
+
+
+def ejecutar_pendientes(intervalos: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """Corre, en el orden de INTERVALOS, las tareas cuyo intervalo ya pasó. Retorna sus resultados."""
+    intervalos = INTERVALOS if intervalos is None else intervalos
+    resultados = []
+    for tarea, intervalo in intervalos.items():
+        resultado = ejecutar(tarea, intervalo)
+        if resultado is not None:
+            resultados.append(resultado)
+    return resultados
+
+
+def historial(tarea: Optional[str] = None, limite: int = 50) -> List[Dict[str, Any]]:
+    """
+    Últimas ejecuciones registradas (más nuevas primero), opcionalmente de una sola tarea.
+    Solo lee: si todavía no se corrió ninguna tarea (no existe _mantenimiento) retorna [].
+    """
+    condicion, valores = ("WHERE tarea = ?", (tarea,)) if tarea else ("", ())
+    with funciones_crud.obtener_conexion() as conexion:
+        if not conexion.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (REGISTRO,)).fetchone():
+            return []
+        filas = conexion.execute(
+            f"SELECT tarea, inicio, duracion_s, liberado_bytes, ok, detalle FROM {REGISTRO} {condicion} ORDER BY id DESC LIMIT ?",
+            valores + (limite,)).fetchall()
+    return [{"tarea": t, "inicio": datetime.datetime.fromtimestamp(i).strftime("%Y-%m-%d %H:%M:%S"),
+             "duracion_s": d, "liberado_bytes": b, "ok": None if ok is None else bool(ok), "detalle": detalle}
+            for t, i, d, b, ok, detalle in filas]
+
+
+# =========================================
+# PROGRAMADOR EN EL PROCESO
+# =========================================
+class Programador:
+    """
+    Hilo que cada REVISAR_CADA segundos corre las tareas que ya tocan (ver ejecutar_pendientes).
+    Parámetros:
+        intervalos: {tarea: segundos}; por defecto INTERVALOS
+        revisar_cada: segundos entre revisiones
+    """
+
+    def __init__(self, intervalos=None, revisar_cada=REVISAR_CADA):
+        self.intervalos = dict(INTERVALOS if intervalos is None else intervalos)
+        self.revisar_cada = revisar_cada
+        self.ultimos: List[Dict[str, Any]] = []
+        self.errores = 0
+        self.ultimo_error: Optional[Dict[str, Any]] = None  # {"momento", "error"} de la última revisión fallida
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._ciclo, name="mantenimiento", daemon=True)
+        self._hilo.start()
+
+    def _ciclo(self):
+        while not self._detener.is_set():
+            try:
+                self.ultimos = ejecutar_pendientes(self.intervalos) or self.ultimos
+            except Exception as error:
+                # Base ocupada o cerrada, hilo escritor detenido, etc.: se anota y se
+                # vuelve a intentar en la próxima revisión (el hilo no debe morir)
+                self.errores += 1
+                self.ultimo_error = {"momento": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                     "error": f"{type(error).__name__}: {error}"}
+            self._detener.wait(self.revisar_cada)
+
+    def detener(self):
+        """Termina el hilo (espera a que termine la tarea en curso)."""
+        self._detener.set()
+        self._hilo.join()
+
+
+_programador: Optional[Programador] = None
+_candado = threading.Lock()
+
+
+def iniciar(intervalos=None, revisar_cada=REVISAR_CADA) -> Programador:
+    """Inicia el programador del proceso (si no estaba). Retorna el Programador."""
+    global _programador
+    with _candado:
+        if _programador is None:
+            _programador = Programador(intervalos, revisar_cada)
+        return _programador
+
+
+def programador() -> Optional[Programador]:
+    """El programador del proceso, o None si no se inició."""
+    return _programador
+
+
+def detener():
+    """Detiene el programador del proceso."""
+    global _programador
+    with _candado:
+        if _programador is not None:
+            _programador.detener()
+            _programador = None
+
+
+# =========================================
+# PREPARACIÓN DE LA BASE AL INICIAR
+# =========================================
+# Lo que la interfaz necesita creado una vez por base (índice de asientos,
+# resúmenes, acumulados del tablero, triggers del diario e índices FTS5) puede
+# tardar minutos en una base grande que lo ve por primera vez. preparar() lo corre
+# en un hilo propio, una sola vez por proceso y archivo; mientras tanto main.py
+# muestra que se están preparando los índices en vez de bloquear el redibujo.
+_preparaciones: Dict[str, Dict[str, Any]] = {}  # RUTA_BD -> estado
+_candado_preparacion = threading.Lock()
+
+
+def _pasos_preparacion():
+    import asientos
+    import diario_cambios
+    import reportes
+    import tablero
+    return [
+        ("asientos", asientos.instalar),
+        ("reportes", reportes.instalar),
+        ("tablero", tablero.instalar),
+        # El diario solo si ya se activó; se rehacen los triggers si cambiaron las columnas
+        ("diario", lambda: diario_cambios.activo() and diario_cambios.instalar()),
+        ("busqueda", funciones_crud.preparar_busqueda),
+    ]
+
+
+def _preparar(estado):
+    inicio = time.perf_counter()
+    for nombre, paso in _pasos_preparacion():
+        try:
+            paso()
+        except Exception as error:
+            # Cada instalar() es idempotente: se vuelve a intentar cuando se use
+            with _candado_preparacion:
+                estado["errores"][nombre] = f"{type(error).__name__}: {error}"
+    with _candado_preparacion:
+        estado["duracion_s"] = time.perf_counter() - inicio
+        estado["lista"] = True
+
+
+def preparar() -> Dict[str, Any]:
+    """
+    Inicia en segundo plano (la primera vez por proceso y base) la creación de los
+    índices y tablas de resumen que faltan. Retorna una copia de su estado:
+    {"lista": bool, "errores": {paso: mensaje}, "duracion_s": segundos o None}.
+    """
+    ruta = funciones_crud.RUTA_BD
+    with _candado_preparacion:
+        estado = _preparaciones.get(ruta)
+        if estado is None:
+            estado = _preparaciones[ruta] = {"lista": False, "errores": {}, "duracion_s": None}
+            threading.Thread(target=_preparar, args=(estado,), name="bd-preparacion", daemon=True).start()
+        return dict(estado, errores=dict(estado["errores"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=list(TAREAS) + ["pendientes", "historial"])
+    parser.add_argument("archivo", nargs="?", help="respaldo: archivo de destino")
+    parser.add_argument("--completo", action="store_true", help="vacuum: VACUUM completo (bloquea escrituras)")
+    parser.add_argument("--completa", action="store_true", help="integridad: integrity_check en vez de quick_check")
+    parser.add_argument("--paginas", type=int, default=PAGINAS_POR_PASO, help="respaldo: páginas por paso (-1 = un paso)")
+    parser.add_argument("--bd", help="archivo de base de datos (por defecto " + funciones_crud.RUTA_BD + ")")
+    args = parser.parse_args(argv)
+    if args.bd:
+        funciones_crud.configurar_pool(ruta_bd=args.bd)
+    if args.comando == "historial":
+        for fila in historial():
+            estado = {True: "ok", False: "ERROR", None: "en curso"}[fila["ok"]]
+            print(f"{fila['inicio']}  {fila['tarea']:<11} {estado:<8} {fila['duracion_s'] or 0:>8.2f} s "
+                  f"{(fila['liberado_bytes'] or 0) / 1024:>10.0f} KiB  {fila['detalle'] or ''}")
+        return 0
+    if args.comando == "pendientes":
+        resultados = ejecutar_pendientes()
+    else:
+        opciones = {"respaldo": {"destino": args.archivo, "paginas": args.paginas},
+                    "vacuum": {"completo": args.completo},
+                    "integridad": {"completa": args.completa}}.get(args.comando, {})
+        resultados = [ejecutar(args.comando, **opciones)]
+    for r in resultados:
+        print(f"{r['tarea']}: {'ok' if r['ok'] else 'ERROR'} en {r['duracion_s']:.2f} s, "
+              f"{r['liberado_bytes'] / 1024:.0f} KiB liberados  {json.dumps(r['detalle'], ensure_ascii=False)}")
+    if not resultados:
+        print("Ninguna tarea pendiente.")
+    return 0 if all(r["ok"] for r in resultados) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
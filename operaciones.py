@@ -0,0 +1,233 @@
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+# Operaciones de la interfaz (crear, leer, actualizar, eliminar) sin Streamlit:
+# main.py las llama desde los formularios y los benchmarks las miden directo.
+
+from esquema import SCHEMAS
+from catalogo import obtener_catalogo
+from validaciones import validar_datos
+from filtros import Filtro, construir, explicar
+import instrumentacion
+
+try:
+    import funciones_crud
+    import asientos
+    import crud_asincrono
+    import tarifas
+    import borrado_cascada
+except Exception:
+    funciones_crud = None  # type: ignore
+    asientos = None  # type: ignore
+    crud_asincrono = None  # type: ignore
+    tarifas = None  # type: ignore
+    borrado_cascada = None  # type: ignore
+
+
+# Wrappers muy simples que llaman a funciones_crud con los parámetros que espera
+def insertar_registro(tabla: str, datos: Dict[str, Any]):
+    if not funciones_crud:
+        return {"error": "no_db", "message": "Módulo funciones_crud no disponible."}
+    if tabla == "Boleto" and not datos.get("precio") and datos.get("servicio_id"):
+        # Precio vacío o 0: se cobra la tarifa vigente de la ruta en la fecha del servicio
+        tarifa = tarifas.precio_servicio(datos["servicio_id"])
+        if tarifa is None:
+            return {"error": "validation", "message": f"No hay tarifa vigente para el servicio id={datos['servicio_id']}; ingrese el precio."}
+        datos = dict(datos, precio=tarifa["monto"])
+    # Validar según metadatos
+    valid, msg = validar_datos(tabla, datos, is_update=False)
+    if not valid:
+        return {"error": "validation", "message": msg}
+    if tabla == "Boleto":
+        # La venta de boletos pasa por el mapa de asientos: verifica capacidad y asiento libre.
+        # Asiento 0 (valor por defecto del formulario) = asignar el primero libre.
+        return asientos.reservar_asiento(datos["servicio_id"], datos["cliente_id"], datos["precio"], datos["codigo"], datos.get("asiento") or None)
+    cols = list(datos.keys())
+    vals = [datos[c] for c in cols]
+    try:
+        return funciones_crud.insertar(tabla, cols, vals)
+    except sqlite3.IntegrityError as e:
+        # Capturar violaciones de UNIQUE u otras restricciones de integridad
+        return {"error": "unique", "message": str(e)}
+    except Exception as e:
+        return {"error": "db_error", "message": str(e)}
+
+
+def leer_registros(tabla: str, filtros: Optional[Dict[str, Any]], limite: int) -> List[Dict[str, Any]]:
+    cols = ["id"] + SCHEMAS[tabla]
+    condicion = None
+    valores: tuple = ()
+    if not funciones_crud:
+        return []
+    try:
+        if filtros:
+            # Igualdades con los valores convertidos al tipo de cada columna (ver filtros.py)
+            condicion, valores, _ = construir(tabla, [Filtro(k, "=", v) for k, v in filtros.items()])
+        # El LIMIT se aplica en SQL: solo se traen las filas que se muestran
+        filas = funciones_crud.consultar(tabla, columnas=cols, condicion=condicion, valores_condicion=valores, limite=limite)
+    except Exception:
+        return []
+    resultado: List[Dict[str, Any]] = []
+    for row in (filas or []):
+        d = {cols[i]: row[i] for i in range(min(len(cols), len(row)))}
+        resultado.append(d)
+    return resultado
+
+
+def buscar_registros(tabla: str, filtros: List[Filtro], orden: Optional[str] = None, descendente: bool = False, limite: int = 50) -> Dict[str, Any]:
+    """Búsqueda con filtros tipados (rangos, prefijos, listas IN y orden), resuelta en SQL.
+    Retorna {"filas": [...], "indices": [...], "escaneo_completo": [...], "ordena_en_memoria", "plan"}
+    con el índice que usó SQLite, o {"error", "message"} si un filtro no es válido.
+    """
+    if not funciones_crud:
+        return {"error": "no_db", "message": "Módulo funciones_crud no disponible."}
+    cols = ["id"] + SCHEMAS[tabla]
+    try:
+        condicion, valores, texto_orden = construir(tabla, filtros, orden, descendente)
+    except ValueError as e:
+        return {"error": "validation", "message": str(e)}
+    try:
+        filas = funciones_crud.consultar(tabla, columnas=cols, condicion=condicion, valores_condicion=valores, limite=limite, orden=texto_orden)
+        resultado = explicar(tabla, cols, condicion, valores, texto_orden, limite)
+    except (sqlite3.Error, ValueError) as e:
+        return {"error": "db_error", "message": str(e)}
+    resultado["filas"] = [dict(zip(cols, row)) for row in filas]
+    return resultado
+
+
+def actualizar_registro(tabla: str, id_registro, datos: Dict[str, Any]):
+    condicion = "id = ?"
+    if not funciones_crud:
+        return {"error": "no_db", "message": "Módulo funciones_crud no disponible."}
+    # Validar según metadatos (indicar que es update para permitir same-row unique)
+    valid, msg = validar_datos(tabla, datos, is_update=True, current_id=id_registro)
+    if not valid:
+        return {"error": "validation", "message": msg}
+    if tabla == "Boleto":
+        # Mismo control que la venta: el asiento tiene que caber en el bus del servicio
+        error = asientos.verificar_actualizacion(id_registro, datos)
+        if error:
+            return error
+    try:
+        resultado = funciones_crud.actualizar(tabla, datos, condicion, (id_registro,))
+        if tabla == "Boleto":
+            asientos.invalidar()  # el boleto pudo cambiar de asiento o de servicio
+        return resultado
+    except Exception as e:
+        return {"error": "db_error", "message": str(e)}
+
+
+def eliminar_registro(tabla: str, id_registro):
+    """
+    Intentamos borrar directamente usando la conexión SQLite para poder
+    capturar errores de integridad (foreign key) y devolver una estructura
+    informativa que la UI puede interpretar.
+    El borrado pasa por el hilo escritor si crud_asincrono encola las escrituras; los
+    dependientes se buscan después, fuera de él, para no demorar otras escrituras.
+    """
+    if not funciones_crud:
+        return {"deleted": False, "error": "no_db", "message": "Módulo funciones_crud no disponible."}
+    try:
+        res = funciones_crud.en_escritor(lambda: _borrar(tabla, id_registro))
+        if res.get("error") == "foreign_key":
+            try:
+                res["dependents"] = _buscar_referencias(None, tabla, id_registro)
+            except Exception:
+                res["dependents"] = None
+            return res
+    except sqlite3.Error as e:
+        return {"deleted": False, "error": "db_error", "message": str(e)}
+    if res.get("deleted"):
+        # La fila ya no existe: descartar los resultados guardados de la tabla
+        funciones_crud.invalidar_cache(tabla)
+    return res
+
+
+def planificar_eliminacion(tabla: str, id_registro) -> Dict[str, Any]:
+    """
+    Cuántas filas de cada tabla se borrarían junto con (tabla, id_registro),
+    recorriendo todas las claves foráneas (ver borrado_cascada.py). No borra nada.
+    """
+    if not funciones_crud:
+        return {"error": "no_db", "message": "Módulo funciones_crud no disponible."}
+    try:
+        return borrado_cascada.planificar(tabla, int(id_registro))
+    except (sqlite3.Error, ValueError) as e:
+        return {"error": "db_error", "message": str(e)}
+
+
+def eliminar_en_cascada(tabla: str, id_registro, esperado: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Borra (tabla, id_registro) y todos sus dependientes en una transacción.
+    esperado: los conteos del plan mostrado; si cambiaron no se borra nada y
+    se retorna {"deleted": False, "error": "changed", "plan": plan nuevo}.
+    """
+    if not funciones_crud:
+        return {"deleted": False, "error": "no_db", "message": "Módulo funciones_crud no disponible."}
+    return borrado_cascada.borrar(tabla, int(id_registro), esperado)
+
+
+def _borrar(tabla: str, id_registro) -> Dict[str, Any]:
+    with funciones_crud.obtener_conexion() as conn:
+        cur = conn.cursor()
+        q = f"DELETE FROM \"{tabla}\" WHERE id = ?"
+        try:
+            espera = funciones_crud.obtener_pool().ultima_espera()
+            with instrumentacion.medir("eliminar_registro", tabla, q, (id_registro,), conn, espera) as medicion:
+                cur.execute(q, (id_registro,))
+                medicion["filas"] = cur.rowcount
+        except sqlite3.IntegrityError as e:
+            # Falló por restricción de clave foránea
+            conn.rollback()
+            return {"deleted": False, "error": "foreign_key", "message": str(e)}
+        # Si no se eliminó ninguna fila, el registro no existe
+        if cur.rowcount == 0:
+            conn.commit()
+            return {"deleted": False, "error": "not_found", "message": f"Registro id={id_registro} no encontrado en {tabla}."}
+        conn.commit()
+    return {"deleted": True, "id": id_registro}
+
+
+def _buscar_referencias(conn: Optional[sqlite3.Connection], tabla: str, id_val) -> Dict[str, List[Dict[str, Any]]]:
+    """Busca en la base de datos las filas que referencian a (tabla,id_val).
+    Retorna un dict {tabla_referente: [ {pk: val, col: val, ...}, ... ] }
+    Limitamos a 10 filas por tabla para no sobrecargar la UI.
+    Las claves foráneas salen del catálogo en caché (catalogo.py): se hace una sola
+    consulta por tabla referente, filtrando por la columna FK (que tiene índice).
+    Con conn=None usa conexiones propias; si crud_asincrono está iniciado, las
+    consultas de las distintas tablas corren a la vez en sus hilos lectores.
+    """
+    consultas = []
+    for t, fks in obtener_catalogo(conn).dependientes(tabla).items():
+        # nombres ya validados por el catálogo (sqlite_master/pragma)
+        condicion = " OR ".join(f'"{fk.columna}" = ?' for fk in fks)
+        consultas.append((t, f'SELECT * FROM "{t}" WHERE {condicion} LIMIT 10', (id_val,) * len(fks)))
+    if conn is None and crud_asincrono is not None and crud_asincrono.activo():
+        futuros = [crud_asincrono.en_segundo_plano(_filas_referentes, None, t, q, v) for t, q, v in consultas]
+        resultados = [_resultado_o_vacio(f) for f in futuros]
+    else:
+        resultados = [_filas_referentes(conn, t, q, v) for t, q, v in consultas]
+    return {t: filas for (t, _, _), filas in zip(consultas, resultados) if filas}
+
+
+def _resultado_o_vacio(futuro) -> List[Dict[str, Any]]:
+    try:
+        return futuro.result()
+    except Exception:
+        return []
+
+
+def _filas_referentes(conn: Optional[sqlite3.Connection], t: str, q: str, valores: tuple) -> List[Dict[str, Any]]:
+    if conn is None:
+        with funciones_crud.obtener_conexion() as propia:
+            return _filas_referentes(propia, t, q, valores)
+    try:
+        cur = conn.cursor()
+        with instrumentacion.medir("buscar_referencias", t, q, valores, conn) as medicion:
+            rows = cur.execute(q, valores).fetchall()
+            medicion["filas"] = len(rows)
+    except Exception:
+        # ignorar errores en tablas individuales y continuar
+        return []
+    cols = [c[0] for c in cur.description]
+    return [{cols[i]: row[i] for i in range(len(cols))} for row in rows]
@@ -0,0 +1,117 @@
+import streamlit as st
+
+import asesor_indices
+import diario_cambios
+import funciones_crud
+import instrumentacion
+import mantenimiento
+import tarifas
+
+# Página de diagnóstico: tiempos de las consultas medidas por instrumentacion.py
+# (p50/p95/p99 por tabla y operación), sentencias lentas con su plan de
+# ejecución y estado del pool y de la caché.
+
+st.set_page_config(page_title="Diagnóstico de consultas", layout="wide")
+st.title("Diagnóstico de consultas")
+
+with st.sidebar:
+    fuente = st.radio("Origen de las mediciones", ["Esta sesión", "Archivo de log"])
+    umbral_ms = st.number_input("Umbral de sentencia lenta (ms)", min_value=1, value=int(instrumentacion.UMBRAL_LENTA * 1000))
+    if umbral_ms / 1000 != instrumentacion.UMBRAL_LENTA:
+        instrumentacion.configurar(umbral_lenta=umbral_ms / 1000)
+    if st.button("Reiniciar mediciones"):
+        instrumentacion.reiniciar()
+    st.caption(f"Log: {instrumentacion.RUTA_LOG or '(desactivado)'}")
+
+st.subheader("Tiempos por tabla y operación")
+if fuente == "Esta sesión":
+    resumen = instrumentacion.percentiles()
+else:
+    resumen = instrumentacion.percentiles_desde_log()
+if resumen:
+    st.dataframe(resumen, use_container_width=True)
+else:
+    st.info("Todavía no hay mediciones. Use la interfaz principal y vuelva a esta página.")
+
+st.subheader("Sentencias lentas")
+lentas = instrumentacion.lentas()
+if not lentas:
+    st.caption(f"Ninguna sentencia superó {umbral_ms} ms en esta sesión.")
+for registro in lentas:
+    aviso = " — recorre completa: " + ", ".join(registro["escaneo_completo"]) if registro["escaneo_completo"] else ""
+    with st.expander(f"{registro['duracion_ms']:.1f} ms · {registro['operacion']} {registro['tabla']}{aviso}"):
+        st.code(registro["sql"], language="sql")
+        st.caption(f"Filas: {registro['filas']} — Espera por conexión: {registro['espera_ms']:.1f} ms")
+        if registro["plan"]:
+            st.text("\n".join(registro["plan"]))
+
+st.subheader("Pool y caché")
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.json(funciones_crud.obtener_pool().estadisticas())
+with col2:
+    st.json(funciones_crud.estadisticas_cache())
+with col3:
+    st.json(funciones_crud.estadisticas_sentencias())
+# Los mismos contadores (aciertos, fallos, invalidaciones...) como texto de Prometheus,
+# para copiarlos a un recolector externo
+with st.expander("Métricas de la caché (formato Prometheus)"):
+    st.code(funciones_crud.cache.metricas_texto(), language="text")
+
+st.subheader("Tarifas: solapamientos y huecos")
+problemas_tarifas = tarifas.problemas()
+if problemas_tarifas:
+    st.dataframe(problemas_tarifas, use_container_width=True)
+    st.caption("Con tarifas solapadas se cobra la de inicio más reciente; en un hueco no hay precio automático.")
+else:
+    st.caption("Todas las rutas tienen tarifas sin solapamientos ni huecos.")
+
+st.subheader("Diario de cambios")
+estado_diario = diario_cambios.retrasos()
+if not diario_cambios.activo():
+    st.caption("El diario no está instalado (se activa con: python diario_cambios.py instalar).")
+else:
+    st.caption(f"{estado_diario['filas']} cambios en el diario (seq {estado_diario['primer_seq'] or 0} a {estado_diario['ultimo_seq'] or 0}).")
+if estado_diario["consumidores"]:
+    st.dataframe(estado_diario["consumidores"], use_container_width=True)
+else:
+    st.caption("Ninguna réplica ni exportación registrada (ver diario_cambios.py).")
+
+st.subheader("Mantenimiento")
+programador = mantenimiento.programador()
+if programador is not None and programador.ultimo_error:
+    st.warning(f"El programador de mantenimiento falló {programador.errores} veces; la última "
+               f"({programador.ultimo_error['momento']}): {programador.ultimo_error['error']}")
+ejecuciones = mantenimiento.historial(limite=20)
+if ejecuciones:
+    st.dataframe(ejecuciones, use_container_width=True)
+else:
+    st.caption("Todavía no se corrió ninguna tarea de mantenimiento.")
+
+st.subheader("Asesor de índices")
+capturando = st.checkbox("Capturar las sentencias de la interfaz para recomendar índices", key="asesor_capturar",
+                         value=asesor_indices.captura_activa() is not None)
+carga = asesor_indices.iniciar_captura() if capturando else asesor_indices.detener_captura()
+if carga is not None:
+    st.session_state["asesor_carga"] = carga
+carga = st.session_state.get("asesor_carga")
+if carga is not None:
+    st.caption(f"{len(carga.sentencias)} sentencias distintas capturadas, "
+               f"{sum(d['llamadas'] for d in carga.sentencias.values())} llamadas.")
+    if st.button("Analizar (sobre una copia de la base)", key="asesor_analizar"):
+        with st.spinner("Probando índices en una copia de la base..."):
+            st.session_state["asesor_resultado"] = asesor_indices.analizar(carga)
+resultado = st.session_state.get("asesor_resultado")
+if resultado:
+    recomendaciones = resultado["recomendaciones"]
+    if recomendaciones:
+        st.dataframe([{c: r[c] for c in ("accion", "tabla", "indice", "columnas", "ganancia_pct", "motivo")} for r in recomendaciones],
+                     use_container_width=True)
+        st.code(";\n".join(r["sql"] for r in recomendaciones) + ";", language="sql")
+        if st.button("Aplicar recomendaciones", key="asesor_aplicar"):
+            st.success(f"{asesor_indices.aplicar(recomendaciones)} índices creados o borrados.")
+            del st.session_state["asesor_resultado"]
+    else:
+        st.caption("Sin recomendaciones para esta carga.")
+    if resultado["sin_uso"]:
+        st.caption("Índices que ningún plan de la carga usa (revisar con una carga más completa): " + ", ".join(resultado["sin_uso"]))
@@ -0,0 +1,65 @@
+import streamlit as st
+
+import formularios
+import funciones_crud
+import planificador
+
+# Página de venta: busca el viaje que llega antes entre dos paradas, con
+# transbordos, saliendo después de una hora dada (ver planificador.py).
+
+st.set_page_config(page_title="Planificar viaje", layout="wide")
+st.title("Planificar viaje")
+
+if not funciones_crud.consultar("Parada", ["id"], limite=1):
+    st.info("No hay paradas registradas.")
+    st.stop()
+# Las paradas se eligen con el mismo selector por páginas que las claves foráneas de
+# los formularios (formularios.opciones_referencia): sin texto en orden de id, con
+# texto por el índice FTS5 de Parada (nombre y ciudad); nunca se carga la tabla completa
+PARADA = next(c for c in formularios.formulario("RutaParadas").referencias if c.tabla_ref == "Parada")
+
+
+def _selector_parada(clave: str, titulo: str):
+    """Texto de búsqueda, páginas ◀ ▶ y la lista de paradas de la página; retorna el id elegido."""
+    texto = st.text_input(f"{titulo}: buscar parada", key=f"{clave}_buscar", placeholder="nombre, ciudad o id")
+    estado = st.session_state.setdefault(f"{clave}_paginas", {"texto": texto, "cursores": [None], "siguiente": None})
+    if estado["texto"] != texto:
+        estado.update(texto=texto, cursores=[None], siguiente=None)
+    col_anterior, col_siguiente = st.columns(2)
+    with col_anterior:
+        if st.button("◀", key=f"{clave}_anterior", disabled=len(estado["cursores"]) <= 1):
+            estado["cursores"].pop()
+    with col_siguiente:
+        if st.button("▶", key=f"{clave}_siguiente", disabled=estado["siguiente"] is None):
+            estado["cursores"].append(estado["siguiente"])
+    filas, estado["siguiente"] = formularios.opciones_referencia(PARADA, texto, estado["cursores"][-1])
+    etiquetas = dict(filas)
+    elegido = st.session_state.get(clave)
+    if elegido is not None and elegido not in etiquetas:
+        etiquetas[elegido] = f"id {elegido}"  # lo ya elegido sigue disponible al cambiar de página
+    return st.selectbox(titulo, options=[None] + list(etiquetas),
+                        format_func=lambda i: "(sin elegir)" if i is None else f"{etiquetas[i]} (id {i})", key=clave)
+
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    origen = _selector_parada("viaje_origen", "Desde")
+with col2:
+    destino = _selector_parada("viaje_destino", "Hasta")
+with col3:
+    desde = st.text_input("Salir después de (YYYY-MM-DD HH:MM)", key="viaje_desde", placeholder="2025-10-22 07:00")
+
+if st.button("Buscar viaje") and desde and origen is not None and destino is not None:
+    try:
+        viaje = planificador.planificar(origen, destino, desde)
+    except ValueError as error:
+        st.error(str(error))
+    else:
+        if viaje is None:
+            st.warning("No hay conexión entre esas paradas después de esa hora.")
+        else:
+            st.success(f"Llegada {viaje['llegada']} — {viaje['transbordos']} transbordo(s)")
+            if viaje["tramos"]:
+                st.table(viaje["tramos"])
+            st.caption(f"Transbordo mínimo: {planificador.TRANSBORDO_MIN} minutos. "
+                       "Las horas en paradas intermedias se estiman según su posición en la ruta.")
@@ -0,0 +1,75 @@
+import datetime
+
+import streamlit as st
+
+import funciones_crud
+import mantenimiento
+import tablero
+
+# Tablero de operación: ocupación por servicio, ingresos por ruta y día, medios
+# de pago y carga de los choferes. Todo sale de tablas de resumen y acumulados
+# (ver tablero.py y reportes.py), nunca de recorrer Boleto o Pago completos.
+
+st.set_page_config(page_title="Tablero", layout="wide")
+st.title("Tablero de operación")
+
+# Guardado por período y base: los redibujos (cambiar de pestaña, ordenar una
+# tabla) no vuelven a consultar; a los TTL segundos se suman las filas nuevas.
+TTL = 60
+
+
+@st.cache_data(ttl=TTL, show_spinner=False)
+def _indicadores(ruta_bd, desde, hasta):
+    return tablero.indicadores(desde, hasta)
+
+
+# Los resúmenes y acumulados se crean en segundo plano la primera vez (mantenimiento.preparar)
+if not mantenimiento.preparar()["lista"]:
+    st.info("Preparando los resúmenes del tablero (solo la primera vez). Vuelve a cargar la página en un momento.")
+    st.stop()
+
+desde_def, hasta_def = tablero.periodo_reciente(7)
+if desde_def is None:
+    st.info("Todavía no hay pagos registrados.")
+    st.stop()
+
+with st.sidebar:
+    periodo = st.date_input("Período", value=(datetime.date.fromisoformat(desde_def), datetime.date.fromisoformat(hasta_def)))
+    if st.button("Actualizar ahora"):
+        _indicadores.clear()
+if not isinstance(periodo, (tuple, list)) or len(periodo) != 2:
+    st.stop()
+desde, hasta = (d.isoformat() for d in periodo)
+datos = _indicadores(funciones_crud.RUTA_BD, desde, hasta)
+
+ingresos = datos["ingresos_ruta_dia"]
+pagos = datos["medios_pago"]
+col1, col2, col3 = st.columns(3)
+col1.metric("Ingresos del período", f"${sum(f['ingresos'] for f in ingresos):,}".replace(",", "."))
+col2.metric("Pagos", sum(f["pagos"] for f in pagos))
+promedio = datos["ocupacion_promedio"]
+col3.metric("Ocupación promedio", f"{promedio:.1f} %" if promedio is not None else "—")
+
+st.subheader("Ingresos por día")
+por_dia = {}
+for fila in ingresos:
+    por_dia[fila["dia"]] = por_dia.get(fila["dia"], 0) + fila["ingresos"]
+st.bar_chart({"ingresos": por_dia})
+with st.expander("Ingresos por ruta y día"):
+    st.dataframe(ingresos, use_container_width=True)
+
+col_izq, col_der = st.columns(2)
+with col_izq:
+    st.subheader("Medios de pago")
+    mezcla = {}
+    for fila in pagos:
+        mezcla[fila["metodo"]] = mezcla.get(fila["metodo"], 0) + fila["pagos"]
+    st.bar_chart({"pagos": mezcla})
+with col_der:
+    st.subheader("Carga de choferes")
+    st.dataframe(datos["carga_choferes"], use_container_width=True)
+
+st.subheader("Ocupación por servicio")
+st.dataframe(datos["ocupacion"], use_container_width=True)
+if len(datos["ocupacion"]) >= 500:
+    st.caption("Se muestran los primeros 500 servicios del período.")
@@ -0,0 +1,443 @@
+"""
+Planificador de viajes sobre la red de rutas (RutaParadas + Servicio).
+
+Responde "¿cómo llego de la parada A a la parada B saliendo después de la hora T,
+con transbordos si hace falta, llegando lo antes posible?".
+
+La red se carga una vez en memoria como un grafo compacto:
+  - cada parada es un nodo (0..P-1) y cada nodo guarda en un array los pares
+    (ruta_id, posición) de las rutas que pasan por él;
+  - cada ruta guarda la secuencia de nodos de sus paradas y sus servicios
+    (salida, llegada, id) en arrays, más los horarios de paso por cada parada
+    ordenados, para encontrar con bisect el primer servicio después de una hora.
+Sin diccionarios por tramo: una consulta solo recorre arrays.
+
+La consulta es un Dijkstra dependiente del tiempo: el costo de un nodo es la hora
+de llegada, y desde cada parada se toma el primer servicio de cada ruta que sale
+después de (llegada + TRANSBORDO_MIN), relajando todas las paradas siguientes.
+
+Servicio solo tiene la hora de salida (primera parada) y de llegada (última), así
+que la hora de paso por las paradas intermedias se interpola según su posición
+en la ruta. Como un servicio posterior puede ser más rápido y adelantar a uno
+anterior, se revisan todos los servicios que salen antes de la llegada a la
+última parada del mejor ya visto (ninguno posterior puede llegar antes).
+
+Los triggers anotan en _rutas_cambios la ruta de cada Servicio o RutaParadas
+insertado, modificado o borrado; antes de cada consulta el grafo recarga solo
+esas rutas. Los cambios en Ruta y Parada (nombres, ciudades) no alteran el grafo.
+
+Uso:
+    python planificador.py instalar
+    python planificador.py viaje 1 5 "2025-10-22 07:00"
+    python planificador.py desinstalar
+"""
+import argparse
+import bisect
+import datetime
+import heapq
+import sqlite3
+import sys
+import threading
+from array import array
+from typing import Any, Dict, List, Optional
+
+import fechas
+import funciones_crud
+
+TRANSBORDO_MIN = 10  # minutos mínimos para cambiar de bus en una parada
+INICIO_RELOJ = datetime.datetime(2000, 1, 1)  # las horas se guardan en minutos desde esta fecha
+
+# Registro de rutas modificadas; los triggers del propio registro conservan las
+# últimas MAX_CAMBIOS anotaciones (un grafo que quedó más atrás se recarga entero).
+CAMBIOS = "_rutas_cambios"
+MAX_CAMBIOS = 50000
+_CREAR_CAMBIOS = f"""CREATE TABLE IF NOT EXISTS {CAMBIOS} (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ruta_id INTEGER
+)"""
+
+
+def _triggers():
+    """[(nombre, cuerpo)] de los triggers que anotan las rutas modificadas."""
+    anotar = "INSERT INTO " + CAMBIOS + " (ruta_id) VALUES ({})"
+    anotar_nueva = "INSERT INTO " + CAMBIOS + " (ruta_id) SELECT NEW.ruta_id WHERE NEW.ruta_id IS NOT OLD.ruta_id"
+    t = []
+    for tabla, columnas in (("Servicio", "ruta_id, fecha_salida, fecha_llegada"), ("RutaParadas", "ruta_id, parada_id, orden")):
+        nombre = tabla.lower()
+        t.append((f"_trg_rutas_{nombre}_ins", f"AFTER INSERT ON {tabla} BEGIN {anotar.format('NEW.ruta_id')}; END"))
+        t.append((f"_trg_rutas_{nombre}_del", f"AFTER DELETE ON {tabla} BEGIN {anotar.format('OLD.ruta_id')}; END"))
+        t.append((f"_trg_rutas_{nombre}_upd", f"AFTER UPDATE OF id, {columnas} ON {tabla} BEGIN {anotar.format('OLD.ruta_id')}; {anotar_nueva}; END"))
+    # Recorte del registro cada 1000 anotaciones
+    t.append(("_trg_rutas_recorte", f"AFTER INSERT ON {CAMBIOS} WHEN NEW.seq % 1000 = 0 "
+                                    f"BEGIN DELETE FROM {CAMBIOS} WHERE seq <= NEW.seq - {MAX_CAMBIOS}; END"))
+    return t
+
+
+# =========================================
+# INSTALAR
+# =========================================
+_instalado = set()  # archivos de base donde ya se verificó la instalación
+
+
+def instalado(conexion):
+    """True si existen el registro de cambios y sus triggers."""
+    nombres = {r[0] for r in conexion.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+    return CAMBIOS in nombres and all(nombre in nombres for nombre, _ in _triggers())
+
+
+def instalar(conexion=None):
+    """Crea el registro de cambios y sus triggers si faltan. Retorna True si instaló algo."""
+    if conexion is None:
+        if funciones_crud.RUTA_BD in _instalado:
+            return False
+        with funciones_crud.obtener_conexion() as propia:
+            resultado = funciones_crud.con_reintentos(lambda: instalar(propia))
+        _instalado.add(funciones_crud.RUTA_BD)
+        return resultado
+    if instalado(conexion):
+        return False
+    conexion.execute("BEGIN IMMEDIATE")
+    try:
+        conexion.execute(_CREAR_CAMBIOS)
+        for nombre, cuerpo in _triggers():
+            conexion.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+    return True
+
+
+def desinstalar(conexion):
+    """Borra los triggers y el registro de cambios."""
+    for nombre, _ in _triggers():
+        conexion.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    conexion.execute(f"DROP TABLE IF EXISTS {CAMBIOS}")
+    conexion.commit()
+    _instalado.clear()
+    _grafos.clear()
+
+
+# =========================================
+# HORAS
+# =========================================
+def a_minutos(fecha) -> Optional[int]:
+    """
+    Convierte "YYYY-MM-DD HH:MM" (o con "/", o solo la fecha) o un datetime a
+    minutos desde INICIO_RELOJ. Retorna None si no se puede interpretar.
+    """
+    if isinstance(fecha, str):
+        try:
+            fecha = fechas.interpretar(fecha)[0]
+        except ValueError:
+            return None
+    if not isinstance(fecha, datetime.datetime):
+        return None
+    return int((fecha - INICIO_RELOJ).total_seconds()) // 60
+
+
+def desde_minutos(minutos: int) -> str:
+    """Inversa de a_minutos: "YYYY-MM-DD HH:MM"."""
+    return (INICIO_RELOJ + datetime.timedelta(minutes=minutos)).strftime("%Y-%m-%d %H:%M")
+
+
+# =========================================
+# GRAFO EN MEMORIA
+# =========================================
+class _Ruta:
+    """
+    Secuencia de paradas de una ruta y sus servicios, en arrays.
+    horas/viajes tienen un bloque de m elementos por parada: en el bloque k están
+    las horas de paso de los m servicios por la parada k, ordenadas, y el índice
+    del servicio correspondiente.
+    """
+
+    __slots__ = ("ruta_id", "nodos", "salidas", "llegadas", "servicios", "horas", "viajes")
+
+    def __init__(self, ruta_id, nodos, servicios):
+        self.ruta_id = ruta_id
+        self.nodos = array("i", nodos)
+        servicios.sort(key=lambda s: s[1])
+        self.servicios = array("q", (s[0] for s in servicios))
+        self.salidas = array("q", (s[1] for s in servicios))
+        self.llegadas = array("q", (s[2] for s in servicios))
+        self.horas = array("q")
+        self.viajes = array("i")
+        n, m = len(nodos), len(servicios)
+        for k in range(n):
+            orden = sorted(range(m), key=lambda j: self.hora(j, k))
+            self.horas.extend(self.hora(j, k) for j in orden)
+            self.viajes.extend(orden)
+
+    def hora(self, j, k):
+        """Hora de paso del servicio j por la parada en la posición k (interpolada)."""
+        salida = self.salidas[j]
+        return salida + (self.llegadas[j] - salida) * k // (len(self.nodos) - 1)
+
+
+class GrafoRutas:
+    """
+    Red de rutas en memoria con consultas de llegada más temprana.
+    Se llena con cargar() y se mantiene al día con refrescar().
+    """
+
+    def __init__(self):
+        self.candado = threading.Lock()  # tomarlo para refrescar y consultar
+        self._vaciar()
+
+    def _vaciar(self):
+        self.nodo_de_parada: Dict[int, int] = {}  # parada_id -> nodo
+        self.paradas = array("q")  # nodo -> parada_id
+        self.adyacencia: List[array] = []  # nodo -> array [ruta_id, posición, ruta_id, posición, ...]
+        self.rutas: Dict[int, _Ruta] = {}
+        self.ultimo_cambio = 0  # última anotación de _rutas_cambios aplicada
+        self.servicios_invalidos = 0  # servicios sin fechas interpretables (se ignoran)
+
+    # ---------- Carga ----------
+    def _nodo(self, parada_id):
+        nodo = self.nodo_de_parada.get(parada_id)
+        if nodo is None:
+            nodo = len(self.paradas)
+            self.nodo_de_parada[parada_id] = nodo
+            self.paradas.append(parada_id)
+            self.adyacencia.append(array("q"))
+        return nodo
+
+    def _servicio(self, servicio_id, salida, llegada):
+        inicio, fin = a_minutos(salida), a_minutos(llegada)
+        if inicio is None or fin is None or fin < inicio:
+            self.servicios_invalidos += 1
+            return None
+        return (servicio_id, inicio, fin)
+
+    def _poner_ruta(self, ruta_id, paradas, servicios):
+        """Reemplaza (o quita, si tiene menos de dos paradas) una ruta y su adyacencia."""
+        anterior = self.rutas.pop(ruta_id, None)
+        if anterior is not None:
+            for nodo in set(anterior.nodos):
+                pares = self.adyacencia[nodo]
+                self.adyacencia[nodo] = array("q", (v for i in range(0, len(pares), 2) if pares[i] != ruta_id for v in pares[i:i + 2]))
+        if len(paradas) < 2:
+            return
+        ruta = _Ruta(ruta_id, [self._nodo(p) for p in paradas], servicios)
+        self.rutas[ruta_id] = ruta
+        for posicion, nodo in enumerate(ruta.nodos[:-1]):  # desde la última parada no se sube
+            self.adyacencia[nodo].extend((ruta_id, posicion))
+
+    def cargar(self, conexion: sqlite3.Connection):
+        """Carga la red completa desde la base (reemplaza lo que hubiera)."""
+        self._vaciar()
+        fila = conexion.execute(f"SELECT MAX(seq) FROM {CAMBIOS}").fetchone()
+        self.ultimo_cambio = fila[0] or 0
+        for (parada_id,) in conexion.execute("SELECT id FROM Parada ORDER BY id"):
+            self._nodo(parada_id)
+        paradas: Dict[int, list] = {}
+        for ruta_id, parada_id in conexion.execute("SELECT ruta_id, parada_id FROM RutaParadas ORDER BY ruta_id, orden, id"):
+            paradas.setdefault(ruta_id, []).append(parada_id)
+        servicios: Dict[int, list] = {}
+        for ruta_id, servicio_id, salida, llegada in conexion.execute("SELECT ruta_id, id, fecha_salida, fecha_llegada FROM Servicio"):
+            servicio = self._servicio(servicio_id, salida, llegada)
+            if servicio is not None and ruta_id in paradas:
+                servicios.setdefault(ruta_id, []).append(servicio)
+        for ruta_id, lista in paradas.items():
+            self._poner_ruta(ruta_id, lista, servicios.get(ruta_id, []))
+
+    def _recargar_ruta(self, conexion, ruta_id):
+        paradas = [p for (p,) in conexion.execute(
+            "SELECT parada_id FROM RutaParadas WHERE ruta_id = ? ORDER BY orden, id", (ruta_id,))]
+        servicios = []
+        if len(paradas) >= 2:
+            for servicio_id, salida, llegada in conexion.execute(
+                    "SELECT id, fecha_salida, fecha_llegada FROM Servicio WHERE ruta_id = ?", (ruta_id,)):
+                servicio = self._servicio(servicio_id, salida, llegada)
+                if servicio is not None:
+                    servicios.append(servicio)
+        self._poner_ruta(ruta_id, paradas, servicios)
+
+    def refrescar(self, conexion: sqlite3.Connection) -> int:
+        """
+        Recarga solo las rutas anotadas en _rutas_cambios desde la última vez.
+        Si el registro ya se recortó más allá de lo aplicado, recarga todo.
+        Retorna la cantidad de rutas recargadas (-1 si recargó la red completa).
+        """
+        cambios = conexion.execute(f"SELECT seq, ruta_id FROM {CAMBIOS} WHERE seq > ? ORDER BY seq", (self.ultimo_cambio,)).fetchall()
+        if not cambios:
+            return 0
+        if cambios[0][0] > self.ultimo_cambio + 1:
+            primero = conexion.execute(f"SELECT MIN(seq) FROM {CAMBIOS}").fetchone()[0]
+            if primero is not None and primero > self.ultimo_cambio + 1:
+                self.cargar(conexion)
+                return -1
+        rutas = {ruta_id for _, ruta_id in cambios}
+        for ruta_id in rutas:
+            self._recargar_ruta(conexion, ruta_id)
+        self.ultimo_cambio = cambios[-1][0]
+        return len(rutas)
+
+    # ---------- Consulta ----------
+    def llegada_mas_temprana(self, origen: int, destino: int, desde: int) -> Optional[List[tuple]]:
+        """
+        Viaje que llega antes a la parada destino saliendo de origen a partir de
+        desde (minutos, ver a_minutos). Retorna la lista de tramos
+        (servicio_id, ruta_id, parada_sube, parada_baja, hora_sube, hora_baja)
+        o None si no hay conexión.
+        """
+        o, d = self.nodo_de_parada.get(origen), self.nodo_de_parada.get(destino)
+        if o is None or d is None:
+            return None
+        if o == d:
+            return []
+        sin_llegar = 1 << 62
+        llegada = [sin_llegar] * len(self.paradas)
+        previo: List[Any] = [None] * len(self.paradas)
+        llegada[o] = desde
+        pendientes = [(desde, o)]
+        while pendientes:
+            hora, nodo = heapq.heappop(pendientes)
+            if hora > llegada[nodo]:
+                continue
+            if nodo == d:
+                break
+            listo = hora if nodo == o else hora + TRANSBORDO_MIN
+            pares = self.adyacencia[nodo]
+            for i in range(0, len(pares), 2):
+                ruta, k = self.rutas[pares[i]], pares[i + 1]
+                m = len(ruta.servicios)
+                if not m:
+                    continue
+                inicio = k * m
+                fin = inicio + m
+                tramos = len(ruta.nodos) - 1
+                cota = llegada[d]  # un servicio que sale después no mejora nada
+                pos = bisect.bisect_left(ruta.horas, listo, inicio, fin)
+                while pos < fin and ruta.horas[pos] < cota:
+                    sube, j = ruta.horas[pos], ruta.viajes[pos]
+                    salida = ruta.salidas[j]
+                    duracion = ruta.llegadas[j] - salida
+                    for p in range(k + 1, tramos + 1):
+                        baja = salida + duracion * p // tramos
+                        v = ruta.nodos[p]
+                        if baja < llegada[v]:
+                            llegada[v] = baja
+                            previo[v] = (nodo, ruta.servicios[j], ruta.ruta_id, sube)
+                            heapq.heappush(pendientes, (baja, v))
+                    cota = min(cota, ruta.llegadas[j])
+                    pos += 1
+        if previo[d] is None:
+            return None
+        tramos_viaje = []
+        nodo = d
+        while nodo != o:
+            anterior, servicio_id, ruta_id, sube = previo[nodo]
+            tramos_viaje.append((servicio_id, ruta_id, self.paradas[anterior], self.paradas[nodo], sube, llegada[nodo]))
+            nodo = anterior
+        tramos_viaje.reverse()
+        return tramos_viaje
+
+    def estadisticas(self) -> Dict[str, int]:
+        return {
+            "paradas": len(self.paradas),
+            "rutas": len(self.rutas),
+            "servicios": sum(len(r.servicios) for r in self.rutas.values()),
+            "servicios_invalidos": self.servicios_invalidos,
+            "ultimo_cambio": self.ultimo_cambio,
+        }
+
+
+# =========================================
+# FUNCIONES PARA LA APLICACIÓN
+# =========================================
+_grafos: Dict[str, GrafoRutas] = {}  # RUTA_BD -> grafo cargado
+_candado_grafos = threading.Lock()
+
+
+def obtener_grafo() -> GrafoRutas:
+    """Grafo de la base configurada en funciones_crud, cargado la primera vez y refrescado en cada llamada."""
+    instalar()
+    with _candado_grafos:
+        grafo = _grafos.get(funciones_crud.RUTA_BD)
+        if grafo is None:
+            grafo = _grafos[funciones_crud.RUTA_BD] = GrafoRutas()
+            with funciones_crud.obtener_conexion() as conexion:
+                grafo.cargar(conexion)
+            return grafo
+    with grafo.candado, funciones_crud.obtener_conexion() as conexion:
+        grafo.refrescar(conexion)
+    return grafo
+
+
+def planificar(origen_id: int, destino_id: int, desde) -> Optional[Dict[str, Any]]:
+    """
+    Viaje con llegada más temprana de la parada origen_id a destino_id.
+    Parámetros:
+        origen_id, destino_id: ids de Parada
+        desde: hora mínima de salida ("YYYY-MM-DD HH:MM" o datetime)
+    Retorna {"salida", "llegada", "transbordos", "tramos": [...]} o None si no hay
+    conexión. Cada tramo es {"servicio_id", "codigo", "ruta_id", "sube", "baja",
+    "salida", "llegada"} con los nombres de las paradas.
+    Lanza ValueError si desde no es una fecha válida.
+    """
+    minutos = a_minutos(desde)
+    if minutos is None:
+        raise ValueError(f"Fecha no válida: {desde!r} (use YYYY-MM-DD HH:MM).")
+    grafo = obtener_grafo()
+    with grafo.candado:
+        tramos = grafo.llegada_mas_temprana(int(origen_id), int(destino_id), minutos)
+    if not tramos:
+        return None if tramos is None else {"salida": desde_minutos(minutos), "llegada": desde_minutos(minutos), "transbordos": 0, "tramos": []}
+    ids_servicio = sorted({t[0] for t in tramos})
+    ids_parada = sorted({t[2] for t in tramos} | {t[3] for t in tramos})
+    with funciones_crud.obtener_conexion() as conexion:
+        codigos = dict(conexion.execute(f"SELECT id, codigo FROM Servicio WHERE id IN ({', '.join('?' * len(ids_servicio))})", ids_servicio))
+        nombres = dict(conexion.execute(f"SELECT id, nombre FROM Parada WHERE id IN ({', '.join('?' * len(ids_parada))})", ids_parada))
+    return {
+        "salida": desde_minutos(tramos[0][4]),
+        "llegada": desde_minutos(tramos[-1][5]),
+        "transbordos": len(tramos) - 1,
+        "tramos": [
+            {
+                "servicio_id": servicio_id,
+                "codigo": codigos.get(servicio_id),
+                "ruta_id": ruta_id,
+                "sube": nombres.get(sube, sube),
+                "baja": nombres.get(baja, baja),
+                "salida": desde_minutos(hora_sube),
+                "llegada": desde_minutos(hora_baja),
+            }
+            for servicio_id, ruta_id, sube, baja, hora_sube, hora_baja in tramos
+        ],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=["instalar", "viaje", "desinstalar"])
+    parser.add_argument("origen", nargs="?", type=int, help="id de la parada de origen")
+    parser.add_argument("destino", nargs="?", type=int, help="id de la parada de destino")
+    parser.add_argument("desde", nargs="?", help='hora mínima de salida, "YYYY-MM-DD HH:MM"')
+    parser.add_argument("--bd", help="archivo de base de datos (por defecto " + funciones_crud.RUTA_BD + ")")
+    args = parser.parse_args(argv)
+    if args.bd:
+        funciones_crud.configurar_pool(ruta_bd=args.bd)
+    if args.comando == "viaje":
+        if args.origen is None or args.destino is None or not args.desde:
+            parser.error("viaje necesita origen, destino y desde")
+        viaje = planificar(args.origen, args.destino, args.desde)
+        if viaje is None:
+            print("No hay conexión entre esas paradas después de esa hora.")
+            return 1
+        print(f"Llegada {viaje['llegada']} — {viaje['transbordos']} transbordo(s)")
+        for tramo in viaje["tramos"]:
+            print(f"  {tramo['codigo']}: {tramo['sube']} {tramo['salida']} -> {tramo['baja']} {tramo['llegada']}")
+        return 0
+    with funciones_crud.obtener_conexion() as conexion:
+        if args.comando == "instalar":
+            print("Registro de cambios de rutas instalado." if instalar(conexion) else "El registro de cambios ya estaba instalado.")
+        else:
+            desinstalar(conexion)
+            print("Registro de cambios de rutas eliminado.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
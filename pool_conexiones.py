@@ -0,0 +1,223 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# =========================================
+# POOL DE CONEXIONES SQLITE
+# =========================================
+# Mantiene un conjunto de conexiones abiertas que se reutilizan entre
+# llamadas, en vez de abrir y cerrar el archivo en cada operación.
+# Cada hilo (cada sesión de Streamlit corre en su propio hilo) toma una
+# conexión libre; si el mismo hilo vuelve a pedir conexión mientras ya
+# tiene una (por ejemplo eliminar_registro -> _buscar_referencias) se le
+# entrega la misma, así nunca se bloquea a sí mismo.
+
+
+class PoolConexiones:
+    """
+    Pool de conexiones reutilizables, seguro para varios hilos.
+    Parámetros:
+        fabrica: función sin argumentos que devuelve una conexión nueva ya configurada
+        tamano_max: cantidad máxima de conexiones abiertas a la vez
+        inactividad_max: segundos que una conexión puede estar sin uso antes de cerrarse
+        intervalo_verificacion: segundos entre chequeos de salud ("SELECT 1") de una conexión libre
+        espera_max: segundos que se espera por una conexión libre antes de fallar
+    """
+
+    def __init__(self, fabrica, tamano_max=5, inactividad_max=300.0, intervalo_verificacion=30.0, espera_max=10.0):
+        if tamano_max < 1:
+            raise ValueError("tamano_max debe ser al menos 1")
+        self.fabrica = fabrica
+        self.tamano_max = tamano_max
+        self.inactividad_max = inactividad_max
+        self.intervalo_verificacion = intervalo_verificacion
+        self.espera_max = espera_max
+        self._libres = []  # lista de (conexion, ultimo_uso, ultima_verificacion)
+        self._abiertas = 0  # conexiones creadas y no cerradas (libres + en uso)
+        self._condicion = threading.Condition()
+        self._local = threading.local()  # conexión actual y profundidad por hilo
+        self._cerrado = False
+        self.creadas = 0
+        self.reutilizadas = 0
+        self.descartadas = 0
+
+    # ---------- API pública ----------
+    @contextmanager
+    def conexion(self):
+        """
+        Entrega una conexión del pool dentro de un bloque "with".
+        Al salir del bloque la conexión vuelve al pool (no se cierra).
+        """
+        actual = getattr(self._local, "conexion", None)
+        if actual is not None:
+            # Reentrada desde el mismo hilo: se reutiliza la conexión que ya tiene
+            self._local.profundidad += 1
+            self._local.ultima_espera = 0.0
+            try:
+                yield actual
+            finally:
+                self._local.profundidad -= 1
+            return
+
+        inicio = time.perf_counter()
+        conexion = self._tomar()
+        self._local.ultima_espera = time.perf_counter() - inicio
+        self._local.conexion = conexion
+        self._local.profundidad = 1
+        sana = True
+        try:
+            yield conexion
+        except sqlite3.DatabaseError:
+            # Tras un error de base de datos se descarta lo que haya quedado a medias
+            sana = self._deshacer(conexion)
+            raise
+        finally:
+            self._local.conexion = None
+            self._local.profundidad = 0
+            if sana and conexion.in_transaction:
+                # Nadie hizo commit: no se deben filtrar cambios pendientes al siguiente usuario
+                sana = self._deshacer(conexion)
+            self._devolver(conexion, sana)
+
+    @contextmanager
+    def fijar(self, conexion):
+        """
+        Dentro del bloque, el hilo actual usa conexion (propia, ajena al pool) en
+        cada "with pool.conexion()", como si ya la hubiera tomado del pool. La usan
+        los hilos de crud_asincrono, que mantienen una conexión cada uno.
+        """
+        anterior = (getattr(self._local, "conexion", None), getattr(self._local, "profundidad", 0))
+        self._local.conexion, self._local.profundidad = conexion, 1
+        self._local.ultima_espera = 0.0
+        try:
+            yield conexion
+        finally:
+            self._local.conexion, self._local.profundidad = anterior
+
+    def en_uso(self):
+        """True si el hilo actual está dentro de un bloque "with pool.conexion()"."""
+        return getattr(self._local, "conexion", None) is not None
+
+    def actual(self):
+        """Conexión que el hilo actual tiene tomada (o fijada), None si no tiene."""
+        return getattr(self._local, "conexion", None)
+
+    def ultima_espera(self):
+        """Segundos que el hilo actual esperó por su última conexión."""
+        return getattr(self._local, "ultima_espera", 0.0)
+
+    def cerrar_todo(self):
+        """Cierra las conexiones libres y marca el pool como cerrado."""
+        with self._condicion:
+            self._cerrado = True
+            libres, self._libres = self._libres, []
+            self._abiertas -= len(libres)
+            self._condicion.notify_all()
+        for conexion, _, _ in libres:
+            self._cerrar(conexion)
+
+    def desalojar_inactivas(self):
+        """Cierra las conexiones libres que superaron inactividad_max. Retorna cuántas cerró."""
+        ahora = time.monotonic()
+        with self._condicion:
+            vigentes, vencidas = [], []
+            for item in self._libres:
+                (vencidas if ahora - item[1] > self.inactividad_max else vigentes).append(item)
+            self._libres = vigentes
+            self._abiertas -= len(vencidas)
+            if vencidas:
+                self._condicion.notify_all()
+        for conexion, _, _ in vencidas:
+            self._cerrar(conexion)
+        self.descartadas += len(vencidas)
+        return len(vencidas)
+
+    def estadisticas(self):
+        """Resumen del estado del pool (útil para depurar o mostrar en la UI)."""
+        with self._condicion:
+            return {
+                "abiertas": self._abiertas,
+                "libres": len(self._libres),
+                "tamano_max": self.tamano_max,
+                "creadas": self.creadas,
+                "reutilizadas": self.reutilizadas,
+                "descartadas": self.descartadas,
+            }
+
+    # ---------- Internos ----------
+    def _tomar(self):
+        self.desalojar_inactivas()
+        limite = time.monotonic() + self.espera_max
+        with self._condicion:
+            while True:
+                if self._cerrado:
+                    raise sqlite3.OperationalError("El pool de conexiones está cerrado")
+                if self._libres:
+                    # LIFO: la conexión usada más recientemente tiene su caché más caliente
+                    conexion, _, verificada = self._libres.pop()
+                    break
+                if self._abiertas < self.tamano_max:
+                    self._abiertas += 1
+                    conexion = None
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise sqlite3.OperationalError("No hay conexiones libres en el pool (tiempo de espera agotado)")
+                self._condicion.wait(restante)
+
+        if conexion is None:
+            return self._crear()
+        if time.monotonic() - verificada > self.intervalo_verificacion and not self._sana(conexion):
+            # La conexión quedó inutilizable: se reemplaza por una nueva
+            self._cerrar(conexion)
+            self.descartadas += 1
+            return self._crear()
+        self.reutilizadas += 1
+        return conexion
+
+    def _crear(self):
+        try:
+            conexion = self.fabrica()
+        except Exception:
+            with self._condicion:
+                self._abiertas -= 1
+                self._condicion.notify()
+            raise
+        self.creadas += 1
+        return conexion
+
+    def _devolver(self, conexion, sana):
+        ahora = time.monotonic()
+        with self._condicion:
+            if sana and not self._cerrado:
+                self._libres.append((conexion, ahora, ahora))
+                self._condicion.notify()
+                return
+            self._abiertas -= 1
+            self._condicion.notify()
+        self._cerrar(conexion)
+        self.descartadas += 1
+
+    @staticmethod
+    def _sana(conexion):
+        try:
+            conexion.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _deshacer(conexion):
+        try:
+            conexion.rollback()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _cerrar(conexion):
+        try:
+            conexion.close()
+        except sqlite3.Error:
+            pass
@@ -0,0 +1,368 @@
+"""
+Tablas de resumen materializadas para los reportes.
+
+Reemplazan la lectura de las vistas vw_boletos_por_servicio y vw_ingresos_ruta
+(que recorren todos los Boleto y Pago en cada lectura) por tablas pequeñas que
+se mantienen al día con triggers en cada escritura:
+
+    _resumen_boletos_servicio   boletos vendidos por servicio
+    _resumen_ingresos_ruta      ingresos totales por ruta
+    _resumen_ingresos_ruta_dia  ingresos por ruta y día de pago (fecha_pago)
+
+Los triggers cubren cualquier camino de escritura (funciones_crud, main.py,
+scripts SQL). Si algo las desalinea, "reconstruir" las recalcula desde cero y
+"verificar" las compara con las vistas.
+
+Uso:
+    python reportes.py instalar       (crea tablas y triggers, y las llena)
+    python reportes.py reconstruir    (recalcula todo desde Boleto/Pago)
+    python reportes.py verificar      (compara con las vistas; código 1 si difieren)
+    python reportes.py desinstalar
+"""
+import argparse
+import sys
+
+import funciones_crud
+
+TABLAS_RESUMEN = ("_resumen_boletos_servicio", "_resumen_ingresos_ruta", "_resumen_ingresos_ruta_dia")
+
+# Día de un pago como 'YYYY-MM-DD' (acepta fechas con '/' o '-'); '' si no tiene fecha
+_DIA = "COALESCE(substr(replace({col}, '/', '-'), 1, 10), '')"
+
+_CREAR_TABLAS = """
+CREATE TABLE IF NOT EXISTS _resumen_boletos_servicio (
+    servicio_id INTEGER PRIMARY KEY,
+    codigo TEXT,
+    boletos_vendidos INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS _resumen_ingresos_ruta (
+    ruta_id INTEGER PRIMARY KEY,
+    ruta TEXT,
+    total_ingresos INTEGER NOT NULL DEFAULT 0,
+    pagos INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS _resumen_ingresos_ruta_dia (
+    ruta_id INTEGER NOT NULL,
+    dia TEXT NOT NULL,
+    total_ingresos INTEGER NOT NULL DEFAULT 0,
+    pagos INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (ruta_id, dia)
+);
+"""
+
+
+# =========================================
+# SQL DE LOS TRIGGERS
+# =========================================
+def _sumar_pago(ruta, dia, monto):
+    """Sentencias que suman un pago (monto) a la ruta y a la ruta-día."""
+    return f"""
+    INSERT INTO _resumen_ingresos_ruta (ruta_id, ruta, total_ingresos, pagos)
+    VALUES ({ruta}, (SELECT nombre FROM Ruta WHERE id = {ruta}), {monto}, 1)
+    ON CONFLICT(ruta_id) DO UPDATE SET total_ingresos = total_ingresos + excluded.total_ingresos, pagos = pagos + 1;
+    INSERT INTO _resumen_ingresos_ruta_dia (ruta_id, dia, total_ingresos, pagos)
+    VALUES ({ruta}, {dia}, {monto}, 1)
+    ON CONFLICT(ruta_id, dia) DO UPDATE SET total_ingresos = total_ingresos + excluded.total_ingresos, pagos = pagos + 1;"""
+
+
+def _restar_pago(ruta, dia, monto):
+    """Sentencias que descuentan un pago; las filas que quedan sin pagos se borran."""
+    return f"""
+    UPDATE _resumen_ingresos_ruta SET total_ingresos = total_ingresos - {monto}, pagos = pagos - 1 WHERE ruta_id = {ruta};
+    DELETE FROM _resumen_ingresos_ruta WHERE ruta_id = {ruta} AND pagos <= 0;
+    UPDATE _resumen_ingresos_ruta_dia SET total_ingresos = total_ingresos - {monto}, pagos = pagos - 1 WHERE ruta_id = {ruta} AND dia = {dia};
+    DELETE FROM _resumen_ingresos_ruta_dia WHERE ruta_id = {ruta} AND dia = {dia} AND pagos <= 0;"""
+
+
+def _ruta_de_boleto(boleto_id):
+    return f"(SELECT s.ruta_id FROM Boleto b JOIN Servicio s ON s.id = b.servicio_id WHERE b.id = {boleto_id})"
+
+
+def _pagos_de_servicio(servicio_id):
+    """FROM/WHERE de los pagos de todos los boletos de un servicio."""
+    return f"FROM Boleto b JOIN Pago p ON p.boleto_id = b.id WHERE b.servicio_id = {servicio_id}"
+
+
+def _triggers():
+    """Lista de (nombre, sql) de los triggers que mantienen los resúmenes."""
+    dia_new = _DIA.format(col="NEW.fecha_pago")
+    dia_old = _DIA.format(col="OLD.fecha_pago")
+    dia_p = _DIA.format(col="p.fecha_pago")
+    pago_de_boleto = "(SELECT {c} FROM Pago WHERE boleto_id = {b})"
+    t = []
+    # ---- Servicio ----
+    t.append(("_trg_resumen_servicio_ins", """
+    AFTER INSERT ON Servicio BEGIN
+    INSERT OR IGNORE INTO _resumen_boletos_servicio (servicio_id, codigo, boletos_vendidos) VALUES (NEW.id, NEW.codigo, 0);
+    END"""))
+    t.append(("_trg_resumen_servicio_codigo", """
+    AFTER UPDATE OF codigo ON Servicio BEGIN
+    UPDATE _resumen_boletos_servicio SET codigo = NEW.codigo WHERE servicio_id = NEW.id;
+    END"""))
+    t.append(("_trg_resumen_servicio_del", """
+    AFTER DELETE ON Servicio BEGIN
+    DELETE FROM _resumen_boletos_servicio WHERE servicio_id = OLD.id;
+    END"""))
+    # Cambio de ruta de un servicio: sus ingresos pasan de la ruta vieja a la nueva
+    t.append(("_trg_resumen_servicio_ruta", f"""
+    AFTER UPDATE OF ruta_id ON Servicio WHEN OLD.ruta_id IS NOT NEW.ruta_id BEGIN
+    UPDATE _resumen_ingresos_ruta_dia SET
+        total_ingresos = total_ingresos - (SELECT COALESCE(SUM(p.monto), 0) {_pagos_de_servicio("OLD.id")} AND {dia_p} = _resumen_ingresos_ruta_dia.dia),
+        pagos = pagos - (SELECT COUNT(*) {_pagos_de_servicio("OLD.id")} AND {dia_p} = _resumen_ingresos_ruta_dia.dia)
+        WHERE ruta_id = OLD.ruta_id;
+    DELETE FROM _resumen_ingresos_ruta_dia WHERE ruta_id = OLD.ruta_id AND pagos <= 0;
+    UPDATE _resumen_ingresos_ruta SET
+        total_ingresos = total_ingresos - (SELECT COALESCE(SUM(p.monto), 0) {_pagos_de_servicio("OLD.id")}),
+        pagos = pagos - (SELECT COUNT(*) {_pagos_de_servicio("OLD.id")})
+        WHERE ruta_id = OLD.ruta_id;
+    DELETE FROM _resumen_ingresos_ruta WHERE ruta_id = OLD.ruta_id AND pagos <= 0;
+    INSERT INTO _resumen_ingresos_ruta_dia (ruta_id, dia, total_ingresos, pagos)
+        SELECT NEW.ruta_id, {dia_p}, SUM(p.monto), COUNT(*) {_pagos_de_servicio("NEW.id")} GROUP BY 2
+        ON CONFLICT(ruta_id, dia) DO UPDATE SET total_ingresos = total_ingresos + excluded.total_ingresos, pagos = pagos + excluded.pagos;
+    INSERT INTO _resumen_ingresos_ruta (ruta_id, ruta, total_ingresos, pagos)
+        SELECT NEW.ruta_id, (SELECT nombre FROM Ruta WHERE id = NEW.ruta_id), SUM(p.monto), COUNT(*) {_pagos_de_servicio("NEW.id")} HAVING COUNT(*) > 0
+        ON CONFLICT(ruta_id) DO UPDATE SET total_ingresos = total_ingresos + excluded.total_ingresos, pagos = pagos + excluded.pagos;
+    END"""))
+    # ---- Ruta ----
+    t.append(("_trg_resumen_ruta_nombre", """
+    AFTER UPDATE OF nombre ON Ruta BEGIN
+    UPDATE _resumen_ingresos_ruta SET ruta = NEW.nombre WHERE ruta_id = NEW.id;
+    END"""))
+    # ---- Boleto ----
+    t.append(("_trg_resumen_boleto_ins", """
+    AFTER INSERT ON Boleto BEGIN
+    UPDATE _resumen_boletos_servicio SET boletos_vendidos = boletos_vendidos + 1 WHERE servicio_id = NEW.servicio_id;
+    END"""))
+    t.append(("_trg_resumen_boleto_del", """
+    AFTER DELETE ON Boleto BEGIN
+    UPDATE _resumen_boletos_servicio SET boletos_vendidos = boletos_vendidos - 1 WHERE servicio_id = OLD.servicio_id;
+    END"""))
+    # Cambio de servicio de un boleto: mueve el conteo y, si cambia la ruta, su pago
+    ruta_vieja = "(SELECT ruta_id FROM Servicio WHERE id = OLD.servicio_id)"
+    ruta_nueva = "(SELECT ruta_id FROM Servicio WHERE id = NEW.servicio_id)"
+    monto_pago = pago_de_boleto.format(c="monto", b="NEW.id")
+    dia_pago = pago_de_boleto.format(c=_DIA.format(col="fecha_pago"), b="NEW.id")
+    t.append(("_trg_resumen_boleto_servicio", """
+    AFTER UPDATE OF servicio_id ON Boleto WHEN OLD.servicio_id IS NOT NEW.servicio_id BEGIN
+    UPDATE _resumen_boletos_servicio SET boletos_vendidos = boletos_vendidos - 1 WHERE servicio_id = OLD.servicio_id;
+    UPDATE _resumen_boletos_servicio SET boletos_vendidos = boletos_vendidos + 1 WHERE servicio_id = NEW.servicio_id;
+    END"""))
+    t.append(("_trg_resumen_boleto_ruta", f"""
+    AFTER UPDATE OF servicio_id ON Boleto
+    WHEN EXISTS (SELECT 1 FROM Pago WHERE boleto_id = NEW.id) AND {ruta_vieja} IS NOT {ruta_nueva} BEGIN
+    {_restar_pago(ruta_vieja, dia_pago, monto_pago)}
+    {_sumar_pago(ruta_nueva, dia_pago, monto_pago)}
+    END"""))
+    # ---- Pago ----
+    t.append(("_trg_resumen_pago_ins", f"""
+    AFTER INSERT ON Pago BEGIN
+    {_sumar_pago(_ruta_de_boleto("NEW.boleto_id"), dia_new, "NEW.monto")}
+    END"""))
+    t.append(("_trg_resumen_pago_del", f"""
+    AFTER DELETE ON Pago BEGIN
+    {_restar_pago(_ruta_de_boleto("OLD.boleto_id"), dia_old, "OLD.monto")}
+    END"""))
+    t.append(("_trg_resumen_pago_upd", f"""
+    AFTER UPDATE OF monto, boleto_id, fecha_pago ON Pago BEGIN
+    {_restar_pago(_ruta_de_boleto("OLD.boleto_id"), dia_old, "OLD.monto")}
+    {_sumar_pago(_ruta_de_boleto("NEW.boleto_id"), dia_new, "NEW.monto")}
+    END"""))
+    return t
+
+
+# =========================================
+# INSTALAR / RECONSTRUIR
+# =========================================
+_instalado = set()  # archivos de base donde ya se verificó la instalación
+
+
+def instalado(conexion):
+    """True si las tablas de resumen y sus triggers existen en la base."""
+    nombres = {r[0] for r in conexion.execute(
+        "SELECT name FROM sqlite_master WHERE name LIKE '\\_resumen\\_%' ESCAPE '\\' OR name LIKE '\\_trg\\_resumen\\_%' ESCAPE '\\'"
+    )}
+    return set(TABLAS_RESUMEN) <= nombres and {n for n, _ in _triggers()} <= nombres
+
+
+def instalar(conexion=None):
+    """
+    Crea las tablas de resumen y sus triggers si faltan, y las llena desde cero.
+    Es idempotente: si ya están instaladas no hace nada. Retorna True si instaló.
+    """
+    if conexion is None:
+        if funciones_crud.RUTA_BD in _instalado:
+            return False
+        with funciones_crud.obtener_conexion() as propia:
+            resultado = instalar(propia)
+        _instalado.add(funciones_crud.RUTA_BD)
+        return resultado
+    if instalado(conexion):
+        return False
+    conexion.executescript("BEGIN IMMEDIATE;" + _CREAR_TABLAS)
+    try:
+        for nombre, cuerpo in _triggers():
+            conexion.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+        _reconstruir(conexion)
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+    return True
+
+
+def desinstalar(conexion):
+    """Borra triggers y tablas de resumen."""
+    for nombre, _ in _triggers():
+        conexion.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    for tabla in TABLAS_RESUMEN:
+        conexion.execute(f"DROP TABLE IF EXISTS {tabla}")
+    conexion.commit()
+    _instalado.clear()
+
+
+def _reconstruir(conexion):
+    dia_p = _DIA.format(col="p.fecha_pago")
+    for tabla in TABLAS_RESUMEN:
+        conexion.execute(f"DELETE FROM {tabla}")
+    conexion.execute("""
+        INSERT INTO _resumen_boletos_servicio (servicio_id, codigo, boletos_vendidos)
+        SELECT s.id, s.codigo, COUNT(b.id) FROM Servicio s LEFT JOIN Boleto b ON b.servicio_id = s.id GROUP BY s.id""")
+    conexion.execute("""
+        INSERT INTO _resumen_ingresos_ruta (ruta_id, ruta, total_ingresos, pagos)
+        SELECT r.id, r.nombre, SUM(p.monto), COUNT(p.id)
+        FROM Ruta r JOIN Servicio s ON s.ruta_id = r.id JOIN Boleto b ON b.servicio_id = s.id JOIN Pago p ON p.boleto_id = b.id
+        GROUP BY r.id""")
+    conexion.execute(f"""
+        INSERT INTO _resumen_ingresos_ruta_dia (ruta_id, dia, total_ingresos, pagos)
+        SELECT s.ruta_id, {dia_p}, SUM(p.monto), COUNT(p.id)
+        FROM Servicio s JOIN Boleto b ON b.servicio_id = s.id JOIN Pago p ON p.boleto_id = b.id
+        GROUP BY s.ruta_id, 2""")
+
+
+def reconstruir(conexion):
+    """Recalcula las tablas de resumen desde Servicio/Boleto/Pago en una sola transacción."""
+    conexion.execute("BEGIN IMMEDIATE")
+    try:
+        _reconstruir(conexion)
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+
+
+# =========================================
+# VERIFICACIÓN DE CONSISTENCIA
+# =========================================
+def verificar(conexion):
+    """
+    Compara los resúmenes con las vistas (y el resumen por día con una agregación en vivo).
+    Retorna {nombre_resumen: {"faltan": [...], "sobran": [...]}} solo con los que difieren;
+    un diccionario vacío significa que todo está consistente.
+    """
+    dia_p = _DIA.format(col="p.fecha_pago")
+    comparaciones = {
+        "_resumen_boletos_servicio": (
+            "SELECT servicio_id, codigo, boletos_vendidos FROM _resumen_boletos_servicio",
+            "SELECT servicio_id, codigo, boletos_vendidos FROM vw_boletos_por_servicio",
+        ),
+        "_resumen_ingresos_ruta": (
+            "SELECT ruta, total_ingresos FROM _resumen_ingresos_ruta",
+            "SELECT ruta, total_ingresos FROM vw_ingresos_ruta",
+        ),
+        "_resumen_ingresos_ruta_dia": (
+            "SELECT ruta_id, dia, total_ingresos, pagos FROM _resumen_ingresos_ruta_dia",
+            f"""SELECT s.ruta_id, {dia_p}, SUM(p.monto), COUNT(p.id)
+                FROM Servicio s JOIN Boleto b ON b.servicio_id = s.id JOIN Pago p ON p.boleto_id = b.id
+                GROUP BY s.ruta_id, 2""",
+        ),
+    }
+    diferencias = {}
+    for nombre, (sql_resumen, sql_vivo) in comparaciones.items():
+        resumen = sorted(conexion.execute(sql_resumen).fetchall(), key=repr)
+        vivo = sorted(conexion.execute(sql_vivo).fetchall(), key=repr)
+        if resumen != vivo:
+            diferencias[nombre] = {
+                "faltan": [f for f in vivo if f not in resumen],
+                "sobran": [f for f in resumen if f not in vivo],
+            }
+    return diferencias
+
+
+# =========================================
+# LECTURA DE LOS RESÚMENES
+# =========================================
+def boletos_por_servicio(limite=100):
+    """[(servicio_id, codigo, boletos_vendidos)] desde el resumen (no recorre Boleto)."""
+    instalar()
+    with funciones_crud.obtener_conexion() as conexion:
+        return conexion.execute(
+            "SELECT servicio_id, codigo, boletos_vendidos FROM _resumen_boletos_servicio ORDER BY servicio_id LIMIT ?", (limite,)
+        ).fetchall()
+
+
+def ingresos_por_ruta():
+    """[(ruta_id, ruta, total_ingresos, pagos)] desde el resumen (no recorre Pago)."""
+    instalar()
+    with funciones_crud.obtener_conexion() as conexion:
+        return conexion.execute(
+            "SELECT ruta_id, ruta, total_ingresos, pagos FROM _resumen_ingresos_ruta ORDER BY total_ingresos DESC"
+        ).fetchall()
+
+
+def ingresos_por_dia(desde=None, hasta=None, ruta_id=None):
+    """[(ruta_id, dia, total_ingresos, pagos)] por día ('YYYY-MM-DD'), con filtros opcionales."""
+    instalar()
+    condiciones, valores = [], []
+    if desde:
+        condiciones.append("dia >= ?")
+        valores.append(desde)
+    if hasta:
+        condiciones.append("dia <= ?")
+        valores.append(hasta)
+    if ruta_id is not None:
+        condiciones.append("ruta_id = ?")
+        valores.append(ruta_id)
+    sql = "SELECT ruta_id, dia, total_ingresos, pagos FROM _resumen_ingresos_ruta_dia"
+    if condiciones:
+        sql += " WHERE " + " AND ".join(condiciones)
+    with funciones_crud.obtener_conexion() as conexion:
+        return conexion.execute(sql + " ORDER BY dia, ruta_id", tuple(valores)).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=["instalar", "reconstruir", "verificar", "desinstalar"])
+    parser.add_argument("--bd", help="archivo de base de datos (por defecto " + funciones_crud.RUTA_BD + ")")
+    args = parser.parse_args(argv)
+    if args.bd:
+        funciones_crud.configurar_pool(ruta_bd=args.bd)
+    with funciones_crud.obtener_conexion() as conexion:
+        if args.comando == "instalar":
+            print("Resúmenes instalados." if instalar(conexion) else "Los resúmenes ya estaban instalados.")
+        elif args.comando == "reconstruir":
+            if not instalar(conexion):
+                reconstruir(conexion)
+            print("Resúmenes reconstruidos.")
+        elif args.comando == "desinstalar":
+            desinstalar(conexion)
+            print("Resúmenes eliminados.")
+        else:
+            if not instalado(conexion):
+                print("Los resúmenes no están instalados (use: python reportes.py instalar).")
+                return 1
+            diferencias = verificar(conexion)
+            if not diferencias:
+                print("Resúmenes consistentes con las vistas.")
+                return 0
+            for nombre, detalle in diferencias.items():
+                print(f"{nombre}: faltan {len(detalle['faltan'])} filas, sobran {len(detalle['sobran'])}")
+                for fila in detalle["faltan"][:10]:
+                    print("   falta:", fila)
+                for fila in detalle["sobran"][:10]:
+                    print("   sobra:", fila)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# =========================================
+# CONSTRUCTOR DE SENTENCIAS CRUD
+# =========================================
+# Arma el texto SQL de insertar / consultar / actualizar / eliminar y lo guarda
+# por (operación, tabla, columnas, condición, orden...): cuando el mismo
+# formulario se envía otra vez no se vuelve a concatenar ni a validar nada, y
+# como el texto es idéntico, la caché de sentencias preparadas de cada conexión
+# del pool (cached_statements de sqlite3) evita que SQLite lo vuelva a compilar.
+#
+# Antes de guardar una sentencia se validan sus identificadores contra el
+# catálogo (catalogo.py):
+#   - la tabla y las columnas de INSERT/UPDATE deben existir;
+#   - en columnas, condición y orden cada palabra tiene que ser una columna de
+#     la tabla, una palabra clave de expresión (AND, LIKE, BETWEEN, DESC...) o
+#     una función conocida (COUNT, lower, substr...). No se aceptan ";",
+#     comentarios ni SELECT: un nombre de tabla o una condición armada con
+#     texto del usuario no puede leer ni modificar otra tabla.
+# Los valores siempre van como parámetros "?"; los literales entre comillas
+# simples se aceptan en la condición ("patente LIKE 'Z%'").
+
+PALABRAS_EXPRESION = {
+    "AND", "OR", "NOT", "IN", "IS", "NULL", "LIKE", "GLOB", "BETWEEN", "ESCAPE",
+    "COLLATE", "NOCASE", "BINARY", "RTRIM", "ASC", "DESC", "CASE", "WHEN", "THEN",
+    "ELSE", "END", "DISTINCT", "TRUE", "FALSE", "AS", "NULLS", "FIRST", "LAST",
+}
+FUNCIONES = {
+    "COUNT", "SUM", "TOTAL", "AVG", "MIN", "MAX", "LOWER", "UPPER", "LENGTH", "SUBSTR",
+    "TRIM", "LTRIM", "RTRIM", "REPLACE", "COALESCE", "IFNULL", "NULLIF", "ABS", "ROUND",
+    "DATE", "TIME", "DATETIME", "STRFTIME", "JULIANDAY", "INSTR", "TYPEOF", "PRINTF", "CAST",
+}
+
+_TOKEN = re.compile(r"""
+    (?P<espacio>\s+)
+  | (?P<texto>'(?:[^']|'')*')
+  | (?P<citado>"(?:[^"]|"")*")
+  | (?P<palabra>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<numero>\d+(?:\.\d+)?)
+  | (?P<simbolo><=|>=|<>|!=|==|\|\||[=<>+\-*/%(),.?])
+""", re.VERBOSE)
+
+
+class ConstructorSentencias:
+    """
+    Caché de textos SQL validados contra el catálogo del esquema.
+    Parámetros:
+        obtener_catalogo: función sin argumentos que devuelve el CatalogoEsquema
+            de la base actual (solo se llama al armar una sentencia nueva)
+        max_entradas: cantidad máxima de sentencias guardadas
+    Los métodos lanzan ValueError si la tabla, una columna o una expresión no es válida.
+    """
+
+    def __init__(self, obtener_catalogo, max_entradas=512):
+        self.obtener_catalogo = obtener_catalogo
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()  # clave -> texto SQL, en orden de armado
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.rechazadas = 0
+
+    # ---------- Sentencias ----------
+    def insertar(self, tabla, columnas):
+        """INSERT INTO tabla (columnas) VALUES (?, ...)."""
+        columnas = tuple(columnas)
+        return self._obtener(("INSERT", tabla, columnas), lambda: self._insertar(tabla, columnas))
+
+    def upsert(self, tabla, columnas, conflicto):
+        """INSERT ... ON CONFLICT(c) DO UPDATE SET ... (sin la clave primaria) por cada columna de conflicto."""
+        columnas, conflicto = tuple(columnas), tuple(conflicto)
+        return self._obtener(("UPSERT", tabla, columnas, conflicto), lambda: self._upsert(tabla, columnas, conflicto))
+
+    def seleccionar(self, tabla, columnas="*", condicion=None, orden=None, con_limite=False, con_desplazamiento=False, por_clave=False):
+        """
+        SELECT columnas FROM tabla [WHERE ...] [ORDER BY ...] [LIMIT ?] [OFFSET ?].
+        Parámetros:
+            columnas: "*", texto "a, b" o lista de columnas/expresiones
+            condicion, orden: texto del WHERE y del ORDER BY (se validan)
+            con_limite, con_desplazamiento: agrega "LIMIT ?" / "OFFSET ?"
+            por_clave: paginación por clave, agrega "id > ?" y ordena por id si no hay orden
+        """
+        if isinstance(columnas, list):
+            columnas = tuple(columnas)
+        clave = ("SELECT", tabla, columnas, condicion, orden, con_limite, con_desplazamiento, por_clave)
+        return self._obtener(clave, lambda: self._seleccionar(tabla, columnas, condicion, orden, con_limite, con_desplazamiento, por_clave))
+
+    def actualizar(self, tabla, columnas, condicion):
+        """UPDATE tabla SET c1 = ?, c2 = ? WHERE condicion."""
+        columnas = tuple(columnas)
+        return self._obtener(("UPDATE", tabla, columnas, condicion), lambda: self._actualizar(tabla, columnas, condicion))
+
+    def eliminar(self, tabla, condicion):
+        """DELETE FROM tabla WHERE condicion."""
+        return self._obtener(("DELETE", tabla, condicion), lambda: self._eliminar(tabla, condicion))
+
+    # ---------- Caché ----------
+    def limpiar(self):
+        """Olvida las sentencias guardadas (por ejemplo al cambiar de base o de esquema)."""
+        with self._candado:
+            self._entradas.clear()
+
+    def estadisticas(self):
+        """Contadores del constructor (aciertos, fallos, rechazadas, entradas)."""
+        with self._candado:
+            pedidas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / pedidas if pedidas else 0.0,
+                "rechazadas": self.rechazadas,
+                "entradas": len(self._entradas),
+            }
+
+    def _obtener(self, clave, armar):
+        # Lectura sin candado (un dict.get es atómico): el acierto es el camino de
+        # cada llamada y no debe costar más que la concatenación que reemplaza.
+        # Al llenarse se descarta la sentencia más antigua (orden de inserción).
+        texto = self._entradas.get(clave)
+        if texto is not None:
+            self.aciertos += 1  # contador aproximado entre hilos
+            return texto
+        with self._candado:
+            self.fallos += 1
+        try:
+            texto = armar()
+        except ValueError:
+            with self._candado:
+                self.rechazadas += 1
+            raise
+        with self._candado:
+            self._entradas[clave] = texto
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return texto
+
+    # ---------- Armado y validación ----------
+    def _tabla(self, tabla):
+        info = self.obtener_catalogo().tablas.get(tabla) if isinstance(tabla, str) else None
+        if info is None:
+            raise ValueError(f"No existe la tabla {tabla!r}.")
+        return info
+
+    @staticmethod
+    def _columnas(info, columnas):
+        if not columnas:
+            raise ValueError(f"No se indicaron columnas para {info.nombre}.")
+        nombres = set(info.nombres_columnas)
+        for columna in columnas:
+            if columna not in nombres:
+                raise ValueError(f"La tabla {info.nombre} no tiene la columna {columna!r}.")
+            if columnas.count(columna) > 1:
+                raise ValueError(f"La columna {columna!r} está repetida.")
+        return ", ".join(f'"{c}"' for c in columnas)
+
+    def _insertar(self, tabla, columnas):
+        info = self._tabla(tabla)
+        return f'INSERT INTO "{info.nombre}" ({self._columnas(info, columnas)}) VALUES ({", ".join("?" * len(columnas))})'
+
+    def _upsert(self, tabla, columnas, conflicto):
+        texto = self._insertar(tabla, columnas)
+        faltantes = [c for c in conflicto if c not in columnas]
+        if faltantes:
+            raise ValueError("Faltan las columnas de conflicto en lista_columnas: " + ", ".join(faltantes))
+        # La clave primaria nunca se actualiza: si la fila choca por una columna UNIQUE,
+        # la existente conserva su id (y las filas que la referencian siguen apuntándole)
+        clave = self._tabla(tabla).pk
+        actualizar = [c for c in columnas if c not in conflicto and c not in clave]
+        if actualizar:
+            accion = "DO UPDATE SET " + ", ".join(f'"{c}" = excluded."{c}"' for c in actualizar)
+        else:
+            accion = "DO NOTHING"
+        if sqlite3.sqlite_version_info < (3, 24, 0):
+            raise ValueError(f"upsert necesita SQLite 3.24 o superior (esta es {sqlite3.sqlite_version}).")
+        # Una cláusula ON CONFLICT por cada columna UNIQUE (cada una es un índice único
+        # distinto). Antes de SQLite 3.35 solo se admite una: se usa la primera y un
+        # conflicto en otra columna UNIQUE queda como fila con error en el resumen
+        if sqlite3.sqlite_version_info < (3, 35, 0):
+            conflicto = conflicto[:1]
+        return texto + "".join(f' ON CONFLICT("{c}") {accion}' for c in conflicto)
+
+    def _seleccionar(self, tabla, columnas, condicion, orden, con_limite, con_desplazamiento, por_clave):
+        info = self._tabla(tabla)
+        if columnas == "*" or not columnas:
+            lista = "*"
+        else:
+            partes = columnas if isinstance(columnas, tuple) else [c.strip() for c in _dividir(columnas)]
+            for parte in partes:
+                if parte != "*":
+                    validar_expresion(info, parte)
+            lista = ", ".join(partes)
+        texto = f'SELECT {lista} FROM "{info.nombre}"'
+        if condicion:
+            validar_expresion(info, condicion)
+        if por_clave:
+            condicion = f"({condicion}) AND id > ?" if condicion else "id > ?"
+            orden = orden or "id"
+        if condicion:
+            texto += " WHERE " + condicion
+        if orden:
+            validar_expresion(info, orden)
+            texto += " ORDER BY " + orden
+        if con_limite:
+            texto += " LIMIT ?"
+            if con_desplazamiento:
+                texto += " OFFSET ?"
+        elif con_desplazamiento:
+            texto += " LIMIT -1 OFFSET ?"
+        return texto
+
+    def _actualizar(self, tabla, columnas, condicion):
+        info = self._tabla(tabla)
+        self._columnas(info, columnas)
+        if not condicion:
+            raise ValueError("actualizar necesita una condición.")
+        validar_expresion(info, condicion)
+        asignaciones = ", ".join(f'"{c}" = ?' for c in columnas)
+        return f'UPDATE "{info.nombre}" SET {asignaciones} WHERE {condicion}'
+
+    def _eliminar(self, tabla, condicion):
+        info = self._tabla(tabla)
+        if not condicion:
+            raise ValueError("eliminar necesita una condición.")
+        validar_expresion(info, condicion)
+        return f'DELETE FROM "{info.nombre}" WHERE {condicion}'
+
+
+def _dividir(texto):
+    """Separa "a, COUNT(*), b" por las comas que no están dentro de paréntesis."""
+    partes, nivel, actual = [], 0, []
+    for caracter in texto:
+        if caracter == "," and nivel == 0:
+            partes.append("".join(actual))
+            actual = []
+            continue
+        nivel += caracter == "("
+        nivel -= caracter == ")"
+        actual.append(caracter)
+    partes.append("".join(actual))
+    return partes
+
+
+def validar_expresion(info, texto):
+    """
+    Revisa una expresión (lista de columnas, condición u orden) de la tabla info:
+    cada palabra debe ser una columna, una palabra de PALABRAS_EXPRESION o una
+    función de FUNCIONES seguida de "(". Lanza ValueError si no.
+    """
+    if "--" in texto or "/*" in texto:
+        raise ValueError("La expresión no puede tener comentarios SQL.")
+    columnas = {c.lower() for c in info.nombres_columnas} | {"rowid"}
+    tokens = []
+    posicion = 0
+    while posicion < len(texto):
+        coincide = _TOKEN.match(texto, posicion)
+        if not coincide:
+            raise ValueError(f"Carácter no permitido en la expresión: {texto[posicion]!r}.")
+        posicion = coincide.end()
+        if coincide.lastgroup != "espacio":
+            tokens.append((coincide.lastgroup, coincide.group()))
+    nivel = 0
+    for i, (tipo, valor) in enumerate(tokens):
+        if tipo == "citado":
+            if valor[1:-1].replace('""', '"').lower() not in columnas:
+                raise ValueError(f"La tabla {info.nombre} no tiene la columna {valor}.")
+        elif tipo == "palabra":
+            siguiente = tokens[i + 1][1] if i + 1 < len(tokens) else ""
+            anterior = tokens[i - 1][1] if i else ""
+            mayuscula = valor.upper()
+            if siguiente == ".":
+                if valor != info.nombre:
+                    raise ValueError(f"Solo se pueden usar columnas de {info.nombre}.")
+            elif anterior.upper() == "AS" or (mayuscula in FUNCIONES and siguiente == "("):
+                continue  # alias ("COUNT(*) AS total"), tipo de CAST o llamada a función
+            elif valor.lower() not in columnas and mayuscula not in PALABRAS_EXPRESION:
+                raise ValueError(f"La tabla {info.nombre} no tiene la columna {valor!r}.")
+        elif valor == "(":
+            nivel += 1
+        elif valor == ")":
+            nivel -= 1
+            if nivel < 0:
+                raise ValueError("Paréntesis desbalanceados en la expresión.")
+    if nivel:
+        raise ValueError("Paréntesis desbalanceados en la expresión.")
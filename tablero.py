@@ -0,0 +1,403 @@
+"""
+Indicadores del tablero de operación (página "Tablero" de Streamlit).
+
+    ocupación por servicio      boletos vendidos / Bus.capacidad
+    ingresos por ruta y día     (_resumen_ingresos_ruta_dia de reportes.py)
+    mezcla de medios de pago    por hora y por día
+    carga de cada chofer        servicios y minutos de viaje por día
+
+Los dos primeros salen de los resúmenes de reportes.py. Los otros dos se
+guardan en tablas de acumulados por período que se ponen al día leyendo solo
+las filas nuevas: _kpi_marca guarda el último id de Pago y de Servicio ya
+sumado, y cada actualización suma las filas con id mayor (por la clave
+primaria, en lotes) y avanza la marca en la misma transacción. Los ids son
+AUTOINCREMENT, así que nunca aparece una fila nueva por debajo de la marca.
+Las inserciones normales no pagan nada extra; los triggers solo corrigen los
+acumulados cuando se cambia o se borra una fila ya sumada (o se inserta una
+con id explícito por debajo de la marca).
+
+    _kpi_pagos_hora    hora ('YYYY-MM-DD HH:00'), metodo -> total_ingresos, pagos
+    _kpi_chofer_dia    dia ('YYYY-MM-DD'), chofer_id -> minutos, servicios
+
+Uso:
+    python tablero.py instalar      (crea tablas y triggers, y suma todo lo existente)
+    python tablero.py actualizar    (suma las filas nuevas)
+    python tablero.py verificar     (compara con la agregación en vivo; código 1 si difieren)
+    python tablero.py desinstalar
+"""
+import argparse
+import datetime
+import sys
+from typing import Any, Dict, List, Optional
+
+import fechas
+import funciones_crud
+import reportes
+
+TABLAS_KPI = ("_kpi_pagos_hora", "_kpi_chofer_dia", "_kpi_marca")
+TAMANO_LOTE = 50000  # filas de la tabla de origen sumadas por transacción
+
+# Por cada tabla de origen: su tabla de acumulados, las claves del período
+# (expresiones sobre la fila, con {f} = prefijo NEW./OLD./vacío) y las medidas.
+# La última medida cuenta filas: cuando llega a 0 el período se borra.
+_FUENTES = {
+    "Pago": {
+        "tabla": "_kpi_pagos_hora",
+        "claves": {"hora": "COALESCE(substr({f}fecha_pago, 1, 13) || ':00', '')", "metodo": "{f}metodo"},
+        "medidas": {"total_ingresos": "{f}monto", "pagos": "1"},
+        "columnas": ("fecha_pago", "metodo", "monto"),
+    },
+    "Servicio": {
+        "tabla": "_kpi_chofer_dia",
+        "claves": {"dia": "substr({f}fecha_salida, 1, 10)", "chofer_id": "{f}chofer_id"},
+        "medidas": {
+            "minutos": "COALESCE(MAX(0, CAST(round((julianday({f}fecha_llegada) - julianday({f}fecha_salida)) * 1440) AS INTEGER)), 0)",
+            "servicios": "1",
+        },
+        "columnas": ("fecha_salida", "fecha_llegada", "chofer_id"),
+    },
+}
+
+_CREAR_TABLAS = """
+CREATE TABLE IF NOT EXISTS _kpi_pagos_hora (
+    hora TEXT NOT NULL,
+    metodo TEXT NOT NULL,
+    total_ingresos INTEGER NOT NULL DEFAULT 0,
+    pagos INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (hora, metodo)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS _kpi_chofer_dia (
+    dia TEXT NOT NULL,
+    chofer_id INTEGER NOT NULL,
+    minutos INTEGER NOT NULL DEFAULT 0,
+    servicios INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, chofer_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS _kpi_marca (
+    tabla TEXT PRIMARY KEY,
+    ultimo_id INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+# =========================================
+# SQL DE LOS ACUMULADOS
+# =========================================
+def _expresiones(fuente, grupo, prefijo):
+    return [e.format(f=prefijo) for e in _FUENTES[fuente][grupo].values()]
+
+
+def _sumar(fuente, prefijo):
+    """Suma la fila NEW/OLD a su período (INSERT ... ON CONFLICT)."""
+    d = _FUENTES[fuente]
+    columnas = list(d["claves"]) + list(d["medidas"])
+    valores = _expresiones(fuente, "claves", prefijo) + _expresiones(fuente, "medidas", prefijo)
+    suma = ", ".join(f"{m} = {m} + excluded.{m}" for m in d["medidas"])
+    return (f"INSERT INTO {d['tabla']} ({', '.join(columnas)}) VALUES ({', '.join(valores)}) "
+            f"ON CONFLICT({', '.join(d['claves'])}) DO UPDATE SET {suma};")
+
+
+def _restar(fuente, prefijo):
+    """Descuenta la fila de su período y borra el período si quedó sin filas."""
+    d = _FUENTES[fuente]
+    donde = " AND ".join(f"{c} = {e}" for c, e in zip(d["claves"], _expresiones(fuente, "claves", prefijo)))
+    resta = ", ".join(f"{m} = {m} - {e}" for m, e in zip(d["medidas"], _expresiones(fuente, "medidas", prefijo)))
+    contador = list(d["medidas"])[-1]
+    return (f"UPDATE {d['tabla']} SET {resta} WHERE {donde}; "
+            f"DELETE FROM {d['tabla']} WHERE {donde} AND {contador} <= 0;")
+
+
+def _sumar_lote(fuente):
+    """Suma las filas con id en (desde, hasta] agrupadas por período."""
+    d = _FUENTES[fuente]
+    claves = _expresiones(fuente, "claves", "")
+    medidas = [f"SUM({e})" for e in _expresiones(fuente, "medidas", "")]
+    grupos = ", ".join(str(i) for i in range(1, len(claves) + 1))
+    suma = ", ".join(f"{m} = {m} + excluded.{m}" for m in d["medidas"])
+    return (f"INSERT INTO {d['tabla']} ({', '.join(list(d['claves']) + list(d['medidas']))}) "
+            f"SELECT {', '.join(claves + medidas)} FROM {fuente} WHERE id > ? AND id <= ? GROUP BY {grupos} "
+            f"ON CONFLICT({', '.join(d['claves'])}) DO UPDATE SET {suma}")
+
+
+def _triggers():
+    """Lista de (nombre, sql): solo corrigen filas que ya están por debajo de la marca."""
+    t = []
+    for fuente in _FUENTES:
+        marca = f"(SELECT ultimo_id FROM _kpi_marca WHERE tabla = '{fuente}')"
+        base = fuente.lower()
+        t.append((f"_trg_kpi_{base}_ins", f"""
+    AFTER INSERT ON {fuente} WHEN NEW.id <= {marca} BEGIN
+    {_sumar(fuente, "NEW.")}
+    END"""))
+        t.append((f"_trg_kpi_{base}_del", f"""
+    AFTER DELETE ON {fuente} WHEN OLD.id <= {marca} BEGIN
+    {_restar(fuente, "OLD.")}
+    END"""))
+        t.append((f"_trg_kpi_{base}_upd", f"""
+    AFTER UPDATE OF {', '.join(_FUENTES[fuente]['columnas'])} ON {fuente} WHEN OLD.id <= {marca} BEGIN
+    {_restar(fuente, "OLD.")}
+    {_sumar(fuente, "NEW.")}
+    END"""))
+    return t
+
+
+# =========================================
+# INSTALAR / ACTUALIZAR
+# =========================================
+_instalado = set()  # archivos de base donde ya se verificó la instalación
+
+
+def instalado(conexion):
+    """True si las tablas de acumulados y sus triggers existen en la base."""
+    nombres = {r[0] for r in conexion.execute(
+        "SELECT name FROM sqlite_master WHERE name LIKE '\\_kpi\\_%' ESCAPE '\\' OR name LIKE '\\_trg\\_kpi\\_%' ESCAPE '\\'"
+    )}
+    return set(TABLAS_KPI) <= nombres and {n for n, _ in _triggers()} <= nombres
+
+
+def instalar(conexion=None):
+    """
+    Crea las tablas de acumulados y sus triggers si faltan (con la marca en 0) y
+    suma las filas existentes. Es idempotente. Retorna True si instaló.
+    """
+    if conexion is None:
+        if funciones_crud.RUTA_BD in _instalado:
+            return False
+
+        def operacion():
+            with funciones_crud.obtener_conexion() as propia:
+                return instalar(propia)
+
+        # Por el hilo escritor y con reintentos, como las demás escrituras; la base
+        # se marca como revisada solo si la instalación terminó con su commit
+        resultado = funciones_crud.en_escritor(lambda: funciones_crud.con_reintentos(operacion))
+        _instalado.add(funciones_crud.RUTA_BD)
+        if resultado:
+            actualizar()
+        return resultado
+    if instalado(conexion):
+        return False
+    try:
+        conexion.executescript("BEGIN IMMEDIATE;" + _CREAR_TABLAS)
+        for nombre, cuerpo in _triggers():
+            conexion.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+        conexion.executemany("INSERT OR IGNORE INTO _kpi_marca (tabla, ultimo_id) VALUES (?, 0)", [(f,) for f in _FUENTES])
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+    return True
+
+
+def desinstalar(conexion):
+    """Borra triggers y tablas de acumulados."""
+    for nombre, _ in _triggers():
+        conexion.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    for tabla in TABLAS_KPI:
+        conexion.execute(f"DROP TABLE IF EXISTS {tabla}")
+    conexion.commit()
+    _instalado.clear()
+
+
+def _sumar_nuevas(fuente, tamano_lote):
+    """Suma un lote de filas por encima de la marca y la avanza; retorna cuántas sumó."""
+    def operacion():
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                marca = conexion.execute("SELECT ultimo_id FROM _kpi_marca WHERE tabla = ?", (fuente,)).fetchone()[0]
+                tope, filas = conexion.execute(
+                    f"SELECT MAX(id), COUNT(*) FROM (SELECT id FROM {fuente} WHERE id > ? ORDER BY id LIMIT ?)",
+                    (marca, tamano_lote)).fetchone()
+                if filas:
+                    conexion.execute(_sumar_lote(fuente), (marca, tope))
+                    conexion.execute("UPDATE _kpi_marca SET ultimo_id = ? WHERE tabla = ?", (tope, fuente))
+                conexion.commit()
+            except Exception:
+                conexion.rollback()
+                raise
+        return filas
+
+    return funciones_crud.en_escritor(lambda: funciones_crud.con_reintentos(operacion))
+
+
+def actualizar(tamano_lote: int = TAMANO_LOTE) -> Dict[str, int]:
+    """
+    Suma a los acumulados las filas nuevas desde la última vez, en lotes de
+    tamano_lote filas (una transacción corta por lote, por el hilo escritor).
+    Retorna {tabla_origen: filas sumadas}.
+    """
+    instalar()
+    sumadas = {}
+    for fuente in _FUENTES:
+        sumadas[fuente] = 0
+        while True:
+            filas = _sumar_nuevas(fuente, tamano_lote)
+            sumadas[fuente] += filas
+            if filas < tamano_lote:
+                break
+    return sumadas
+
+
+def reconstruir(conexion):
+    """Vacía los acumulados y vuelve la marca a 0; el próximo actualizar() suma todo."""
+    conexion.execute("BEGIN IMMEDIATE")
+    try:
+        for d in _FUENTES.values():
+            conexion.execute(f"DELETE FROM {d['tabla']}")
+        conexion.execute("UPDATE _kpi_marca SET ultimo_id = 0")
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+
+
+def verificar(conexion):
+    """
+    Compara los acumulados con la agregación en vivo de las filas hasta la marca.
+    Retorna {tabla_kpi: {"faltan": [...], "sobran": [...]}} solo con las que difieren.
+    """
+    diferencias = {}
+    for fuente, d in _FUENTES.items():
+        marca = conexion.execute("SELECT ultimo_id FROM _kpi_marca WHERE tabla = ?", (fuente,)).fetchone()[0]
+        columnas = list(d["claves"]) + list(d["medidas"])
+        claves = _expresiones(fuente, "claves", "")
+        medidas = [f"SUM({e})" for e in _expresiones(fuente, "medidas", "")]
+        grupos = ", ".join(str(i) for i in range(1, len(claves) + 1))
+        vivo = set(conexion.execute(f"SELECT {', '.join(claves + medidas)} FROM {fuente} WHERE id <= ? GROUP BY {grupos}", (marca,)))
+        guardado = set(conexion.execute(f"SELECT {', '.join(columnas)} FROM {d['tabla']}"))
+        if vivo != guardado:
+            diferencias[d["tabla"]] = {"faltan": sorted(vivo - guardado, key=repr), "sobran": sorted(guardado - vivo, key=repr)}
+    return diferencias
+
+
+# =========================================
+# INDICADORES
+# =========================================
+def _dia(valor):
+    return fechas.interpretar(valor)[0].strftime("%Y-%m-%d")
+
+
+def periodo_reciente(dias: int = 30):
+    """(desde, hasta) 'YYYY-MM-DD': los últimos dias días con pagos registrados."""
+    instalar()
+    with funciones_crud.obtener_conexion() as conexion:
+        ultima = conexion.execute("SELECT MAX(hora) FROM _kpi_pagos_hora WHERE hora <> ''").fetchone()[0]
+    if not ultima:
+        return None, None
+    hasta, _ = fechas.interpretar(ultima)
+    return (hasta - datetime.timedelta(days=dias - 1)).strftime("%Y-%m-%d"), hasta.strftime("%Y-%m-%d")
+
+
+def ocupacion(desde, hasta, limite: int = 500) -> List[Dict[str, Any]]:
+    """Servicios que salen entre desde y hasta (por idx_servicio_salida), con su ocupación en %."""
+    reportes.instalar()
+    condicion, valores = fechas.rango("fecha_salida", desde, hasta)
+    with funciones_crud.obtener_conexion() as conexion:
+        filas = conexion.execute(f"""
+            SELECT s.id, s.codigo, s.fecha_salida, COALESCE(r.boletos_vendidos, 0), b.capacidad
+            FROM Servicio s JOIN Bus b ON b.id = s.bus_id
+            LEFT JOIN _resumen_boletos_servicio r ON r.servicio_id = s.id
+            WHERE {condicion} ORDER BY s.fecha_salida LIMIT ?""",
+            valores + (limite,)).fetchall()
+    return [{"servicio_id": i, "codigo": c, "salida": f, "vendidos": v, "capacidad": cap,
+             "ocupacion": round(100.0 * v / cap, 1) if cap else None} for i, c, f, v, cap in filas]
+
+
+def ocupacion_promedio(desde, hasta) -> Optional[float]:
+    """Boletos vendidos / asientos ofrecidos (%) de todos los servicios que salen en el período."""
+    reportes.instalar()
+    condicion, valores = fechas.rango("fecha_salida", desde, hasta)
+    with funciones_crud.obtener_conexion() as conexion:
+        vendidos, asientos = conexion.execute(f"""
+            SELECT SUM(COALESCE(r.boletos_vendidos, 0)), SUM(b.capacidad)
+            FROM Servicio s JOIN Bus b ON b.id = s.bus_id
+            LEFT JOIN _resumen_boletos_servicio r ON r.servicio_id = s.id
+            WHERE {condicion}""", valores).fetchone()
+    return round(100.0 * vendidos / asientos, 1) if asientos else None
+
+
+def ingresos_ruta_dia(desde, hasta) -> List[Dict[str, Any]]:
+    """Ingresos por ruta y día de pago (resumen de reportes.py)."""
+    reportes.instalar()
+    with funciones_crud.obtener_conexion() as conexion:
+        filas = conexion.execute("""
+            SELECT d.dia, d.ruta_id, r.nombre, d.total_ingresos, d.pagos
+            FROM _resumen_ingresos_ruta_dia d JOIN Ruta r ON r.id = d.ruta_id
+            WHERE d.dia >= ? AND d.dia <= ? ORDER BY d.dia, d.total_ingresos DESC""",
+            (_dia(desde), _dia(hasta))).fetchall()
+    return [{"dia": d, "ruta_id": i, "ruta": n, "ingresos": t, "pagos": p} for d, i, n, t, p in filas]
+
+
+def medios_pago(desde, hasta, por_hora: bool = False) -> List[Dict[str, Any]]:
+    """Pagos e ingresos por medio de pago, por día (o por hora) entre desde y hasta."""
+    condicion, valores = fechas.rango("hora", desde, hasta)
+    periodo = "hora" if por_hora else "substr(hora, 1, 10)"
+    with funciones_crud.obtener_conexion() as conexion:
+        filas = conexion.execute(f"""
+            SELECT {periodo}, metodo, SUM(total_ingresos), SUM(pagos) FROM _kpi_pagos_hora
+            WHERE {condicion} GROUP BY 1, 2 ORDER BY 1, 2""", valores).fetchall()
+    return [{"periodo": p, "metodo": m, "ingresos": t, "pagos": n} for p, m, t, n in filas]
+
+
+def carga_choferes(desde, hasta, limite: int = 50) -> List[Dict[str, Any]]:
+    """Choferes con más minutos de viaje entre desde y hasta (servicios, minutos y días trabajados)."""
+    with funciones_crud.obtener_conexion() as conexion:
+        filas = conexion.execute("""
+            SELECT k.chofer_id, c.nombre, SUM(k.servicios), SUM(k.minutos), COUNT(*)
+            FROM _kpi_chofer_dia k JOIN Chofer c ON c.id = k.chofer_id
+            WHERE k.dia >= ? AND k.dia <= ? GROUP BY k.chofer_id ORDER BY 4 DESC LIMIT ?""",
+            (_dia(desde), _dia(hasta), limite)).fetchall()
+    return [{"chofer_id": i, "chofer": n, "servicios": s, "horas": round(m / 60, 1), "dias": d} for i, n, s, m, d in filas]
+
+
+def indicadores(desde, hasta, limite: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Pone al día los acumulados y arma todos los indicadores del período (la
+    página los guarda en caché por período, así cada redibujo no vuelve a consultar).
+    """
+    actualizar()
+    return {
+        "ocupacion": ocupacion(desde, hasta, limite or 500),
+        "ocupacion_promedio": ocupacion_promedio(desde, hasta),
+        "ingresos_ruta_dia": ingresos_ruta_dia(desde, hasta),
+        "medios_pago": medios_pago(desde, hasta),
+        "carga_choferes": carga_choferes(desde, hasta, limite or 50),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=["instalar", "actualizar", "verificar", "desinstalar"])
+    parser.add_argument("--bd", help="archivo de base de datos (por defecto " + funciones_crud.RUTA_BD + ")")
+    args = parser.parse_args(argv)
+    if args.bd:
+        funciones_crud.configurar_pool(ruta_bd=args.bd)
+    if args.comando in ("instalar", "actualizar"):
+        nuevo = instalar()
+        sumadas = actualizar()
+        print(("Acumulados instalados. " if nuevo else "") + "Filas sumadas: " + ", ".join(f"{t} {n}" for t, n in sumadas.items()))
+        return 0
+    with funciones_crud.obtener_conexion() as conexion:
+        if args.comando == "desinstalar":
+            desinstalar(conexion)
+            print("Acumulados eliminados.")
+            return 0
+        if not instalado(conexion):
+            print("Los acumulados no están instalados (use: python tablero.py instalar).")
+            return 1
+        diferencias = verificar(conexion)
+    if not diferencias:
+        print("Acumulados consistentes con las tablas de origen.")
+        return 0
+    for nombre, detalle in diferencias.items():
+        print(f"{nombre}: faltan {len(detalle['faltan'])} filas, sobran {len(detalle['sobran'])}")
+        for fila in detalle["faltan"][:10]:
+            print("   falta:", fila)
+        for fila in detalle["sobran"][:10]:
+            print("   sobra:", fila)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Tarifa vigente por ruta y fecha, resuelta en memoria.
+
+Todas las filas de Tarifa se cargan en un índice de intervalos por ruta: arrays
+con el inicio, el fin y el id de cada tarifa, ordenados por inicio. La
+tarifa vigente para (ruta R, momento T) se encuentra con bisect sobre los
+inicios de R, sin ir a la base.
+
+Vigencia de cada tarifa (intervalo semiabierto [inicio, fin)):
+  - fecha_inicio "YYYY-MM-DD" empieza a las 00:00 de ese día; vacía = desde siempre;
+  - fecha_fin "YYYY-MM-DD" incluye el día completo, "YYYY-MM-DD HH:MM" incluye
+    ese minuto; vacía = sin fin.
+  - Se aceptan "/" o "-" como separador de la fecha.
+Comparar esos textos en SQL (fecha_fin >= '2025-11-30 10:00') deja afuera el
+último día de las tarifas guardadas solo con fecha (las que "fechas.py migrar"
+todavía no pasó a "2025-11-30 23:59"); aquí no.
+
+Al cargar se revisa cada ruta y se informan los solapamientos (dos tarifas
+vigentes a la vez: gana la de inicio más reciente) y los huecos (períodos sin
+tarifa). El índice se recarga después de cada escritura en Tarifa hecha por
+este proceso; los triggers llevan un número de versión en _tarifas_version,
+que se revisa cada VIGENCIA_INDICE segundos para ver escrituras de otros procesos.
+
+Uso:
+    python tarifas.py revisar            (lista solapamientos y huecos)
+    python tarifas.py vigente 1 "2025-10-22 08:00"
+"""
+import argparse
+import bisect
+import datetime
+import sys
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+import fechas
+import funciones_crud
+
+VIGENCIA_INDICE = 2.0  # segundos entre revisiones de la versión guardada en la base
+_EPOCA = datetime.datetime(2000, 1, 1)  # los momentos se guardan en minutos desde esta fecha
+_SIEMPRE_ANTES, _SIEMPRE_DESPUES = -(1 << 62), 1 << 62
+
+VERSION = "_tarifas_version"
+_CREAR_VERSION = f"CREATE TABLE IF NOT EXISTS {VERSION} (version INTEGER NOT NULL)"
+
+
+def _triggers():
+    sumar = f"UPDATE {VERSION} SET version = version + 1;"
+    return [(f"_trg_tarifas_{evento.lower()}", f"AFTER {evento} ON Tarifa BEGIN {sumar} END") for evento in ("INSERT", "UPDATE", "DELETE")]
+
+
+# =========================================
+# INSTALAR
+# =========================================
+_instalado = set()  # archivos de base donde ya se verificó la instalación
+
+
+def instalado(conexion):
+    """True si existen la tabla de versión y sus triggers."""
+    nombres = {r[0] for r in conexion.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+    return VERSION in nombres and all(nombre in nombres for nombre, _ in _triggers())
+
+
+def instalar(conexion=None):
+    """Crea la tabla de versión y los triggers de Tarifa si faltan. Retorna True si instaló algo."""
+    if conexion is None:
+        if funciones_crud.RUTA_BD in _instalado:
+            return False
+        with funciones_crud.obtener_conexion() as propia:
+            resultado = funciones_crud.con_reintentos(lambda: instalar(propia))
+        _instalado.add(funciones_crud.RUTA_BD)
+        return resultado
+    if instalado(conexion):
+        return False
+    conexion.execute("BEGIN IMMEDIATE")
+    try:
+        conexion.execute(_CREAR_VERSION)
+        if conexion.execute(f"SELECT COUNT(*) FROM {VERSION}").fetchone()[0] == 0:
+            conexion.execute(f"INSERT INTO {VERSION} (version) VALUES (0)")
+        for nombre, cuerpo in _triggers():
+            conexion.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+    return True
+
+
+def desinstalar(conexion):
+    """Borra los triggers y la tabla de versión."""
+    for nombre, _ in _triggers():
+        conexion.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    conexion.execute(f"DROP TABLE IF EXISTS {VERSION}")
+    conexion.commit()
+    _instalado.clear()
+    _indices.clear()
+
+
+# =========================================
+# FECHAS
+# =========================================
+def _minutos(texto, es_fin=False) -> Optional[int]:
+    """
+    Minutos desde _EPOCA del comienzo (o, con es_fin, del final exclusivo) de una fecha.
+    Vacía = sin límite. Retorna None si el texto no es una fecha válida.
+    """
+    if texto is None or str(texto).strip() == "":
+        return _SIEMPRE_DESPUES if es_fin else _SIEMPRE_ANTES
+    try:
+        momento, tiene_hora = fechas.interpretar(texto)
+    except ValueError:
+        return None
+    minutos = int((momento - _EPOCA).total_seconds()) // 60
+    if es_fin:
+        minutos += 1 if tiene_hora else 24 * 60  # solo fecha: el día completo
+    return minutos
+
+
+def _momento(momento) -> int:
+    """Minutos de un datetime o texto "YYYY-MM-DD HH:MM"; ValueError si no es válido."""
+    if isinstance(momento, datetime.datetime):
+        return int((momento - _EPOCA).total_seconds()) // 60
+    minutos = _minutos(momento) if momento is not None and str(momento).strip() else None
+    if minutos is None:
+        raise ValueError(f"Fecha no válida: {momento!r} (use YYYY-MM-DD HH:MM).")
+    return minutos
+
+
+def _texto(minutos) -> str:
+    if minutos <= _SIEMPRE_ANTES or minutos >= _SIEMPRE_DESPUES:
+        return "(sin límite)"
+    return (_EPOCA + datetime.timedelta(minutes=minutos)).strftime("%Y-%m-%d %H:%M")
+
+
+# =========================================
+# ÍNDICE DE INTERVALOS EN MEMORIA
+# =========================================
+class _TarifasRuta:
+    """
+    Tarifas de una ruta ordenadas por inicio, en arrays paralelos. max_fines[i] es
+    el mayor fin entre las tarifas 0..i: al buscar hacia atrás desde la última que
+    empezó, se puede parar apenas max_fines no alcanza al momento buscado.
+    """
+
+    __slots__ = ("inicios", "fines", "max_fines", "ids")
+
+    def __init__(self, filas):
+        filas.sort()
+        self.inicios = array("q", (f[0] for f in filas))
+        self.fines = array("q", (f[1] for f in filas))
+        self.ids = array("q", (f[2] for f in filas))
+        self.max_fines = array("q")
+        mayor = _SIEMPRE_ANTES
+        for fin in self.fines:
+            mayor = max(mayor, fin)
+            self.max_fines.append(mayor)
+
+    def vigente(self, momento) -> int:
+        """Posición de la tarifa vigente en momento (la de inicio más reciente), o -1."""
+        i = bisect.bisect_right(self.inicios, momento) - 1
+        while i >= 0 and self.max_fines[i] > momento:
+            if self.fines[i] > momento:
+                return i
+            i -= 1
+        return -1
+
+
+class IndiceTarifas:
+    """Tarifas de todas las rutas en memoria, con los problemas encontrados al cargarlas."""
+
+    def __init__(self):
+        self.rutas: Dict[int, _TarifasRuta] = {}
+        self.detalle: Dict[int, tuple] = {}  # tarifa_id -> (ruta_id, nombre, monto, fecha_inicio, fecha_fin)
+        self.problemas: List[Dict[str, Any]] = []
+        self.version = None  # versión de _tarifas_version cargada
+        self.generacion = None  # generación de la caché de funciones_crud para Tarifa
+        self.revisado = 0.0  # time.monotonic() de la última revisión de versión
+
+    def cargar(self, conexion):
+        """Lee Tarifa completa, arma los intervalos por ruta y revisa solapamientos y huecos."""
+        fila = conexion.execute(f"SELECT version FROM {VERSION}").fetchone()
+        self.version = fila[0] if fila else None
+        por_ruta: Dict[int, list] = {}
+        self.detalle, self.problemas = {}, []
+        for tarifa_id, ruta_id, nombre, monto, fecha_inicio, fecha_fin in conexion.execute(
+                "SELECT id, ruta_id, nombre, monto, fecha_inicio, fecha_fin FROM Tarifa"):
+            inicio, fin = _minutos(fecha_inicio), _minutos(fecha_fin, es_fin=True)
+            if inicio is None or fin is None:
+                self.problemas.append({"ruta_id": ruta_id, "tipo": "fecha inválida", "tarifas": (tarifa_id,),
+                                       "desde": fecha_inicio, "hasta": fecha_fin})
+                continue
+            if fin <= inicio:
+                self.problemas.append({"ruta_id": ruta_id, "tipo": "termina antes de empezar", "tarifas": (tarifa_id,),
+                                       "desde": fecha_inicio, "hasta": fecha_fin})
+                continue
+            self.detalle[tarifa_id] = (ruta_id, nombre, monto, fecha_inicio, fecha_fin)
+            por_ruta.setdefault(ruta_id, []).append((inicio, fin, tarifa_id))
+        self.rutas = {ruta_id: _TarifasRuta(filas) for ruta_id, filas in por_ruta.items()}
+        for ruta_id, tarifas in sorted(self.rutas.items()):
+            self._revisar(ruta_id, tarifas)
+
+    def _revisar(self, ruta_id, tarifas):
+        mas_larga = 0  # tarifa anterior que llega más lejos
+        for i in range(1, len(tarifas.inicios)):
+            anterior_fin = tarifas.max_fines[i - 1]
+            inicio = tarifas.inicios[i]
+            if inicio < anterior_fin:
+                self.problemas.append({"ruta_id": ruta_id, "tipo": "solapamiento", "tarifas": (tarifas.ids[mas_larga], tarifas.ids[i]),
+                                       "desde": _texto(inicio), "hasta": _texto(min(anterior_fin, tarifas.fines[i]))})
+            elif inicio > anterior_fin:
+                self.problemas.append({"ruta_id": ruta_id, "tipo": "hueco", "tarifas": (tarifas.ids[mas_larga], tarifas.ids[i]),
+                                       "desde": _texto(anterior_fin), "hasta": _texto(inicio)})
+            if tarifas.fines[i] > tarifas.fines[mas_larga]:
+                mas_larga = i
+
+    def vigente(self, ruta_id, momento) -> Optional[int]:
+        """id de la tarifa vigente para la ruta en momento (minutos), o None."""
+        tarifas = self.rutas.get(ruta_id)
+        if tarifas is None:
+            return None
+        i = tarifas.vigente(momento)
+        return tarifas.ids[i] if i >= 0 else None
+
+
+# =========================================
+# FUNCIONES PARA LA APLICACIÓN
+# =========================================
+_indices: Dict[str, IndiceTarifas] = {}  # RUTA_BD -> índice cargado
+_candado = threading.Lock()
+
+
+def obtener_indice() -> IndiceTarifas:
+    """
+    Índice de la base configurada, cargado la primera vez y recargado si se escribió
+    en Tarifa (desde este proceso: al instante; desde otro: en VIGENCIA_INDICE segundos).
+    """
+    instalar()
+    generacion = funciones_crud.cache.generacion("Tarifa")
+    with _candado:
+        indice = _indices.get(funciones_crud.RUTA_BD)
+        ahora = time.monotonic()
+        if indice is not None and indice.generacion == generacion and ahora - indice.revisado < VIGENCIA_INDICE:
+            return indice
+        with funciones_crud.obtener_conexion() as conexion:
+            if indice is not None and indice.generacion == generacion:
+                fila = conexion.execute(f"SELECT version FROM {VERSION}").fetchone()
+                if fila and fila[0] == indice.version:
+                    indice.revisado = ahora
+                    return indice
+            nuevo = IndiceTarifas()
+            nuevo.cargar(conexion)
+        nuevo.generacion, nuevo.revisado = generacion, ahora
+        _indices[funciones_crud.RUTA_BD] = nuevo
+        return nuevo
+
+
+def tarifa_vigente(ruta_id: int, momento) -> Optional[Dict[str, Any]]:
+    """
+    Tarifa vigente para la ruta en un momento.
+    Parámetros:
+        ruta_id: id de Ruta
+        momento: "YYYY-MM-DD HH:MM" (o solo la fecha) o datetime
+    Retorna {"id", "nombre", "monto", "fecha_inicio", "fecha_fin"} o None si no hay
+    ninguna vigente. Lanza ValueError si momento no es una fecha válida.
+    """
+    minutos = _momento(momento)
+    indice = obtener_indice()
+    tarifa_id = indice.vigente(int(ruta_id), minutos)
+    if tarifa_id is None:
+        return None
+    _, nombre, monto, fecha_inicio, fecha_fin = indice.detalle[tarifa_id]
+    return {"id": tarifa_id, "nombre": nombre, "monto": monto, "fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin}
+
+
+def precio_servicio(servicio_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Tarifa que corresponde a un boleto del servicio: la vigente para su ruta en su
+    fecha de salida. Retorna lo mismo que tarifa_vigente, o None si no existe el
+    servicio, su fecha no es válida o no hay tarifa vigente.
+    """
+    filas = funciones_crud.consultar("Servicio", ["ruta_id", "fecha_salida"], "id = ?", (int(servicio_id),))
+    if not filas:
+        return None
+    ruta_id, fecha_salida = filas[0]
+    try:
+        return tarifa_vigente(ruta_id, fecha_salida)
+    except ValueError:
+        return None
+
+
+def problemas() -> List[Dict[str, Any]]:
+    """Solapamientos, huecos y fechas inválidas encontrados en la última carga."""
+    return list(obtener_indice().problemas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=["revisar", "vigente"])
+    parser.add_argument("ruta_id", nargs="?", type=int)
+    parser.add_argument("momento", nargs="?", help='"YYYY-MM-DD HH:MM"')
+    parser.add_argument("--bd", help="archivo de base de datos (por defecto " + funciones_crud.RUTA_BD + ")")
+    args = parser.parse_args(argv)
+    if args.bd:
+        funciones_crud.configurar_pool(ruta_bd=args.bd)
+    if args.comando == "vigente":
+        if args.ruta_id is None or not args.momento:
+            parser.error("vigente necesita ruta_id y momento")
+        tarifa = tarifa_vigente(args.ruta_id, args.momento)
+        print(tarifa if tarifa else "No hay tarifa vigente para esa ruta en ese momento.")
+        return 0 if tarifa else 1
+    encontrados = problemas()
+    for problema in encontrados:
+        print(f"Ruta {problema['ruta_id']}: {problema['tipo']} entre tarifas {problema['tarifas']} ({problema['desde']} — {problema['hasta']})")
+    print(f"{len(encontrados)} problema(s) en las tarifas.")
+    return 1 if encontrados else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
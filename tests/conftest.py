@@ -0,0 +1,49 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Pruebas con pytest sobre una base temporal creada con los scripts del proyecto.
+# Nunca tocan base_de_datos_transportes.db.
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+import funciones_crud  # noqa: E402
+
+SCRIPT_TABLAS = os.path.join(RAIZ, "Script Tablas y Vistas.sql")
+SCRIPT_DATOS = os.path.join(RAIZ, "Datos de prueba.sql")
+
+
+@pytest.fixture
+def bd(tmp_path):
+    """
+    Base temporal con el esquema y los datos de prueba; funciones_crud queda apuntando
+    a ella durante la prueba. Retorna la ruta del archivo.
+    """
+    ruta = str(tmp_path / "transportes.db")
+    conexion = sqlite3.connect(ruta)
+    for script in (SCRIPT_TABLAS, SCRIPT_DATOS):
+        with open(script, encoding="utf-8") as archivo:
+            conexion.executescript(archivo.read())
+    conexion.commit()
+    conexion.close()
+    anterior = funciones_crud.RUTA_BD
+    funciones_crud.configurar_pool(ruta_bd=ruta)
+    try:
+        yield ruta
+    finally:
+        funciones_crud.configurar_pool(ruta_bd=anterior)
+
+
+@pytest.fixture
+def leer(bd):
+    """Función que lee directo del archivo (sin pool ni caché) para comprobar lo guardado."""
+    def consultar(consulta, valores=()):
+        conexion = sqlite3.connect(bd)
+        try:
+            return conexion.execute(consulta, valores).fetchall()
+        finally:
+            conexion.close()
+    return consultar
@@ -0,0 +1,59 @@
+import borrado_cascada
+import crud_asincrono
+import funciones_crud
+
+
+def _filas(leer):
+    return {t: leer(f'SELECT COUNT(*) FROM "{t}"')[0][0] for t in ("Servicio", "Boleto", "Pago")}
+
+
+def test_plan_cuenta_dependientes_sin_borrar(bd, leer):
+    antes = _filas(leer)
+    plan = borrado_cascada.planificar("Servicio", 1)
+    assert plan["existe"] and plan["conteos"] == {"Pago": 2, "Boleto": 2, "Servicio": 1}
+    assert _filas(leer) == antes
+
+
+def test_borra_con_el_plan_confirmado(bd, leer):
+    plan = borrado_cascada.planificar("Servicio", 1)
+    resultado = borrado_cascada.borrar("Servicio", 1, plan["conteos"])
+    assert resultado["deleted"] and resultado["total"] == 5
+    assert leer("SELECT COUNT(*) FROM Boleto WHERE servicio_id = 1") == [(0,)]
+    assert leer("SELECT COUNT(*) FROM Pago WHERE boleto_id IN (1, 2)") == [(0,)]
+    # Lo que no dependía del servicio sigue ahí
+    assert leer("SELECT id FROM Boleto ORDER BY id") == [(3,), (4,)]
+    assert leer("SELECT boleto_id FROM Pago ORDER BY boleto_id") == [(3,), (4,)]
+
+
+def test_no_borra_si_se_vendio_un_boleto_despues_del_plan(bd, leer):
+    plan = borrado_cascada.planificar("Servicio", 1)
+    funciones_crud.insertar("Boleto", ["codigo", "servicio_id", "cliente_id", "asiento", "precio"], ["B005", 1, 3, 7, 8500])
+    antes = _filas(leer)
+    resultado = borrado_cascada.borrar("Servicio", 1, plan["conteos"])
+    assert not resultado["deleted"] and resultado["error"] == "changed"
+    assert resultado["plan"]["conteos"]["Boleto"] == 3
+    assert _filas(leer) == antes
+
+
+def test_no_borra_si_desaparecio_un_dependiente(bd, leer):
+    plan = borrado_cascada.planificar("Servicio", 1)
+    funciones_crud.eliminar("Pago", "boleto_id = ?", (2,))
+    resultado = borrado_cascada.borrar("Servicio", 1, plan["conteos"])
+    assert resultado["error"] == "changed" and resultado["plan"]["conteos"]["Pago"] == 1
+    assert leer("SELECT COUNT(*) FROM Boleto WHERE servicio_id = 1") == [(2,)]
+
+
+def test_fila_inexistente(bd):
+    assert borrado_cascada.borrar("Servicio", 999, {"Servicio": 1})["error"] == "not_found"
+
+
+def test_borra_por_el_hilo_escritor(bd, leer):
+    trabajador = crud_asincrono.iniciar(lectores=1, encolar_escrituras=True)
+    try:
+        plan = borrado_cascada.planificar("Servicio", 2)
+        antes = trabajador.escrituras
+        resultado = crud_asincrono.en_segundo_plano(borrado_cascada.borrar, "Servicio", 2, plan["conteos"]).result(timeout=10)
+        assert resultado["deleted"] and trabajador.escrituras == antes + 1
+    finally:
+        crud_asincrono.detener()
+    assert leer("SELECT COUNT(*) FROM Servicio WHERE id = 2") == [(0,)]
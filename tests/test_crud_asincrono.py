@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+import crud_asincrono
+import funciones_crud
+
+
+@pytest.fixture
+def trabajador(bd):
+    """Hilos de crud_asincrono con las escrituras de funciones_crud encoladas en el escritor."""
+    yield crud_asincrono.iniciar(lectores=2, encolar_escrituras=True)
+    crud_asincrono.detener()
+
+
+def _insertar_parada(nombre):
+    hilos = []
+    original = funciones_crud.con_reintentos
+
+    def registrar(operacion):
+        hilos.append(threading.current_thread().name)
+        return original(operacion)
+
+    funciones_crud.con_reintentos = registrar
+    try:
+        funciones_crud.insertar("Parada", ["nombre", "ciudad"], [nombre, "Talca"])
+    finally:
+        funciones_crud.con_reintentos = original
+    return hilos
+
+
+def test_sin_encolar_no_registra_el_escritor(bd):
+    crud_asincrono.iniciar(lectores=1)
+    try:
+        assert funciones_crud._escritor is None
+        assert _insertar_parada("Terminal Sur") == [threading.current_thread().name]
+    finally:
+        crud_asincrono.detener()
+
+
+def test_escritura_desde_un_lector_pasa_por_el_escritor(trabajador, leer):
+    antes = trabajador.escrituras
+    hilos = crud_asincrono.en_segundo_plano(_insertar_parada, "Terminal Norte").result(timeout=10)
+    assert hilos == ["bd-escritor"]
+    assert trabajador.escrituras == antes + 1
+    assert leer("SELECT COUNT(*) FROM Parada WHERE nombre = 'Terminal Norte'") == [(1,)]
+
+
+def test_escritura_desde_el_hilo_principal_pasa_por_el_escritor(trabajador):
+    assert _insertar_parada("Terminal Centro") == ["bd-escritor"]
+
+
+def test_escritura_con_transaccion_abierta_no_espera_al_escritor(trabajador, leer):
+    def vender():
+        with funciones_crud.obtener_conexion() as conexion:
+            conexion.execute("INSERT INTO Parada (nombre, ciudad) VALUES ('Terminal Este', 'Talca')")
+            # La transacción de este hilo tiene el bloqueo: el escritor no podría escribir
+            hilos = _insertar_parada("Terminal Oeste")
+            conexion.commit()
+        return hilos
+
+    antes = trabajador.escrituras
+    hilos = crud_asincrono.en_segundo_plano(vender).result(timeout=10)
+    assert hilos and hilos[0].startswith("bd-lector")
+    assert trabajador.escrituras == antes
+    assert leer("SELECT COUNT(*) FROM Parada WHERE nombre IN ('Terminal Este', 'Terminal Oeste')") == [(2,)]
@@ -0,0 +1,33 @@
+import funciones_crud
+
+
+def test_upsert_por_rut_conserva_id_y_boletos(bd, leer):
+    boletos = leer("SELECT id, cliente_id FROM Boleto ORDER BY id")
+    res = funciones_crud.upsert_lote("Cliente", ["id", "rut", "nombre"], [(7, "20.123.456-7", "Beatriz C. Carvajal")])
+    assert res["fallidas"] == 0 and res["afectadas"] == 1
+    assert leer("SELECT id, nombre FROM Cliente WHERE rut = ?", ("20.123.456-7",)) == [(1, "Beatriz C. Carvajal")]
+    assert leer("SELECT COUNT(*) FROM Cliente WHERE id = 7") == [(0,)]
+    assert leer("SELECT id, cliente_id FROM Boleto ORDER BY id") == boletos
+
+
+def test_upsert_por_codigo_conserva_id_y_dependientes(bd, leer):
+    servicios = leer("SELECT id, ruta_id FROM Servicio ORDER BY id")
+    paradas = leer("SELECT ruta_id, parada_id, orden FROM RutaParadas ORDER BY ruta_id, orden")
+    res = funciones_crud.upsert_lote("Ruta", ["id", "codigo", "nombre", "origen", "destino"],
+                                     [{"id": 9, "codigo": "R001", "nombre": "Santiago - Viña", "origen": "Santiago", "destino": "Viña del Mar"}])
+    assert res["fallidas"] == 0
+    assert leer("SELECT id, destino FROM Ruta WHERE codigo = 'R001'") == [(1, "Viña del Mar")]
+    assert leer("SELECT id, ruta_id FROM Servicio ORDER BY id") == servicios
+    assert leer("SELECT ruta_id, parada_id, orden FROM RutaParadas ORDER BY ruta_id, orden") == paradas
+
+
+def test_upsert_inserta_fila_nueva_con_su_id(bd, leer):
+    res = funciones_crud.upsert_lote("Cliente", ["id", "rut", "nombre"], [(7, "23.000.000-5", "Nueva")])
+    assert res["afectadas"] == 1
+    assert leer("SELECT id, nombre FROM Cliente WHERE rut = '23.000.000-5'") == [(7, "Nueva")]
+
+
+def test_sentencia_upsert_no_actualiza_la_clave_primaria(bd):
+    texto = funciones_crud.sentencias.upsert("Cliente", ["id", "rut", "nombre"], ["rut"])
+    actualizacion = texto.split("DO UPDATE SET", 1)[1]
+    assert '"id"' not in actualizacion and '"nombre" = excluded."nombre"' in actualizacion
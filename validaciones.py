@@ -0,0 +1,183 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import re
+import sqlite3
+
+from catalogo import obtener_catalogo
+from esquema import SCHEMA_META
+import fechas
+
+# Reglas de validación de datos según SCHEMA_META (sin Streamlit).
+# Las usa la interfaz (main.py) antes de escribir y las herramientas de
+# importación masiva (importar_exportar.py) por lotes.
+# Todo pasa por validar_lote: validar_datos es el caso de un lote de una fila.
+
+try:
+    import funciones_crud
+except Exception:
+    funciones_crud = None  # type: ignore
+
+# Patrones compilados una sola vez (no en cada llamada)
+# RUT: 12.345.678-9 o 1.234.567-8; permitir K/k
+_PATRON_RUT = re.compile(r"^\d{1,2}\.\d{3}\.\d{3}-[\dkK]$")
+
+# Hasta esta cantidad de valores se usa "col IN (?, ?, ...)"; con más, una tabla temporal
+_MAX_PARAMETROS_IN = 900
+
+
+def _vacio(val: Any) -> bool:
+    return val is None or (isinstance(val, str) and val.strip() == "")
+
+
+def _validar_campos(tabla: str, datos: Dict[str, Any], is_update: bool = False) -> Tuple[bool, Optional[str]]:
+    """Reglas que no necesitan la base: campos requeridos y formatos (RUT, fechas).
+    Retorna (True, None) si pasa, o (False, mensaje) si falla.
+    """
+    meta = SCHEMA_META.get(tabla, {})
+    # Required
+    for req in meta.get("required", []):
+        # Si es update y campo no está presente, no lo exigimos
+        if is_update and req not in datos:
+            continue
+        if _vacio(datos.get(req)):
+            return False, f"El campo '{req}' es obligatorio para la tabla {tabla}."
+
+    # Tipos especiales
+    types = meta.get("types", {})
+    for field, kind in types.items():
+        val = datos.get(field)
+        if val is None:
+            continue
+        if kind == "rut":
+            if not _PATRON_RUT.match(str(val)):
+                return False, f"El campo '{field}' debe tener formato RUT: xx.xxx.xxx-x"
+        elif kind == "datetime":
+            # Se acepta "-" o "/" y la hora es opcional; al guardar queda "YYYY-MM-DD HH:MM"
+            if _vacio(val):
+                continue
+            try:
+                fechas.interpretar(val)
+            except ValueError:
+                return False, f"El campo '{field}' debe tener formato fecha 'YYYY-MM-DD' o 'YYYY-MM-DD HH:MM'"
+
+    return True, None
+
+
+def _claves_foraneas(conexion: sqlite3.Connection, tabla: str) -> Dict[str, Tuple[str, str]]:
+    """Columnas *_id de la tabla que son clave foránea: {columna: (tabla_referida, columna_referida)}."""
+    info = obtener_catalogo(conexion).tablas.get(tabla)
+    if not info:
+        return {}
+    return {fk.columna: (fk.tabla_ref, fk.columna_ref) for fk in info.claves_foraneas if fk.columna.endswith("_id")}
+
+
+def _buscar_existentes(conexion: sqlite3.Connection, tabla: str, col: str, valores: List[Any], devolver: str) -> Dict[str, Set[Any]]:
+    """Busca de una vez qué valores de 'col' existen en 'tabla'.
+    Con pocos valores usa "col IN (...)"; con muchos los carga en una tabla temporal y
+    hace un join, así siempre es una sola consulta por columna (usando el índice de col).
+    Retorna {str(valor): {valores de la columna 'devolver' de las filas encontradas}}.
+    """
+    encontrados: Dict[str, Set[Any]] = {}
+    if not valores:
+        return encontrados
+    if len(valores) <= _MAX_PARAMETROS_IN:
+        signos = ", ".join(["?"] * len(valores))
+        filas = conexion.execute(
+            f'SELECT "{col}", "{devolver}" FROM "{tabla}" WHERE "{col}" IN ({signos})', tuple(valores)
+        ).fetchall()
+    else:
+        habia_transaccion = conexion.in_transaction
+        conexion.execute("CREATE TEMP TABLE IF NOT EXISTS _valores_validacion (valor)")
+        conexion.execute("DELETE FROM _valores_validacion")
+        conexion.executemany("INSERT INTO _valores_validacion (valor) VALUES (?)", ((v,) for v in valores))
+        filas = conexion.execute(
+            f'SELECT t."{col}", t."{devolver}" FROM _valores_validacion v JOIN "{tabla}" t ON t."{col}" = v.valor'
+        ).fetchall()
+        conexion.execute("DELETE FROM _valores_validacion")
+        if not habia_transaccion:
+            conexion.commit()  # solo se cierra la transacción si la abrimos aquí
+    for valor, dato in filas:
+        encontrados.setdefault(str(valor), set()).add(dato)
+    return encontrados
+
+
+def _valores_a_revisar(filas: List[Dict[str, Any]], errores: List[Optional[str]], col: str) -> Dict[str, List[int]]:
+    """Agrupa por valor (como texto) las posiciones de las filas aún válidas que traen 'col'."""
+    posiciones: Dict[str, List[int]] = {}
+    for i, datos in enumerate(filas):
+        if errores[i] is not None or col not in datos:
+            continue
+        val = datos[col]
+        if _vacio(val):
+            continue
+        posiciones.setdefault(str(val), []).append(i)
+    return posiciones
+
+
+def validar_lote(tabla: str, filas: List[Dict[str, Any]], permitir_existentes: bool = False,
+                 is_update: bool = False, ids_actuales: Optional[Iterable[Optional[int]]] = None) -> List[Optional[str]]:
+    """Valida un lote de filas con las reglas de SCHEMA_META, con pocas consultas a la base.
+      - Campos requeridos y formatos (RUT, fechas) en una sola pasada con patrones precompilados.
+      - Unicidad: una consulta por columna UNIQUE para todo el lote ("IN (...)" o tabla temporal),
+        más la detección de valores repetidos dentro del mismo lote.
+      - Claves foráneas (*_id): una consulta por columna para confirmar que los ids existen.
+    Parámetros:
+        permitir_existentes: True para upsert (no es error que el valor UNIQUE ya exista)
+        is_update: las filas son actualizaciones parciales (no se exigen los campos ausentes)
+        ids_actuales: en actualizaciones, id de cada fila (su propio valor UNIQUE no es conflicto)
+    Retorna una lista del mismo largo que filas: None si la fila es válida o el mensaje de error.
+    """
+    filas = list(filas)
+    ids = list(ids_actuales) if ids_actuales is not None else [None] * len(filas)
+    errores: List[Optional[str]] = []
+    for datos in filas:
+        ok, msg = _validar_campos(tabla, datos, is_update=is_update)
+        errores.append(None if ok else msg)
+
+    if not funciones_crud or not filas:
+        return errores
+
+    meta = SCHEMA_META.get(tabla, {})
+    try:
+        with funciones_crud.obtener_conexion() as conexion:
+            # Unicidad
+            for col in meta.get("unique", []):
+                posiciones = _valores_a_revisar(filas, errores, col)
+                # Repetidos dentro del mismo lote: solo vale la primera aparición
+                for val, lista in posiciones.items():
+                    for i in lista[1:]:
+                        errores[i] = f"El valor '{filas[i][col]}' para '{col}' está repetido en el lote (fila {lista[0]})."
+                if permitir_existentes or not posiciones:
+                    continue
+                existentes = _buscar_existentes(conexion, tabla, col, [filas[lista[0]][col] for lista in posiciones.values()], "id")
+                for val, lista in posiciones.items():
+                    i = lista[0]
+                    # Si es update y la única fila encontrada es la misma id, ok
+                    otros = existentes.get(val, set()) - {ids[i]}
+                    if otros:
+                        errores[i] = f"El valor '{filas[i][col]}' para '{col}' ya existe en {tabla}."
+
+            # Claves foráneas: el id referido debe existir
+            for col, (tabla_ref, col_ref) in _claves_foraneas(conexion, tabla).items():
+                posiciones = _valores_a_revisar(filas, errores, col)
+                if not posiciones:
+                    continue
+                existentes = _buscar_existentes(conexion, tabla_ref, col_ref, [filas[lista[0]][col] for lista in posiciones.values()], col_ref)
+                for val, lista in posiciones.items():
+                    if val not in existentes:
+                        for i in lista:
+                            errores[i] = f"No existe {tabla_ref} con {col_ref}={filas[i][col]} (campo '{col}')."
+    except sqlite3.Error:
+        # Si la base no responde, se dejan pasar y la propia base aplicará sus restricciones
+        pass
+    return errores
+
+
+def validar_datos(tabla: str, datos: Dict[str, Any], is_update: bool = False, current_id: Optional[int] = None) -> Tuple[bool, Optional[str]]:
+    """Valida datos contra SCHEMA_META: campos requeridos, formato de RUT, fechas, unicidad
+    y existencia de las claves foráneas. Es validar_lote con una sola fila.
+    Retorna (True, None) si pasa, o (False, mensaje) si falla.
+    """
+    error = validar_lote(tabla, [datos], is_update=is_update, ids_actuales=[current_id])[0]
+    if error:
+        return False, error
+    return True, None